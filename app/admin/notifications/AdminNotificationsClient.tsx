@@ -27,7 +27,7 @@ export default function AdminNotificationsPage() {
 
       const data = await response.json();
       if (response.ok) {
-        setMessage('Notification sent successfully!');
+        setMessage(data.message || 'Notification sent successfully!');
         setTitle('');
         setBody('');
         setUserId('');
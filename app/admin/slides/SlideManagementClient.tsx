@@ -1,7 +1,6 @@
 'use client';
 
 import { SlideDTO } from '@/lib/dto';
-import { User } from '@/lib/db.interfaces';
 import React, { useState } from 'react';
 import SlideEditModal from '@/components/admin/SlideEditModal';
 
@@ -9,13 +8,12 @@ type ActionResponse = { success: boolean; error?: string };
 
 interface SlideManagementClientProps {
   slides: SlideDTO[];
-  users: User[];
   createSlideAction: (formData: FormData) => Promise<ActionResponse>;
   updateSlideAction: (formData: FormData) => Promise<ActionResponse>;
   deleteSlideAction: (formData: FormData) => Promise<ActionResponse>;
 }
 
-export default function SlideManagementClient({ slides, users, createSlideAction, updateSlideAction, deleteSlideAction }: SlideManagementClientProps) {
+export default function SlideManagementClient({ slides, createSlideAction, updateSlideAction, deleteSlideAction }: SlideManagementClientProps) {
   const [isModalOpen, setIsModalOpen] = useState(false);
   const [editingSlide, setEditingSlide] = useState<SlideDTO | null>(null);
 
@@ -105,6 +103,11 @@ export default function SlideManagementClient({ slides, users, createSlideAction
                 </td>
               </tr>
             ))}
+            {slides.length === 0 && (
+              <tr>
+                <td colSpan={5} className="p-4 text-center text-gray-400">No slides match these filters.</td>
+              </tr>
+            )}
           </tbody>
         </table>
       </div>
@@ -113,7 +116,6 @@ export default function SlideManagementClient({ slides, users, createSlideAction
         onClose={handleCloseModal}
         onSubmit={handleSubmit}
         slide={editingSlide}
-        users={users}
       />
     </>
   );
@@ -1,29 +1,38 @@
-import { db, User } from '@/lib/db';
+import { db } from '@/lib/db';
 import { SlideDTO } from '@/lib/dto';
 import React from 'react';
 import { verifySession } from '@/lib/auth';
 import { revalidatePath } from 'next/cache';
 import SlideManagementClient from './SlideManagementClient';
+import ListPager from '@/components/admin/ListPager';
+import AuthorPicker from '@/components/admin/AuthorPicker';
 import { redirect } from 'next/navigation';
 import { sanitize } from '@/lib/sanitize';
+import { AUTHOR_SEARCH_MIN_LENGTH } from '@/lib/constants';
 
 export const dynamic = 'force-dynamic';
 
-export default async function SlideManagementPage() {
+interface SlideManagementPageProps {
+  searchParams: { q?: string; type?: string; author?: string; cursor?: string };
+}
+
+export default async function SlideManagementPage({ searchParams }: SlideManagementPageProps) {
   const session = await verifySession();
   // Allow admin and author to access
   if (!session || !['admin', 'author'].includes(session.user.role || '')) {
     redirect('/admin/login');
   }
 
-  // Use the new getAllSlides function
-  // We need to cast the DB result to SlideDTO because db-postgres returns strict DB types
-  // and we are in a transition phase where we want to use DTOs in frontend components.
-  const slidesRaw = await db.getAllSlides();
+  // One keyset page at a time; filters arrive as query params from the form below
+  const q = searchParams.q?.trim() || undefined;
+  const type = searchParams.type === 'video' || searchParams.type === 'html' ? searchParams.type : undefined;
+  const authorId = searchParams.author || undefined;
+  const [{ items: slidesRaw, nextCursor }, author] = await Promise.all([
+    db.listSlidesForAdmin({ q, type, authorId, cursor: searchParams.cursor }),
+    authorId ? db.findUserById(authorId) : Promise.resolve(null),
+  ]);
 
-  // Mapping DB slides to SlideDTO
-  // Note: getAllSlides returns a type that matches the DB schema.
-  // We need to ensure it matches SlideDTO structure.
+  // Fill in defaults for fields older slides may lack
   const slides: SlideDTO[] = slidesRaw.map(s => {
       const base = {
           id: s.id,
@@ -60,8 +69,6 @@ export default async function SlideManagementPage() {
       }
   });
 
-  const users: User[] = await db.getAllUsers();
-
   async function createSlideAction(formData: FormData): Promise<{ success: boolean, error?: string }> {
     'use server';
     const session = await verifySession();
@@ -187,13 +194,44 @@ export default async function SlideManagementPage() {
   return (
     <div>
       <h2 className="text-2xl font-semibold mb-4">Slide Management</h2>
+      <form method="get" className="flex gap-2 mb-4 items-start">
+        <input
+          type="search"
+          name="q"
+          defaultValue={q}
+          minLength={AUTHOR_SEARCH_MIN_LENGTH}
+          placeholder="Search titles"
+          className="flex-1 px-3 py-2 bg-gray-700 border border-gray-600 rounded-md"
+        />
+        <select name="type" defaultValue={type || ''} className="px-3 py-2 bg-gray-700 border border-gray-600 rounded-md">
+          <option value="">All types</option>
+          <option value="video">Video</option>
+          <option value="html">HTML</option>
+        </select>
+        <div className="w-56">
+          <AuthorPicker
+            name="author"
+            placeholder="Any author"
+            initialAuthor={author ? { id: author.id, username: author.username } : null}
+          />
+        </div>
+        <button type="submit" className="bg-pink-600 hover:bg-pink-700 text-white font-bold py-2 px-4 rounded">Filter</button>
+      </form>
+      {q && q.length < AUTHOR_SEARCH_MIN_LENGTH && (
+        <p className="text-sm text-gray-400 -mt-2 mb-4">Search needs at least {AUTHOR_SEARCH_MIN_LENGTH} characters, so it was ignored.</p>
+      )}
       <SlideManagementClient
         slides={slides}
-        users={users}
         createSlideAction={createSlideAction}
         updateSlideAction={updateSlideAction}
         deleteSlideAction={deleteSlideAction}
       />
+      <ListPager
+        basePath="/admin/slides"
+        filters={{ q, type, author: authorId }}
+        nextCursor={nextCursor}
+        isFirstPage={!searchParams.cursor}
+      />
     </div>
   );
 }
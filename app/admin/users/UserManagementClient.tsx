@@ -1,10 +1,10 @@
 'use client';
 
-import { User } from '@/lib/db';
+import { AdminUserRow } from '@/lib/db.interfaces';
 import React from 'react';
 
 interface UserManagementClientProps {
-  users: User[];
+  users: AdminUserRow[];
   deleteUserAction: (formData: FormData) => Promise<void>;
 }
 
@@ -42,6 +42,11 @@ export default function UserManagementClient({ users, deleteUserAction }: UserMa
               </td>
             </tr>
           ))}
+          {users.length === 0 && (
+            <tr>
+              <td colSpan={4} className="p-4 text-center text-gray-400">No users match these filters.</td>
+            </tr>
+          )}
         </tbody>
       </table>
     </div>
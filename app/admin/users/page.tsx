@@ -2,18 +2,28 @@ import { db } from '@/lib/db';
 import React from 'react';
 import { revalidatePath } from 'next/cache';
 import UserManagementClient from './UserManagementClient';
+import ListPager from '@/components/admin/ListPager';
 import { verifySession } from '@/lib/auth';
 import { redirect } from 'next/navigation';
+import { AUTHOR_SEARCH_MIN_LENGTH } from '@/lib/constants';
 
 export const dynamic = 'force-dynamic';
 
-export default async function UserManagementPage() {
+const ROLES = ['user', 'author', 'patron', 'admin'];
+
+interface UserManagementPageProps {
+  searchParams: { q?: string; role?: string; cursor?: string };
+}
+
+export default async function UserManagementPage({ searchParams }: UserManagementPageProps) {
   const payload = await verifySession();
   if (!payload || payload.user.role !== 'admin') {
     redirect('/admin/login');
   }
 
-  const users = await db.getAllUsers();
+  const q = searchParams.q?.trim() || undefined;
+  const role = ROLES.includes(searchParams.role || '') ? searchParams.role : undefined;
+  const { items: users, nextCursor } = await db.listUsersForAdmin({ q, role, cursor: searchParams.cursor });
 
   async function deleteUserAction(formData: FormData) {
     'use server';
@@ -34,7 +44,26 @@ export default async function UserManagementPage() {
   return (
     <div>
       <h2 className="text-2xl font-semibold mb-4">User Management</h2>
+      <form method="get" className="flex gap-2 mb-4">
+        <input
+          type="search"
+          name="q"
+          defaultValue={q}
+          minLength={AUTHOR_SEARCH_MIN_LENGTH}
+          placeholder="Search username, email or name"
+          className="flex-1 px-3 py-2 bg-gray-700 border border-gray-600 rounded-md"
+        />
+        <select name="role" defaultValue={role || ''} className="px-3 py-2 bg-gray-700 border border-gray-600 rounded-md">
+          <option value="">All roles</option>
+          {ROLES.map(r => <option key={r} value={r} className="capitalize">{r}</option>)}
+        </select>
+        <button type="submit" className="bg-pink-600 hover:bg-pink-700 text-white font-bold py-2 px-4 rounded">Filter</button>
+      </form>
+      {q && q.length < AUTHOR_SEARCH_MIN_LENGTH && (
+        <p className="text-sm text-gray-400 -mt-2 mb-4">Search needs at least {AUTHOR_SEARCH_MIN_LENGTH} characters, so it was ignored.</p>
+      )}
       <UserManagementClient users={users} deleteUserAction={deleteUserAction} />
+      <ListPager basePath="/admin/users" filters={{ q, role }} nextCursor={nextCursor} isFirstPage={!searchParams.cursor} />
     </div>
   );
 }
@@ -1,9 +1,26 @@
 import { NextRequest, NextResponse } from 'next/server';
+import { auth } from '@/auth';
 import { ably } from '@/lib/ably-server';
+import { notificationChannel } from '@/lib/notification-counter';
+import { FEED_COUNTS_CHANNEL } from '@/lib/count-channel';
 
 export const dynamic = 'force-dynamic';
 
 export async function GET(req: NextRequest) {
-  const token = await ably.auth.createTokenRequest({ clientId: 'ting-tong-client' });
+  // Browsers only ever subscribe; a signed-in user may also listen to their own unread counter.
+  // `[*]` covers the filtered (derived) attachments the feed makes to the counts channel.
+  const capability: Record<string, string[]> = {
+    [FEED_COUNTS_CHANNEL]: ['subscribe'],
+    [`[*]${FEED_COUNTS_CHANNEL}`]: ['subscribe'],
+  };
+  const session = await auth();
+  if (session?.user?.id) {
+    capability[notificationChannel(session.user.id)] = ['subscribe'];
+  }
+
+  const token = await ably.auth.createTokenRequest({
+    clientId: 'ting-tong-client',
+    capability: JSON.stringify(capability),
+  });
   return NextResponse.json(token);
 }
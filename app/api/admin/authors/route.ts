@@ -0,0 +1,35 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { auth } from '@/auth';
+import { db } from '@/lib/db';
+import { AUTHOR_SEARCH_MIN_LENGTH } from '@/lib/constants';
+
+export const dynamic = 'force-dynamic';
+
+const ADMIN_ROLES = ['admin', 'author'];
+const MAX_LIMIT = 20;
+
+/**
+ * Author typeahead for the admin slide views: prefix matches on username or
+ * display name, a handful of columns, no full user rows.
+ */
+export async function GET(req: NextRequest) {
+  const session = await auth();
+  if (!session?.user || !ADMIN_ROLES.includes(session.user.role || '')) {
+    return NextResponse.json({ success: false, error: 'Unauthorized' }, { status: 401 });
+  }
+
+  const q = req.nextUrl.searchParams.get('q')?.trim() || '';
+  const limit = Math.min(parseInt(req.nextUrl.searchParams.get('limit') || '10', 10) || 10, MAX_LIMIT);
+  // Shorter prefixes would scan the users table
+  if (q.length < AUTHOR_SEARCH_MIN_LENGTH) {
+    return NextResponse.json({ success: true, authors: [] });
+  }
+
+  try {
+    const authors = await db.searchAuthors(q, limit);
+    return NextResponse.json({ success: true, authors }, { headers: { 'Cache-Control': 'private, max-age=30' } });
+  } catch (error) {
+    console.error('Author search failed:', error);
+    return NextResponse.json({ success: false, error: 'Search failed' }, { status: 500 });
+  }
+}
@@ -1,7 +1,10 @@
-
 import { NextRequest, NextResponse } from 'next/server';
-import { prisma } from '@/lib/prisma'; // Use singleton instance
+import { db } from '@/lib/db';
+import { AUTHOR_CACHE_CONTROL, getAuthorProfiles, isNotModified } from '@/lib/author-cache';
+
+export const dynamic = 'force-dynamic';
 
+// Single profile; the feed batches through /api/authors. Both share the cache and ETags.
 export async function GET(
   request: NextRequest,
   { params }: { params: { id: string } }
@@ -13,75 +16,19 @@ export async function GET(
   }
 
   try {
-    const user = await prisma.user.findUnique({
-      where: { id },
-      select: {
-        id: true,
-        username: true,
-        displayName: true,
-        avatarUrl: true,
-        avatar: true,
-        image: true,
-        bio: true,
-        role: true,
-      },
-    });
+    const profile = (await getAuthorProfiles([id], db.getAuthorProfiles)).get(id);
 
-    if (!user) {
+    if (!profile) {
       return NextResponse.json({ success: false, message: 'User not found' }, { status: 404 });
     }
 
-    const slides = await prisma.slide.findMany({
-      where: { userId: id },
-      orderBy: { createdAt: 'desc' },
-      take: 12,
-      select: {
-        id: true,
-        title: true,
-        thumbnailUrl: true,
-        content: true,
-      },
-    });
-
-    const formattedSlides = slides.map((slide) => {
-      let title = slide.title || 'Untitled';
-      let thumbnailUrl = slide.thumbnailUrl || '/placeholder.jpg';
-
-      // Fallback: Parse content JSON if title or thumbnail are missing
-      if ((!slide.title || !slide.thumbnailUrl) && slide.content) {
-        try {
-          const parsedContent = JSON.parse(slide.content);
-          if (!title || title === 'Untitled') {
-             title = parsedContent.title || 'Untitled';
-          }
-          if (!thumbnailUrl || thumbnailUrl === '/placeholder.jpg') {
-             thumbnailUrl = parsedContent.thumbnailUrl || parsedContent.cover || '/placeholder.jpg';
-          }
-        } catch (e) {
-          // Ignore parsing error
-        }
-      }
-
-      return {
-        id: slide.id,
-        title,
-        thumbnailUrl,
-      };
-    });
-
-    const responseData = {
-      id: user.id,
-      username: user.displayName || user.username || 'Użytkownik',
-      avatarUrl: user.avatar || user.avatarUrl || user.image || 'https://i.pravatar.cc/150?u=' + user.id,
-      bio: user.bio || "",
-      role: user.role || "user",
-      slides: formattedSlides,
-    };
-
-    return NextResponse.json(responseData);
+    const headers = { ETag: profile.etag, 'Cache-Control': AUTHOR_CACHE_CONTROL };
+    if (isNotModified(request, profile.etag)) {
+      return new NextResponse(null, { status: 304, headers });
+    }
+    return new NextResponse(profile.body, { headers: { ...headers, 'Content-Type': 'application/json' } });
   } catch (error) {
     console.error('Error fetching author profile:', error);
     return NextResponse.json({ success: false, message: 'Internal Server Error' }, { status: 500 });
   }
-  // No disconnect in serverless environment
 }
@@ -0,0 +1,43 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { db } from '@/lib/db';
+import { AUTHOR_CACHE_CONTROL, MAX_BATCH_AUTHORS, etagFor, getAuthorProfiles, isNotModified } from '@/lib/author-cache';
+
+export const dynamic = 'force-dynamic';
+
+// Batch author profiles: GET /api/authors?ids=a,b,c -> { profiles, missing }.
+// Ids are de-duplicated and sorted, so the same set of authors always maps to
+// the same URL and ETag and can be revalidated with If-None-Match.
+export async function GET(request: NextRequest) {
+  const ids = Array.from(new Set(
+    (request.nextUrl.searchParams.get('ids') || '').split(',').map(id => id.trim()).filter(Boolean)
+  )).sort();
+
+  if (ids.length === 0) {
+    return NextResponse.json({ success: false, message: 'Missing ids' }, { status: 400 });
+  }
+  if (ids.length > MAX_BATCH_AUTHORS) {
+    return NextResponse.json(
+      { success: false, message: `At most ${MAX_BATCH_AUTHORS} ids per request` },
+      { status: 400 }
+    );
+  }
+
+  try {
+    const found = await getAuthorProfiles(ids, db.getAuthorProfiles);
+    const profiles = ids.flatMap(id => found.get(id) || []);
+    const missing = ids.filter(id => !found.has(id));
+
+    // The body is fixed by the profiles' own ETags and the missing ids
+    const etag = etagFor(JSON.stringify([profiles.map(p => p.etag), missing]));
+    const headers = { ETag: etag, 'Cache-Control': AUTHOR_CACHE_CONTROL };
+    if (isNotModified(request, etag)) {
+      return new NextResponse(null, { status: 304, headers });
+    }
+
+    const body = `{"profiles":[${profiles.map(p => p.body).join(',')}],"missing":${JSON.stringify(missing)}}`;
+    return new NextResponse(body, { headers: { ...headers, 'Content-Type': 'application/json' } });
+  } catch (error) {
+    console.error('Error fetching author profiles:', error);
+    return NextResponse.json({ success: false, message: 'Internal Server Error' }, { status: 500 });
+  }
+}
@@ -16,8 +16,13 @@ export async function GET(request: NextRequest) {
 
   try {
     // We need a new db function to get replies specifically
+    const dbStart = performance.now();
     const { comments: replies, nextCursor } = await db.getCommentReplies(parentId, { limit, cursor });
-    return NextResponse.json({ success: true, replies, nextCursor });
+    const dbMs = performance.now() - dbStart;
+    return NextResponse.json(
+      { success: true, replies, nextCursor },
+      { headers: { 'Server-Timing': `db;dur=${dbMs.toFixed(1)}` } }
+    );
   } catch (error) {
     console.error(`Error fetching replies for parentId ${parentId}:`, error);
     return NextResponse.json({ success: false, message: 'Internal Server Error' }, { status: 500 });
@@ -2,8 +2,8 @@ import { NextRequest, NextResponse } from 'next/server';
 import { db } from '@/lib/db';
 import { auth } from '@/auth';
 import { sanitize } from '@/lib/sanitize';
-import { rateLimit } from '@/lib/rate-limiter';
-import { ably } from '@/lib/ably-server';
+import { limitRequest, rateLimitHeaders } from '@/lib/rate-limiter';
+import { markSlideCountsDirty, settleSlideCounts } from '@/lib/count-broadcaster';
 import { prisma } from '@/lib/prisma'; // Import prisma for direct checks if needed, but we should try to use db layer
 import { NotificationService } from '@/lib/notifications';
 
@@ -22,8 +22,14 @@ export async function GET(request: NextRequest) {
   }
 
   try {
+    const dbStart = performance.now();
     const { comments, nextCursor } = await db.getComments(slideId, { limit, cursor, sortBy: sortBy || 'top' });
-    return NextResponse.json({ success: true, comments, nextCursor });
+    const dbMs = performance.now() - dbStart;
+    // Server-Timing lets load_comments.py split DB time from the rest of the request
+    return NextResponse.json(
+      { success: true, comments, nextCursor },
+      { headers: { 'Server-Timing': `db;dur=${dbMs.toFixed(1)}` } }
+    );
   } catch (error) {
     console.error('Error fetching comments:', error);
     return NextResponse.json({ success: false, message: 'Internal Server Error' }, { status: 500 });
@@ -37,10 +43,13 @@ export async function POST(request: NextRequest) {
   }
   const currentUser = session.user;
 
-  const { success } = await rateLimit(`comment:${currentUser.id}`, 3, 30);
+  const limited = await limitRequest(['comment-burst', 'comment-hourly'], currentUser.id);
 
-  if (!success) {
-    return NextResponse.json({ success: false, message: 'commentRateLimit' }, { status: 429 });
+  if (!limited.success) {
+    return NextResponse.json(
+      { success: false, message: 'commentRateLimit' },
+      { status: 429, headers: rateLimitHeaders(limited) }
+    );
   }
 
   try {
@@ -85,8 +94,9 @@ export async function POST(request: NextRequest) {
         }
     }
 
-    const channel = ably.channels.get(`comments:${slideId}`);
-    await channel.publish('new-comment', newComment);
+    // The new commentCount reaches viewers (and open comment threads) via the coalesced broadcast
+    markSlideCountsDirty(slideId);
+    await settleSlideCounts();
 
     return NextResponse.json({ success: true, comment: newComment }, { status: 201 });
 
@@ -116,7 +126,7 @@ export async function DELETE(request: NextRequest) {
 
       const comment = await prisma.comment.findUnique({
         where: { id: commentId },
-        select: { authorId: true }
+        select: { authorId: true, slideId: true }
       });
 
       if (!comment) {
@@ -128,6 +138,8 @@ export async function DELETE(request: NextRequest) {
       }
 
       await db.deleteComment(commentId, currentUser.id!);
+      markSlideCountsDirty(comment.slideId);
+      await settleSlideCounts();
 
       return NextResponse.json({ success: true });
 
@@ -3,6 +3,7 @@ import { NextRequest, NextResponse } from 'next/server';
 import { findUserByUsername, findUserByEmail, getSlides, getComments, addComment } from '@/lib/db-postgres';
 import { google } from '@ai-sdk/google';
 import { generateText } from 'ai';
+import { flushSlideCounts, markSlideCountsDirty } from '@/lib/count-broadcaster';
 
 export const dynamic = 'force-dynamic';
 
@@ -159,6 +160,9 @@ export async function GET(req: NextRequest) {
     // 4. Save to Database
     if (resultText) {
        await addComment(slideId, botUser.id, resultText, parentId);
+       // Cron invocations end with the response, so publish now rather than on the window timer
+       markSlideCountsDirty(slideId);
+       await flushSlideCounts();
     }
 
     return NextResponse.json({
@@ -1,7 +1,8 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { db } from '@/lib/db';
 import { auth } from '@/auth';
-import { ably } from '@/lib/ably-server';
+import { markSlideCountsDirty, settleSlideCounts } from '@/lib/count-broadcaster';
+import { limitRequest, rateLimitHeaders } from '@/lib/rate-limiter';
 
 export const dynamic = 'force-dynamic';
 
@@ -12,6 +13,14 @@ export async function POST(request: NextRequest) {
   }
   const currentUser = session.user;
 
+  const limited = await limitRequest(['like-burst'], currentUser.id);
+  if (!limited.success) {
+    return NextResponse.json(
+      { success: false, message: 'Too many requests' },
+      { status: 429, headers: rateLimitHeaders(limited) }
+    );
+  }
+
   try {
     const { slideId } = await request.json();
 
@@ -26,8 +35,9 @@ export async function POST(request: NextRequest) {
 
     const result = await db.toggleLike(slideId, currentUser.id!);
 
-    const channel = ably.channels.get(`likes:${slideId}`);
-    await channel.publish('update', { likeCount: result.likeCount });
+    // Viewers get the new count with the next coalesced broadcast, not one message per tap
+    markSlideCountsDirty(slideId);
+    await settleSlideCounts();
 
     return NextResponse.json({
       success: true,
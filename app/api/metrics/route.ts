@@ -0,0 +1,20 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { allMetrics, metricsAuthorized, metricsSnapshot } from '@/lib/metrics';
+
+export const dynamic = 'force-dynamic';
+
+// Instance metrics: database queries (latency histograms, rows, retries,
+// timeouts, slow-query log), feed cache, rate limiter and count broadcaster.
+// Prometheus text by default; ?format=json adds the slow-query log.
+export async function GET(request: NextRequest) {
+  if (!metricsAuthorized(request)) {
+    return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+  }
+
+  if (request.nextUrl.searchParams.get('format') === 'json') {
+    return NextResponse.json(metricsSnapshot(), { headers: { 'Cache-Control': 'no-store' } });
+  }
+  return new NextResponse(allMetrics(), {
+    headers: { 'Content-Type': 'text/plain; version=0.0.4', 'Cache-Control': 'no-store' },
+  });
+}
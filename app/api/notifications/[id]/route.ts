@@ -2,6 +2,7 @@
 import { NextResponse } from 'next/server';
 import { auth } from '@/auth';
 import { prisma } from '@/lib/prisma';
+import { adjustUnreadCount } from '@/lib/notification-counter';
 
 export async function DELETE(
   request: Request,
@@ -18,7 +19,7 @@ export async function DELETE(
     // Verify ownership
     const notification = await prisma.notification.findUnique({
       where: { id },
-      select: { userId: true }
+      select: { userId: true, read: true }
     });
 
     if (!notification) {
@@ -33,6 +34,10 @@ export async function DELETE(
       where: { id }
     });
 
+    if (!notification.read) {
+      await adjustUnreadCount(session.user.id, -1);
+    }
+
     return NextResponse.json({ success: true });
 
   } catch (error) {
@@ -1,7 +1,7 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { auth } from '@/auth';
 import { db } from '@/lib/db';
-import { redis } from '@/lib/kv';
+import { adjustUnreadCount } from '@/lib/notification-counter';
 
 export async function POST(request: NextRequest) {
   const session = await auth();
@@ -17,15 +17,13 @@ export async function POST(request: NextRequest) {
       return NextResponse.json({ success: false, message: 'notificationId is required and must be a string' }, { status: 400 });
     }
 
-    // Security check: Ensure the notification belongs to the user trying to mark it as read.
-    const notification = await redis.get(`notification:${notificationId}`);
-    if (!notification || (notification as any).userId !== userId) {
-        return NextResponse.json({ success: false, message: 'Notification not found or access denied.' }, { status: 404 });
+    // Ownership is part of the update, so another user's id simply matches nothing.
+    const changed = await db.markNotificationAsRead(notificationId, userId);
+    if (changed) {
+      await adjustUnreadCount(userId, -1);
     }
 
-    await db.markNotificationAsRead(notificationId);
-
-    return NextResponse.json({ success: true });
+    return NextResponse.json({ success: true, changed });
 
   } catch (error) {
     console.error('Error marking notification as read:', error);
@@ -1,20 +1,25 @@
 
 import { NextResponse } from 'next/server';
 import { auth } from '@/auth';
-import { prisma } from '@/lib/prisma';
 import { mockNotifications } from '@/lib/mock-db';
 import { db } from '@/lib/db';
+import { getUnreadCount } from '@/lib/notification-counter';
 
 export const dynamic = 'force-dynamic';
 
+const MAX_PAGE_SIZE = 50;
+
 export async function GET(req: Request) {
   try {
     const session = await auth();
     const url = new URL(req.url);
     const forceMock = url.searchParams.get('mock') === 'true';
+    const cursor = url.searchParams.get('cursor') || undefined;
+    const limit = Math.min(Math.max(parseInt(url.searchParams.get('limit') || '20', 10) || 20, 1), MAX_PAGE_SIZE);
 
     // Helper to return success wrapper
-    const successResponse = (data: any[], unreadCount: number) => NextResponse.json({ success: true, notifications: data, unreadCount });
+    const successResponse = (data: any[], unreadCount: number, nextCursor: string | null = null) =>
+      NextResponse.json({ success: true, notifications: data, unreadCount, nextCursor });
 
     if (forceMock || !session?.user) {
       console.log("🔔 API: Returning mock notifications (Force Mock or Guest)");
@@ -23,32 +28,12 @@ export async function GET(req: Request) {
     }
 
     try {
-      if (!prisma) throw new Error("Prisma client is undefined");
-
-      const [notifications, unreadCount] = await Promise.all([
-        prisma.notification.findMany({
-          where: { userId: session.user.id },
-          orderBy: { createdAt: 'desc' },
-          take: 20,
-          include: {
-            fromUser: {
-              select: {
-                id: true,
-                displayName: true,
-                avatar: true
-              }
-            }
-          }
-        }),
-        prisma.notification.count({
-          where: {
-            userId: session.user.id,
-            read: false
-          }
-        })
+      const [page, unreadCount] = await Promise.all([
+        db.getNotifications(session.user.id!, { limit, cursor }),
+        getUnreadCount(session.user.id!),
       ]);
 
-      return successResponse(notifications, unreadCount);
+      return successResponse(page.notifications, unreadCount, page.nextCursor);
 
     } catch (dbError) {
       console.error("⚠️ API: Database error:", dbError);
@@ -1,8 +1,11 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { auth } from '@/auth';
-import { db } from '@/lib/db';
+import { fanOutPush, PushTarget } from '@/lib/push-fanout';
 import webpush from 'web-push';
 
+// Large fan-outs run for a while; stats are returned when the last batch is done.
+export const maxDuration = 300;
+
 if (process.env.VAPID_SUBJECT && process.env.NEXT_PUBLIC_VAPID_PUBLIC_KEY && process.env.VAPID_PRIVATE_KEY) {
     webpush.setVapidDetails(
       process.env.VAPID_SUBJECT,
@@ -20,43 +23,31 @@ export async function POST(request: NextRequest) {
   const { userId, userType, targetPwa, targetBrowser, title, body, url } = await request.json();
 
   try {
-    const options: { userId?: string, role?: string, isPwaInstalled?: boolean } = {};
-    let subscriptions = [];
+    let target: PushTarget;
 
     if (userId) {
-        options.userId = userId;
-        subscriptions = await db.getPushSubscriptions(options);
+        target = { userId };
     } else if (userType) {
-        options.role = userType; // Changed from options.userType to options.role based on db.getPushSubscriptions signature
-        subscriptions = await db.getPushSubscriptions(options);
+        target = { role: userType };
     } else if (targetPwa || targetBrowser) {
-        if (targetPwa && targetBrowser) {
-            // Get all users, no isPwaInstalled filter
-            subscriptions = await db.getPushSubscriptions({});
-        } else if (targetPwa) {
-            options.isPwaInstalled = true;
-            subscriptions = await db.getPushSubscriptions(options);
-        } else { // targetBrowser
-            options.isPwaInstalled = false;
-            subscriptions = await db.getPushSubscriptions(options);
-        }
+        // Both groups selected means every subscription, no isPwaInstalled filter
+        target = targetPwa && targetBrowser ? {} : { isPwaInstalled: !!targetPwa };
     } else {
         return NextResponse.json({ success: false, message: 'Target user, userType, or a PWA/browser group is required.' }, { status: 400 });
     }
 
-    if (!subscriptions || subscriptions.length === 0) {
-      return NextResponse.json({ success: false, message: 'No subscriptions found for the target.' }, { status: 404 });
-    }
-
     const notificationPayload = JSON.stringify({ title, body, url });
+    const stats = await fanOutPush(target, notificationPayload);
 
-    const sendPromises = subscriptions.map((s: any) =>
-      webpush.sendNotification(s.subscription, notificationPayload)
-    );
-
-    await Promise.all(sendPromises);
+    if (stats.total === 0) {
+      return NextResponse.json({ success: false, message: 'No subscriptions found for the target.' }, { status: 404 });
+    }
 
-    return NextResponse.json({ success: true, message: 'Notifications sent.' });
+    return NextResponse.json({
+      success: true,
+      message: `Notifications sent: ${stats.sent}/${stats.total} (${stats.pruned} expired subscriptions removed).`,
+      stats,
+    });
   } catch (error) {
     console.error('Error sending push notifications:', error);
     return NextResponse.json({ success: false, message: 'Internal Server Error' }, { status: 500 });
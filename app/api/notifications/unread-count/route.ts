@@ -0,0 +1,21 @@
+import { NextResponse } from 'next/server';
+import { auth } from '@/auth';
+import { getUnreadCount, notificationChannel } from '@/lib/notification-counter';
+
+export const dynamic = 'force-dynamic';
+
+// Badge count for the TopBar. Read once per page load; later changes arrive over Ably.
+export async function GET() {
+  const session = await auth();
+  if (!session?.user?.id) {
+    return NextResponse.json({ success: true, unreadCount: 0, channel: null });
+  }
+
+  try {
+    const unreadCount = await getUnreadCount(session.user.id);
+    return NextResponse.json({ success: true, unreadCount, channel: notificationChannel(session.user.id) });
+  } catch (error) {
+    console.error('Error reading unread notification count:', error);
+    return NextResponse.json({ success: false, message: 'Internal Server Error' }, { status: 500 });
+  }
+}
@@ -0,0 +1,38 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { rateLimit } from '@/lib/rate-limiter';
+
+export const dynamic = 'force-dynamic';
+
+const MAX_LIMIT = 10_000;
+const MAX_WINDOW_MS = 3_600_000;
+
+/**
+ * Benchmark hook for load_ratelimit.py, off unless RATE_LIMIT_PROBE=1: runs
+ * one limiter decision for ?subject= under an ad-hoc ?limit= / ?windowMs=
+ * policy and reports it with the time the limiter took (Server-Timing).
+ * ?mode=none skips the limiter to measure the bare route.
+ */
+export async function POST(req: NextRequest) {
+  if (process.env.RATE_LIMIT_PROBE !== '1') {
+    return NextResponse.json({ success: false, error: 'Not found' }, { status: 404 });
+  }
+
+  const params = req.nextUrl.searchParams;
+  const subject = params.get('subject') || 'probe';
+  const limit = Math.min(parseInt(params.get('limit') || '10', 10) || 10, MAX_LIMIT);
+  const windowMs = Math.min(parseInt(params.get('windowMs') || '1000', 10) || 1000, MAX_WINDOW_MS);
+
+  const at = Date.now();
+  if (params.get('mode') === 'none') {
+    return NextResponse.json({ allowed: true, at, source: 'none' });
+  }
+
+  const started = performance.now();
+  const result = await rateLimit(`probe:${limit}:${windowMs}:${subject}`, limit, windowMs / 1000);
+  const limiterMs = performance.now() - started;
+
+  return NextResponse.json(
+    { allowed: result.success, at, remaining: result.remaining, retryAfterMs: result.retryAfterMs, source: result.source },
+    { headers: { 'Server-Timing': `ratelimit;dur=${limiterMs.toFixed(2)}` } }
+  );
+}
@@ -0,0 +1,18 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { feedCacheMetrics } from '@/lib/feed-cache';
+import { metricsAuthorized } from '@/lib/metrics';
+
+export const dynamic = 'force-dynamic';
+
+// Prometheus scrape target for the feed cache counters of this instance;
+// /api/metrics serves these together with the query metrics.
+// Set METRICS_TOKEN to require "Authorization: Bearer <token>".
+export async function GET(request: NextRequest) {
+  if (!metricsAuthorized(request)) {
+    return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+  }
+
+  return new NextResponse(feedCacheMetrics(), {
+    headers: { 'Content-Type': 'text/plain; version=0.0.4' },
+  });
+}
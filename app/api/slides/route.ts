@@ -1,34 +1,79 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { db } from '@/lib/db';
 import { auth } from '@/auth';
+import { getFeedPage, FeedPage } from '@/lib/feed-cache';
+import { SlideDTO } from '@/lib/dto';
 
 export const dynamic = 'force-dynamic';
 
+// Default NextAuth v5 session cookie names (plain and HTTPS)
+const SESSION_COOKIES = ['authjs.session-token', '__Secure-authjs.session-token'];
+
+// limit and cursor make up the feed cache key, so both are bounded and normalised first
+const DEFAULT_LIMIT = 5;
+const MAX_LIMIT = 20;
+const MAX_CURSOR_LENGTH = 128;
+
+// Same position in the form getSlides parses back, so equivalent cursors share a cache entry
+function normalizeCursor(raw: string): string | null {
+  if (raw.length > MAX_CURSOR_LENGTH) return null;
+  const position = db.parseSlideCursor(raw);
+  if (!position) return null;
+  const { createdAt, id } = position;
+  return id ? db.slideCursor({ createdAt: createdAt.toISOString(), id }) : String(createdAt.getTime());
+}
+
 export async function GET(request: NextRequest) {
   try {
     const { searchParams } = new URL(request.url);
-    const cursor = searchParams.get('cursor') || undefined;
-    const limit = searchParams.has('limit') ? parseInt(searchParams.get('limit')!, 10) : 5;
+    const rawLimit = searchParams.get('limit');
+    const requested = rawLimit ? Number(rawLimit) : DEFAULT_LIMIT;
+    if (!Number.isInteger(requested) || requested < 1) {
+      return NextResponse.json({ error: 'Invalid limit' }, { status: 400 });
+    }
+    const limit = Math.min(requested, MAX_LIMIT);
 
-    const session = await auth();
-    const currentUserId = session?.user?.id;
+    const rawCursor = searchParams.get('cursor');
+    const cursor = rawCursor ? normalizeCursor(rawCursor) : undefined;
+    if (cursor === null) {
+      return NextResponse.json({ error: 'Invalid cursor' }, { status: 400 });
+    }
 
     if (!db.getSlides) {
         return NextResponse.json({ error: 'db.getSlides is not a function' }, { status: 500 });
     }
+    const getSlides = db.getSlides;
 
-    const slides = await db.getSlides({ limit, cursor, currentUserId });
+    // Everyone shares the anonymous page; only requests carrying a session cookie pay for auth().
+    const hasSession = SESSION_COOKIES.some(name => request.cookies.has(name));
+    const session = hasSession ? await auth() : null;
+    const currentUserId = session?.user?.id;
 
-    let nextCursor: string | null = null;
-    if (slides.length === limit) {
-      const lastSlide = slides[slides.length - 1];
-      nextCursor = lastSlide.createdAt.toString();
-    }
+    const { body, source } = await getFeedPage(cursor, limit, async (): Promise<FeedPage> => {
+      const slides = await getSlides({ limit, cursor });
 
-    return NextResponse.json({
-      slides,
-      nextCursor,
+      let nextCursor: string | null = null;
+      if (slides.length === limit) {
+        nextCursor = db.slideCursor(slides[slides.length - 1]);
+      }
+      return { slides, nextCursor };
     });
+
+    const headers = { 'Content-Type': 'application/json', 'X-Feed-Cache': source };
+
+    if (!currentUserId) {
+      return new NextResponse(body, { headers });
+    }
+
+    const page = JSON.parse(body) as FeedPage;
+    const liked = new Set(await db.getLikedSlideIds(currentUserId, page.slides.map(s => s.id)));
+    const slides = page.slides.map((slide: SlideDTO) => ({ ...slide, isLiked: liked.has(slide.id) }));
+
+    // Carries this viewer's likes: kept out of shared caches, the service worker's included
+    return NextResponse.json(
+      { slides, nextCursor: page.nextCursor },
+      { headers: { ...headers, 'Cache-Control': 'private, no-store' } }
+    );
   } catch (error) {
     console.error('Failed to fetch slides:', error);
     return NextResponse.json({ error: 'Failed to fetch slides' }, { status: 500 });
@@ -0,0 +1,22 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { auth } from '@/auth';
+import { getMediaJob } from '@/lib/media-queue';
+
+export const dynamic = 'force-dynamic';
+
+// Progress of the poster/HLS job started by a finished video upload
+export async function GET(req: NextRequest, { params }: { params: { id: string } }) {
+  const session = await auth();
+  if (!session?.user?.id) {
+    return NextResponse.json({ success: false, error: 'Authentication required' }, { status: 401 });
+  }
+
+  const job = await getMediaJob(params.id);
+  // Someone else's job is reported as missing rather than forbidden
+  if (!job || (job.userId !== session.user.id && session.user.role !== 'admin')) {
+    return NextResponse.json({ success: false, error: 'Job not found' }, { status: 404 });
+  }
+
+  const { source, ...visible } = job;
+  return NextResponse.json({ success: true, job: visible });
+}
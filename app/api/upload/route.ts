@@ -1,33 +1,59 @@
-
 import { NextRequest, NextResponse } from 'next/server';
-import { writeFile, mkdir } from 'fs/promises';
 import { join } from 'path';
-import { v4 as uuidv4 } from 'uuid';
-
+import { auth } from '@/auth';
+import { limitRequest, rateLimitHeaders } from '@/lib/rate-limiter';
+import { enqueueMediaJob } from '@/lib/media-queue';
+import { classifyUpload, MAX_BYTES, saveUpload, UPLOAD_DIR, UploadError, uploadUrl, VIDEO_UPLOAD_ROLES } from '@/lib/uploads';
+
+export const dynamic = 'force-dynamic';
+export const maxDuration = 300;
+
+/**
+ * Single-shot upload: the raw file is the request body and its type is the
+ * Content-Type. The body is streamed to disk and capped per kind; large videos
+ * should use the resumable /api/upload/sessions flow instead.
+ */
 export async function POST(req: NextRequest) {
-  try {
-    const formData = await req.formData();
-    const file = formData.get('file') as File;
-
-    if (!file) {
-      return NextResponse.json({ success: false, error: 'No file provided' }, { status: 400 });
-    }
+  const session = await auth();
+  if (!session?.user?.id) {
+    return NextResponse.json({ success: false, error: 'Authentication required' }, { status: 401 });
+  }
 
-    const bytes = await file.arrayBuffer();
-    const buffer = Buffer.from(bytes);
+  const limited = await limitRequest(['upload-hourly'], session.user.id);
+  if (!limited.success) {
+    return NextResponse.json(
+      { success: false, error: 'Too many uploads, try again later' },
+      { status: 429, headers: rateLimitHeaders(limited) }
+    );
+  }
 
-    const fileExtension = file.name.split('.').pop();
-    const uniqueFilename = `${uuidv4()}.${fileExtension}`;
-    const publicDir = join(process.cwd(), 'public', 'uploads');
-    const path = join(publicDir, uniqueFilename);
+  try {
+    if (req.headers.get('content-type')?.startsWith('multipart/form-data')) {
+      throw new UploadError(415, 'Send the file as the request body, not as multipart form data');
+    }
+    const { kind, ext } = classifyUpload(req.headers.get('content-type'));
+    if (kind === 'video' && !VIDEO_UPLOAD_ROLES.includes(session.user.role || '')) {
+      throw new UploadError(403, 'Video uploads are limited to slide authors');
+    }
 
-    await mkdir(publicDir, { recursive: true });
-    await writeFile(path, buffer);
+    const maxBytes = MAX_BYTES[kind];
+    const declared = Number(req.headers.get('content-length'));
+    if (declared > maxBytes) {
+      throw new UploadError(413, `Upload exceeds ${maxBytes} bytes`);
+    }
+    if (!req.body) {
+      throw new UploadError(400, 'No file provided');
+    }
 
-    const imageUrl = `/uploads/${uniqueFilename}`;
+    const { filename, size } = await saveUpload(req.body, ext, maxBytes);
+    const url = uploadUrl(filename);
+    const job = kind === 'video' ? await enqueueMediaJob(join(UPLOAD_DIR, filename), url, session.user.id) : null;
 
-    return NextResponse.json({ success: true, imageUrl });
+    return NextResponse.json({ success: true, imageUrl: url, url, size, jobId: job?.id ?? null });
   } catch (error) {
+    if (error instanceof UploadError) {
+      return NextResponse.json({ success: false, error: error.message }, { status: error.status });
+    }
     console.error('Upload error:', error);
     return NextResponse.json({ success: false, error: 'Upload failed' }, { status: 500 });
   }
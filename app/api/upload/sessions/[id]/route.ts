@@ -0,0 +1,79 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { join } from 'path';
+import { auth } from '@/auth';
+import { enqueueMediaJob } from '@/lib/media-queue';
+import {
+  abortUpload, appendChunk, getUploadSession, uploadOffset, UPLOAD_DIR, UploadError, uploadUrl,
+} from '@/lib/uploads';
+
+export const dynamic = 'force-dynamic';
+export const maxDuration = 300;
+
+type Params = { params: { id: string } };
+
+function errorResponse(error: unknown) {
+  if (error instanceof UploadError) {
+    return NextResponse.json({ success: false, error: error.message }, { status: error.status });
+  }
+  console.error('Upload chunk error:', error);
+  return NextResponse.json({ success: false, error: 'Upload failed' }, { status: 500 });
+}
+
+// Resume point: the number of bytes already on disk
+export async function HEAD(req: NextRequest, { params }: Params) {
+  const session = await auth();
+  if (!session?.user?.id) return new NextResponse(null, { status: 401 });
+
+  try {
+    const upload = await getUploadSession(params.id, session.user.id);
+    const offset = await uploadOffset(upload);
+    return new NextResponse(null, {
+      headers: { 'Upload-Offset': String(offset), 'Upload-Length': String(upload.size), 'Cache-Control': 'no-store' },
+    });
+  } catch (error) {
+    return new NextResponse(null, { status: error instanceof UploadError ? error.status : 500 });
+  }
+}
+
+export async function PATCH(req: NextRequest, { params }: Params) {
+  const session = await auth();
+  if (!session?.user?.id) {
+    return NextResponse.json({ success: false, error: 'Authentication required' }, { status: 401 });
+  }
+
+  try {
+    const upload = await getUploadSession(params.id, session.user.id);
+    const offset = Number(req.headers.get('upload-offset'));
+    if (!Number.isInteger(offset) || offset < 0) {
+      throw new UploadError(400, 'Upload-Offset header is required');
+    }
+    if (!req.body) {
+      throw new UploadError(400, 'Empty chunk');
+    }
+
+    const result = await appendChunk(upload, offset, req.body);
+    if (!result.filename) {
+      return NextResponse.json({ success: true, offset: result.offset, complete: false });
+    }
+
+    const url = uploadUrl(result.filename);
+    const job = upload.kind === 'video' ? await enqueueMediaJob(join(UPLOAD_DIR, result.filename), url, session.user.id) : null;
+    return NextResponse.json({ success: true, offset: result.offset, complete: true, url, jobId: job?.id ?? null });
+  } catch (error) {
+    return errorResponse(error);
+  }
+}
+
+export async function DELETE(req: NextRequest, { params }: Params) {
+  const session = await auth();
+  if (!session?.user?.id) {
+    return NextResponse.json({ success: false, error: 'Authentication required' }, { status: 401 });
+  }
+
+  try {
+    await abortUpload(await getUploadSession(params.id, session.user.id));
+    return NextResponse.json({ success: true });
+  } catch (error) {
+    return errorResponse(error);
+  }
+}
@@ -0,0 +1,48 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { auth } from '@/auth';
+import { limitRequest, rateLimitHeaders } from '@/lib/rate-limiter';
+import { CHUNK_BYTES, classifyUpload, createUploadSession, UploadError, VIDEO_UPLOAD_ROLES } from '@/lib/uploads';
+
+export const dynamic = 'force-dynamic';
+
+/**
+ * Starts a resumable upload: { filename, contentType, size } -> { id, offset, chunkSize }.
+ * Chunks then go to PATCH /api/upload/sessions/:id with an Upload-Offset header.
+ */
+export async function POST(req: NextRequest) {
+  const session = await auth();
+  if (!session?.user?.id) {
+    return NextResponse.json({ success: false, error: 'Authentication required' }, { status: 401 });
+  }
+
+  const limited = await limitRequest(['upload-hourly'], session.user.id);
+  if (!limited.success) {
+    return NextResponse.json(
+      { success: false, error: 'Too many uploads, try again later' },
+      { status: 429, headers: rateLimitHeaders(limited) }
+    );
+  }
+
+  try {
+    const { filename, contentType, size } = await req.json();
+    if (typeof contentType !== 'string') {
+      throw new UploadError(400, 'contentType is required');
+    }
+    const { kind } = classifyUpload(contentType);
+    if (kind === 'video' && !VIDEO_UPLOAD_ROLES.includes(session.user.role || '')) {
+      throw new UploadError(403, 'Video uploads are limited to slide authors');
+    }
+
+    const upload = await createUploadSession(session.user.id, String(filename || ''), contentType, Number(size));
+    return NextResponse.json(
+      { success: true, id: upload.id, offset: 0, size: upload.size, chunkSize: CHUNK_BYTES },
+      { status: 201 }
+    );
+  } catch (error) {
+    if (error instanceof UploadError) {
+      return NextResponse.json({ success: false, error: error.message }, { status: error.status });
+    }
+    console.error('Upload session error:', error);
+    return NextResponse.json({ success: false, error: 'Upload failed' }, { status: 500 });
+  }
+}
@@ -1,16 +1,168 @@
 import type { PrecacheEntry } from "@serwist/precaching";
 import { installSerwist } from "@serwist/sw";
+import {
+  CacheFirst,
+  CacheableResponsePlugin,
+  ExpirationPlugin,
+  RangeRequestsPlugin,
+  StaleWhileRevalidate,
+} from "serwist";
+import type { RuntimeCaching, SerwistPlugin } from "serwist";
+import { SW_FEED_CACHE } from "../lib/constants";
 
 declare const self: ServiceWorkerGlobalScope & {
   __SW_MANIFEST: (PrecacheEntry | string)[] | undefined;
 };
 
+// Runtime caches. JSON the feed opens with is served stale while it
+// revalidates; images and video are immutable once uploaded, so they are
+// served from cache first and evicted by age, entry count and total bytes.
+const FEED_CACHE = SW_FEED_CACHE;
+const AUTHOR_CACHE = 'author-profiles';
+const IMAGE_CACHE = 'images';
+const PLAYLIST_CACHE = 'video-playlists';
+const VIDEO_CACHE = 'video-segments';
+
+const DAY_SECONDS = 24 * 60 * 60;
+const IMAGE_MAX_BYTES = 40 * 1024 * 1024;
+const VIDEO_MAX_BYTES = 150 * 1024 * 1024;
+
+const SEGMENT_PATH = /\.(ts|m4s|aac|mp4)$/i;
+
+/**
+ * Evicts the oldest entries of a cache once its responses add up to more than
+ * `maxBytes`. ExpirationPlugin only bounds entry count and age; video segments
+ * and images vary too much in size for a count alone to bound storage.
+ */
+function byteBudget(maxBytes: number): SerwistPlugin {
+  const sizes = new Map<string, number>();
+  let trimming = Promise.resolve();
+
+  const sizeOf = async (cache: Cache, request: Request) => {
+    let size = sizes.get(request.url);
+    if (size === undefined) {
+      const response = await cache.match(request);
+      // Opaque responses report neither; they are bounded by ExpirationPlugin
+      size = Number(response?.headers.get('content-length')) || (response ? (await response.blob()).size : 0);
+      sizes.set(request.url, size);
+    }
+    return size;
+  };
+
+  const trim = async (cacheName: string) => {
+    const cache = await caches.open(cacheName);
+    const entries: [Request, number][] = [];
+    let total = 0;
+    for (const request of await cache.keys()) {
+      const size = await sizeOf(cache, request);
+      entries.push([request, size]);
+      total += size;
+    }
+    // Keys come back in insertion order; the last one was just stored and stays
+    for (const [request, size] of entries.slice(0, -1)) {
+      if (total <= maxBytes) break;
+      await cache.delete(request);
+      sizes.delete(request.url);
+      total -= size;
+    }
+  };
+
+  return {
+    cacheDidUpdate: async ({ cacheName, request }) => {
+      sizes.delete(request.url);
+      trimming = trimming.then(() => trim(cacheName)).catch(error => console.warn('SW cache trim failed', error));
+      await trimming;
+    },
+  };
+}
+
+/**
+ * Caches only the anonymous feed page. Pages for a signed-in viewer carry their
+ * isLiked flags and come back `no-store` (app/api/slides); one of those also drops
+ * the cached anonymous page. The worker cannot see the HttpOnly session cookie, so
+ * UserProvider drops it too as soon as it knows the viewer is signed in, and a
+ * signed-in viewer never has a cached page to be answered from.
+ */
+function anonymousFeedOnly(): SerwistPlugin {
+  return {
+    cacheWillUpdate: async ({ response }) => {
+      if (!response.headers.get('cache-control')?.includes('no-store')) return response;
+      await caches.delete(FEED_CACHE);
+      return null;
+    },
+  };
+}
+
+const runtimeCaching: RuntimeCaching[] = [
+  {
+    // Only the first page: deeper cursors are rarely revisited
+    matcher: ({ url, sameOrigin }) => sameOrigin && url.pathname === '/api/slides' && !url.searchParams.get('cursor'),
+    handler: new StaleWhileRevalidate({
+      cacheName: FEED_CACHE,
+      plugins: [
+        new CacheableResponsePlugin({ statuses: [200] }),
+        anonymousFeedOnly(),
+        new ExpirationPlugin({ maxEntries: 4, maxAgeSeconds: DAY_SECONDS }),
+      ],
+    }),
+  },
+  {
+    // Revalidation still goes out with If-None-Match, so an unchanged profile costs a 304
+    matcher: ({ url, sameOrigin }) =>
+      sameOrigin && (url.pathname === '/api/authors' || url.pathname.startsWith('/api/author/')),
+    handler: new StaleWhileRevalidate({
+      cacheName: AUTHOR_CACHE,
+      plugins: [
+        new CacheableResponsePlugin({ statuses: [200] }),
+        new ExpirationPlugin({ maxEntries: 300, maxAgeSeconds: DAY_SECONDS }),
+      ],
+    }),
+  },
+  {
+    matcher: ({ request }) => request.destination === 'image',
+    handler: new CacheFirst({
+      cacheName: IMAGE_CACHE,
+      plugins: [
+        // Not opaque (status 0) responses: quota counts each at a padded size of
+        // megabytes, which would evict the feed and video caches
+        new CacheableResponsePlugin({ statuses: [200] }),
+        new ExpirationPlugin({ maxEntries: 300, maxAgeSeconds: 30 * DAY_SECONDS, purgeOnQuotaError: true }),
+        byteBudget(IMAGE_MAX_BYTES),
+      ],
+    }),
+  },
+  {
+    matcher: ({ url }) => url.pathname.endsWith('.m3u8'),
+    handler: new StaleWhileRevalidate({
+      cacheName: PLAYLIST_CACHE,
+      plugins: [
+        new CacheableResponsePlugin({ statuses: [200] }),
+        new ExpirationPlugin({ maxEntries: 100, maxAgeSeconds: 7 * DAY_SECONDS }),
+      ],
+    }),
+  },
+  {
+    // HLS segments and mp4 files. Range requests are answered from a cached
+    // whole file; partial (206) responses are passed through uncached.
+    matcher: ({ url, request }) => SEGMENT_PATH.test(url.pathname) || request.destination === 'video',
+    handler: new CacheFirst({
+      cacheName: VIDEO_CACHE,
+      plugins: [
+        new CacheableResponsePlugin({ statuses: [200] }),
+        new RangeRequestsPlugin(),
+        new ExpirationPlugin({ maxEntries: 600, maxAgeSeconds: 7 * DAY_SECONDS, purgeOnQuotaError: true }),
+        byteBudget(VIDEO_MAX_BYTES),
+      ],
+    }),
+  },
+];
+
 installSerwist({
   precacheEntries: self.__SW_MANIFEST,
   skipWaiting: true,
   clientsClaim: true,
   navigationPreload: true,
-  runtimeCaching: [],
+  runtimeCaching,
 });
 
 self.addEventListener('push', (event) => {
@@ -5,7 +5,7 @@ import { useInfiniteQuery, useQueryClient, useMutation } from '@tanstack/react-q
 import { motion, AnimatePresence } from 'framer-motion';
 import { X, Heart, MessageSquare, Loader2, MoreHorizontal, Trash, Flag, Smile, ChevronDown, ImageIcon, SendHorizontal } from 'lucide-react';
 import Image from 'next/image';
-import { ably } from '@/lib/ably-client';
+import { useLiveCounts } from '@/lib/live-counts';
 import EmojiPicker, { EmojiClickData, Theme } from 'emoji-picker-react';
 import { useTranslation } from '@/context/LanguageContext';
 import { useUser } from '@/context/UserContext';
@@ -249,13 +249,17 @@ const CommentsModal: React.FC<CommentsModalProps> = ({ isOpen, onClose, slideId,
 
   const comments = data?.pages.flatMap((page) => page.comments) ?? [];
 
+  // Someone else commented (or deleted): the slide's live commentCount moved, so refetch the thread
+  const liveCommentCount = useLiveCounts(slideId)?.commentCount;
+  const seenCommentCount = useRef<{ slideId: string | null | undefined; count: number } | null>(null);
   useEffect(() => {
-    if (!isOpen || !slideId) return;
-    const channel = ably.channels.get(`comments:${slideId}`);
-    const onNewComment = () => queryClient.invalidateQueries({ queryKey: ['comments', slideId] });
-    channel.subscribe('new-comment', onNewComment);
-    return () => channel.unsubscribe('new-comment', onNewComment);
-  }, [isOpen, slideId, queryClient]);
+    if (!isOpen || liveCommentCount === undefined) return;
+    const seen = seenCommentCount.current;
+    if (seen && seen.slideId === slideId && seen.count !== liveCommentCount) {
+      queryClient.invalidateQueries({ queryKey: ['comments', slideId] });
+    }
+    seenCommentCount.current = { slideId, count: liveCommentCount };
+  }, [isOpen, slideId, liveCommentCount, queryClient]);
 
   useEffect(() => {
     if (!isOpen) {
@@ -311,9 +315,12 @@ const CommentsModal: React.FC<CommentsModalProps> = ({ isOpen, onClose, slideId,
     mutationFn: async ({ parentId, text, imageFile }: { parentId: string | null; text: string; imageFile: File | null }) => {
       let imageUrl: string | null = null;
       if (imageFile) {
-        const formData = new FormData();
-        formData.append('file', imageFile);
-        const uploadRes = await fetch('/api/upload', { method: 'POST', body: formData });
+        // Raw body: the server streams it to disk instead of parsing multipart
+        const uploadRes = await fetch('/api/upload', {
+          method: 'POST',
+          headers: { 'Content-Type': imageFile.type },
+          body: imageFile,
+        });
         const uploadData = await uploadRes.json();
         if (!uploadData.success) {
           throw new Error('Image upload failed');
@@ -13,7 +13,14 @@ import { useStore } from '@/store/useStore';
 import { SlidesResponseSchema } from '@/lib/validators';
 import { SlideDTO } from '@/lib/dto';
 import { shallow } from 'zustand/shallow';
-import { fetchComments, fetchAuthorProfile } from '@/lib/queries';
+import { fetchComments, fetchAuthorProfile, AUTHOR_PROFILE_STALE_MS } from '@/lib/queries';
+import { watchSlides } from '@/lib/live-counts';
+import { updateVideoPrefetch } from '@/lib/video-prefetch';
+
+// Live counts stream for the active slide and this many neighbours on each side
+const LIVE_COUNTS_RADIUS = 2;
+// Slides after the active one published for video prefetch
+const UPCOMING_SLIDES = 2;
 
 const fetchSlides = async ({ pageParam = '' }) => {
   const res = await fetch(`/api/slides?cursor=${pageParam}&limit=5`);
@@ -32,9 +39,10 @@ const fetchSlides = async ({ pageParam = '' }) => {
 };
 
 const FeedSwiper = () => {
-  const { setActiveSlide, setNextSlide, playVideo, activeSlide } = useStore(state => ({
+  const { setActiveSlide, setNextSlide, setUpcomingSlides, playVideo, activeSlide } = useStore(state => ({
     setActiveSlide: state.setActiveSlide,
     setNextSlide: state.setNextSlide,
+    setUpcomingSlides: state.setUpcomingSlides,
     playVideo: state.playVideo,
     activeSlide: state.activeSlide
   }), shallow);
@@ -101,6 +109,7 @@ const FeedSwiper = () => {
                 if (activeSlideRef.current?.id !== currentSlide.id) {
                   setActiveSlide(currentSlide);
                   setNextSlide(nextSlide);
+                  setUpcomingSlides(slides.slice(newActiveIndex + 1, newActiveIndex + 1 + UPCOMING_SLIDES));
 
                   // Pre-fetch comments and author profile
                   if (currentSlide.id) {
@@ -114,6 +123,7 @@ const FeedSwiper = () => {
                     queryClient.prefetchQuery({
                       queryKey: ['author', currentSlide.userId],
                       queryFn: () => fetchAuthorProfile(currentSlide.userId),
+                      staleTime: AUTHOR_PROFILE_STALE_MS,
                     });
                   }
 
@@ -130,7 +140,7 @@ const FeedSwiper = () => {
         },
       });
     }
-  }, [hasSlides, queryClient, playVideo, setActiveSlide, setNextSlide]);
+  }, [hasSlides, queryClient, playVideo, setActiveSlide, setNextSlide, setUpcomingSlides]);
 
   useEffect(() => {
     if (swiperInstance.current) {
@@ -138,6 +148,36 @@ const FeedSwiper = () => {
     }
   }, [slides]);
 
+  // Warm the profiles of every author on the loaded pages; fetchAuthorProfile
+  // batches these into one /api/authors request per page
+  useEffect(() => {
+    new Set(slides.map(slide => slide.userId).filter(Boolean)).forEach(userId => {
+      queryClient.prefetchQuery({
+        queryKey: ['author', userId],
+        queryFn: () => fetchAuthorProfile(userId),
+        staleTime: AUTHOR_PROFILE_STALE_MS,
+      });
+    });
+  }, [slides, queryClient]);
+
+  useEffect(() => {
+    const from = Math.max(0, activeIndex - LIVE_COUNTS_RADIUS);
+    watchSlides(slides.slice(from, activeIndex + LIVE_COUNTS_RADIUS + 1).map(slide => slide.id));
+  }, [slides, activeIndex]);
+
+  useEffect(() => () => watchSlides([]), []);
+
+  // Warm the next videos as the active slide moves
+  useEffect(() => {
+    const { activeSlide, upcomingSlides } = useStore.getState();
+    updateVideoPrefetch(activeSlide, upcomingSlides);
+    return useStore.subscribe((state, previous) => {
+      if (state.activeSlide !== previous.activeSlide || state.upcomingSlides !== previous.upcomingSlides) {
+        updateVideoPrefetch(state.activeSlide, state.upcomingSlides);
+      }
+    });
+  }, []);
+
 
   useEffect(() => {
     return () => {
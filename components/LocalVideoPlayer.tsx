@@ -1,11 +1,10 @@
 "use client";
 
-import React, { useEffect, useRef, useState } from 'react';
-import Hls from 'hls.js';
+import React, { useEffect, useRef } from 'react';
 import { useStore } from '@/store/useStore';
 import { shallow } from 'zustand/shallow';
 import { VideoSlideDTO } from '@/lib/dto';
-import { cn } from '@/lib/utils';
+import { usePooledVideo } from '@/lib/video-prefetch';
 
 interface LocalVideoPlayerProps {
     slide: VideoSlideDTO;
@@ -14,9 +13,11 @@ interface LocalVideoPlayerProps {
 }
 
 const LocalVideoPlayer = ({ slide, isActive, shouldLoad = false }: LocalVideoPlayerProps) => {
-    const videoRef = useRef<HTMLVideoElement>(null);
-    const hlsRef = useRef<Hls | null>(null);
-    const [isReadyToPlay, setIsReadyToPlay] = useState(false);
+    const hostRef = useRef<HTMLDivElement>(null);
+
+    // 1. Element <video> z puli lib/video-prefetch (HLS/mp4 i preloading ustawia menedżer);
+    //    null, dopóki slajd nie dostał elementu - wtedy widać sam poster
+    const video = usePooledVideo(slide, hostRef, shouldLoad);
 
     // Global state
     const { isPlaying, isMuted } = useStore(
@@ -27,56 +28,8 @@ const LocalVideoPlayer = ({ slide, isActive, shouldLoad = false }: LocalVideoPla
         shallow
     );
 
-    // 1. Inicjalizacja HLS (tylko raz)
+    // 2. Logika Odtwarzania (Tylko Active)
     useEffect(() => {
-        const video = videoRef.current;
-        if (!video) return;
-
-        const { hlsUrl, mp4Url } = slide.data;
-
-        if (Hls.isSupported() && hlsUrl) {
-            const hls = new Hls({
-                autoStartLoad: false, // WAŻNE: Nie ładuj automatycznie, czekaj na sygnał
-                capLevelToPlayerSize: true,
-            });
-            hlsRef.current = hls;
-            hls.attachMedia(video);
-            hls.on(Hls.Events.MANIFEST_PARSED, () => {
-                setIsReadyToPlay(true);
-            });
-
-            // Cleanup
-            return () => {
-                if (hlsRef.current) {
-                    hlsRef.current.destroy();
-                    hlsRef.current = null;
-                }
-            };
-        } else if (video.canPlayType('application/vnd.apple.mpegurl') && hlsUrl) {
-             // Native HLS (iOS)
-             video.src = hlsUrl;
-             setIsReadyToPlay(true);
-        } else if (mp4Url) {
-             video.src = mp4Url;
-             setIsReadyToPlay(true);
-        }
-    }, [slide.data]);
-
-    // 2. Logika Preloadingu (Smart Loading)
-    useEffect(() => {
-        const hls = hlsRef.current;
-        
-        if ((isActive || shouldLoad) && hls && slide.data.hlsUrl) {
-            if (hls.url !== slide.data.hlsUrl) {
-                 hls.loadSource(slide.data.hlsUrl);
-                 hls.startLoad();
-            }
-        }
-    }, [isActive, shouldLoad, slide.data.hlsUrl, slide.id]);
-
-    // 3. Logika Odtwarzania (Tylko Active)
-    useEffect(() => {
-        const video = videoRef.current;
         if (!video) return;
 
         const shouldPlay = isActive && isPlaying;
@@ -91,30 +44,22 @@ const LocalVideoPlayer = ({ slide, isActive, shouldLoad = false }: LocalVideoPla
             }
         } else {
             video.pause();
-            if (!isActive) {
-                // Opcjonalnie: przewiń do początku po przewinięciu dalej
-                // video.currentTime = 0; 
-            }
         }
-    }, [isActive, isPlaying]);
+    }, [video, isActive, isPlaying]);
 
-    // 4. Obsługa Mute
+    // 3. Obsługa Mute
     useEffect(() => {
-        if (videoRef.current) {
-            videoRef.current.muted = isMuted;
+        if (video) {
+            video.muted = isMuted;
         }
-    }, [isMuted]);
+    }, [video, isMuted]);
 
     return (
-        <div className="absolute inset-0 z-0 bg-black">
-             <video
-                ref={videoRef}
-                className="w-full h-full object-cover"
-                loop
-                playsInline
-                muted={isMuted}
-                poster={slide.data.poster}
-            />
+        <div
+            className="absolute inset-0 z-0 bg-black bg-cover bg-center"
+            style={slide.data.poster ? { backgroundImage: `url(${slide.data.poster})` } : undefined}
+        >
+            <div ref={hostRef} data-video-host className="w-full h-full [&>video]:w-full [&>video]:h-full [&>video]:object-cover" />
         </div>
     );
 };
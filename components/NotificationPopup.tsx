@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { useInfiniteQuery, useMutation, useQueryClient, InfiniteData } from '@tanstack/react-query';
 import { motion, AnimatePresence } from 'framer-motion';
 import { X, Bell, Mail, User, Tag, ChevronDown, Loader2, Heart, MessageSquare, UserPlus, Info, Trash } from 'lucide-react';
 import { useTranslation } from '@/context/LanguageContext';
@@ -146,6 +146,10 @@ const DeleteButton = ({ onDelete, t }: { onDelete: (e: any) => void, t: any }) =
   );
 }
 
+const PAGE_SIZE = 20;
+const LIST_KEY = ['notifications', 'list'];
+const UNREAD_KEY = ['notifications', 'unread'];
+
 interface NotificationPopupProps {
   isOpen: boolean;
   onClose: () => void;
@@ -155,16 +159,48 @@ const NotificationPopup: React.FC<NotificationPopupProps> = ({ isOpen, onClose }
   const { t, lang } = useTranslation();
   const queryClient = useQueryClient();
 
-  const { data, isLoading, error } = useQuery({
-    queryKey: ['notifications'],
-    queryFn: async () => {
-      const res = await fetch('/api/notifications');
+  // The list is only fetched while the popup is open, one page at a time;
+  // the badge count lives in its own query (see TopBar).
+  const { data, isLoading, error, fetchNextPage, hasNextPage, isFetchingNextPage } = useInfiniteQuery({
+    queryKey: LIST_KEY,
+    queryFn: async ({ pageParam }) => {
+      const params = new URLSearchParams({ limit: String(PAGE_SIZE) });
+      if (pageParam) params.set('cursor', pageParam);
+      const res = await fetch(`/api/notifications?${params}`);
       if (!res.ok) throw new Error('Failed to fetch');
       return res.json();
     },
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage?.nextCursor ?? null,
     enabled: isOpen,
   });
 
+  // Applies `update` to every loaded page and returns the previous list for rollback.
+  const updateList = async (update: (notifications: any[]) => any[]) => {
+    await queryClient.cancelQueries({ queryKey: LIST_KEY });
+    const previousData = queryClient.getQueryData<InfiniteData<any>>(LIST_KEY);
+    queryClient.setQueryData<InfiniteData<any>>(LIST_KEY, (old) => {
+        if (!old) return old;
+        return {
+            ...old,
+            pages: old.pages.map((page) => ({ ...page, notifications: update(page.notifications || []) })),
+        };
+    });
+    return previousData;
+  };
+
+  const decrementUnread = () => {
+    queryClient.setQueryData(UNREAD_KEY, (old: any) =>
+        old ? { ...old, unreadCount: Math.max(0, (old.unreadCount || 0) - 1) } : old
+    );
+  };
+
+  const isUnread = (id: string) => {
+    const list = queryClient.getQueryData<InfiniteData<any>>(LIST_KEY);
+    const notification = list?.pages.flatMap((page) => page.notifications || []).find((n: any) => n.id === id);
+    return !!notification && !notification.read;
+  };
+
   const markReadMutation = useMutation({
     mutationFn: async (id: string) => {
         await fetch('/api/notifications/mark-as-read', {
@@ -174,26 +210,15 @@ const NotificationPopup: React.FC<NotificationPopupProps> = ({ isOpen, onClose }
         });
     },
     onMutate: async (id) => {
-        await queryClient.cancelQueries({ queryKey: ['notifications'] });
-        const previousData = queryClient.getQueryData(['notifications']);
-        queryClient.setQueryData(['notifications'], (old: any) => {
-            if (!old) return old;
-            return {
-                ...old,
-                notifications: old.notifications.map((n: any) =>
-                    n.id === id ? { ...n, read: true } : n
-                ),
-                unreadCount: Math.max(0, (old.unreadCount || 0) - 1)
-            };
-        });
+        const wasUnread = isUnread(id);
+        const previousData = await updateList((list) => list.map((n: any) => n.id === id ? { ...n, read: true } : n));
+        if (wasUnread) decrementUnread();
         return { previousData };
     },
-    onError: (err, newTodo, context) => {
-        queryClient.setQueryData(['notifications'], context?.previousData);
+    onError: (err, id, context) => {
+        queryClient.setQueryData(LIST_KEY, context?.previousData);
+        queryClient.invalidateQueries({ queryKey: UNREAD_KEY });
     },
-    onSettled: () => {
-        queryClient.invalidateQueries({ queryKey: ['notifications'] });
-    }
   });
 
   const deleteMutation = useMutation({
@@ -203,29 +228,18 @@ const NotificationPopup: React.FC<NotificationPopupProps> = ({ isOpen, onClose }
         });
     },
     onMutate: async (id) => {
-        await queryClient.cancelQueries({ queryKey: ['notifications'] });
-        const previousData = queryClient.getQueryData(['notifications']);
-        queryClient.setQueryData(['notifications'], (old: any) => {
-            if (!old) return old;
-            const notification = old.notifications.find((n: any) => n.id === id);
-            const wasUnread = notification && !notification.read;
-            return {
-                ...old,
-                notifications: old.notifications.filter((n: any) => n.id !== id),
-                unreadCount: wasUnread ? Math.max(0, (old.unreadCount || 0) - 1) : old.unreadCount
-            };
-        });
+        const wasUnread = isUnread(id);
+        const previousData = await updateList((list) => list.filter((n: any) => n.id !== id));
+        if (wasUnread) decrementUnread();
         return { previousData };
     },
     onError: (err, id, context) => {
-        queryClient.setQueryData(['notifications'], context?.previousData);
+        queryClient.setQueryData(LIST_KEY, context?.previousData);
+        queryClient.invalidateQueries({ queryKey: UNREAD_KEY });
     },
-    onSettled: () => {
-        queryClient.invalidateQueries({ queryKey: ['notifications'] });
-    }
   });
 
-  const notifications: Notification[] = data?.success ? data.notifications.map((n: any) => {
+  const notifications: Notification[] = data ? data.pages.flatMap((page: any) => page?.success ? page.notifications : []).map((n: any) => {
         const previewText = n.text || t(n.previewKey) || '';
         return {
             id: n.id,
@@ -272,6 +286,17 @@ const NotificationPopup: React.FC<NotificationPopupProps> = ({ isOpen, onClose }
             />
           ))}
         </AnimatePresence>
+        {hasNextPage && (
+          <li className="flex justify-center py-2">
+            <button
+              onClick={() => fetchNextPage()}
+              disabled={isFetchingNextPage}
+              className="text-xs text-white/60 hover:text-white transition-colors"
+            >
+              {isFetchingNextPage ? <Loader2 className="h-4 w-4 animate-spin" /> : t('notificationsLoadMore')}
+            </button>
+          </li>
+        )}
       </ul>
     );
   };
@@ -10,6 +10,11 @@ import { shallow } from 'zustand/shallow';
 // Importujemy komponent odtwarzacza i typy
 import LocalVideoPlayer from './LocalVideoPlayer';
 import { VideoSlideDTO, SlideDTO } from '@/lib/dto';
+import { imageSources } from '@/lib/image-variants';
+
+// Pre-encoded AVIF/WebP (npm run images:variants): the logo paints before the image optimizer has warmed
+const LOGO_SRC = '/icons/icon-512x512.png';
+const LOGO_SOURCES = imageSources(LOGO_SRC);
 
 const fetchSlides = async () => {
     const res = await fetch(`/api/slides?cursor=&limit=1`);
@@ -94,13 +99,23 @@ const Preloader: React.FC = () => {
                 animate={{ scale: [1, 1.03, 1], opacity: [0.9, 1, 0.9] }}
                 transition={{ duration: 2.5, ease: "easeInOut", repeat: Infinity }}
               >
-                <Image
-                  src="/icons/icon-512x512.png"
-                  alt="Ting Tong Logo"
-                  width={150}
-                  height={150}
-                  priority
-                />
+                {LOGO_SOURCES.length > 0 ? (
+                  <picture>
+                    {LOGO_SOURCES.map(source => (
+                      <source key={source.type} type={source.type} srcSet={source.srcSet} sizes="150px" />
+                    ))}
+                    {/* eslint-disable-next-line @next/next/no-img-element */}
+                    <img src={LOGO_SRC} alt="Ting Tong Logo" width={150} height={150} />
+                  </picture>
+                ) : (
+                  <Image
+                    src={LOGO_SRC}
+                    alt="Ting Tong Logo"
+                    width={150}
+                    height={150}
+                    priority
+                  />
+                )}
               </motion.div>
             </motion.div>
           </div>
@@ -1,9 +1,8 @@
-import React, { memo, useEffect } from 'react';
+import React, { memo } from 'react';
 import Image from 'next/image';
 import { Heart, MessageSquare, User, CornerUpRight } from 'lucide-react';
 import { motion } from 'framer-motion';
-import Ably from 'ably';
-import { ably } from '@/lib/ably-client';
+import { useLiveCounts } from '@/lib/live-counts';
 import { useToast } from '@/context/ToastContext';
 import { useTranslation } from '@/context/LanguageContext';
 import { useStore } from '@/store/useStore';
@@ -47,27 +46,12 @@ const Sidebar: React.FC<SidebarProps> = ({
     openTippingModal: state.openTippingModal
   }), shallow);
 
+  const live = useLiveCounts(slideId);
   const likeState = likeChanges[slideId];
-  const currentCommentCount = commentCountChanges[slideId] ?? commentsCount;
-  const [liveLikes, setLiveLikes] = React.useState(initialLikes);
-  const currentLikes = likeState ? likeState.likes : liveLikes;
+  const currentCommentCount = live?.commentCount ?? commentCountChanges[slideId] ?? commentsCount;
+  const currentLikes = likeState ? likeState.likes : live?.likeCount ?? initialLikes;
   const isLiked = likeState ? likeState.isLiked : initialIsLiked;
 
-  useEffect(() => {
-    setLiveLikes(initialLikes);
-    const channel = ably.channels.get(`likes:${slideId}`);
-
-    const onLikeUpdate = (message: Ably.Message) => {
-      setLiveLikes((message.data as { likeCount: number }).likeCount);
-    };
-
-    channel.subscribe('update', onLikeUpdate);
-
-    return () => {
-      channel.unsubscribe('update', onLikeUpdate);
-    };
-  }, [initialLikes, slideId]);
-
   const handleLike = () => {
     if (!isLoggedIn) {
       addToast(t('loginRequired') || 'Musisz się zalogować', 'locked');
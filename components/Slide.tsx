@@ -17,7 +17,7 @@ import PwaOverlay from './PwaOverlay';
 import { DEFAULT_AVATAR_URL } from '@/lib/constants';
 import LocalVideoPlayer from './LocalVideoPlayer';
 import { useQueryClient } from '@tanstack/react-query';
-import { fetchComments, fetchAuthorProfile } from '@/lib/queries';
+import { fetchComments, fetchAuthorProfile, AUTHOR_PROFILE_STALE_MS } from '@/lib/queries';
 
 import HtmlContent from './HtmlContent';
 
@@ -194,7 +194,7 @@ const Slide = memo<SlideProps>(({ slide, priorityLoad = false }) => {
                     queryClient.prefetchQuery({
                         queryKey: ['author', slide.userId],
                         queryFn: () => fetchAuthorProfile(slide.userId),
-                        staleTime: 1000 * 60 * 5,
+                        staleTime: AUTHOR_PROFILE_STALE_MS,
                     });
                 } catch (err) {
                     console.error("Prefetch author error:", err);
@@ -15,7 +15,11 @@ import { Popover, PopoverContent, PopoverTrigger } from "@/components/ui/popover
 import { User, LogOut, ChevronDown, Settings } from 'lucide-react';
 import { usePushSubscription } from '@/hooks/usePushSubscription';
 import { usePathname } from 'next/navigation';
-import { useQuery } from '@tanstack/react-query';
+import { useQuery, useQueryClient } from '@tanstack/react-query';
+import Ably from 'ably';
+import { ably } from '@/lib/ably-client';
+
+const UNREAD_KEY = ['notifications', 'unread'];
 
 const TopBar = () => {
   const { user, logout } = useUser();
@@ -54,16 +58,43 @@ const TopBar = () => {
     return () => window.removeEventListener('resize', checkIsDesktop);
   }, []);
 
+  // The badge count is fetched once and then kept current by `unread` messages on the
+  // user's Ably channel; the occasional refetch (focus, stale) reconciles missed messages.
+  const queryClient = useQueryClient();
   const { data: notificationData } = useQuery({
-    queryKey: ['notifications'],
+    queryKey: UNREAD_KEY,
     queryFn: async () => {
-      const res = await fetch('/api/notifications');
+      const res = await fetch('/api/notifications/unread-count');
       return res.json();
     },
     enabled: !!user,
-    refetchInterval: 30000, // Poll every 30s
+    staleTime: 5 * 60 * 1000,
   });
 
+  const unreadChannel: string | null = user ? notificationData?.channel ?? null : null;
+
+  useEffect(() => {
+    if (!unreadChannel) return;
+    let cancelled = false;
+    const channel = ably.channels.get(unreadChannel);
+    const onUnread = (message: Ably.Message) => {
+      const { unreadCount } = message.data as { unreadCount: number };
+      queryClient.setQueryData(UNREAD_KEY, (old: any) => ({ ...old, unreadCount }));
+    };
+
+    // The connection's token may predate this login; renew it so it covers the user's channel.
+    ably.auth.authorize()
+      .then(() => {
+        if (!cancelled) channel.subscribe('unread', onUnread);
+      })
+      .catch((error) => console.error('Failed to subscribe to notification updates:', error));
+
+    return () => {
+      cancelled = true;
+      channel.unsubscribe('unread', onUnread);
+    };
+  }, [unreadChannel, queryClient]);
+
   if (pathname?.startsWith('/setup')) {
     return null;
   }
@@ -0,0 +1,96 @@
+'use client';
+
+import React, { useEffect, useRef, useState } from 'react';
+import { AuthorSuggestion } from '@/lib/db.interfaces';
+import { AUTHOR_SEARCH_MIN_LENGTH } from '@/lib/constants';
+
+const DEBOUNCE_MS = 200;
+
+interface AuthorPickerProps {
+  id?: string;
+  name: string;
+  initialAuthor?: { id: string; username: string } | null;
+  placeholder?: string;
+  onSelect?: (author: AuthorSuggestion | null) => void;
+}
+
+/** Username typeahead backed by /api/admin/authors; submits the chosen user id as `name`. */
+export default function AuthorPicker({ id, name, initialAuthor, placeholder, onSelect }: AuthorPickerProps) {
+  const [query, setQuery] = useState(initialAuthor?.username || '');
+  const [selectedId, setSelectedId] = useState(initialAuthor?.id || '');
+  const [suggestions, setSuggestions] = useState<AuthorSuggestion[]>([]);
+  const [isOpen, setIsOpen] = useState(false);
+  const selectedName = useRef(initialAuthor?.username || '');
+
+  useEffect(() => {
+    const term = query.trim();
+    if (term.length < AUTHOR_SEARCH_MIN_LENGTH || term === selectedName.current) {
+      setSuggestions([]);
+      return;
+    }
+    const controller = new AbortController();
+    const timer = setTimeout(async () => {
+      try {
+        const res = await fetch(`/api/admin/authors?q=${encodeURIComponent(term)}`, { signal: controller.signal });
+        const body = await res.json();
+        setSuggestions(body.authors || []);
+        setIsOpen(true);
+      } catch (error) {
+        if ((error as Error).name !== 'AbortError') console.error('Author search failed:', error);
+      }
+    }, DEBOUNCE_MS);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [query]);
+
+  const choose = (author: AuthorSuggestion | null) => {
+    selectedName.current = author?.username || '';
+    setSelectedId(author?.id || '');
+    setQuery(author?.username || '');
+    setSuggestions([]);
+    setIsOpen(false);
+    onSelect?.(author);
+  };
+
+  return (
+    <div className="relative">
+      <input type="hidden" name={name} value={selectedId} />
+      <input
+        id={id}
+        type="text"
+        autoComplete="off"
+        value={query}
+        placeholder={placeholder}
+        onChange={(e) => {
+          setQuery(e.target.value);
+          if (selectedId) {
+            setSelectedId('');
+            onSelect?.(null);
+          }
+        }}
+        onFocus={() => setIsOpen(suggestions.length > 0)}
+        onBlur={() => setTimeout(() => setIsOpen(false), 150)}
+        className="block w-full px-3 py-2 bg-gray-700 border border-gray-600 rounded-md shadow-sm focus:outline-none focus:ring-pink-500 focus:border-pink-500"
+      />
+      {isOpen && suggestions.length > 0 && (
+        <ul className="absolute z-10 mt-1 w-full max-h-60 overflow-auto bg-gray-700 border border-gray-600 rounded-md shadow-lg">
+          {suggestions.map(author => (
+            <li key={author.id}>
+              <button
+                type="button"
+                onMouseDown={(e) => e.preventDefault()}
+                onClick={() => choose(author)}
+                className="w-full text-left px-3 py-2 hover:bg-gray-600"
+              >
+                {author.username}
+                {author.displayName && <span className="text-gray-400 ml-2">{author.displayName}</span>}
+              </button>
+            </li>
+          ))}
+        </ul>
+      )}
+    </div>
+  );
+}
@@ -0,0 +1,31 @@
+import Link from 'next/link';
+import React from 'react';
+
+interface ListPagerProps {
+  basePath: string;
+  // Active filters, carried over to the next page
+  filters: Record<string, string | undefined>;
+  nextCursor: string | null;
+  isFirstPage: boolean;
+}
+
+function href(basePath: string, filters: Record<string, string | undefined>, cursor?: string) {
+  const params = new URLSearchParams();
+  Object.entries(filters).forEach(([key, value]) => {
+    if (value) params.set(key, value);
+  });
+  if (cursor) params.set('cursor', cursor);
+  const query = params.toString();
+  return query ? `${basePath}?${query}` : basePath;
+}
+
+/** Keyset pagination links: back to the first page and on to the next one. */
+export default function ListPager({ basePath, filters, nextCursor, isFirstPage }: ListPagerProps) {
+  const linkClass = 'bg-gray-700 hover:bg-gray-600 text-white text-sm py-1 px-3 rounded';
+  return (
+    <div className="flex justify-between mt-4">
+      {isFirstPage ? <span /> : <Link href={href(basePath, filters)} className={linkClass}>First page</Link>}
+      {nextCursor && <Link href={href(basePath, filters, nextCursor)} className={linkClass}>Next page</Link>}
+    </div>
+  );
+}
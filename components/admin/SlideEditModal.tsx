@@ -2,29 +2,26 @@
 
 import React, { useState, useEffect } from 'react';
 import { SlideDTO } from '@/lib/dto';
-import { User } from '@/lib/db.interfaces';
+import AuthorPicker from './AuthorPicker';
 
 interface SlideEditModalProps {
   isOpen: boolean;
   onClose: () => void;
   onSubmit: (formData: FormData) => Promise<{ success: boolean, error?: string }>;
   slide?: SlideDTO | null;
-  users: User[];
 }
 
-export default function SlideEditModal({ isOpen, onClose, onSubmit, slide, users }: SlideEditModalProps) {
+export default function SlideEditModal({ isOpen, onClose, onSubmit, slide }: SlideEditModalProps) {
   const [error, setError] = useState<string | null>(null);
   const [isSubmitting, setIsSubmitting] = useState(false);
 
   const [type, setType] = useState<'video' | 'html'>('video');
   const [title, setTitle] = useState('');
   const [content, setContent] = useState('');
-  const [authorId, setAuthorId] = useState('');
 
   useEffect(() => {
     if (slide) {
       setType(slide.type);
-      setAuthorId(slide.userId);
       if (slide.type === 'video') {
         setTitle(slide.data.title || '');
         setContent(slide.data.mp4Url);
@@ -37,9 +34,8 @@ export default function SlideEditModal({ isOpen, onClose, onSubmit, slide, users
       setType('video');
       setTitle('');
       setContent('');
-      setAuthorId(users.length > 0 ? users[0].id : '');
     }
-  }, [slide, users]);
+  }, [slide]);
 
   const handleSubmit = async (event: React.FormEvent<HTMLFormElement>) => {
     event.preventDefault();
@@ -89,17 +85,9 @@ export default function SlideEditModal({ isOpen, onClose, onSubmit, slide, users
           {!slide && (
             <div className="mb-4">
               <label htmlFor="author_id" className="block text-sm font-medium text-gray-300">Author</label>
-              <select
-                id="author_id"
-                name="author_id"
-                value={authorId}
-                onChange={(e) => setAuthorId(e.target.value)}
-                className="mt-1 block w-full px-3 py-2 bg-gray-700 border border-gray-600 rounded-md shadow-sm focus:outline-none focus:ring-pink-500 focus:border-pink-500"
-              >
-                {users.map(user => (
-                  <option key={user.id} value={user.id}>{user.username}</option>
-                ))}
-              </select>
+              <div className="mt-1">
+                <AuthorPicker id="author_id" name="author_id" placeholder="Search by username" />
+              </div>
             </div>
           )}
 
@@ -63,6 +63,7 @@ const translations: Record<string, Record<string, string>> = {
         closeNotificationsAriaLabel: 'Zamknij powiadomienia',
         notificationsEmpty: 'Wszystko na bieżąco!',
         notificationsError: 'Błąd ładowania powiadomień.',
+        notificationsLoadMore: 'Pokaż starsze',
         notif1Preview: 'Nowa wiadomość od Admina',
         notif1Time: '2 min temu',
         notif1Full: 'Cześć! Chcieliśmy tylko dać znać, że nowa wersja aplikacji jest już dostępna. Sprawdź nowe funkcje w panelu konta!',
@@ -227,6 +228,7 @@ const translations: Record<string, Record<string, string>> = {
         closeNotificationsAriaLabel: 'Close notifications',
         notificationsEmpty: 'You are all caught up!',
         notificationsError: 'Failed to load notifications.',
+        notificationsLoadMore: 'Show older',
         notif1Preview: 'New message from Admin',
         notif1Time: '2 mins ago',
         notif1Full: 'Hi there! Just wanted to let you know that a new version of the app is available. Check out the new features in your account panel!',
@@ -2,6 +2,7 @@
 
 import React, { createContext, useState, useContext, useEffect, ReactNode, Dispatch, SetStateAction } from 'react';
 import { User } from '@/lib/db';
+import { SW_FEED_CACHE } from '@/lib/constants';
 
 export interface LoginCredentials {
   email?: string;
@@ -51,6 +52,14 @@ export const UserProvider = ({ children }: { children: ReactNode }) => {
     checkUserStatus();
   }, []);
 
+  // The service worker's cached feed page is the anonymous one, without this viewer's likes
+  const userId = user?.id;
+  useEffect(() => {
+    if (userId && 'caches' in window) {
+      caches.delete(SW_FEED_CACHE).catch(() => {});
+    }
+  }, [userId]);
+
   const login = async (loginData: LoginCredentials) => {
     const res = await fetch('/api/login', {
         method: 'POST',
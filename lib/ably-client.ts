@@ -2,4 +2,17 @@
 
 import Ably from 'ably';
 
-export const ably = new Ably.Realtime({ authUrl: '/api/ably-token' });
+// NEXT_PUBLIC_ABLY_HOST/PORT point the browser at local_ably.py (see local_stack.py)
+const localHost = process.env.NEXT_PUBLIC_ABLY_HOST;
+
+export const ably = new Ably.Realtime({
+  authUrl: '/api/ably-token',
+  ...(localHost && {
+    realtimeHost: localHost,
+    restHost: localHost,
+    port: parseInt(process.env.NEXT_PUBLIC_ABLY_PORT || '80', 10),
+    tls: false,
+    useBinaryProtocol: false,
+    fallbackHosts: [],
+  }),
+});
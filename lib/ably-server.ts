@@ -4,4 +4,16 @@ if (!process.env.ABLY_API_KEY) {
   console.warn('ABLY_API_KEY environment variable not set. Using dummy key for build.');
 }
 
-export const ably = new Ably.Rest({ key: process.env.ABLY_API_KEY || 'dummy:key' });
+// ABLY_REST_HOST points publishes at a local sink (local_ably.py) instead of Ably.
+const localRestHost = process.env.ABLY_REST_HOST;
+
+export const ably = new Ably.Rest({
+  key: process.env.ABLY_API_KEY || 'dummy:key',
+  ...(localRestHost && {
+    restHost: localRestHost,
+    port: parseInt(process.env.ABLY_REST_PORT || '80', 10),
+    tls: false,
+    useBinaryProtocol: false,
+    fallbackHosts: [],
+  }),
+});
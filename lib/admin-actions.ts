@@ -5,6 +5,8 @@ import { prisma } from '@/lib/prisma';
 import * as bcrypt from 'bcryptjs';
 import { sendWelcomeEmail } from '@/lib/email';
 import { revalidatePath } from 'next/cache';
+import { invalidateFeedCache } from '@/lib/feed-cache';
+import { invalidateAuthorProfiles } from '@/lib/author-cache';
 
 // Helper for generating random password
 function generatePassword(length = 12) {
@@ -166,6 +168,8 @@ export async function deleteUser(userId: string) {
             await tx.user.delete({ where: { id: userId } });
         });
 
+        // The user's slides are gone from the feed
+        await Promise.all([invalidateFeedCache(), invalidateAuthorProfiles([userId])]);
         revalidatePath('/admin');
         return { success: true, message: 'Użytkownik został usunięty.' };
 
@@ -191,6 +195,7 @@ export async function updateUserRole(userId: string, newRole: string) {
             where: { id: userId },
             data: { role: newRole }
         });
+        await invalidateAuthorProfiles([userId]);
 
         revalidatePath('/admin');
         return { success: true, message: `Rola użytkownika zmieniona na ${newRole}.` };
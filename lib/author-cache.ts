@@ -0,0 +1,149 @@
+import { createHash } from 'crypto';
+import { NextRequest } from 'next/server';
+import { redis } from './kv';
+import { LruCache } from './feed-cache';
+import { AuthorProfile } from '@/types';
+
+// Cache for the public author profiles served by /api/author/[id] and the
+// batch /api/authors route. Lookups go through an in-process LRU, then
+// Upstash (one MGET per batch), then one database query for whatever is
+// still missing. Profile edits and slide mutations of an author drop that
+// author's entry here and in Redis, and bump a generation that makes other
+// instances clear their LRU within GENERATION_CHECK_MS.
+//
+// Every profile carries a strong ETag (a hash of its serialized body), so
+// clients revalidate with If-None-Match and repeat views come back as 304.
+
+export type CachedProfile = { body: string; etag: string };
+
+const LOCAL_MAX_ENTRIES = 2_000;
+const LOCAL_TTL_MS = 30_000;
+const REDIS_TTL_SECONDS = 300;
+const GENERATION_KEY = 'author:generation';
+const GENERATION_CHECK_MS = 2_000;
+
+export const MAX_BATCH_AUTHORS = 50;
+
+// Public, but always revalidated: a 304 costs no body and no query
+export const AUTHOR_CACHE_CONTROL = 'public, max-age=0, must-revalidate';
+
+const local = new LruCache<CachedProfile>(LOCAL_MAX_ENTRIES, LOCAL_TTL_MS);
+
+export const authorCacheStats = {
+  localHits: 0,
+  redisHits: 0,
+  misses: 0,
+  invalidations: 0,
+  errors: 0,
+};
+
+let generation: number | null = null;
+let generationCheckedAt = 0;
+
+async function checkGeneration() {
+  const now = Date.now();
+  if (generation !== null && now - generationCheckedAt < GENERATION_CHECK_MS) return;
+  try {
+    const stored = Number(await redis.get<number>(GENERATION_KEY)) || 0;
+    if (stored !== generation) local.clear();
+    generation = stored;
+  } catch (error) {
+    authorCacheStats.errors++;
+    console.error('Author cache: failed to read generation', error);
+    generation = generation ?? 0;
+  }
+  generationCheckedAt = now;
+}
+
+const profileKey = (id: string) => `author:profile:${id}`;
+
+/** Strong ETag over a serialized response body. */
+export function etagFor(body: string): string {
+  return `"${createHash('sha1').update(body).digest('base64url')}"`;
+}
+
+/** True when the request's If-None-Match already names `etag`. */
+export function isNotModified(request: NextRequest, etag: string): boolean {
+  const header = request.headers.get('if-none-match');
+  if (!header) return false;
+  return header === '*' || header.split(',').some(tag => tag.trim() === etag);
+}
+
+function cacheEntry(profile: AuthorProfile | unknown): CachedProfile {
+  const body = JSON.stringify(profile);
+  return { body, etag: etagFor(body) };
+}
+
+/**
+ * Cached profiles for `ids`; `load` is called once with the ids found in
+ * neither cache. Ids with no such user are absent from the result.
+ */
+export async function getAuthorProfiles(
+  ids: string[],
+  load: (ids: string[]) => Promise<AuthorProfile[]>
+): Promise<Map<string, CachedProfile>> {
+  await checkGeneration();
+  const found = new Map<string, CachedProfile>();
+
+  let missing = ids.filter(id => {
+    const cached = local.get(id);
+    if (cached) {
+      found.set(id, cached);
+      authorCacheStats.localHits++;
+    }
+    return !cached;
+  });
+
+  if (missing.length > 0) {
+    try {
+      const stored = await redis.mget<(AuthorProfile | null)[]>(...missing.map(profileKey));
+      missing = missing.filter((id, i) => {
+        if (!stored[i]) return true;
+        const entry = cacheEntry(stored[i]);
+        local.set(id, entry);
+        found.set(id, entry);
+        authorCacheStats.redisHits++;
+        return false;
+      });
+    } catch (error) {
+      authorCacheStats.errors++;
+      console.error('Author cache: redis read failed', error);
+    }
+  }
+
+  if (missing.length > 0) {
+    authorCacheStats.misses += missing.length;
+    const profiles = await load(missing);
+    const pipeline = redis.pipeline();
+    profiles.forEach(profile => {
+      const entry = cacheEntry(profile);
+      local.set(profile.id, entry);
+      found.set(profile.id, entry);
+      pipeline.set(profileKey(profile.id), entry.body, { ex: REDIS_TTL_SECONDS });
+    });
+    if (profiles.length > 0) {
+      pipeline.exec().catch((error) => {
+        authorCacheStats.errors++;
+        console.error('Author cache: redis write failed', error);
+      });
+    }
+  }
+
+  return found;
+}
+
+/** Drops the cached profiles of `userIds`, here and (via the generation key) on other instances. */
+export async function invalidateAuthorProfiles(userIds: string[]): Promise<void> {
+  const ids = Array.from(new Set(userIds.filter(Boolean)));
+  if (ids.length === 0) return;
+  ids.forEach(id => local.delete(id));
+  authorCacheStats.invalidations++;
+  try {
+    await redis.del(...ids.map(profileKey));
+    generation = await redis.incr(GENERATION_KEY);
+    generationCheckedAt = Date.now();
+  } catch (error) {
+    authorCacheStats.errors++;
+    console.error('Author cache: invalidation failed', error);
+  }
+}
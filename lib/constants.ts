@@ -1,2 +1,9 @@
 
 export const DEFAULT_AVATAR_URL = 'https://4r6bgzvgnm5exo49.public.blob.vercel-storage.com/jajk.png';
+
+// Author typeahead and admin list search: pg_trgm indexes only serve patterns of
+// three or more characters, so shorter terms are not searched
+export const AUTHOR_SEARCH_MIN_LENGTH = 3;
+
+// Service worker cache holding the anonymous first feed page (app/sw.ts); dropped on sign-in
+export const SW_FEED_CACHE = 'feed-first-page';
@@ -0,0 +1,152 @@
+import { ably } from './ably-server';
+import { redis } from './kv';
+import { db } from './db';
+import { COUNTS_MESSAGE, FEED_COUNTS_CHANNEL, SlideCountsMessage } from './count-channel';
+
+// Coalesces like/comment count changes into at most one Ably message per slide
+// per window. Writers only mark a slide dirty; a flush every WINDOW_MS reads the
+// current counters for all dirty slides in one query and publishes them as one
+// batch on FEED_COUNTS_CHANNEL, each message tagged with its slideId header so
+// clients can subscribe to just the slides around them. A Redis key per slide
+// and window keeps other instances from publishing the same slide in that window;
+// a slide that loses the race stays dirty and goes out in the next flush.
+//
+// Serverless functions can be frozen as soon as the response is sent, before the
+// window timer fires, so there the writing routes flush inline (settleSlideCounts);
+// the Redis gate still limits each slide to one message per window across instances.
+// No timer retries a slide that lost the gate there, so the first loser of a window
+// takes a pending key, waits the window out and publishes the trailing edge; later
+// losers see the key and return straight away.
+
+const WINDOW_MS = parseInt(process.env.COUNT_BROADCAST_WINDOW_MS || '1000', 10);
+const FLUSH_INLINE = process.env.COUNT_BROADCAST_INLINE
+  ? process.env.COUNT_BROADCAST_INLINE === '1'
+  : Boolean(process.env.VERCEL);
+const GATE_PREFIX = 'counts:gate:';
+const PENDING_PREFIX = 'counts:pending:';
+
+const dirty = new Set<string>();
+let timer: ReturnType<typeof setTimeout> | null = null;
+let flushing: Promise<string[]> | null = null;
+
+export const countBroadcastStats = {
+  marked: 0,
+  flushes: 0,
+  published: 0,
+  deferred: 0,
+  trailing: 0,
+  errors: 0,
+};
+
+function schedule() {
+  if (!timer && dirty.size > 0) {
+    timer = setTimeout(() => {
+      timer = null;
+      flushSlideCounts().catch(() => {});
+    }, WINDOW_MS);
+  }
+}
+
+/** Records that a slide's counters changed; the update goes out with the next flush. */
+export function markSlideCountsDirty(slideId: string): void {
+  countBroadcastStats.marked++;
+  dirty.add(slideId);
+  schedule();
+}
+
+// Claims each slide's publish slot for this window; returns the slides we may publish
+async function claimWindow(slideIds: string[]): Promise<string[]> {
+  try {
+    const pipeline = redis.pipeline();
+    slideIds.forEach(id => pipeline.set(`${GATE_PREFIX}${id}`, 1, { nx: true, px: WINDOW_MS }));
+    const results = await pipeline.exec<(string | null)[]>();
+    return slideIds.filter((_, i) => results[i] === 'OK');
+  } catch (error) {
+    // Without Redis, fall back to per-instance coalescing only
+    console.error('Count broadcaster: redis gate failed', error);
+    return slideIds;
+  }
+}
+
+// Returns the slides that lost the gate; inline flushes hand them to publishTrailingEdge
+async function flush(): Promise<string[]> {
+  const pending = Array.from(dirty);
+  dirty.clear();
+  if (pending.length === 0) return [];
+  countBroadcastStats.flushes++;
+
+  const claimed = await claimWindow(pending);
+  const deferred = pending.filter(id => !claimed.includes(id));
+  if (!FLUSH_INLINE) deferred.forEach(id => dirty.add(id));
+  countBroadcastStats.deferred += deferred.length;
+  if (claimed.length === 0) return deferred;
+
+  try {
+    const ts = Date.now();
+    const rows = await db.getSlideCounts(claimed);
+    const messages = rows.map(row => {
+      const data: SlideCountsMessage = { slideId: row.id, likeCount: row.likeCount, commentCount: row.commentCount, ts };
+      return { name: COUNTS_MESSAGE, data, extras: { headers: { slideId: row.id } } };
+    });
+    if (messages.length > 0) {
+      await ably.channels.get(FEED_COUNTS_CHANNEL).publish(messages);
+      countBroadcastStats.published += messages.length;
+    }
+  } catch (error) {
+    countBroadcastStats.errors++;
+    console.error('Count broadcaster: publish failed', error);
+    claimed.forEach(id => dirty.add(id));
+  }
+  return deferred;
+}
+
+// Publishes slides that lost this window's gate once it has expired, unless another
+// request already waits to do so. The counts are read after the wait, so they
+// include every write that found the pending key taken.
+async function publishTrailingEdge(slideIds: string[]): Promise<void> {
+  let mine = slideIds;
+  try {
+    const pipeline = redis.pipeline();
+    slideIds.forEach(id => pipeline.set(`${PENDING_PREFIX}${id}`, 1, { nx: true, px: WINDOW_MS * 3 }));
+    const results = await pipeline.exec<(string | null)[]>();
+    mine = slideIds.filter((_, i) => results[i] === 'OK');
+    if (mine.length === 0) return;
+    await new Promise(resolve => setTimeout(resolve, WINDOW_MS));
+    // Released before reading the counts: a write from here on waits for the next window itself
+    await redis.del(...mine.map(id => `${PENDING_PREFIX}${id}`));
+  } catch (error) {
+    console.error('Count broadcaster: pending key failed', error);
+  }
+  countBroadcastStats.trailing += mine.length;
+  mine.forEach(id => dirty.add(id));
+  // A slide that loses again was published by a write newer than ours, which covers its own trailing edge
+  await flushSlideCounts(false);
+}
+
+/**
+ * Publishes everything marked so far. Runs on the window timer; short-lived
+ * callers (cron routes) can await it before returning. `trailing` is false only
+ * for the trailing-edge flush itself.
+ */
+export async function flushSlideCounts(trailing = true): Promise<void> {
+  if (timer) {
+    clearTimeout(timer);
+    timer = null;
+  }
+  while (flushing) await flushing;
+  const run = flush().finally(() => {
+    flushing = null;
+    schedule();
+  });
+  flushing = run;
+  const deferred = await run;
+  if (FLUSH_INLINE && trailing && deferred.length > 0) await publishTrailingEdge(deferred);
+}
+
+/**
+ * For routes that marked slides dirty: on serverless, publishes before the
+ * response goes out; elsewhere the window timer does it.
+ */
+export async function settleSlideCounts(): Promise<void> {
+  if (FLUSH_INLINE) await flushSlideCounts();
+}
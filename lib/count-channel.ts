@@ -0,0 +1,17 @@
+// Shared by the server-side broadcaster and the browser subscriber.
+
+/** One Ably channel for every slide's like/comment counts; clients filter it by slide. */
+export const FEED_COUNTS_CHANNEL = 'feed:counts';
+export const COUNTS_MESSAGE = 'counts';
+
+export interface SlideCountsMessage {
+  slideId: string;
+  likeCount: number;
+  commentCount: number;
+  ts: number; // server time the counts were read, for ordering and staleness
+}
+
+/** Ably subscription filter matching messages for any of `slideIds` (sent in extras.headers). */
+export function slideCountsFilter(slideIds: string[]): string {
+  return slideIds.map(id => `headers.slideId == \`${JSON.stringify(id)}\``).join(' || ');
+}
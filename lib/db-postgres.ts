@@ -1,8 +1,14 @@
-import { neon, NeonQueryFunction } from '@neondatabase/serverless';
-import { User, Comment, Notification } from './db.interfaces';
+import { neon, neonConfig, NeonQueryFunction } from '@neondatabase/serverless';
+import { User, Comment, Notification, AdminPage, AdminUserRow, AuthorSuggestion } from './db.interfaces';
 import { SlideDTO as Slide } from './dto';
 import { prisma } from './prisma';
 import { CommentWithRelations } from './dto';
+import { invalidateFeedCache } from './feed-cache';
+import { invalidateAuthorProfiles } from './author-cache';
+import { getFinishedMediaJob } from './media-queue';
+import { AUTHOR_SEARCH_MIN_LENGTH } from './constants';
+import { AuthorProfile } from '@/types';
+import { recordQuery, recordQueryTimeout, resultRows } from './query-metrics';
 import * as bcrypt from 'bcryptjs';
 
 let sql: NeonQueryFunction<false, false>;
@@ -11,50 +17,79 @@ const MAX_RETRIES = 3;
 const RETRY_DELAY_MS = 100;
 const QUERY_TIMEOUT_MS = 10000; // Increased to 10 seconds
 
-async function queryWithTimeout(query: Promise<any>) {
-  return Promise.race([
-    query,
-    new Promise((_, reject) =>
-      setTimeout(() => reject(new Error('Query timed out')), QUERY_TIMEOUT_MS)
-    ),
-  ]);
+async function queryWithTimeout<T>(query: Promise<T>): Promise<T> {
+  let timer: ReturnType<typeof setTimeout> | undefined;
+  try {
+    return await Promise.race([
+      query,
+      new Promise<never>((_, reject) => {
+        timer = setTimeout(() => reject(new Error('Query timed out')), QUERY_TIMEOUT_MS);
+      }),
+    ]);
+  } finally {
+    clearTimeout(timer);
+  }
 }
 
-async function executeWithRetry(queryFn: () => Promise<any>) {
+async function executeWithRetry(name: string, queryFn: () => Promise<any>) {
+  const started = performance.now();
   let lastError: Error | undefined;
+  let timedOut = false;
   for (let i = 0; i < MAX_RETRIES; i++) {
     try {
-      return await queryWithTimeout(queryFn());
+      const result = await queryWithTimeout(queryFn());
+      recordQuery({ name, source: 'sql', ms: performance.now() - started, rows: resultRows(result), retries: i, outcome: 'ok' });
+      return result;
     } catch (error: any) {
       lastError = error;
-      if (error.message === 'Query timed out' || error.name === 'NeonDbError') {
-        console.warn(`Query failed (attempt ${i + 1}/${MAX_RETRIES}): ${error.message}. Retrying...`);
+      timedOut = error.message === 'Query timed out';
+      if (timedOut) recordQueryTimeout();
+      if (timedOut || error.name === 'NeonDbError') {
+        console.warn(`Query ${name} failed (attempt ${i + 1}/${MAX_RETRIES}): ${error.message}. Retrying...`);
         await new Promise(resolve => setTimeout(resolve, RETRY_DELAY_MS * Math.pow(2, i)));
       } else {
+        recordQuery({ name, source: 'sql', ms: performance.now() - started, retries: i, outcome: 'error' });
         throw error;
       }
     }
   }
+  recordQuery({ name, source: 'sql', ms: performance.now() - started, retries: MAX_RETRIES - 1, outcome: timedOut ? 'timeout' : 'error' });
   throw new Error(`Query failed after ${MAX_RETRIES} retries: ${lastError?.message}`);
 }
 
-function getDb() {
+/**
+ * The neon sql function with retries, a timeout and per-query metrics under
+ * `name` (the calling db function; see lib/query-metrics.ts).
+ */
+function getDb(name = 'query') {
   if (!sql) {
     if (!process.env.DATABASE_URL) {
       throw new Error("DATABASE_URL environment variable is not set");
     }
+    if (process.env.NEON_FETCH_ENDPOINT) {
+      // Local Postgres behind a Neon HTTP proxy (see local_stack.py)
+      neonConfig.fetchEndpoint = process.env.NEON_FETCH_ENDPOINT;
+    }
     sql = neon(process.env.DATABASE_URL);
   }
 
-  // Wrap the sql function to include retry logic
+  // Queries stay lazy neon query objects, so they can still be nested as
+  // fragments in other sql`` templates; only awaiting one runs it, through the retry wrapper
   const wrappedSql: any = (strings: TemplateStringsArray, ...values: any[]) => {
-    return executeWithRetry(() => sql(strings, ...values));
+    const query: any = sql(strings, ...values);
+    let running: Promise<any> | undefined;
+    const run = () => (running ??= executeWithRetry(name, () => sql(strings, ...values)));
+    return Object.assign(query, {
+      then: (onFulfilled?: any, onRejected?: any) => run().then(onFulfilled, onRejected),
+      catch: (onRejected?: any) => run().catch(onRejected),
+      finally: (onFinally?: any) => run().finally(onFinally),
+    });
   }
 
   // Copy properties from the original sql function, like `sql.query`
   Object.assign(wrappedSql, {
     query: (query: string, params: any[]) => {
-      return executeWithRetry(() => sql.query(query, params));
+      return executeWithRetry(name, () => sql.query(query, params));
     }
   });
 
@@ -64,7 +99,7 @@ function getDb() {
 
 // --- Table Creation ---
 export async function createTables() {
-  const sql = getDb();
+  const sql = getDb('createTables');
   await sql`DROP TABLE IF EXISTS password_reset_tokens CASCADE;`;
   await sql`DROP TABLE IF EXISTS push_subscriptions CASCADE;`;
   await sql`DROP TABLE IF EXISTS notifications CASCADE;`;
@@ -157,27 +192,27 @@ export async function createTables() {
 
 // --- User Functions ---
 export async function findUserById(id: string): Promise<User | null> {
-    const sql = getDb();
+    const sql = getDb('findUserById');
     const result = await sql`SELECT * FROM users WHERE id = ${id};`;
     return result[0] as User || null;
 }
 export async function findUserByEmail(email: string): Promise<User | null> {
-    const sql = getDb();
+    const sql = getDb('findUserByEmail');
     const result = await sql`SELECT * FROM users WHERE email = ${email};`;
     return result[0] as User || null;
 }
 export async function findUserByUsername(username: string): Promise<User | null> {
-    const sql = getDb();
+    const sql = getDb('findUserByUsername');
     const result = await sql`SELECT * FROM users WHERE username = ${username};`;
     return result[0] as User || null;
 }
 export async function getAllUsers(): Promise<User[]> {
-    const sql = getDb();
+    const sql = getDb('getAllUsers');
     const result = await sql`SELECT * FROM users;`;
     return result as unknown as User[];
 }
 export async function createUser(userData: Omit<User, 'id' | 'sessionVersion' | 'password'> & {password: string | null}): Promise<User> {
-    const sql = getDb();
+    const sql = getDb('createUser');
     const { username, displayName, email, password, avatar, role } = userData;
     // Ensure avatar is NULL if undefined or empty string to differentiate from default URL logic in UI
     const avatarValue = avatar || null;
@@ -208,7 +243,7 @@ export async function createUser(userData: Omit<User, 'id' | 'sessionVersion' |
     return newUser;
 }
 export async function updateUser(userId: string, updates: Partial<User>): Promise<User | null> {
-    const sql = getDb();
+    const sql = getDb('updateUser');
 
     const keys = Object.keys(updates).filter(key => (updates as any)[key] !== undefined);
     if (keys.length === 0) {
@@ -232,18 +267,22 @@ export async function updateUser(userId: string, updates: Partial<User>): Promis
     `;
 
     const result = await sql.query(query, values);
+    // Cached feed pages carry the author's avatar and name
+    const shownInFeed = keys.includes('avatar') || keys.includes('username');
+    await Promise.all([invalidateAuthorProfiles([userId]), shownInFeed ? invalidateFeedCache() : undefined]);
 
     return (result[0] as User) || null;
 }
 export async function deleteUser(userId: string): Promise<boolean> {
-    const sql = getDb();
+    const sql = getDb('deleteUser');
     const result = await sql`DELETE FROM users WHERE id = ${userId} RETURNING id;`;
+    await invalidateAuthorProfiles([userId]);
     return result.length > 0;
 }
 
 // --- Password Reset Token Functions ---
 export async function createPasswordResetToken(userId: string, token: string, expiresAt: Date): Promise<void> {
-    const sql = getDb();
+    const sql = getDb('createPasswordResetToken');
     await sql`
         INSERT INTO password_reset_tokens ("userId", token, "expiresAt")
         VALUES (${userId}, ${token}, ${expiresAt.toISOString()});
@@ -251,7 +290,7 @@ export async function createPasswordResetToken(userId: string, token: string, ex
 }
 
 export async function getPasswordResetToken(token: string): Promise<{ id: string, userId: string, expiresAt: Date } | null> {
-    const sql = getDb();
+    const sql = getDb('getPasswordResetToken');
     const result = await sql`SELECT * FROM password_reset_tokens WHERE token = ${token};`;
     if (result.length === 0) {
         return null;
@@ -265,19 +304,19 @@ export async function getPasswordResetToken(token: string): Promise<{ id: string
 }
 
 export async function deletePasswordResetToken(id: string): Promise<void> {
-    const sql = getDb();
+    const sql = getDb('deletePasswordResetToken');
     await sql`DELETE FROM password_reset_tokens WHERE id = ${id};`;
 }
 
 
 export async function pingDb() {
-  const sql = getDb();
+  const sql = getDb('pingDb');
   await sql`SELECT 1`;
 }
 
 // --- Slide Functions ---
 export async function createSlide(slideData: any): Promise<any> {
-    const sql = getDb();
+    const sql = getDb('createSlide');
     const id = 'slide_' + Math.random().toString(36).substring(2, 15);
     const { userId, username, x, y, type, data, accessLevel, avatar } = slideData;
 
@@ -293,12 +332,23 @@ export async function createSlide(slideData: any): Promise<any> {
         INSERT INTO slides (id, "userId", username, x, y, "slideType", title, content, "accessLevel")
         VALUES (${id}, ${userId}, ${username}, ${x}, ${y}, ${type}, ${title}, ${content}, ${accessLevel || 'PUBLIC'});
     `;
+    // The upload's media job may have finished before the slide existed. The slide is
+    // in already, so a failure here only costs the renditions, not the request.
+    if (type === 'video' && data?.mp4Url && !data.hlsUrl) {
+        try {
+            const job = await getFinishedMediaJob(data.mp4Url);
+            if (job) await attachMediaRenditions(job.mp4Url, { hlsUrl: job.hlsUrl!, poster: job.poster! }, id);
+        } catch (error) {
+            console.error(`Failed to attach media renditions to slide ${id}:`, error);
+        }
+    }
+    await Promise.all([invalidateFeedCache(), invalidateAuthorProfiles([userId])]);
     return { id };
 }
 
 // --- Like Functions ---
 export async function toggleLike(slideId: string, userId: string): Promise<{ newStatus: 'liked' | 'unliked', likeCount: number }> {
-    const sql = getDb();
+    const sql = getDb('toggleLike');
     const isLikedResult = await sql`SELECT 1 FROM likes WHERE "slideId" = ${slideId} AND "userId" = ${userId};`;
     const isLiked = isLikedResult.length > 0;
 
@@ -546,52 +596,56 @@ export async function deleteComment(commentId: string, userId: string): Promise<
 
 
 // --- Notification Functions ---
+// Notifications live in the Prisma-managed "Notification" table, the same one the
+// notification routes read, so the unread counter and the list always agree.
+const notificationInclude = {
+    fromUser: { select: { id: true, displayName: true, avatar: true } },
+} as const;
+
 export async function createNotification(notificationData: Omit<Notification, 'id' | 'createdAt' | 'read'>): Promise<Notification> {
-    const sql = getDb();
     const { userId, type, text, link, fromUser } = notificationData;
-    const fromUserId = fromUser?.id;
-    const result = await sql`
-        INSERT INTO notifications ("userId", type, text, link, "fromUserId")
-        VALUES (${userId}, ${type}, ${text}, ${link}, ${fromUserId})
-        RETURNING *;
-    `;
-    return result[0] as Notification;
-}
-export async function getNotifications(userId: string): Promise<Notification[]> {
-    const sql = getDb();
-    const results = await sql`
-        SELECT n.*, u.username as "fromUsername", u.avatar as "fromUserAvatar"
-        FROM notifications n
-        LEFT JOIN users u ON n."fromUserId" = u.id
-        WHERE n."userId" = ${userId}
-        ORDER BY n."createdAt" DESC;
-    `;
-    return (results as unknown as any[]).map(n => {
-        const { fromUsername, fromUserAvatar, ...rest } = n;
-        return {
-            ...rest,
-            fromUser: n.fromUserId ? {
-                id: n.fromUserId,
-                username: fromUsername,
-                avatar: fromUserAvatar,
-            } : undefined,
-        };
-    }) as Notification[];
-}
-export async function markNotificationAsRead(notificationId: string): Promise<Notification | null> {
-    const sql = getDb();
-    const result = await sql`UPDATE notifications SET read = true WHERE id = ${notificationId} RETURNING *;`;
-    return result[0] as Notification || null;
+    const fromUserId = fromUser?.id ?? notificationData.fromUserId ?? null;
+    const notification = await prisma.notification.create({
+        data: { userId, type, text, link, fromUserId },
+    });
+    return notification as Notification;
+}
+export async function getNotifications(
+    userId: string,
+    options: { limit?: number; cursor?: string } = {}
+): Promise<{ notifications: Notification[]; nextCursor: string | null }> {
+    const { limit = 20, cursor } = options;
+    const notifications = await prisma.notification.findMany({
+        where: { userId },
+        take: limit + 1,
+        skip: cursor ? 1 : 0,
+        cursor: cursor ? { id: cursor } : undefined,
+        orderBy: [{ createdAt: 'desc' }, { id: 'desc' }],
+        include: notificationInclude,
+    });
+
+    let nextCursor: string | null = null;
+    if (notifications.length > limit) {
+        notifications.pop();
+        nextCursor = notifications[notifications.length - 1].id;
+    }
+    return { notifications: notifications as Notification[], nextCursor };
+}
+/** Marks one of the user's notifications as read; true only if it was unread before. */
+export async function markNotificationAsRead(notificationId: string, userId: string): Promise<boolean> {
+    const { count } = await prisma.notification.updateMany({
+        where: { id: notificationId, userId, read: false },
+        data: { read: true },
+    });
+    return count > 0;
 }
 export async function getUnreadNotificationCount(userId: string): Promise<number> {
-    const sql = getDb();
-    const result = await sql`SELECT COUNT(*) as count FROM notifications WHERE "userId" = ${userId} AND read = false;`;
-    return parseInt(result[0].count as string, 10);
+    return prisma.notification.count({ where: { userId, read: false } });
 }
 
 // --- Push Subscription Functions ---
 export async function savePushSubscription(userId: string | null, subscription: object, isPwaInstalled: boolean): Promise<void> {
-    const sql = getDb();
+    const sql = getDb('savePushSubscription');
     const subJson = JSON.stringify(subscription);
 
     // Check for existing subscription with the same endpoint to prevent duplicates
@@ -640,7 +694,7 @@ export async function savePushSubscription(userId: string | null, subscription:
 }
 
 export async function getPushSubscriptions(options: { userId?: string, role?: string, isPwaInstalled?: boolean }): Promise<any[]> {
-    const sql = getDb();
+    const sql = getDb('getPushSubscriptions');
     const { userId, role, isPwaInstalled } = options;
 
     if (userId) {
@@ -664,10 +718,56 @@ export async function getPushSubscriptions(options: { userId?: string, role?: st
     return await sql`SELECT ps.subscription FROM push_subscriptions ps`;
 }
 
+// Keyset-paginated variant of getPushSubscriptions for the push fan-out (lib/push-fanout.ts).
+export async function getPushSubscriptionPage(
+    options: { userId?: string, role?: string, isPwaInstalled?: boolean },
+    page: { afterId?: string, limit: number }
+): Promise<{ id: string, subscription: any }[]> {
+    const sql = getDb('getPushSubscriptionPage');
+    const { userId, role, isPwaInstalled } = options;
+    const { afterId, limit } = page;
+    // No predicate on the first page: ids are UUIDs on the createTables schema, where '' is not a valid input
+    const after = afterId === undefined ? sql`` : sql`AND ps.id > ${afterId}`;
+
+    if (userId) {
+        return await sql`
+            SELECT ps.id, ps.subscription FROM push_subscriptions ps
+            WHERE ps."userId" = ${userId} ${after}
+            ORDER BY ps.id LIMIT ${limit}` as unknown as { id: string, subscription: any }[];
+    }
+
+    if (role) {
+        return await sql`
+            SELECT ps.id, ps.subscription FROM push_subscriptions ps
+            JOIN users u ON ps."userId" = u.id
+            WHERE u.role = ${role} ${after}
+            ORDER BY ps.id LIMIT ${limit}` as unknown as { id: string, subscription: any }[];
+    }
+
+    if (isPwaInstalled !== undefined) {
+        return await sql`
+            SELECT ps.id, ps.subscription FROM push_subscriptions ps
+            WHERE ps.is_pwa_installed = ${isPwaInstalled} ${after}
+            ORDER BY ps.id LIMIT ${limit}` as unknown as { id: string, subscription: any }[];
+    }
+
+    return await sql`
+        SELECT ps.id, ps.subscription FROM push_subscriptions ps
+        WHERE true ${after}
+        ORDER BY ps.id LIMIT ${limit}` as unknown as { id: string, subscription: any }[];
+}
+
+export async function deletePushSubscriptions(ids: string[]): Promise<number> {
+    if (ids.length === 0) return 0;
+    const sql = getDb('deletePushSubscriptions');
+    const result = await sql`DELETE FROM push_subscriptions WHERE id = ANY(${ids}) RETURNING id`;
+    return result.length;
+}
+
 // --- Slide Management Functions (Added) ---
 
 export async function getSlide(id: string): Promise<Slide | null> {
-    const sql = getDb();
+    const sql = getDb('getSlide');
     // Refactored: Reads directly from denormalized counters on 'slides' table.
     const result = await sql`
         SELECT s.*
@@ -696,66 +796,89 @@ export async function getSlide(id: string): Promise<Slide | null> {
     } as Slide;
 }
 
+// Feed cursor: "<createdAt epoch ms>_<slide id>". Ties on createdAt are broken by id,
+// matching ORDER BY "createdAt" DESC, id DESC and the slides (createdAt, id) index.
+export function slideCursor(slide: Pick<Slide, 'createdAt' | 'id'>): string {
+    return `${new Date(slide.createdAt).getTime()}_${slide.id}`;
+}
+
+export function parseSlideCursor(cursor: string): { createdAt: Date, id: string | null } | null {
+    const separator = cursor.indexOf('_');
+    if (separator > 0 && /^\d+$/.test(cursor.slice(0, separator))) {
+        return { createdAt: new Date(parseInt(cursor.slice(0, separator), 10)), id: cursor.slice(separator + 1) };
+    }
+    // Legacy cursors (createdAt only, as epoch ms or a date string)
+    const legacy = /^\d+$/.test(cursor) ? new Date(parseInt(cursor, 10)) : new Date(cursor);
+    return isNaN(legacy.getTime()) ? null : { createdAt: legacy, id: null };
+}
+
 export async function getSlides(options: { limit?: number, cursor?: string, currentUserId?: string }): Promise<Slide[]> {
-    const sql = getDb();
+    const sql = getDb('getSlides');
     const { limit = 5, cursor, currentUserId } = options;
+    const position = cursor ? parseSlideCursor(cursor) : null;
+
+    // Only the columns SlideDTO needs; content is parsed by Postgres and only its
+    // data/avatar keys come back, instead of s.* with the raw TEXT and legacy URL columns.
+    const isLiked = currentUserId
+        ? sql`EXISTS(SELECT 1 FROM likes WHERE "slideId" = s.id AND "userId" = ${currentUserId})`
+        : sql`false`;
+    const after = position?.id
+        ? sql`WHERE (s."createdAt", s.id) < (${position.createdAt}, ${position.id})`
+        : position
+            ? sql`WHERE s."createdAt" < ${position.createdAt}`
+            : sql``;
 
-    let result;
+    const result = await sql`
+        SELECT
+            s.id, s.x, s.y, s."slideType", s."userId", s.username, s."createdAt",
+            s."likeCount", s."commentCount", s."accessLevel",
+            c.doc -> 'data' AS data,
+            c.doc ->> 'avatar' AS "contentAvatar",
+            u.avatar AS "userAvatar",
+            ${isLiked} AS "isLiked"
+        FROM slides s
+        -- content is cast once per row; empty content gives NULL instead of failing the page
+        CROSS JOIN LATERAL (SELECT CASE WHEN s.content <> '' THEN s.content::jsonb END AS doc) c
+        LEFT JOIN users u ON s."userId" = u.id
+        ${after}
+        ORDER BY s."createdAt" DESC, s.id DESC
+        LIMIT ${limit}
+    `;
 
-    // Use Date object for cursor comparison if provided
-    const cursorDate = cursor ? new Date(parseInt(cursor)) : null;
+    return result.map((row: any) => ({
+        id: row.id,
+        x: row.x,
+        y: row.y,
+        type: row.slideType as 'video' | 'html',
+        userId: row.userId,
+        username: row.username,
+        createdAt: new Date(row.createdAt).toISOString(),
+        initialLikes: row.likeCount || 0,
+        initialComments: row.commentCount || 0,
+        isLiked: !!row.isLiked,
+        avatar: row.userAvatar || row.contentAvatar || '',
+        accessLevel: row.accessLevel || 'PUBLIC',
+        data: row.data,
+    }) as Slide);
+}
 
-    // Refactored: Reads directly from denormalized counters.
-    // Removed complex JOINs for counts.
-    // 'isLiked' still requires a subquery or join, but exists() is efficient.
-
-    if (cursorDate) {
-        result = await sql`
-            SELECT
-                s.*,
-                u.avatar as "userAvatar",
-                ${currentUserId ? sql`EXISTS(SELECT 1 FROM likes WHERE "slideId" = s.id AND "userId" = ${currentUserId})` : false} as "isLiked"
-            FROM slides s
-            LEFT JOIN users u ON s."userId" = u.id
-            WHERE s."createdAt" < ${cursorDate}
-            ORDER BY s."createdAt" DESC
-            LIMIT ${limit}
-        `;
-    } else {
-        result = await sql`
-            SELECT
-                s.*,
-                u.avatar as "userAvatar",
-                ${currentUserId ? sql`EXISTS(SELECT 1 FROM likes WHERE "slideId" = s.id AND "userId" = ${currentUserId})` : false} as "isLiked"
-            FROM slides s
-            LEFT JOIN users u ON s."userId" = u.id
-            ORDER BY s."createdAt" DESC
-            LIMIT ${limit}
-        `;
-    }
+// Which of the given slides the user has liked; overlays isLiked on cached anonymous feed pages.
+export async function getLikedSlideIds(userId: string, slideIds: string[]): Promise<string[]> {
+    if (slideIds.length === 0) return [];
+    const sql = getDb('getLikedSlideIds');
+    const result = await sql`SELECT "slideId" FROM likes WHERE "userId" = ${userId} AND "slideId" = ANY(${slideIds})`;
+    return result.map((row: any) => row.slideId as string);
+}
 
-    return result.map((row: any) => {
-        const content = row.content ? JSON.parse(row.content) : {};
-        return {
-            id: row.id,
-            x: row.x,
-            y: row.y,
-            type: row.slideType as 'video' | 'html',
-            userId: row.userId,
-            username: row.username,
-            createdAt: new Date(row.createdAt).toISOString(),
-            initialLikes: row.likeCount || 0,
-            initialComments: row.commentCount || 0,
-            isLiked: !!row.isLiked,
-            avatar: row.userAvatar || content.avatar || '',
-            accessLevel: row.accessLevel || 'PUBLIC',
-            data: content.data,
-        } as Slide;
-    });
+export async function getSlideCounts(slideIds: string[]): Promise<{ id: string; likeCount: number; commentCount: number }[]> {
+    if (slideIds.length === 0) return [];
+    const sql = getDb('getSlideCounts');
+    const result = await sql`SELECT id, "likeCount", "commentCount" FROM slides WHERE id = ANY(${slideIds})`;
+    return result.map((row: any) => ({ id: row.id, likeCount: row.likeCount || 0, commentCount: row.commentCount || 0 }));
 }
 
 export async function getAllSlides(): Promise<Slide[]> {
-    const sql = getDb();
+    const sql = getDb('getAllSlides');
     // Refactored: Reads directly from denormalized counters.
     const result = await sql`
         SELECT s.*
@@ -783,8 +906,173 @@ export async function getAllSlides(): Promise<Slide[]> {
     });
 }
 
+// --- Admin listings ---
+// Keyset pages in the feed's "<createdAt ms>_<id>" cursor format, newest first.
+// Search is a substring ILIKE, served by the pg_trgm GIN indexes in
+// prisma/schema.prisma; terms shorter than AUTHOR_SEARCH_MIN_LENGTH, which
+// the indexes cannot serve, are ignored.
+
+export const ADMIN_PAGE_SIZE = 50;
+
+function escapeLike(term: string): string {
+    return term.replace(/[\\%_]/g, '\\$&');
+}
+
+export async function listUsersForAdmin(
+    options: { limit?: number; cursor?: string; q?: string; role?: string } = {}
+): Promise<AdminPage<AdminUserRow>> {
+    const sql = getDb('listUsersForAdmin');
+    const { limit = ADMIN_PAGE_SIZE, cursor, q, role } = options;
+    const position = cursor ? parseSlideCursor(cursor) : null;
+    const term = q?.trim();
+    const pattern = term && term.length >= AUTHOR_SEARCH_MIN_LENGTH ? `%${escapeLike(term)}%` : null;
+
+    const result = await sql`
+        SELECT id, username, "displayName", email, role, avatar, "createdAt"
+        FROM users
+        WHERE true
+            ${role ? sql`AND role = ${role}` : sql``}
+            ${pattern ? sql`AND (username ILIKE ${pattern} OR email ILIKE ${pattern} OR "displayName" ILIKE ${pattern})` : sql``}
+            ${position?.id ? sql`AND ("createdAt", id) < (${position.createdAt}, ${position.id})` : sql``}
+        ORDER BY "createdAt" DESC, id DESC
+        LIMIT ${limit + 1}
+    `;
+
+    const items = result.slice(0, limit).map((row: any) => ({
+        id: row.id,
+        username: row.username,
+        displayName: row.displayName,
+        email: row.email,
+        role: row.role,
+        avatar: row.avatar,
+        createdAt: new Date(row.createdAt).toISOString(),
+    }) as AdminUserRow);
+    const last = items[items.length - 1];
+    return { items, nextCursor: result.length > limit && last ? slideCursor(last) : null };
+}
+
+export async function listSlidesForAdmin(
+    options: { limit?: number; cursor?: string; q?: string; type?: 'video' | 'html'; authorId?: string } = {}
+): Promise<AdminPage<Slide>> {
+    const sql = getDb('listSlidesForAdmin');
+    const { limit = ADMIN_PAGE_SIZE, cursor, q, type, authorId } = options;
+    const position = cursor ? parseSlideCursor(cursor) : null;
+    const term = q?.trim();
+    const pattern = term && term.length >= AUTHOR_SEARCH_MIN_LENGTH ? `%${escapeLike(term)}%` : null;
+
+    // Only this page's content is parsed, by Postgres, as in getSlides
+    const result = await sql`
+        SELECT
+            s.id, s.x, s.y, s."slideType", s."userId", s.username, s."createdAt",
+            s."likeCount", s."commentCount", s."accessLevel",
+            c.doc -> 'data' AS data
+        FROM slides s
+        CROSS JOIN LATERAL (SELECT CASE WHEN s.content <> '' THEN s.content::jsonb END AS doc) c
+        WHERE true
+            ${type ? sql`AND s."slideType" = ${type}` : sql``}
+            ${authorId ? sql`AND s."userId" = ${authorId}` : sql``}
+            ${pattern ? sql`AND s.title ILIKE ${pattern}` : sql``}
+            ${position?.id ? sql`AND (s."createdAt", s.id) < (${position.createdAt}, ${position.id})` : sql``}
+        ORDER BY s."createdAt" DESC, s.id DESC
+        LIMIT ${limit + 1}
+    `;
+
+    const items = result.slice(0, limit).map((row: any) => ({
+        id: row.id,
+        x: row.x,
+        y: row.y,
+        type: row.slideType as 'video' | 'html',
+        userId: row.userId,
+        username: row.username,
+        createdAt: new Date(row.createdAt).toISOString(),
+        initialLikes: row.likeCount || 0,
+        initialComments: row.commentCount || 0,
+        isLiked: false,
+        avatar: '',
+        accessLevel: row.accessLevel || 'PUBLIC',
+        data: row.data || {},
+    }) as Slide);
+    const last = items[items.length - 1];
+    return { items, nextCursor: result.length > limit && last ? slideCursor(last) : null };
+}
+
+/**
+ * Username/display-name prefix matches for the admin author picker. Callers pass at
+ * least AUTHOR_SEARCH_MIN_LENGTH characters, the shortest the trigram indexes serve.
+ */
+export async function searchAuthors(term: string, limit = 10): Promise<AuthorSuggestion[]> {
+    const sql = getDb('searchAuthors');
+    const prefix = `${escapeLike(term.trim())}%`;
+    const result = await sql`
+        SELECT id, username, "displayName", avatar
+        FROM users
+        WHERE username ILIKE ${prefix} OR "displayName" ILIKE ${prefix}
+        ORDER BY username
+        LIMIT ${limit}
+    `;
+    return result as unknown as AuthorSuggestion[];
+}
+
+/**
+ * Public profiles for `ids` with each author's 12 latest slides, in one round-trip.
+ * Content is only read for slides missing a title or thumbnail, as their fallback.
+ */
+export async function getAuthorProfiles(ids: string[]): Promise<AuthorProfile[]> {
+    if (ids.length === 0) return [];
+    const sql = getDb('getAuthorProfiles');
+    const result = await sql`
+        SELECT u.id, u.username, u."displayName", u."avatarUrl", u.avatar, u.image, u.bio, u.role,
+               COALESCE(latest.slides, '[]'::json) AS slides
+        FROM users u
+        LEFT JOIN LATERAL (
+            SELECT json_agg(json_build_object(
+                       'id', s.id,
+                       'title', s.title,
+                       'thumbnailUrl', s."thumbnailUrl",
+                       'content', CASE WHEN s.title IS NULL OR s."thumbnailUrl" IS NULL THEN s.content END
+                   ) ORDER BY s."createdAt" DESC) AS slides
+            FROM (
+                SELECT id, title, "thumbnailUrl", content, "createdAt"
+                FROM slides
+                WHERE "userId" = u.id
+                ORDER BY "createdAt" DESC
+                LIMIT 12
+            ) s
+        ) latest ON true
+        WHERE u.id = ANY(${ids})
+    `;
+
+    return result.map((user: any) => ({
+        id: user.id,
+        username: user.displayName || user.username || 'Użytkownik',
+        avatarUrl: user.avatar || user.avatarUrl || user.image || 'https://i.pravatar.cc/150?u=' + user.id,
+        bio: user.bio || "",
+        role: user.role || "user",
+        slides: (user.slides as any[]).map((slide) => {
+            let title = slide.title || 'Untitled';
+            let thumbnailUrl = slide.thumbnailUrl || '/placeholder.jpg';
+
+            // Fallback: Parse content JSON if title or thumbnail are missing
+            if (slide.content) {
+                try {
+                    const parsedContent = JSON.parse(slide.content);
+                    if (title === 'Untitled') {
+                        title = parsedContent.title || 'Untitled';
+                    }
+                    if (thumbnailUrl === '/placeholder.jpg') {
+                        thumbnailUrl = parsedContent.thumbnailUrl || parsedContent.cover || '/placeholder.jpg';
+                    }
+                } catch (e) {
+                    // Ignore parsing error
+                }
+            }
+            return { id: slide.id, title, thumbnailUrl };
+        }),
+    }));
+}
+
 export async function updateSlide(id: string, updates: Partial<Slide>): Promise<void> {
-    const sql = getDb();
+    const sql = getDb('updateSlide');
 
     // Fetch current slide to preserve existing content fields
     const slides = await sql`SELECT * FROM slides WHERE id = ${id}`;
@@ -811,10 +1099,42 @@ export async function updateSlide(id: string, updates: Partial<Slide>): Promise<
         SET content = ${newContent}, title = ${title}
         WHERE id = ${id}
     `;
+    await Promise.all([invalidateFeedCache(), invalidateAuthorProfiles([slide.userId])]);
+}
+
+/**
+ * Points the video slides playing `mp4Url` at its HLS ladder, only `slideId` when
+ * given; keeps a poster that was set by hand.
+ */
+export async function attachMediaRenditions(
+    mp4Url: string,
+    renditions: { hlsUrl: string; poster: string },
+    slideId?: string
+): Promise<number> {
+    const sql = getDb('attachMediaRenditions');
+    // The text match skips parsing content for slides that cannot mention the URL;
+    // the jsonb compare decides, and never sees empty content
+    const mentions = `%${escapeLike(mp4Url)}%`;
+    const onlySlide = slideId === undefined ? sql`` : sql`AND id = ${slideId}`;
+    const rows = await sql`
+        UPDATE slides
+        SET content = jsonb_set(
+                jsonb_set(content::jsonb, '{data,hlsUrl}', to_jsonb(${renditions.hlsUrl}::text)),
+                '{data,poster}',
+                to_jsonb(COALESCE(NULLIF(content::jsonb #>> '{data,poster}', ''), ${renditions.poster}::text))
+            )::text,
+            "updatedAt" = now()
+        WHERE content LIKE ${mentions}
+          AND (CASE WHEN content <> '' THEN content::jsonb END) #>> '{data,mp4Url}' = ${mp4Url}
+          ${onlySlide}
+        RETURNING id
+    `;
+    if (rows.length > 0) await invalidateFeedCache();
+    return rows.length;
 }
 
 export async function deleteSlide(id: string): Promise<void> {
-    const sql = getDb();
+    const sql = getDb('deleteSlide');
 
     // Delete likes associated with the slide
     await sql`DELETE FROM likes WHERE "slideId" = ${id}`;
@@ -830,5 +1150,9 @@ export async function deleteSlide(id: string): Promise<void> {
     await sql`DELETE FROM comments WHERE "slideId" = ${id}`;
 
     // finally delete the slide
-    await sql`DELETE FROM slides WHERE id = ${id}`;
+    const deleted = await sql`DELETE FROM slides WHERE id = ${id} RETURNING "userId"`;
+    await Promise.all([
+        invalidateFeedCache(),
+        invalidateAuthorProfiles(deleted.map((row: any) => row.userId as string)),
+    ]);
 }
@@ -51,3 +51,26 @@ export interface Notification {
     avatar: string;
   } | null;
 }
+
+// Admin listings: one keyset page plus the cursor of the next one
+export interface AdminPage<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
+export interface AdminUserRow {
+  id: string;
+  username: string;
+  displayName: string | null;
+  email: string;
+  role: User['role'];
+  avatar: string | null;
+  createdAt: string;
+}
+
+export interface AuthorSuggestion {
+  id: string;
+  username: string;
+  displayName: string | null;
+  avatar: string | null;
+}
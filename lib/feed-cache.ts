@@ -0,0 +1,177 @@
+import { redis } from './kv';
+import { SlideDTO } from './dto';
+
+// Cache for anonymous /api/slides pages, keyed by cursor + limit.
+// Lookups go through an in-process LRU first, then Upstash, then the database.
+// Slide mutations bump a generation number in Redis, which retires every cached
+// page at once; other instances pick the new generation up within GENERATION_CHECK_MS.
+// Like/comment counters in a cached page can lag by up to REDIS_TTL_SECONDS
+// (live counts arrive over Ably); per-user isLiked is overlaid by the route.
+
+export type FeedPage = { slides: SlideDTO[]; nextCursor: string | null };
+export type FeedCacheSource = 'local' | 'redis' | 'db';
+
+const LOCAL_MAX_ENTRIES = 200;
+const LOCAL_TTL_MS = 10_000;
+const REDIS_TTL_SECONDS = 60;
+const GENERATION_KEY = 'feed:generation';
+const GENERATION_CHECK_MS = 2_000;
+
+export class LruCache<V> {
+  private entries = new Map<string, { value: V; expiresAt: number }>();
+
+  constructor(private maxEntries: number, private ttlMs: number) {}
+
+  get(key: string): V | undefined {
+    const entry = this.entries.get(key);
+    if (!entry) return undefined;
+    if (entry.expiresAt <= Date.now()) {
+      this.entries.delete(key);
+      return undefined;
+    }
+    // Re-insert so Map iteration order tracks recency
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    return entry.value;
+  }
+
+  set(key: string, value: V) {
+    this.entries.delete(key);
+    this.entries.set(key, { value, expiresAt: Date.now() + this.ttlMs });
+    if (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value as string);
+    }
+  }
+
+  delete(key: string) {
+    this.entries.delete(key);
+  }
+
+  clear() {
+    this.entries.clear();
+  }
+
+  get size() {
+    return this.entries.size;
+  }
+}
+
+const local = new LruCache<string>(LOCAL_MAX_ENTRIES, LOCAL_TTL_MS);
+const inflight = new Map<string, Promise<string>>();
+
+export const feedCacheStats = {
+  localHits: 0,
+  redisHits: 0,
+  misses: 0,
+  invalidations: 0,
+  errors: 0,
+};
+
+let generation: number | null = null;
+let generationCheckedAt = 0;
+
+async function currentGeneration(): Promise<number> {
+  const now = Date.now();
+  if (generation !== null && now - generationCheckedAt < GENERATION_CHECK_MS) {
+    return generation;
+  }
+  try {
+    const stored = Number(await redis.get<number>(GENERATION_KEY)) || 0;
+    if (stored !== generation) local.clear();
+    generation = stored;
+  } catch (error) {
+    feedCacheStats.errors++;
+    console.error('Feed cache: failed to read generation', error);
+    generation = generation ?? 0;
+  }
+  generationCheckedAt = now;
+  return generation;
+}
+
+const pageKey = (gen: number, cursor: string | undefined, limit: number) =>
+  `feed:v${gen}:${cursor || 'first'}:${limit}`;
+
+/**
+ * Returns the serialized anonymous page for cursor + limit, calling `load` only on a miss.
+ * Concurrent misses for the same page share one `load` call.
+ */
+export async function getFeedPage(
+  cursor: string | undefined,
+  limit: number,
+  load: () => Promise<FeedPage>
+): Promise<{ body: string; source: FeedCacheSource }> {
+  const key = pageKey(await currentGeneration(), cursor, limit);
+
+  const cached = local.get(key);
+  if (cached !== undefined) {
+    feedCacheStats.localHits++;
+    return { body: cached, source: 'local' };
+  }
+
+  try {
+    const stored = await redis.get<FeedPage>(key);
+    if (stored) {
+      const body = JSON.stringify(stored);
+      local.set(key, body);
+      feedCacheStats.redisHits++;
+      return { body, source: 'redis' };
+    }
+  } catch (error) {
+    feedCacheStats.errors++;
+    console.error('Feed cache: redis read failed', error);
+  }
+
+  feedCacheStats.misses++;
+  let pending = inflight.get(key);
+  if (!pending) {
+    pending = (async () => {
+      const page = await load();
+      const body = JSON.stringify(page);
+      local.set(key, body);
+      redis.set(key, body, { ex: REDIS_TTL_SECONDS }).catch((error) => {
+        feedCacheStats.errors++;
+        console.error('Feed cache: redis write failed', error);
+      });
+      return body;
+    })().finally(() => inflight.delete(key));
+    inflight.set(key, pending);
+  }
+  return { body: await pending, source: 'db' };
+}
+
+/** Drops every cached feed page, on this instance immediately and elsewhere via the generation key. */
+export async function invalidateFeedCache(): Promise<void> {
+  local.clear();
+  feedCacheStats.invalidations++;
+  try {
+    generation = await redis.incr(GENERATION_KEY);
+    generationCheckedAt = Date.now();
+  } catch (error) {
+    feedCacheStats.errors++;
+    console.error('Feed cache: failed to bump generation', error);
+  }
+}
+
+/** Counters in Prometheus text exposition format. */
+export function feedCacheMetrics(): string {
+  const lines = [
+    '# HELP feed_cache_requests_total Anonymous feed page lookups by result.',
+    '# TYPE feed_cache_requests_total counter',
+    `feed_cache_requests_total{result="local_hit"} ${feedCacheStats.localHits}`,
+    `feed_cache_requests_total{result="redis_hit"} ${feedCacheStats.redisHits}`,
+    `feed_cache_requests_total{result="miss"} ${feedCacheStats.misses}`,
+    '# HELP feed_cache_invalidations_total Slide mutations that retired the cached pages.',
+    '# TYPE feed_cache_invalidations_total counter',
+    `feed_cache_invalidations_total ${feedCacheStats.invalidations}`,
+    '# HELP feed_cache_errors_total Redis errors (the cache fails open).',
+    '# TYPE feed_cache_errors_total counter',
+    `feed_cache_errors_total ${feedCacheStats.errors}`,
+    '# HELP feed_cache_local_entries Pages held in the in-process LRU.',
+    '# TYPE feed_cache_local_entries gauge',
+    `feed_cache_local_entries ${local.size}`,
+    '# HELP feed_cache_generation Current cache generation seen by this instance.',
+    '# TYPE feed_cache_generation gauge',
+    `feed_cache_generation ${generation ?? 0}`,
+  ];
+  return lines.join('\n') + '\n';
+}
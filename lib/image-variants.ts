@@ -0,0 +1,17 @@
+import manifest from '@/public/images/variants.json';
+
+// Reads the manifest written by scripts/image-variants.ts: AVIF and WebP encodes
+// of static images under public/, keyed by the original's URL.
+
+interface Variant { src: string; type: string; width: number; height: number; bytes: number }
+
+const entries = manifest as Record<string, { variants: Variant[] } | undefined>;
+
+/** <source> attributes for a public image, AVIF first; empty until the script has encoded it. */
+export function imageSources(src: string): { type: string; srcSet: string }[] {
+  const byType = new Map<string, string[]>();
+  for (const v of entries[src]?.variants || []) {
+    byType.set(v.type, [...(byType.get(v.type) || []), `${v.src} ${v.width}w`]);
+  }
+  return Array.from(byType, ([type, candidates]) => ({ type, srcSet: candidates.join(', ') }));
+}
@@ -0,0 +1,67 @@
+"use client";
+
+import { useSyncExternalStore } from 'react';
+import Ably from 'ably';
+import { ably } from '@/lib/ably-client';
+import { COUNTS_MESSAGE, FEED_COUNTS_CHANNEL, SlideCountsMessage, slideCountsFilter } from '@/lib/count-channel';
+
+// Live like/comment counts for the slides around the viewer. FeedSwiper calls
+// watchSlides() as the active index moves; the client then holds a single
+// filtered attachment to FEED_COUNTS_CHANNEL carrying only those slides,
+// instead of one channel per rendered Sidebar.
+
+const counts = new Map<string, SlideCountsMessage>();
+const listeners = new Map<string, Set<() => void>>();
+
+let channel: Ably.RealtimeChannel | null = null;
+let watchedKey = '';
+
+function onCounts(message: Ably.Message) {
+  const update = message.data as SlideCountsMessage;
+  const previous = counts.get(update.slideId);
+  if (previous && previous.ts >= update.ts) return; // late delivery of an older batch
+  counts.set(update.slideId, update);
+  listeners.get(update.slideId)?.forEach(listener => listener());
+}
+
+/** Replaces the set of slides whose counts are streamed; an empty list detaches. */
+export function watchSlides(slideIds: string[]) {
+  const ids = Array.from(new Set(slideIds)).sort();
+  const key = ids.join(',');
+  if (key === watchedKey) return;
+  watchedKey = key;
+
+  if (channel) {
+    const previous = channel;
+    previous.unsubscribe(COUNTS_MESSAGE, onCounts);
+    previous.detach()
+      .then(() => ably.channels.release(previous.name))
+      .catch(() => {});
+    channel = null;
+  }
+  if (ids.length === 0) return;
+
+  channel = ably.channels.getDerived(FEED_COUNTS_CHANNEL, { filter: slideCountsFilter(ids) });
+  channel.subscribe(COUNTS_MESSAGE, onCounts).catch((error) => {
+    console.error('Failed to subscribe to live counts:', error);
+  });
+}
+
+function subscribe(slideId: string, listener: () => void) {
+  let set = listeners.get(slideId);
+  if (!set) listeners.set(slideId, (set = new Set()));
+  set.add(listener);
+  return () => {
+    set!.delete(listener);
+    if (set!.size === 0) listeners.delete(slideId);
+  };
+}
+
+/** Latest broadcast counts for a slide, or undefined until one arrives. */
+export function useLiveCounts(slideId: string | null | undefined): SlideCountsMessage | undefined {
+  return useSyncExternalStore(
+    (listener) => (slideId ? subscribe(slideId, listener) : () => {}),
+    () => (slideId ? counts.get(slideId) : undefined),
+    () => undefined
+  );
+}
@@ -0,0 +1,89 @@
+import { v4 as uuidv4 } from 'uuid';
+import { redis } from './kv';
+
+// Redis-backed queue for post-upload media work (poster frame + HLS ladder),
+// drained by scripts/media-worker.ts. A taken job moves to a processing list
+// until it finishes, so a crashed worker's jobs are requeued on the next start.
+
+export type MediaJobStatus = 'queued' | 'processing' | 'done' | 'failed';
+
+export interface MediaJob {
+  id: string;
+  source: string;      // absolute path of the uploaded file
+  mp4Url: string;      // public URL of the upload, as stored in slide data
+  userId: string;      // uploader; only they and admins can read the job
+  status: MediaJobStatus;
+  attempts: number;
+  createdAt: number;
+  updatedAt: number;
+  hlsUrl?: string;
+  poster?: string;
+  error?: string;
+}
+
+const QUEUE_KEY = 'media:jobs';
+const PROCESSING_KEY = 'media:jobs:processing';
+const JOB_TTL_SECONDS = 7 * 24 * 60 * 60;
+
+const jobKey = (id: string) => `media:job:${id}`;
+// Lets a slide created after its upload's job finished pick up the renditions
+const urlKey = (mp4Url: string) => `media:job:url:${mp4Url}`;
+
+async function saveJob(job: MediaJob): Promise<MediaJob> {
+  job.updatedAt = Date.now();
+  await redis.set(jobKey(job.id), job, { ex: JOB_TTL_SECONDS });
+  return job;
+}
+
+export async function enqueueMediaJob(source: string, mp4Url: string, userId: string): Promise<MediaJob> {
+  const now = Date.now();
+  const job = await saveJob({ id: uuidv4(), source, mp4Url, userId, status: 'queued', attempts: 0, createdAt: now, updatedAt: now });
+  await redis.set(urlKey(mp4Url), job.id, { ex: JOB_TTL_SECONDS });
+  await redis.lpush(QUEUE_KEY, job.id);
+  return job;
+}
+
+export async function getMediaJob(id: string): Promise<MediaJob | null> {
+  return redis.get<MediaJob>(jobKey(id));
+}
+
+/** The finished job for an uploaded video, or null while it is still queued, failed or unknown. */
+export async function getFinishedMediaJob(mp4Url: string): Promise<MediaJob | null> {
+  const id = await redis.get<string>(urlKey(mp4Url));
+  const job = id ? await getMediaJob(id) : null;
+  return job?.status === 'done' && job.hlsUrl && job.poster ? job : null;
+}
+
+/** Oldest queued job, moved to the processing list; null when the queue is empty. */
+export async function takeMediaJob(): Promise<MediaJob | null> {
+  const id = await redis.lmove<string>(QUEUE_KEY, PROCESSING_KEY, 'right', 'left');
+  if (!id) return null;
+  const job = await getMediaJob(id);
+  if (!job) {
+    await redis.lrem(PROCESSING_KEY, 1, id);
+    return null;
+  }
+  job.status = 'processing';
+  job.attempts += 1;
+  return saveJob(job);
+}
+
+export async function finishMediaJob(job: MediaJob, result: { hlsUrl: string; poster: string }): Promise<void> {
+  await saveJob({ ...job, ...result, status: 'done', error: undefined });
+  await redis.lrem(PROCESSING_KEY, 1, job.id);
+}
+
+/** Records the failure and requeues the job until it has used `maxAttempts`. */
+export async function failMediaJob(job: MediaJob, error: string, maxAttempts: number): Promise<void> {
+  const retry = job.attempts < maxAttempts;
+  await saveJob({ ...job, status: retry ? 'queued' : 'failed', error });
+  await redis.lrem(PROCESSING_KEY, 1, job.id);
+  if (retry) await redis.lpush(QUEUE_KEY, job.id);
+}
+
+/** Puts jobs a previous worker left in the processing list back on the queue. */
+export async function requeueStaleMediaJobs(): Promise<number> {
+  let moved = 0;
+  while (await redis.lmove(PROCESSING_KEY, QUEUE_KEY, 'right', 'right')) moved++;
+  return moved;
+}
@@ -0,0 +1,44 @@
+import { NextRequest } from 'next/server';
+import { feedCacheMetrics } from './feed-cache';
+import { queryMetrics, queryMetricsSnapshot } from './query-metrics';
+import { rateLimitStats } from './rate-limiter';
+import { countBroadcastStats } from './count-broadcaster';
+import { authorCacheStats } from './author-cache';
+
+/**
+ * Metrics routes need "Authorization: Bearer <METRICS_TOKEN>"; without a
+ * token configured they are only served outside production.
+ */
+export function metricsAuthorized(request: NextRequest): boolean {
+  const token = process.env.METRICS_TOKEN;
+  if (!token) return process.env.NODE_ENV !== 'production';
+  return request.headers.get('authorization') === `Bearer ${token}`;
+}
+
+function counters(prefix: string, help: string, values: Record<string, number>): string[] {
+  return [
+    `# HELP ${prefix}_total ${help}`,
+    `# TYPE ${prefix}_total counter`,
+    ...Object.entries(values).map(([event, n]) => `${prefix}_total{event="${event}"} ${n}`),
+  ];
+}
+
+/** Everything this instance exposes, in Prometheus text format. */
+export function allMetrics(): string {
+  const lines = [
+    ...counters('rate_limit_events', 'Rate limiter decisions and failures.', rateLimitStats),
+    ...counters('count_broadcast_events', 'Live count broadcaster activity.', countBroadcastStats),
+    ...counters('author_cache_events', 'Author profile cache lookups and invalidations.', authorCacheStats),
+  ];
+  return feedCacheMetrics() + queryMetrics() + lines.join('\n') + '\n';
+}
+
+/** JSON view: query summaries and slow-query log plus the other counters. */
+export function metricsSnapshot() {
+  return {
+    db: queryMetricsSnapshot(),
+    rateLimit: { ...rateLimitStats },
+    countBroadcast: { ...countBroadcastStats },
+    authorCache: { ...authorCacheStats },
+  };
+}
@@ -0,0 +1,66 @@
+import { redis } from './kv';
+import { ably } from './ably-server';
+import { db } from './db';
+
+// Per-user unread notification counter kept in Redis, so the TopBar badge never
+// has to COUNT(*) the notifications table. The counter is seeded from the database
+// on first read and adjusted by NotificationService.send, mark-as-read and delete;
+// every change is pushed to the owner over Ably instead of being polled for.
+// Keys expire after COUNTER_TTL_SECONDS, which bounds any drift from racing writers.
+
+const COUNTER_TTL_SECONDS = 60 * 60;
+
+const counterKey = (userId: string) => `notifications:unread:${userId}`;
+
+/** Ably channel carrying `unread` messages ({ unreadCount }) for one user. */
+export const notificationChannel = (userId: string) => `notifications:${userId}`;
+
+async function seedUnreadCount(userId: string, overwrite: boolean): Promise<number> {
+  const count = await db.getUnreadNotificationCount(userId);
+  try {
+    await redis.set(counterKey(userId), count, overwrite ? { ex: COUNTER_TTL_SECONDS } : { ex: COUNTER_TTL_SECONDS, nx: true });
+  } catch (error) {
+    console.error('Notification counter: redis write failed', error);
+  }
+  return count;
+}
+
+/** Current unread count; touches the database only when the counter is cold. */
+export async function getUnreadCount(userId: string): Promise<number> {
+  try {
+    const stored = await redis.get<number>(counterKey(userId));
+    if (stored !== null && stored !== undefined) {
+      return Math.max(0, Number(stored) || 0);
+    }
+  } catch (error) {
+    console.error('Notification counter: redis read failed', error);
+  }
+  return seedUnreadCount(userId, false);
+}
+
+/**
+ * Applies `delta` after the database write has committed and publishes the new value.
+ * A cold (or corrupted) counter is reseeded from the database, which already reflects the write.
+ */
+export async function adjustUnreadCount(userId: string, delta: number): Promise<number> {
+  const key = counterKey(userId);
+  let count: number;
+  try {
+    const [existed, value] = await redis.multi()
+      .exists(key)
+      .incrby(key, delta)
+      .expire(key, COUNTER_TTL_SECONDS)
+      .exec<[number, number, number]>();
+    count = !existed || value < 0 ? await seedUnreadCount(userId, true) : value;
+  } catch (error) {
+    console.error('Notification counter: redis update failed', error);
+    count = await db.getUnreadNotificationCount(userId);
+  }
+
+  try {
+    await ably.channels.get(notificationChannel(userId)).publish('unread', { unreadCount: count });
+  } catch (error) {
+    console.error(`Notification counter: failed to publish to ${userId}`, error);
+  }
+  return count;
+}
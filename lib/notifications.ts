@@ -1,4 +1,5 @@
 import { db } from '@/lib/db';
+import { adjustUnreadCount } from '@/lib/notification-counter';
 
 export type NotificationType = 'system' | 'comment' | 'like' | 'welcome' | 'profile_update';
 
@@ -56,6 +57,7 @@ export class NotificationService {
                 link: link || null,
                 fromUser: fromUserId ? { id: fromUserId } as any : null,
             });
+            await adjustUnreadCount(toUserId, 1);
         } catch (error) {
             console.error(`Failed to send ${type} notification to ${toUserId}:`, error);
             // We usually don't want to throw here to prevent blocking the main action (like commenting)
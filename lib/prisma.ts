@@ -1,7 +1,15 @@
 import { PrismaClient } from '@prisma/client';
+import { instrumentQuery } from './query-metrics';
 
+// Every Prisma operation is timed under "Model.operation" (lib/query-metrics.ts)
 const prismaClientSingleton = () => {
-  return new PrismaClient();
+  return new PrismaClient().$extends({
+    query: {
+      $allOperations({ model, operation, args, query }) {
+        return instrumentQuery(model ? `${model}.${operation}` : operation, 'prisma', () => query(args));
+      },
+    },
+  });
 };
 
 declare global {
@@ -0,0 +1,153 @@
+import https from 'https';
+import webpush, { WebPushError } from 'web-push';
+import { db } from '@/lib/db';
+
+export interface PushTarget {
+  userId?: string;
+  role?: string;
+  isPwaInstalled?: boolean;
+}
+
+export interface FanOutOptions {
+  pageSize?: number;     // subscriptions read from the DB per batch
+  concurrency?: number;  // sends in flight at once
+  maxRetries?: number;   // retries for 429/5xx/network errors
+  baseDelayMs?: number;  // first backoff step, doubled per retry
+  timeoutMs?: number;    // per-request socket timeout
+  ttl?: number;          // seconds the push service keeps an undelivered message
+}
+
+export interface BatchStats {
+  batch: number;
+  size: number;
+  sent: number;
+  failed: number;
+  expired: number;
+  retries: number;
+  ms: number;
+}
+
+export interface FanOutStats {
+  total: number;
+  sent: number;
+  failed: number;
+  expired: number;
+  pruned: number;
+  retries: number;
+  ms: number;
+  batches: BatchStats[];
+}
+
+type Outcome = 'sent' | 'expired' | 'failed';
+
+const DEFAULTS: Required<FanOutOptions> = {
+  pageSize: parseInt(process.env.PUSH_FANOUT_PAGE_SIZE || '500', 10),
+  concurrency: parseInt(process.env.PUSH_FANOUT_CONCURRENCY || '50', 10),
+  maxRetries: 3,
+  baseDelayMs: 250,
+  timeoutMs: 10000,
+  ttl: 24 * 60 * 60,
+};
+
+// Most subscriptions share a handful of push-service hosts (FCM, Mozilla, Apple),
+// so keep connections open between sends instead of a TLS handshake per message.
+const agent = new https.Agent({ keepAlive: true, maxSockets: DEFAULTS.concurrency });
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+const isValidSubscription = (subscription: any) =>
+  !!subscription?.endpoint && !!subscription?.keys?.p256dh && !!subscription?.keys?.auth;
+
+// 404/410: the subscription is gone for good. 429/5xx and network errors are worth retrying.
+const isExpired = (error: unknown) =>
+  error instanceof WebPushError && (error.statusCode === 404 || error.statusCode === 410);
+
+const isTransient = (error: unknown) =>
+  !(error instanceof WebPushError) || error.statusCode === 429 || error.statusCode >= 500;
+
+function backoffMs(error: unknown, attempt: number, baseDelayMs: number): number {
+  const retryAfter = error instanceof WebPushError ? Number(error.headers?.['retry-after']) : NaN;
+  if (retryAfter > 0) return retryAfter * 1000;
+  return baseDelayMs * 2 ** attempt * (0.5 + Math.random());
+}
+
+async function sendOne(subscription: any, payload: string, opts: Required<FanOutOptions>): Promise<{ outcome: Outcome, retries: number }> {
+  if (!isValidSubscription(subscription)) {
+    return { outcome: 'failed', retries: 0 };
+  }
+
+  for (let attempt = 0; ; attempt++) {
+    try {
+      await webpush.sendNotification(subscription, payload, { TTL: opts.ttl, timeout: opts.timeoutMs, agent });
+      return { outcome: 'sent', retries: attempt };
+    } catch (error) {
+      if (isExpired(error)) return { outcome: 'expired', retries: attempt };
+      if (!isTransient(error) || attempt >= opts.maxRetries) return { outcome: 'failed', retries: attempt };
+      await sleep(backoffMs(error, attempt, opts.baseDelayMs));
+    }
+  }
+}
+
+async function mapWithConcurrency<T, R>(items: T[], limit: number, fn: (item: T) => Promise<R>): Promise<R[]> {
+  const results = new Array<R>(items.length);
+  let next = 0;
+  const workers = Array.from({ length: Math.min(limit, items.length) }, async () => {
+    while (next < items.length) {
+      const index = next++;
+      results[index] = await fn(items[index]);
+    }
+  });
+  await Promise.all(workers);
+  return results;
+}
+
+/**
+ * Sends `payload` to every subscription matching `target`.
+ * Subscriptions are read page by page (the next page loads while the current one is sending).
+ * Individual failures never abort the run, and 404/410 endpoints are deleted after each batch.
+ */
+export async function fanOutPush(target: PushTarget, payload: string, options: FanOutOptions = {}): Promise<FanOutStats> {
+  const opts = { ...DEFAULTS, ...options };
+  const started = Date.now();
+  const stats: FanOutStats = { total: 0, sent: 0, failed: 0, expired: 0, pruned: 0, retries: 0, ms: 0, batches: [] };
+
+  let page = await db.getPushSubscriptionPage(target, { limit: opts.pageSize });
+  while (page.length > 0) {
+    const batchStarted = Date.now();
+    const nextPage = page.length === opts.pageSize
+      ? db.getPushSubscriptionPage(target, { afterId: page[page.length - 1].id, limit: opts.pageSize })
+      : Promise.resolve([]);
+    nextPage.catch(() => {}); // awaited below; avoids an unhandled rejection while this batch sends
+
+    const results = await mapWithConcurrency(page, opts.concurrency, row => sendOne(row.subscription, payload, opts));
+
+    const batch: BatchStats = { batch: stats.batches.length, size: page.length, sent: 0, failed: 0, expired: 0, retries: 0, ms: 0 };
+    const expiredIds: string[] = [];
+    results.forEach((result, i) => {
+      batch[result.outcome]++;
+      batch.retries += result.retries;
+      if (result.outcome === 'expired') expiredIds.push(page[i].id);
+    });
+
+    if (expiredIds.length > 0) {
+      try {
+        stats.pruned += await db.deletePushSubscriptions(expiredIds);
+      } catch (error) {
+        console.error('Failed to prune expired push subscriptions:', error);
+      }
+    }
+
+    batch.ms = Date.now() - batchStarted;
+    stats.batches.push(batch);
+    stats.total += batch.size;
+    stats.sent += batch.sent;
+    stats.failed += batch.failed;
+    stats.expired += batch.expired;
+    stats.retries += batch.retries;
+
+    page = await nextPage;
+  }
+
+  stats.ms = Date.now() - started;
+  return stats;
+}
@@ -21,10 +21,58 @@ export const fetchComments = async ({ pageParam = '', slideId, sortBy = 'newest'
   throw new Error(data.message || 'Failed to fetch comments');
 };
 
-export const fetchAuthorProfile = async (authorId: string): Promise<AuthorProfile> => {
-    const res = await fetch(`/api/author/${authorId}`);
+export const AUTHOR_PROFILE_STALE_MS = 1000 * 60 * 5;
+
+// Profile lookups made within this window go out as one /api/authors request
+const AUTHOR_BATCH_WINDOW_MS = 10;
+const AUTHOR_BATCH_MAX = 50;
+
+type AuthorWaiter = { resolve: (profile: AuthorProfile) => void; reject: (error: Error) => void };
+let pendingAuthors = new Map<string, AuthorWaiter[]>();
+let authorBatchTimer: ReturnType<typeof setTimeout> | null = null;
+
+export const fetchAuthorProfiles = async (authorIds: string[]): Promise<{ profiles: AuthorProfile[]; missing: string[] }> => {
+    // Sorted like the server does, so a set of authors always hits the same cacheable URL
+    const ids = Array.from(new Set(authorIds)).sort();
+    const res = await fetch(`/api/authors?ids=${ids.map(encodeURIComponent).join(',')}`);
     if (!res.ok) {
-        throw new Error('Failed to fetch author profile');
+        throw new Error('Failed to fetch author profiles');
     }
     return res.json();
 };
+
+const flushAuthorBatch = () => {
+    const batch = pendingAuthors;
+    pendingAuthors = new Map();
+    authorBatchTimer = null;
+
+    const ids = Array.from(batch.keys());
+    for (let i = 0; i < ids.length; i += AUTHOR_BATCH_MAX) {
+        const chunk = ids.slice(i, i + AUTHOR_BATCH_MAX);
+        fetchAuthorProfiles(chunk)
+            .then(({ profiles }) => {
+                const byId = new Map(profiles.map(profile => [profile.id, profile]));
+                chunk.forEach(id => {
+                    const profile = byId.get(id);
+                    batch.get(id)!.forEach(waiter =>
+                        profile ? waiter.resolve(profile) : waiter.reject(new Error('Failed to fetch author profile'))
+                    );
+                });
+            })
+            .catch((error: Error) => chunk.forEach(id => batch.get(id)!.forEach(waiter => waiter.reject(error))));
+    }
+};
+
+export const fetchAuthorProfile = (authorId: string): Promise<AuthorProfile> => {
+    return new Promise((resolve, reject) => {
+        const waiters = pendingAuthors.get(authorId) || [];
+        waiters.push({ resolve, reject });
+        pendingAuthors.set(authorId, waiters);
+        if (pendingAuthors.size >= AUTHOR_BATCH_MAX) {
+            if (authorBatchTimer) clearTimeout(authorBatchTimer);
+            flushAuthorBatch();
+        } else if (!authorBatchTimer) {
+            authorBatchTimer = setTimeout(flushAuthorBatch, AUTHOR_BATCH_WINDOW_MS);
+        }
+    });
+};
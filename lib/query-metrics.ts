@@ -0,0 +1,189 @@
+// Per-query instrumentation for both database paths: the neon `sql` wrapper in
+// lib/db-postgres.ts (named after the db function that issued the query) and
+// Prisma (named model.operation, via the client extension in lib/prisma.ts).
+// Each name gets a latency histogram, row and retry counters and outcome
+// counts; anything slower than SLOW_QUERY_MS is logged and kept in a short
+// ring buffer. Counters are per instance and reset on restart.
+
+export type QuerySource = 'sql' | 'prisma';
+export type QueryOutcome = 'ok' | 'error' | 'timeout';
+
+export const SLOW_QUERY_MS = parseInt(process.env.SLOW_QUERY_MS || '500', 10);
+
+// Upper bounds (ms) of the latency histogram buckets
+const BUCKETS_MS = [1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000];
+const SLOW_LOG_SIZE = 50;
+
+interface QueryStats {
+  name: string;
+  source: QuerySource;
+  count: number;
+  outcomes: Record<QueryOutcome, number>;
+  sumMs: number;
+  maxMs: number;
+  rows: number;
+  retries: number;
+  // Cumulative counts per bucket, Prometheus style; the last entry is +Inf
+  buckets: number[];
+}
+
+export interface SlowQuery {
+  name: string;
+  source: QuerySource;
+  ms: number;
+  rows: number;
+  retries: number;
+  outcome: QueryOutcome;
+  at: string;
+}
+
+const stats = new Map<string, QueryStats>();
+const slowQueries: SlowQuery[] = [];
+let timeouts = 0;
+
+function statsFor(name: string, source: QuerySource): QueryStats {
+  const key = `${source}:${name}`;
+  let entry = stats.get(key);
+  if (!entry) {
+    entry = {
+      name, source, count: 0, outcomes: { ok: 0, error: 0, timeout: 0 },
+      sumMs: 0, maxMs: 0, rows: 0, retries: 0, buckets: new Array(BUCKETS_MS.length + 1).fill(0),
+    };
+    stats.set(key, entry);
+  }
+  return entry;
+}
+
+/** Row count of a query result: rows returned, or rows affected for Prisma's *Many writes. */
+export function resultRows(result: unknown): number {
+  if (Array.isArray(result)) return result.length;
+  if (result && typeof result === 'object' && typeof (result as { count?: unknown }).count === 'number') {
+    return (result as { count: number }).count;
+  }
+  return result == null ? 0 : 1;
+}
+
+/** Counts a single attempt that hit the query timeout (retried or not). */
+export function recordQueryTimeout() {
+  timeouts++;
+}
+
+export function recordQuery(sample: {
+  name: string;
+  source: QuerySource;
+  ms: number;
+  rows?: number;
+  retries?: number;
+  outcome: QueryOutcome;
+}) {
+  const entry = statsFor(sample.name, sample.source);
+  entry.count++;
+  entry.outcomes[sample.outcome]++;
+  entry.sumMs += sample.ms;
+  entry.maxMs = Math.max(entry.maxMs, sample.ms);
+  entry.rows += sample.rows || 0;
+  entry.retries += sample.retries || 0;
+  for (let i = 0; i <= BUCKETS_MS.length; i++) {
+    if (i === BUCKETS_MS.length || sample.ms <= BUCKETS_MS[i]) entry.buckets[i]++;
+  }
+
+  if (sample.ms >= SLOW_QUERY_MS) {
+    const slow: SlowQuery = {
+      name: sample.name, source: sample.source, ms: Math.round(sample.ms), rows: sample.rows || 0,
+      retries: sample.retries || 0, outcome: sample.outcome, at: new Date().toISOString(),
+    };
+    slowQueries.push(slow);
+    if (slowQueries.length > SLOW_LOG_SIZE) slowQueries.shift();
+    console.warn(`Slow query: ${JSON.stringify(slow)}`);
+  }
+}
+
+/** Times `run` and records it under `name`; errors are recorded and rethrown. */
+export async function instrumentQuery<T>(name: string, source: QuerySource, run: () => Promise<T>): Promise<T> {
+  const started = performance.now();
+  try {
+    const result = await run();
+    recordQuery({ name, source, ms: performance.now() - started, rows: resultRows(result), outcome: 'ok' });
+    return result;
+  } catch (error) {
+    recordQuery({ name, source, ms: performance.now() - started, outcome: isTimeout(error) ? 'timeout' : 'error' });
+    throw error;
+  }
+}
+
+function isTimeout(error: unknown): boolean {
+  const e = error as { code?: string; message?: string } | null;
+  // P2024: timed out fetching a connection from the pool
+  return e?.code === 'P2024' || /timed out/i.test(e?.message || '');
+}
+
+/** JSON view for the metrics route: per-query summaries plus the slow-query log. */
+export function queryMetricsSnapshot() {
+  return {
+    slowQueryMs: SLOW_QUERY_MS,
+    timeouts,
+    queries: Array.from(stats.values())
+      .map(entry => ({
+        name: entry.name,
+        source: entry.source,
+        count: entry.count,
+        ...entry.outcomes,
+        meanMs: entry.count ? entry.sumMs / entry.count : 0,
+        maxMs: entry.maxMs,
+        rows: entry.rows,
+        retries: entry.retries,
+        buckets: Object.fromEntries(
+          entry.buckets.map((n, i) => [i < BUCKETS_MS.length ? String(BUCKETS_MS[i]) : '+Inf', n])
+        ),
+      }))
+      .sort((a, b) => b.count * b.meanMs - a.count * a.meanMs),
+    slow: [...slowQueries].reverse(),
+  };
+}
+
+const label = (value: string) => value.replace(/\\/g, '\\\\').replace(/"/g, '\\"');
+
+/** Prometheus exposition of the query counters. */
+export function queryMetrics(): string {
+  const lines = [
+    '# HELP db_query_duration_ms Query latency by query name, including retries.',
+    '# TYPE db_query_duration_ms histogram',
+  ];
+  const entries = Array.from(stats.values());
+  entries.forEach(entry => {
+    const labels = `name="${label(entry.name)}",source="${entry.source}"`;
+    entry.buckets.forEach((n, i) => {
+      const le = i < BUCKETS_MS.length ? String(BUCKETS_MS[i]) : '+Inf';
+      lines.push(`db_query_duration_ms_bucket{${labels},le="${le}"} ${n}`);
+    });
+    lines.push(`db_query_duration_ms_sum{${labels}} ${entry.sumMs.toFixed(3)}`);
+    lines.push(`db_query_duration_ms_count{${labels}} ${entry.count}`);
+  });
+
+  lines.push('# HELP db_queries_total Queries by name and outcome.', '# TYPE db_queries_total counter');
+  entries.forEach(entry => {
+    (Object.keys(entry.outcomes) as QueryOutcome[]).forEach(outcome => {
+      lines.push(`db_queries_total{name="${label(entry.name)}",source="${entry.source}",outcome="${outcome}"} ${entry.outcomes[outcome]}`);
+    });
+  });
+
+  lines.push('# HELP db_query_rows_total Rows returned or affected.', '# TYPE db_query_rows_total counter');
+  entries.forEach(entry => {
+    lines.push(`db_query_rows_total{name="${label(entry.name)}",source="${entry.source}"} ${entry.rows}`);
+  });
+
+  lines.push('# HELP db_query_retries_total Retried attempts.', '# TYPE db_query_retries_total counter');
+  entries.forEach(entry => {
+    lines.push(`db_query_retries_total{name="${label(entry.name)}",source="${entry.source}"} ${entry.retries}`);
+  });
+
+  lines.push(
+    '# HELP db_query_timeouts_total Attempts that hit the query timeout.',
+    '# TYPE db_query_timeouts_total counter',
+    `db_query_timeouts_total ${timeouts}`,
+    '# HELP db_slow_query_threshold_ms Queries at or above this are logged.',
+    '# TYPE db_slow_query_threshold_ms gauge',
+    `db_slow_query_threshold_ms ${SLOW_QUERY_MS}`,
+  );
+  return lines.join('\n') + '\n';
+}
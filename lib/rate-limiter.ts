@@ -1,26 +1,198 @@
 import { redis } from './kv';
 
-interface RateLimitResult {
+// Sliding-window rate limiting with named policies.
+//
+// Each policy allows `limit` requests in any `windowMs` span. The window is a
+// Redis sorted set of accepted request times per policy and subject, trimmed
+// and checked by one Lua script, so a request is counted against every policy
+// of a route in a single round-trip and only when all of them allow it.
+// Rejected requests are not recorded and never extend the window.
+//
+// Before going to Redis each instance checks what it already knows: a subject
+// Redis recently rejected stays rejected locally until its retry time, and a
+// subject this instance alone has already let through `limit` times within the
+// window is over the limit everywhere. Neither check can reject a request the
+// shared window would allow, so the local path only saves round-trips.
+
+export interface RateLimitPolicy {
+  limit: number;
+  windowMs: number;
+}
+
+export const RATE_LIMIT_POLICIES = {
+  'comment-burst': { limit: 3, windowMs: 30_000 },
+  'comment-hourly': { limit: 30, windowMs: 3_600_000 },
+  'like-burst': { limit: 30, windowMs: 10_000 },
+  'upload-hourly': { limit: 30, windowMs: 3_600_000 },
+};
+
+export type RateLimitPolicyName = keyof typeof RATE_LIMIT_POLICIES;
+
+export type RateLimitSource = 'local' | 'redis' | 'fallback';
+
+export interface RateLimitResult {
   success: boolean;
   limit: number;
   remaining: number;
+  retryAfterMs: number;
+  // The policy that rejected the request
+  policy?: string;
+  source: RateLimitSource;
 }
 
-export async function rateLimit(key: string, limit: number, duration: number): Promise<RateLimitResult> {
-  const requestKey = `${key}:requests`;
+const KEY_PREFIX = 'ratelimit:';
+const LOCAL_MAX_KEYS = 10_000;
+
+const SLIDING_WINDOW_SCRIPT = `-- rate-limit/sliding-window
+-- KEYS: one sorted set per policy; ARGV: member, then limit and window (ms) per key
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local member = ARGV[1]
+local remaining = -1
+local retry = 0
+local blocked = 0
+for i, key in ipairs(KEYS) do
+  local limit = tonumber(ARGV[i * 2])
+  local window = tonumber(ARGV[i * 2 + 1])
+  redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+  local count = redis.call('ZCARD', key)
+  if count >= limit then
+    -- Free once enough of the oldest entries have left the window
+    local oldest = redis.call('ZRANGE', key, count - limit, count - limit, 'WITHSCORES')
+    local wait = tonumber(oldest[2]) + window - now
+    if blocked == 0 or wait > retry then
+      blocked = i
+      retry = wait
+    end
+  elseif remaining < 0 or limit - count - 1 < remaining then
+    remaining = limit - count - 1
+  end
+end
+if blocked > 0 then
+  return {0, 0, retry, blocked}
+end
+for i, key in ipairs(KEYS) do
+  redis.call('ZADD', key, now, member)
+  redis.call('PEXPIRE', key, tonumber(ARGV[i * 2 + 1]))
+end
+return {1, remaining, 0, 0}
+`;
+
+const slidingWindow = redis.createScript<[number, number, number, number]>(SLIDING_WINDOW_SCRIPT);
+
+// What this instance knows per policy key: when a Redis rejection lifts, and
+// the times of the requests it let through
+const localBlocks = new Map<string, number>();
+const localLogs = new Map<string, number[]>();
 
-  const pipeline = redis.pipeline();
-  pipeline.incr(requestKey);
-  pipeline.expire(requestKey, duration);
+export const rateLimitStats = {
+  localRejects: 0,
+  redisChecks: 0,
+  redisRejects: 0,
+  errors: 0,
+};
 
-  const result = await pipeline.exec<[number, number]>();
-  const count = result[0] as number; // The result of incr
+function bounded<V>(map: Map<string, V>, key: string, value: V) {
+  map.delete(key);
+  map.set(key, value);
+  if (map.size > LOCAL_MAX_KEYS) {
+    map.delete(map.keys().next().value as string);
+  }
+}
+
+function recentLocal(key: string, windowMs: number, now: number): number[] {
+  const log = localLogs.get(key);
+  if (!log) return [];
+  const start = log.findIndex(t => t > now - windowMs);
+  if (start < 0) {
+    localLogs.delete(key);
+    return [];
+  }
+  if (start > 0) log.splice(0, start);
+  return log;
+}
 
-  const remaining = Math.max(0, limit - count);
+function checkLocal(keys: string[], policies: [string, RateLimitPolicy][], now: number): RateLimitResult | null {
+  for (let i = 0; i < keys.length; i++) {
+    const [name, policy] = policies[i];
+    const blockedUntil = localBlocks.get(keys[i]);
+    if (blockedUntil !== undefined) {
+      if (blockedUntil > now) {
+        return { success: false, limit: policy.limit, remaining: 0, retryAfterMs: blockedUntil - now, policy: name, source: 'local' };
+      }
+      localBlocks.delete(keys[i]);
+    }
+    const log = recentLocal(keys[i], policy.windowMs, now);
+    if (log.length >= policy.limit) {
+      const retryAfterMs = log[log.length - policy.limit] + policy.windowMs - now;
+      return { success: false, limit: policy.limit, remaining: 0, retryAfterMs, policy: name, source: 'local' };
+    }
+  }
+  return null;
+}
+
+function recordLocal(keys: string[], now: number) {
+  keys.forEach(key => {
+    const log = localLogs.get(key) || [];
+    log.push(now);
+    bounded(localLogs, key, log);
+  });
+}
+
+/**
+ * Counts one request by `subject` (usually a user id) against every named
+ * policy; it is allowed only if all of them have room.
+ */
+export async function limitRequest(policyNames: RateLimitPolicyName[], subject: string): Promise<RateLimitResult> {
+  const policies = policyNames.map(name => [name, RATE_LIMIT_POLICIES[name]] as [string, RateLimitPolicy]);
+  return checkPolicies(policies, subject);
+}
+
+async function checkPolicies(policies: [string, RateLimitPolicy][], subject: string): Promise<RateLimitResult> {
+  const keys = policies.map(([name]) => `${KEY_PREFIX}${name}:${subject}`);
+  const tightest = policies.reduce((a, b) => (b[1].limit < a[1].limit ? b : a))[1];
+  const now = Date.now();
+
+  const local = checkLocal(keys, policies, now);
+  if (local) {
+    rateLimitStats.localRejects++;
+    return local;
+  }
+
+  const args: (string | number)[] = [`${now}-${Math.random().toString(36).slice(2)}`];
+  policies.forEach(([, policy]) => args.push(policy.limit, policy.windowMs));
+
+  try {
+    rateLimitStats.redisChecks++;
+    const [allowed, remaining, retryAfterMs, blocked] = await slidingWindow.exec(keys, args.map(String));
+    if (allowed === 1) {
+      recordLocal(keys, now);
+      return { success: true, limit: tightest.limit, remaining, retryAfterMs: 0, source: 'redis' };
+    }
+    rateLimitStats.redisRejects++;
+    const [name, policy] = policies[blocked - 1];
+    // `now` predates Redis's clock reading, so the local block never outlasts the real one
+    bounded(localBlocks, keys[blocked - 1], now + retryAfterMs);
+    return { success: false, limit: policy.limit, remaining: 0, retryAfterMs, policy: name, source: 'redis' };
+  } catch (error) {
+    // Fail open, but this instance's own window still applies
+    rateLimitStats.errors++;
+    console.error('Rate limiter: redis check failed', error);
+    recordLocal(keys, now);
+    return { success: true, limit: tightest.limit, remaining: 0, retryAfterMs: 0, source: 'fallback' };
+  }
+}
+
+/** Single ad-hoc window of `limit` requests per `duration` seconds under `key`. */
+export async function rateLimit(key: string, limit: number, duration: number): Promise<RateLimitResult> {
+  return checkPolicies([[key, { limit, windowMs: duration * 1000 }]], 'adhoc');
+}
 
+/** Standard headers for a rejected request. */
+export function rateLimitHeaders(result: RateLimitResult): Record<string, string> {
   return {
-    success: count <= limit,
-    limit: limit,
-    remaining: remaining,
+    'Retry-After': String(Math.max(1, Math.ceil(result.retryAfterMs / 1000))),
+    'X-RateLimit-Limit': String(result.limit),
+    'X-RateLimit-Remaining': String(result.remaining),
   };
 }
@@ -5,6 +5,7 @@ import { prisma } from '@/lib/prisma';
 import * as bcrypt from 'bcryptjs';
 import { z } from 'zod';
 import { revalidatePath } from 'next/cache';
+import { invalidateAuthorProfiles } from '@/lib/author-cache';
 
 // Validation Schemas
 const PasswordSchema = z.string()
@@ -95,6 +96,7 @@ export async function completeFirstLoginSetup(data: z.infer<typeof FirstLoginSet
                 emailLanguage: emailLanguage ?? 'pl',
             }
         });
+        await invalidateAuthorProfiles([userId]);
 
         // Create Welcome Notification
         await prisma.notification.create({
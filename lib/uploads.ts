@@ -0,0 +1,192 @@
+import { createWriteStream } from 'fs';
+import { mkdir, rename, stat, truncate, unlink, writeFile } from 'fs/promises';
+import { join } from 'path';
+import { Readable, Transform } from 'stream';
+import { pipeline } from 'stream/promises';
+import { v4 as uuidv4 } from 'uuid';
+import { redis } from './kv';
+
+// Uploads are streamed straight to disk, never buffered: a single-shot POST for
+// small files and resumable sessions (create, then PATCH chunks at an offset,
+// HEAD to resume) for large ones. A session's offset is the size of its partial
+// file, so a dropped connection keeps every byte that reached the disk.
+
+export type UploadKind = 'image' | 'video';
+
+export const UPLOAD_DIR = join(process.cwd(), 'public', 'uploads');
+export const PARTIAL_DIR = process.env.UPLOAD_TMP_DIR || join(process.cwd(), '.uploads');
+
+export const MAX_BYTES: Record<UploadKind, number> = {
+  image: parseInt(process.env.UPLOAD_MAX_IMAGE_BYTES || String(10 * 1024 * 1024), 10),
+  video: parseInt(process.env.UPLOAD_MAX_VIDEO_BYTES || String(1024 * 1024 * 1024), 10),
+};
+export const CHUNK_BYTES = 8 * 1024 * 1024;      // advertised to clients
+export const MAX_CHUNK_BYTES = 64 * 1024 * 1024; // largest PATCH body accepted
+
+const SESSION_TTL_SECONDS = 24 * 60 * 60;
+
+// Same roles that may manage slides in /admin/slides
+export const VIDEO_UPLOAD_ROLES = ['admin', 'author'];
+
+// Extensions come from the declared type, never from the client's filename
+const EXTENSIONS: Record<string, { kind: UploadKind; ext: string }> = {
+  'image/jpeg': { kind: 'image', ext: 'jpg' },
+  'image/png': { kind: 'image', ext: 'png' },
+  'image/gif': { kind: 'image', ext: 'gif' },
+  'image/webp': { kind: 'image', ext: 'webp' },
+  'video/mp4': { kind: 'video', ext: 'mp4' },
+  'video/quicktime': { kind: 'video', ext: 'mov' },
+  'video/webm': { kind: 'video', ext: 'webm' },
+};
+
+export class UploadError extends Error {
+  constructor(public status: number, message: string) {
+    super(message);
+    this.name = 'UploadError';
+  }
+}
+
+export interface UploadSession {
+  id: string;
+  userId: string;
+  filename: string;
+  contentType: string;
+  kind: UploadKind;
+  ext: string;
+  size: number;
+  createdAt: number;
+}
+
+export function classifyUpload(contentType: string | null): { kind: UploadKind; ext: string } {
+  const type = (contentType || '').split(';')[0].trim().toLowerCase();
+  const match = EXTENSIONS[type];
+  if (!match) throw new UploadError(415, `Unsupported file type: ${type || 'unknown'}`);
+  return match;
+}
+
+export const uploadUrl = (filename: string) => `/uploads/${filename}`;
+
+const sessionKey = (id: string) => `upload:${id}`;
+const partialPath = (id: string) => join(PARTIAL_DIR, `${id}.part`);
+
+/**
+ * Pipes `body` into `path`, failing with 413 once more than `maxBytes` arrive.
+ * Backpressure comes from the file stream, so memory use stays at a few chunks.
+ */
+export async function streamToFile(
+  body: ReadableStream<Uint8Array>,
+  path: string,
+  maxBytes: number,
+  flags: 'w' | 'a' = 'w'
+): Promise<number> {
+  let written = 0;
+  const limiter = new Transform({
+    transform(chunk: Buffer, _encoding, callback) {
+      written += chunk.length;
+      if (written > maxBytes) {
+        callback(new UploadError(413, `Upload exceeds ${maxBytes} bytes`));
+        return;
+      }
+      callback(null, chunk);
+    },
+  });
+  await pipeline(Readable.fromWeb(body as any), limiter, createWriteStream(path, { flags }));
+  return written;
+}
+
+/** Single-shot upload of a whole file; returns the public file name. */
+export async function saveUpload(body: ReadableStream<Uint8Array>, ext: string, maxBytes: number): Promise<{ filename: string; size: number }> {
+  const id = uuidv4();
+  const filename = `${id}.${ext}`;
+  const partial = partialPath(id);
+  await Promise.all([mkdir(PARTIAL_DIR, { recursive: true }), mkdir(UPLOAD_DIR, { recursive: true })]);
+  try {
+    const size = await streamToFile(body, partial, maxBytes);
+    await rename(partial, join(UPLOAD_DIR, filename));
+    return { filename, size };
+  } catch (error) {
+    await unlink(partial).catch(() => {});
+    throw error;
+  }
+}
+
+export async function createUploadSession(
+  userId: string,
+  filename: string,
+  contentType: string,
+  size: number
+): Promise<UploadSession> {
+  const { kind, ext } = classifyUpload(contentType);
+  if (!Number.isInteger(size) || size <= 0) throw new UploadError(400, 'size must be a positive integer');
+  if (size > MAX_BYTES[kind]) throw new UploadError(413, `Upload exceeds ${MAX_BYTES[kind]} bytes`);
+
+  const session: UploadSession = {
+    id: uuidv4(), userId, filename: filename.slice(0, 255), contentType, kind, ext, size, createdAt: Date.now(),
+  };
+  await mkdir(PARTIAL_DIR, { recursive: true });
+  await writeFile(partialPath(session.id), '');
+  await redis.set(sessionKey(session.id), session, { ex: SESSION_TTL_SECONDS });
+  return session;
+}
+
+/** The caller's session, or a 404 for unknown, expired and foreign ids alike. */
+export async function getUploadSession(id: string, userId: string): Promise<UploadSession> {
+  const session = await redis.get<UploadSession>(sessionKey(id));
+  if (!session || session.userId !== userId) throw new UploadError(404, 'Upload not found');
+  return session;
+}
+
+export async function uploadOffset(session: UploadSession): Promise<number> {
+  try {
+    return (await stat(partialPath(session.id))).size;
+  } catch {
+    throw new UploadError(404, 'Upload not found');
+  }
+}
+
+// One writer per session on this instance; a second PATCH while one is running gets a 409
+const activeSessions = new Set<string>();
+
+/**
+ * Appends a chunk that must start at the current offset. Bytes that arrived
+ * before a dropped connection are kept, so the client resumes from HEAD's offset.
+ * Returns the public file name once the last byte is in.
+ */
+export async function appendChunk(
+  session: UploadSession,
+  offset: number,
+  body: ReadableStream<Uint8Array>
+): Promise<{ offset: number; filename: string | null }> {
+  if (activeSessions.has(session.id)) throw new UploadError(409, 'Another chunk is being written');
+  activeSessions.add(session.id);
+  try {
+    const current = await uploadOffset(session);
+    if (offset !== current) throw new UploadError(409, `Offset mismatch, expected ${current}`);
+
+    const partial = partialPath(session.id);
+    const maxBytes = Math.min(session.size - current, MAX_CHUNK_BYTES);
+    try {
+      await streamToFile(body, partial, maxBytes, 'a');
+    } catch (error) {
+      // Drop a rejected oversized chunk, keep a short one from a broken connection
+      if (error instanceof UploadError) await truncate(partial, current);
+      throw error;
+    }
+
+    const next = await uploadOffset(session);
+    if (next < session.size) return { offset: next, filename: null };
+
+    const filename = `${session.id}.${session.ext}`;
+    await mkdir(UPLOAD_DIR, { recursive: true });
+    await rename(partial, join(UPLOAD_DIR, filename));
+    await redis.del(sessionKey(session.id));
+    return { offset: next, filename };
+  } finally {
+    activeSessions.delete(session.id);
+  }
+}
+
+export async function abortUpload(session: UploadSession): Promise<void> {
+  await unlink(partialPath(session.id)).catch(() => {});
+  await redis.del(sessionKey(session.id));
+}
@@ -0,0 +1,323 @@
+"use client";
+
+import { RefObject, useEffect, useSyncExternalStore } from 'react';
+import Hls from 'hls.js';
+import { SlideDTO, VideoSlideDTO } from '@/lib/dto';
+
+// Predictive warm-up of the feed's videos. FeedSwiper publishes the active
+// slide and the ones after it through the store; the next video slide (the
+// next two while the viewer is swiping quickly) gets its HLS manifest and
+// first segments loaded within a byte budget, so a swipe lands on buffered
+// media instead of paying for the manifest, the first segment and decoder
+// start-up. <video> elements and their Hls instances come from a small pool
+// and move between slides instead of being created for every slide; slides
+// without one show their poster. Save-Data and slow connections shrink or
+// switch off the warm-up.
+
+const POOL_SIZE = 4; // the active slide, two ahead and the one just left
+const WARM_BYTES = 6 * 1024 * 1024; // across the warmed slides; the nearest gets two thirds
+const WARM_BUFFER_SECONDS = 8; // two segments of the media worker's ladder
+const FAST_SWIPE_MS = 1500; // mean gap between recent swipes at which a second slide is warmed
+const SWIPES_TRACKED = 4;
+// Set to 'off' in localStorage to measure the feed without warm-up (verify_video_prefetch.py)
+const PREFETCH_SWITCH = 'video_prefetch';
+
+interface Lease {
+  video: HTMLVideoElement;
+  hls: Hls | null;
+  slideId: string | null;
+  source: string | null;
+  // Fragment bytes this slide may load while warm; Infinity once it is active
+  budget: number;
+  bytes: number;
+  loading: boolean;
+  lastUsed: number;
+}
+
+interface NetworkInformationLike extends EventTarget {
+  saveData?: boolean;
+  effectiveType?: string;
+  downlink?: number;
+}
+
+declare global {
+  interface Window {
+    __videoPrefetch?: typeof stats;
+  }
+}
+
+const leases: Lease[] = [];
+const hosts = new Map<string, HTMLElement[]>();
+const hinted = new Map<string, VideoSlideDTO>();
+const listeners = new Map<string, Set<() => void>>();
+const swipes: number[] = [];
+
+let activeId: string | null = null;
+let activeVideo: VideoSlideDTO | null = null;
+let upcoming: VideoSlideDTO[] = [];
+let disabled: boolean | null = null;
+let watchingConnection = false;
+
+const stats = {
+  elementsCreated: 0,
+  elementsReused: 0,
+  slidesWarmed: 0,
+  warmBytes: 0,
+  // Swipes onto a slide that already had media loaded
+  warmStarts: 0,
+  coldStarts: 0,
+};
+
+if (typeof window !== 'undefined') window.__videoPrefetch = stats;
+
+const isVideo = (slide: SlideDTO | null | undefined): slide is VideoSlideDTO => slide?.type === 'video';
+
+function notify(slideId: string) {
+  listeners.get(slideId)?.forEach(listener => listener());
+}
+
+function prefetchDisabled() {
+  if (disabled === null) {
+    try {
+      disabled = localStorage.getItem(PREFETCH_SWITCH) === 'off';
+    } catch {
+      disabled = false;
+    }
+  }
+  return disabled;
+}
+
+function connection(): NetworkInformationLike | undefined {
+  return (navigator as Navigator & { connection?: NetworkInformationLike }).connection;
+}
+
+/** How many slides ahead to warm, and the bytes they may load between them. */
+function warmPolicy(): { slides: number; bytes: number } {
+  const info = connection();
+  if (prefetchDisabled() || info?.saveData || info?.effectiveType === 'slow-2g' || info?.effectiveType === '2g') {
+    return { slides: 0, bytes: 0 };
+  }
+  if (info?.effectiveType === '3g' || (info?.downlink ?? Infinity) < 1.5) {
+    return { slides: 1, bytes: WARM_BYTES / 4 };
+  }
+  const gaps = swipes.length - 1;
+  const swiping = gaps > 0 && (swipes[gaps] - swipes[0]) / gaps < FAST_SWIPE_MS;
+  return { slides: swiping ? 2 : 1, bytes: WARM_BYTES };
+}
+
+function createHls(lease: Lease): Hls {
+  const hls = new Hls({ autoStartLoad: false, capLevelToPlayerSize: true });
+  hls.on(Hls.Events.FRAG_LOADED, (_, data) => {
+    const loaded = data.frag.stats.loaded;
+    lease.bytes += loaded;
+    if (lease.budget === Infinity) return;
+    stats.warmBytes += loaded;
+    if (lease.loading && lease.bytes >= lease.budget) {
+      hls.stopLoad();
+      lease.loading = false;
+    }
+  });
+  hls.on(Hls.Events.ERROR, (_, data) => {
+    if (!data.fatal) return;
+    // The next load of this lease starts over on a fresh instance
+    hls.destroy();
+    lease.hls = null;
+    lease.source = null;
+    lease.loading = false;
+  });
+  return hls;
+}
+
+function createLease(): Lease {
+  const video = document.createElement('video');
+  video.loop = true;
+  video.muted = true;
+  video.playsInline = true;
+  video.preload = 'metadata';
+  stats.elementsCreated++;
+  return { video, hls: null, slideId: null, source: null, budget: 0, bytes: 0, loading: false, lastUsed: 0 };
+}
+
+/** Empties a lease for another slide. The element and the Hls instance are kept. */
+function release(lease: Lease) {
+  const previous = lease.slideId;
+  lease.video.pause();
+  lease.video.remove();
+  if (lease.hls?.media) {
+    lease.hls.stopLoad();
+    lease.hls.detachMedia();
+  }
+  if (lease.video.hasAttribute('src')) {
+    lease.video.removeAttribute('src');
+    lease.video.load();
+  }
+  lease.video.removeAttribute('poster');
+  Object.assign(lease, { slideId: null, source: null, budget: 0, bytes: 0, loading: false });
+  if (previous) notify(previous);
+}
+
+function place(lease: Lease) {
+  const stack = lease.slideId ? hosts.get(lease.slideId) : undefined;
+  const host = stack?.[stack.length - 1];
+  if (host && lease.video.parentElement !== host) host.appendChild(lease.video);
+}
+
+/** The lease holding `slideId`, else a new or recycled one; null when every lease is needed elsewhere. */
+function leaseFor(slideId: string, needed: Set<string>): Lease | null {
+  const owned = leases.find(lease => lease.slideId === slideId);
+  if (owned) return owned;
+
+  let lease: Lease | undefined;
+  if (leases.length < POOL_SIZE) {
+    lease = createLease();
+    leases.push(lease);
+  } else {
+    lease = leases
+      .filter(l => l.slideId === null || !needed.has(l.slideId))
+      .sort((a, b) => a.lastUsed - b.lastUsed)[0];
+    if (!lease) return null;
+    release(lease);
+    stats.elementsReused++;
+  }
+  lease.slideId = slideId;
+  place(lease);
+  notify(slideId);
+  return lease;
+}
+
+function load(lease: Lease, slide: VideoSlideDTO, budget: number) {
+  const { video } = lease;
+  const { hlsUrl, mp4Url, poster } = slide.data;
+  lease.budget = budget;
+  lease.lastUsed = performance.now();
+  if (poster && video.getAttribute('poster') !== poster) video.poster = poster;
+
+  if (hlsUrl && Hls.isSupported()) {
+    const hls = lease.hls ?? (lease.hls = createHls(lease));
+    if (lease.source !== hlsUrl) {
+      if (hls.media) hls.detachMedia();
+      hls.attachMedia(video);
+      // autoStartLoad is off: this fetches the manifest only, fragments wait for startLoad()
+      hls.loadSource(hlsUrl);
+      Object.assign(lease, { source: hlsUrl, bytes: 0, loading: false });
+      if (budget !== Infinity) stats.slidesWarmed++;
+    }
+    hls.config.maxBufferLength = budget === Infinity ? Hls.DefaultConfig.maxBufferLength : WARM_BUFFER_SECONDS;
+    const wanted = lease.bytes < budget;
+    if (wanted && !lease.loading) hls.startLoad();
+    else if (!wanted && lease.loading) hls.stopLoad();
+    lease.loading = wanted;
+    return;
+  }
+
+  // Native HLS (Safari) or the mp4: the browser decides how far 'auto' reads
+  // ahead, so a warm slide only gets it with most of the budget to spend
+  const url = hlsUrl && video.canPlayType('application/vnd.apple.mpegurl') ? hlsUrl : mp4Url;
+  if (lease.source !== url) {
+    video.src = url;
+    lease.source = url;
+    if (budget !== Infinity) stats.slidesWarmed++;
+  }
+  video.preload = budget >= WARM_BYTES / 2 ? 'auto' : 'metadata';
+}
+
+function reconcile() {
+  const policy = warmPolicy();
+  const warm: VideoSlideDTO[] = [];
+  // Hints first: before the first swipe the store has no active slide yet
+  for (const slide of [...Array.from(hinted.values()), ...upcoming]) {
+    if (warm.length >= policy.slides) break;
+    if (slide.id !== activeVideo?.id && !warm.some(s => s.id === slide.id)) warm.push(slide);
+  }
+
+  const shares = warm.length > 1 ? [2 / 3, 1 / 3] : [1];
+  const targets: [VideoSlideDTO, number][] = warm.map((slide, i) => [slide, policy.bytes * shares[i]]);
+  if (activeVideo) targets.unshift([activeVideo, Infinity]);
+
+  const needed = new Set(targets.map(([slide]) => slide.id));
+  for (const [slide, budget] of targets) {
+    const lease = leaseFor(slide.id, needed);
+    if (lease) load(lease, slide, budget);
+  }
+}
+
+function watchConnection() {
+  if (watchingConnection) return;
+  watchingConnection = true;
+  connection()?.addEventListener('change', reconcile);
+}
+
+/** Called as the store's active slide or the slides after it (nearest first) change. */
+export function updateVideoPrefetch(active: SlideDTO | null, next: SlideDTO[]) {
+  if ((active?.id ?? null) !== activeId) {
+    activeId = active?.id ?? null;
+    swipes.push(performance.now());
+    if (swipes.length > SWIPES_TRACKED) swipes.shift();
+    if (isVideo(active)) {
+      const lease = leases.find(l => l.slideId === active.id);
+      if (lease && (lease.bytes > 0 || lease.video.readyState >= HTMLMediaElement.HAVE_CURRENT_DATA)) stats.warmStarts++;
+      else stats.coldStarts++;
+    }
+  }
+  activeVideo = isVideo(active) ? active : null;
+  upcoming = next.filter(isVideo);
+  watchConnection();
+  reconcile();
+}
+
+function attachHost(slideId: string, element: HTMLElement) {
+  hosts.set(slideId, [...(hosts.get(slideId) ?? []), element]);
+  const lease = leases.find(l => l.slideId === slideId);
+  if (lease) place(lease);
+
+  return () => {
+    const rest = (hosts.get(slideId) ?? []).filter(host => host !== element);
+    if (rest.length) hosts.set(slideId, rest);
+    else hosts.delete(slideId);
+    const current = leases.find(l => l.slideId === slideId);
+    if (current && current.video.parentElement === element) {
+      current.video.pause();
+      current.video.remove();
+      place(current);
+    }
+  };
+}
+
+function subscribe(slideId: string, listener: () => void) {
+  let set = listeners.get(slideId);
+  if (!set) listeners.set(slideId, (set = new Set()));
+  set.add(listener);
+  return () => {
+    set!.delete(listener);
+    if (set!.size === 0) listeners.delete(slideId);
+  };
+}
+
+/**
+ * The pooled <video> for `slide`, mounted inside `host`, or null while the
+ * slide holds none. `preload` asks for the slide to be warmed even if the
+ * store does not list it (the Preloader's first slide, the feed's next one
+ * before the first swipe).
+ */
+export function usePooledVideo(slide: VideoSlideDTO, host: RefObject<HTMLElement>, preload: boolean): HTMLVideoElement | null {
+  useEffect(() => {
+    const element = host.current;
+    if (!element) return;
+    return attachHost(slide.id, element);
+  }, [slide.id, host]);
+
+  useEffect(() => {
+    if (!preload) return;
+    hinted.set(slide.id, slide);
+    reconcile();
+    return () => {
+      hinted.delete(slide.id);
+    };
+  }, [preload, slide]);
+
+  return useSyncExternalStore(
+    (listener) => subscribe(slide.id, listener),
+    () => leases.find(lease => lease.slideId === slide.id)?.video ?? null,
+    () => null
+  );
+}
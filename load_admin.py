@@ -0,0 +1,276 @@
+"""Seed-and-time check for the paginated admin views at scale.
+
+Grows the database to --users synthetic users and --slides synthetic slides
+(generate_series in batches, idempotent across runs), then logs in as the
+seeded admin and times:
+
+  * /admin/users and /admin/slides, first page and --pages pages down the
+    "Next page" cursor chain,
+  * the same pages with a search term, a role/type filter and an author filter,
+  * /api/admin/authors typeahead lookups.
+
+With --explain it also EXPLAINs the listing queries (the SQL in
+lib/db-postgres.ts) and flags any sequential scan on users or slides, which
+means an index from prisma/schema.prisma is missing or unused.
+
+    python local_stack.py &
+    python load_admin.py --users 1000000 --slides 1000000 --explain --out reports/admin.json
+
+Seeding a million rows of each takes a few minutes on the local stack; pass
+--cleanup to delete the synthetic rows afterwards.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import html
+import json
+import os
+import re
+import sys
+import time
+from typing import Dict, List
+
+import aiohttp
+
+from load_users import TEMPLATE_EMAIL, login, session_for
+from perf_db import NeonHttp
+from perf_report import LatencyStats, print_table, write_report
+
+# Seeded by scripts/seed-test-accounts.ts
+ADMIN_LOGIN = "admin@admin.pl"
+ADMIN_PASSWORD = "admin"
+
+PREFIX = "adminscale"
+WORDS = ["sunset", "metal", "tutorial", "concert", "cooking", "travel", "garden", "retro", "night", "drone"]
+
+SEED_USERS_SQL = """
+INSERT INTO users (id, email, username, "displayName", password, role, "isFirstLogin", "createdAt", "updatedAt")
+SELECT gen_random_uuid()::text, $1 || g || '@load.local', $1 || g, 'Scale ' || $1 || ' ' || g, $2,
+       (ARRAY['user', 'user', 'user', 'author', 'patron'])[1 + g % 5], false,
+       now() - (g || ' seconds')::interval, now()
+FROM generate_series($3::int, $4::int) AS g
+ON CONFLICT DO NOTHING
+"""
+
+SEED_SLIDES_SQL = """
+INSERT INTO slides (id, "userId", username, title, content, "slideType", "createdAt", "updatedAt")
+SELECT $1 || '_' || g, u.id, u.username,
+       ($5::text[])[1 + g % cardinality($5::text[])] || ' ' || ($5::text[])[1 + (g / 7) % cardinality($5::text[])] || ' #' || g,
+       json_build_object('data', CASE WHEN g % 4 = 0
+           THEN json_build_object('htmlContent', '<p>Slide ' || g || '</p>')
+           ELSE json_build_object('mp4Url', '/videos/sample.mp4', 'hlsUrl', null, 'poster', '', 'title', 'Slide ' || g, 'description', '')
+       END)::text,
+       CASE WHEN g % 4 = 0 THEN 'html' ELSE 'video' END,
+       now() - (g || ' seconds')::interval, now()
+FROM generate_series($3::int, $4::int) AS g
+JOIN users u ON u.username = $1 || (1 + g % $2::int)
+ON CONFLICT DO NOTHING
+"""
+
+# Mirrors listUsersForAdmin / listSlidesForAdmin / searchAuthors
+EXPLAIN_QUERIES = {
+    "users first page": ('SELECT id FROM users ORDER BY "createdAt" DESC, id DESC LIMIT 51', []),
+    "users by role": ('SELECT id FROM users WHERE role = $1 ORDER BY "createdAt" DESC, id DESC LIMIT 51', ["author"]),
+    "users search": (
+        'SELECT id FROM users WHERE username ILIKE $1 OR email ILIKE $1 OR "displayName" ILIKE $1 '
+        'ORDER BY "createdAt" DESC, id DESC LIMIT 51', ["%scale 4242%"]),
+    "slides first page": ('SELECT id FROM slides s ORDER BY s."createdAt" DESC, s.id DESC LIMIT 51', []),
+    "slides by type": (
+        'SELECT id FROM slides s WHERE s."slideType" = $1 ORDER BY s."createdAt" DESC, s.id DESC LIMIT 51', ["html"]),
+    "slides search": (
+        'SELECT id FROM slides s WHERE s.title ILIKE $1 ORDER BY s."createdAt" DESC, s.id DESC LIMIT 51', ["%retro night%"]),
+    "authors typeahead": (
+        'SELECT id FROM users WHERE username ILIKE $1 OR "displayName" ILIKE $1 ORDER BY username LIMIT 10',
+        ["adminscale12%"]),
+}
+
+
+async def count_seeded(db: NeonHttp, table: str, column: str, pattern: str) -> int:
+    return int(await db.scalar(f'SELECT COUNT(*) FROM {table} WHERE {column} LIKE $1', [pattern]) or 0)
+
+
+async def seed(db: NeonHttp, args) -> Dict[str, float]:
+    password = await db.scalar("SELECT password FROM users WHERE email = $1", [TEMPLATE_EMAIL])
+    if not password:
+        raise SystemExit(f"{TEMPLATE_EMAIL} not found; run scripts/seed-test-accounts.ts first")
+    timings = {}
+
+    started = time.perf_counter()
+    have = await count_seeded(db, "users", "email", f"{PREFIX}%@load.local")
+    for start in range(have + 1, args.users + 1, args.batch):
+        end = min(start + args.batch - 1, args.users)
+        await db.query(SEED_USERS_SQL, [PREFIX, password, start, end])
+        print(f"  users {end}/{args.users}", end="\r", flush=True)
+    timings["usersSeconds"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    have = await count_seeded(db, "slides", "id", f"{PREFIX}\\_%")
+    for start in range(have + 1, args.slides + 1, args.batch):
+        end = min(start + args.batch - 1, args.slides)
+        await db.query(SEED_SLIDES_SQL, [PREFIX, max(args.users, 1), start, end, WORDS])
+        print(f"  slides {end}/{args.slides}", end="\r", flush=True)
+    timings["slidesSeconds"] = time.perf_counter() - started
+
+    await db.query("ANALYZE users")
+    await db.query("ANALYZE slides")
+    print()
+    return timings
+
+
+async def cleanup(db: NeonHttp) -> None:
+    await db.query("DELETE FROM slides WHERE id LIKE $1", [f"{PREFIX}\\_%"])
+    await db.query("DELETE FROM users WHERE email LIKE $1", [f"{PREFIX}%@load.local"])
+
+
+async def explain(db: NeonHttp) -> List[dict]:
+    rows = []
+    for name, (sql, params) in EXPLAIN_QUERIES.items():
+        plan = await db.scalar(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}", params)
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        top = plan[0]
+        nodes, stack = [], [top["Plan"]]
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            stack.extend(node.get("Plans", []))
+        seq = sorted({n.get("Relation Name") for n in nodes if n["Node Type"] == "Seq Scan"} & {"users", "slides"})
+        indexes = sorted({n["Index Name"] for n in nodes if n.get("Index Name")})
+        rows.append({
+            "query": name,
+            "ms": top.get("Execution Time", 0.0),
+            "seq scan": ",".join(seq) or "-",
+            "indexes": ",".join(indexes) or "-",
+        })
+    return rows
+
+
+NEXT_LINK = re.compile(r'href="([^"]*cursor=[^"]*)"')
+
+
+async def walk(session: aiohttp.ClientSession, base_url: str, path: str, pages: int, stats: LatencyStats) -> int:
+    """Follow the "Next page" links from ``path``; returns the pages fetched."""
+    url, fetched = f"{base_url}{path}", 0
+    while url and fetched < pages:
+        started = time.perf_counter()
+        status, body = None, ""
+        try:
+            async with session.get(url) as resp:
+                status = resp.status
+                body = await resp.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        stats.add((time.perf_counter() - started) * 1000, status == 200, status, len(body))
+        fetched += 1
+        found = NEXT_LINK.search(body)
+        url = f"{base_url}{html.unescape(found.group(1))}" if status == 200 and found else None
+    return fetched
+
+
+async def bench(args) -> dict:
+    async with NeonHttp(timeout=args.seed_timeout) as db:
+        seeding = await seed(db, args) if args.users or args.slides else {}
+        plans = await explain(db) if args.explain else []
+        author_id = await db.scalar("SELECT id FROM users WHERE username = $1", [f"{PREFIX}12"])
+
+    scenarios = {
+        "users": "/admin/users",
+        "users search": "/admin/users?q=scale+4242",
+        "users role": "/admin/users?role=author",
+        "slides": "/admin/slides",
+        "slides search": "/admin/slides?q=retro+night",
+        "slides type": "/admin/slides?type=html",
+    }
+    if author_id:
+        scenarios["slides author"] = f"/admin/slides?author={author_id}"
+
+    connector = aiohttp.TCPConnector(limit=8)
+    admin = session_for(connector, timeout=args.timeout)
+    results: Dict[str, dict] = {}
+    try:
+        if not await login(admin, args.base_url, ADMIN_LOGIN, ADMIN_PASSWORD):
+            raise SystemExit(f"Could not log in as {ADMIN_LOGIN}")
+        for name, path in scenarios.items():
+            stats = LatencyStats()
+            started = time.perf_counter()
+            pages = 0
+            for _ in range(args.repeat):
+                pages += await walk(admin, args.base_url, path, args.pages, stats)
+            results[name] = {**stats.summary(time.perf_counter() - started), "pagesPerWalk": pages / args.repeat}
+
+        stats = LatencyStats()
+        started = time.perf_counter()
+        for term in ["a", "ad", "adm", "adminscale1", "adminscale12", "nobody-here"] * args.repeat:
+            t0 = time.perf_counter()
+            status, nbytes = None, 0
+            try:
+                async with admin.get(f"{args.base_url}/api/admin/authors", params={"q": term}) as resp:
+                    status = resp.status
+                    nbytes = len(await resp.read())
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                pass
+            stats.add((time.perf_counter() - t0) * 1000, status == 200, status, nbytes)
+        results["authors typeahead"] = stats.summary(time.perf_counter() - started)
+    finally:
+        await admin.close()
+        await connector.close()
+
+    return {"seeding": seeding, "plans": plans, "scenarios": results}
+
+
+def over_budget(result: dict, budget_ms: float) -> List[str]:
+    return [name for name, s in result["scenarios"].items() if s["errors"] or s["p95"] > budget_ms]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Admin listing seed-and-timing check.")
+    parser.add_argument("--base-url", default=os.environ.get("LOAD_BASE_URL", "http://127.0.0.1:3000"))
+    parser.add_argument("--users", type=int, default=1_000_000, help="synthetic users to have (0: skip seeding)")
+    parser.add_argument("--slides", type=int, default=1_000_000, help="synthetic slides to have (0: skip seeding)")
+    parser.add_argument("--batch", type=int, default=50_000, help="rows per INSERT")
+    parser.add_argument("--pages", type=int, default=5, help="pages to follow per walk")
+    parser.add_argument("--repeat", type=int, default=3, help="walks per scenario")
+    parser.add_argument("--budget-ms", type=float, default=500.0, help="p95 budget per page")
+    parser.add_argument("--explain", action="store_true", help="EXPLAIN ANALYZE the listing queries")
+    parser.add_argument("--cleanup", action="store_true", help="delete the synthetic rows at the end")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed-timeout", type=float, default=600.0, help="per-statement timeout while seeding")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+    args.base_url = args.base_url.rstrip("/")
+
+    result = asyncio.run(bench(args))
+
+    if result["plans"]:
+        print_table(result["plans"], ["query", "ms", "seq scan", "indexes"], title="Query plans")
+        print()
+    print_table([{
+        "scenario": name, "requests": s["count"], "errors": s["errors"], "pages": s.get("pagesPerWalk", "-"),
+        "p50": s["p50"], "p95": s["p95"], "max": s["max"], "KB": s["bytes"] / 1024 / max(s["count"], 1),
+    } for name, s in result["scenarios"].items()],
+        ["scenario", "requests", "errors", "pages", "p50", "p95", "max", "KB"],
+        title=f"Admin views (ms, budget p95 {args.budget_ms:g})")
+
+    failed = over_budget(result, args.budget_ms)
+    seq_scans = [row["query"] for row in result["plans"] if row["seq scan"] != "-"]
+    if failed:
+        print(f"\nOver budget or failing: {', '.join(failed)}")
+    if seq_scans:
+        print(f"Sequential scans: {', '.join(seq_scans)}")
+
+    if args.cleanup:
+        async def run_cleanup():
+            async with NeonHttp(timeout=args.seed_timeout) as db:
+                await cleanup(db)
+        asyncio.run(run_cleanup())
+        print("Synthetic rows deleted")
+
+    if args.out:
+        config = {k: v for k, v in vars(args).items() if k != "out"}
+        write_report(args.out, "load_admin", config, result)
+        print(f"Report written to {args.out}")
+    return 1 if failed or seq_scans else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""Author-profile traffic of a 100-slide scroll, per-slide versus batched.
+
+Collects the first --slides slides of the feed, then has --viewers concurrent
+viewers scroll through them, one slide every --dwell-ms, fetching author
+profiles the way the client does:
+
+  legacy   FeedSwiper's old prefetch: GET /api/author/{id} on every slide
+           change, no staleTime and no conditional request
+  batched  one GET /api/authors?ids=... per feed page as it loads (pages of 5,
+           the next one requested two slides before the end), each author
+           fetched once per visit
+  revisit  the same viewers coming back: the batched requests again, with the
+           ETags from the first visit as If-None-Match
+
+For each it reports profile requests per viewer, 200s versus 304s, bytes,
+request latency, and how long a slide was on screen before its author's
+profile was there (0 when the prefetch beat the swipe).
+
+    python load_authors.py --viewers 20 --out reports/authors.json
+    python load_authors.py --scenarios legacy --out reports/authors-before.json   # on a tree without /api/authors
+    python perf_report.py diff reports/authors-before.json reports/authors.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+
+from perf_report import LatencyStats, print_table, write_report
+
+# components/FeedSwiper.tsx pages /api/slides at limit=5 and asks for the next
+# page when the viewer reaches the second-to-last loaded slide
+PAGE_SIZE = 5
+PREFETCH_AHEAD = 2
+SCENARIOS = ("legacy", "batched", "revisit")
+
+
+class ScenarioRun:
+    def __init__(self) -> None:
+        self.requests = LatencyStats()
+        self.not_modified = 0
+        # ms each slide was shown before its author's profile had arrived
+        self.waits = LatencyStats()
+
+
+async def timed_get(session: aiohttp.ClientSession, url: str, run: ScenarioRun,
+                    etag: Optional[str] = None) -> Tuple[Optional[int], Optional[str]]:
+    headers = {"If-None-Match": etag} if etag else {}
+    started = time.perf_counter()
+    status, nbytes, new_etag = None, 0, None
+    try:
+        async with session.get(url, headers=headers) as resp:
+            status = resp.status
+            nbytes = len(await resp.read())
+            new_etag = resp.headers.get("ETag")
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        pass
+    run.requests.add((time.perf_counter() - started) * 1000, status in (200, 304), status, nbytes)
+    if status == 304:
+        run.not_modified += 1
+    return status, new_etag
+
+
+async def collect_slides(session: aiohttp.ClientSession, base_url: str, count: int) -> List[dict]:
+    slides, cursor = [], ""
+    while len(slides) < count:
+        async with session.get(f"{base_url}/api/slides", params={"cursor": cursor, "limit": str(PAGE_SIZE)}) as resp:
+            resp.raise_for_status()
+            body = await resp.json(content_type=None)
+        slides.extend(body["slides"])
+        cursor = body.get("nextCursor")
+        if not cursor:
+            break
+    return slides[:count]
+
+
+async def legacy_viewer(session: aiohttp.ClientSession, base_url: str, slides: List[dict], dwell: float,
+                        run: ScenarioRun) -> None:
+    async def fetch_on_show(author_id: str):
+        shown = time.perf_counter()
+        await timed_get(session, f"{base_url}/api/author/{author_id}", run)
+        run.waits.add((time.perf_counter() - shown) * 1000)
+
+    tasks = []
+    for slide in slides:
+        tasks.append(asyncio.create_task(fetch_on_show(slide["userId"])))
+        await asyncio.sleep(dwell)
+    await asyncio.gather(*tasks)
+
+
+async def batched_viewer(session: aiohttp.ClientSession, base_url: str, slides: List[dict], dwell: float,
+                         run: ScenarioRun, etags: Dict[str, str]) -> None:
+    """``etags`` maps batch URL to ETag; read for If-None-Match and updated from responses."""
+    ready: Dict[str, asyncio.Future] = {}
+
+    async def load_page(page: List[dict]):
+        ids = sorted({s["userId"] for s in page} - ready.keys())
+        if not ids:
+            return
+        done = asyncio.get_running_loop().create_future()
+        for author_id in ids:
+            ready[author_id] = done
+        url = f"{base_url}/api/authors?ids={','.join(ids)}"
+        status, etag = await timed_get(session, url, run, etags.get(url))
+        if etag:
+            etags[url] = etag
+        done.set_result(status)
+
+    async def show(author_id: str):
+        shown = time.perf_counter()
+        await ready[author_id]
+        run.waits.add((time.perf_counter() - shown) * 1000)
+
+    pages = [slides[i:i + PAGE_SIZE] for i in range(0, len(slides), PAGE_SIZE)]
+    loads = [asyncio.create_task(load_page(pages[0]))]
+    shows = []
+    for index, slide in enumerate(slides):
+        page_index = len(loads)
+        if page_index < len(pages) and index >= page_index * PAGE_SIZE - PREFETCH_AHEAD:
+            loads.append(asyncio.create_task(load_page(pages[page_index])))
+        await asyncio.sleep(0)  # let the page's load register its authors
+        shows.append(asyncio.create_task(show(slide["userId"])))
+        await asyncio.sleep(dwell)
+    await asyncio.gather(*loads, *shows)
+
+
+def summarise(run: ScenarioRun, viewers: int, elapsed: float) -> dict:
+    requests = run.requests.summary(elapsed)
+    waits = run.waits.summary()
+    return {
+        "requests": requests,
+        "requestsPerViewer": requests["count"] / viewers,
+        "notModified": run.not_modified,
+        "bytesPerViewer": requests["bytes"] / viewers,
+        "profileWaitMs": {"mean": waits["mean"], "p50": waits["p50"], "p95": waits["p95"], "max": waits["max"]},
+    }
+
+
+async def bench(args) -> dict:
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=args.timeout)) as session:
+        slides = await collect_slides(session, args.base_url, args.slides)
+        if not slides:
+            raise SystemExit("The feed is empty; seed some slides first")
+        authors = len({s["userId"] for s in slides})
+        print(f"{len(slides)} slides by {authors} authors, {args.viewers} viewers, {args.dwell_ms:g} ms per slide")
+
+        results: Dict[str, dict] = {"slides": len(slides), "authors": authors}
+        viewer_etags: List[Dict[str, str]] = [{} for _ in range(args.viewers)]
+        dwell = args.dwell_ms / 1000
+        for scenario in args.scenarios:
+            run = ScenarioRun()
+            started = time.perf_counter()
+            if scenario == "legacy":
+                await asyncio.gather(*(legacy_viewer(session, args.base_url, slides, dwell, run)
+                                       for _ in range(args.viewers)))
+            else:
+                # A first visit starts without ETags; a revisit reuses them
+                if scenario == "batched":
+                    viewer_etags = [{} for _ in range(args.viewers)]
+                await asyncio.gather(*(batched_viewer(session, args.base_url, slides, dwell, run, viewer_etags[i])
+                                       for i in range(args.viewers)))
+            results[scenario] = summarise(run, args.viewers, time.perf_counter() - started)
+    return results
+
+
+def print_result(results: dict, args) -> None:
+    rows = []
+    for scenario in args.scenarios:
+        r = results[scenario]
+        s = r["requests"]
+        rows.append({"scenario": scenario, "req/viewer": r["requestsPerViewer"], "304s": r["notModified"],
+                     "errors": s["errors"], "KB/viewer": r["bytesPerViewer"] / 1024, "p50": s["p50"],
+                     "p95": s["p95"], "wait p50": r["profileWaitMs"]["p50"], "wait p95": r["profileWaitMs"]["p95"]})
+    print_table(rows, ["scenario", "req/viewer", "304s", "errors", "KB/viewer", "p50", "p95", "wait p50", "wait p95"],
+                title=f"Author profiles over a {results['slides']}-slide scroll "
+                      f"(latency and profile wait in ms)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Author-profile requests of a feed scroll, per-slide vs batched.")
+    parser.add_argument("--base-url", default=os.environ.get("LOAD_BASE_URL", "http://127.0.0.1:3000"))
+    parser.add_argument("--slides", type=int, default=100, help="slides scrolled per viewer")
+    parser.add_argument("--viewers", type=int, default=10)
+    parser.add_argument("--dwell-ms", type=float, default=300.0, help="time on each slide")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+    args.base_url = args.base_url.rstrip("/")
+    args.scenarios = [s for s in SCENARIOS if s in args.scenarios]
+    if "revisit" in args.scenarios and "batched" not in args.scenarios:
+        parser.error("revisit replays the ETags of the batched scenario; include both")
+
+    results = asyncio.run(bench(args))
+    print_result(results, args)
+    if args.out:
+        config = {k: v for k, v in vars(args).items() if k != "out"}
+        write_report(args.out, "load_authors", config, results)
+        print(f"Report written to {args.out}")
+    return 1 if any(results[s]["requests"]["errors"] for s in args.scenarios) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,358 @@
+"""Comment-thread scale benchmark for GET /api/comments and /api/comments/replies.
+
+Seeds one benchmark slide per size (10k and 100k comments by default) with
+  * root comments, some sharing a createdAt so cursors hit ties,
+  * deep reply chains (parentId -> parentId -> ...) under the first roots,
+  * a fan of direct replies skewed towards the first roots,
+  * Zipf-distributed likes: root 1 is liked by every synthetic user, root 2
+    by half of them, and so on (getComments ships every liker's id),
+then drives, all concurrently, cursor walks over
+  top      GET /api/comments?sortBy=top
+  newest   GET /api/comments?sortBy=newest
+  replies  GET /api/comments/replies on the most replied-to roots
+  thread   descent into a reply chain, one /replies call per level
+and reports latency, payload bytes and DB time (from the routes'
+Server-Timing header) per page.
+
+    python load_comments.py --sizes 10000,100000 --out reports/comments.json
+    python load_comments.py --no-seed --walkers 20 --max-pages 50
+
+Seeding goes straight to the database (DATABASE_URL / NEON_FETCH_ENDPOINT);
+re-runs reuse the seeded slides unless --reseed is given.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import re
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+
+from load_users import ensure_users
+from perf_db import NeonHttp
+from perf_report import LatencyStats, print_table, write_report
+
+USER_PREFIX = "commenter"
+SLIDE_PREFIX = "bench-comments"
+# Rows per INSERT statement, keeps each SQL-over-HTTP request small
+CHUNK = 20_000
+# Page sizes used by lib/queries.ts (comments) and the /replies route default
+COMMENTS_LIMIT = 20
+REPLIES_LIMIT = 10
+
+SERVER_TIMING_DB = re.compile(r"\bdb;dur=([0-9.]+)")
+
+
+def pg_array(values: List[str]) -> str:
+    """Postgres array literal for a text[] parameter (ids need no quoting)."""
+    return "{" + ",".join(values) + "}"
+
+
+def chunks(first: int, last: int, size: int = CHUNK):
+    lo = first
+    while lo <= last:
+        yield lo, min(lo + size - 1, last)
+        lo += size
+
+
+class ThreadShape:
+    def __init__(self, size: int, root_share: float, chains: int, chain_depth: int, hot: int) -> None:
+        self.size = size
+        self.roots = max(1, int(size * root_share))
+        self.chains = min(chains, self.roots)
+        self.chain_depth = chain_depth
+        self.fan = max(0, size - self.roots - self.chains * self.chain_depth)
+        self.hot = min(hot, self.roots)
+
+
+async def seed_slide(db: NeonHttp, slide_id: str, shape: ThreadShape, users: List[dict], reseed: bool) -> None:
+    author = users[0]
+    await db.query(
+        """
+        INSERT INTO slides (id, "userId", username, title, content, "slideType", "accessLevel", "createdAt", "updatedAt")
+        VALUES ($1, $2, $3, 'Comment benchmark', '{}', 'video', 'PUBLIC', '2000-01-01', now())
+        ON CONFLICT (id) DO NOTHING
+        """,
+        [slide_id, author["id"], author["username"]],
+    )
+    existing = int(await db.scalar('SELECT COUNT(*) FROM "Comment" WHERE "slideId" = $1', [slide_id]) or 0)
+    if existing >= shape.size and not reseed:
+        print(f"{slide_id}: {existing} comments already seeded")
+        return
+    if existing:
+        await db.query('DELETE FROM "Comment" WHERE "slideId" = $1', [slide_id])
+
+    ids = pg_array([u["id"] for u in users])
+    started = time.perf_counter()
+
+    # Roots; every third one shares a timestamp with its neighbours.
+    for lo, hi in chunks(1, shape.roots):
+        await db.query(
+            """
+            INSERT INTO "Comment" (id, text, "userId", "slideId", "parentId", "createdAt", "updatedAt")
+            SELECT $1 || '-r' || g, 'Komentarz ' || g, ($2::text[])[1 + g % cardinality($2::text[])], $1,
+                   NULL, now() - ((g / 3) || ' seconds')::interval, now()
+            FROM generate_series($3::int, $4::int) AS g
+            """,
+            [slide_id, ids, lo, hi],
+        )
+
+    # Chains: root c -> c-1 -> c-2 -> ... (one statement per chunk of whole chains)
+    per_stmt = max(1, CHUNK // max(1, shape.chain_depth))
+    for lo, hi in chunks(1, shape.chains, per_stmt):
+        await db.query(
+            """
+            INSERT INTO "Comment" (id, text, "userId", "slideId", "parentId", "createdAt", "updatedAt")
+            SELECT $1 || '-c' || c || '-' || d, 'Odpowiedź ' || d, ($2::text[])[1 + (c + d) % cardinality($2::text[])],
+                   $1, CASE WHEN d = 1 THEN $1 || '-r' || c ELSE $1 || '-c' || c || '-' || (d - 1) END,
+                   now() - interval '1 day' + (d || ' seconds')::interval, now()
+            FROM generate_series($3::int, $4::int) AS c, generate_series(1, $5::int) AS d
+            """,
+            [slide_id, ids, lo, hi, shape.chain_depth],
+        )
+
+    # Fan-out replies, skewed towards the first roots.
+    for lo, hi in chunks(1, shape.fan):
+        await db.query(
+            """
+            INSERT INTO "Comment" (id, text, "userId", "slideId", "parentId", "createdAt", "updatedAt")
+            SELECT $1 || '-f' || g, 'Odpowiedź ' || g, ($2::text[])[1 + g % cardinality($2::text[])], $1,
+                   $1 || '-r' || (1 + floor($5::int * power(random(), 3)))::int,
+                   now() - interval '1 day' + (g || ' milliseconds')::interval, now()
+            FROM generate_series($3::int, $4::int) AS g
+            """,
+            [slide_id, ids, lo, hi, shape.roots],
+        )
+
+    # Hot roots: root r is liked by the first len(users)/r users.
+    await db.query(
+        """
+        INSERT INTO "CommentLike" (id, "userId", "commentId")
+        SELECT gen_random_uuid()::text, u.id, $1 || '-r' || r
+        FROM generate_series(1, $3::int) AS r
+        JOIN LATERAL (
+            SELECT id FROM unnest($2::text[]) WITH ORDINALITY AS x(id, n)
+            WHERE n <= greatest(1, cardinality($2::text[]) / r)
+        ) AS u ON true
+        ON CONFLICT DO NOTHING
+        """,
+        [slide_id, ids, shape.hot],
+    )
+    # Long tail: one like on every tenth root.
+    for lo, hi in chunks(shape.hot + 1, shape.roots):
+        await db.query(
+            """
+            INSERT INTO "CommentLike" (id, "userId", "commentId")
+            SELECT gen_random_uuid()::text, ($2::text[])[1 + g % cardinality($2::text[])], $1 || '-r' || g
+            FROM generate_series($3::int, $4::int) AS g WHERE g % 10 = 0
+            ON CONFLICT DO NOTHING
+            """,
+            [slide_id, ids, lo, hi],
+        )
+
+    await db.query(
+        """UPDATE slides SET "commentCount" = (SELECT COUNT(*) FROM "Comment" WHERE "slideId" = $1) WHERE id = $1""",
+        [slide_id],
+    )
+    print(f"{slide_id}: seeded {shape.size} comments ({shape.roots} roots, {shape.chains}x{shape.chain_depth} "
+          f"chain, {shape.fan} fan replies) in {time.perf_counter() - started:.1f}s")
+
+
+BUCKETS = ["0", "1", "2", "3", "4", "5-9", "10-19", "20-49", "50+", "all"]
+
+
+def page_bucket(page: int) -> str:
+    if page < 5:
+        return str(page)
+    for lo, hi in ((5, 9), (10, 19), (20, 49)):
+        if page <= hi:
+            return f"{lo}-{hi}"
+    return "50+"
+
+
+class PageStats:
+    def __init__(self) -> None:
+        self.http = LatencyStats()
+        self.db = LatencyStats()
+
+
+class CommentRun:
+    def __init__(self) -> None:
+        self.pages: Dict[Tuple[str, str, str], PageStats] = {}
+
+    def add(self, slide: str, endpoint: str, page: int, ms: float, ok: bool, status: Optional[int],
+            nbytes: int, db_ms: Optional[float]) -> None:
+        for key in ((slide, endpoint, page_bucket(page)), (slide, endpoint, "all")):
+            stats = self.pages.setdefault(key, PageStats())
+            stats.http.add(ms, ok, status, nbytes)
+            if db_ms is not None:
+                stats.db.add(db_ms)
+
+
+async def fetch_page(session: aiohttp.ClientSession, url: str, params: dict, run: CommentRun, slide: str,
+                     endpoint: str, page: int) -> Optional[dict]:
+    started = time.perf_counter()
+    status = None
+    body = None
+    nbytes = 0
+    db_ms = None
+    try:
+        async with session.get(url, params=params) as resp:
+            status = resp.status
+            raw = await resp.read()
+            nbytes = len(raw)
+            match = SERVER_TIMING_DB.search(resp.headers.get("Server-Timing", ""))
+            if match:
+                db_ms = float(match.group(1))
+            if resp.status == 200:
+                body = await resp.json(content_type=None)
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        pass
+    ok = body is not None and body.get("success") is True
+    run.add(slide, endpoint, page, (time.perf_counter() - started) * 1000, ok, status, nbytes, db_ms)
+    return body if ok else None
+
+
+async def walk_comments(session, base_url: str, slide: str, slide_id: str, sort: str, max_pages: int,
+                        run: CommentRun) -> None:
+    cursor = None
+    for page in range(max_pages):
+        params = {"slideId": slide_id, "sortBy": sort, "limit": str(COMMENTS_LIMIT)}
+        if cursor:
+            params["cursor"] = cursor
+        body = await fetch_page(session, f"{base_url}/api/comments", params, run, slide, sort, page)
+        if body is None or not body.get("nextCursor"):
+            return
+        cursor = body["nextCursor"]
+
+
+async def walk_replies(session, base_url: str, slide: str, parent_id: str, max_pages: int, run: CommentRun) -> None:
+    cursor = None
+    for page in range(max_pages):
+        params = {"parentId": parent_id, "limit": str(REPLIES_LIMIT)}
+        if cursor:
+            params["cursor"] = cursor
+        body = await fetch_page(session, f"{base_url}/api/comments/replies", params, run, slide, "replies", page)
+        if body is None or not body.get("nextCursor"):
+            return
+        cursor = body["nextCursor"]
+
+
+async def descend_thread(session, base_url: str, slide: str, root_id: str, max_depth: int, run: CommentRun) -> None:
+    """Open a chain level by level, like a reader expanding "show replies" repeatedly."""
+    parent_id = root_id
+    for depth in range(max_depth):
+        params = {"parentId": parent_id, "limit": str(REPLIES_LIMIT)}
+        body = await fetch_page(session, f"{base_url}/api/comments/replies", params, run, slide, "thread", depth)
+        if body is None:
+            return
+        nested = [r for r in body.get("replies", []) if (r.get("_count") or {}).get("replies")]
+        if not nested:
+            return
+        parent_id = nested[0]["id"]
+
+
+async def drive(args, slides: List[Tuple[str, str, ThreadShape]], run: CommentRun) -> float:
+    connector = aiohttp.TCPConnector(limit=args.connections)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        jobs = []
+        for label, slide_id, shape in slides:
+            for w in range(args.walkers):
+                for sort in ("top", "newest"):
+                    jobs.append(walk_comments(session, args.base_url, label, slide_id, sort, args.max_pages, run))
+                root = 1 + w % max(1, shape.hot)
+                jobs.append(walk_replies(session, args.base_url, label, f"{slide_id}-r{root}", args.max_pages, run))
+                if shape.chains:
+                    chain = 1 + w % shape.chains
+                    jobs.append(descend_thread(session, args.base_url, label, f"{slide_id}-r{chain}",
+                                               args.max_depth, run))
+        started = time.perf_counter()
+        await asyncio.gather(*jobs)
+        return time.perf_counter() - started
+
+
+def summarize(run: CommentRun, elapsed: float) -> dict:
+    out: Dict[str, dict] = {}
+    for (slide, endpoint, bucket), stats in run.pages.items():
+        http = stats.http.summary(elapsed)
+        db = stats.db.summary()
+        out.setdefault(slide, {}).setdefault(endpoint, {})[bucket] = {
+            **http,
+            "bytesPerPage": stats.http.bytes / stats.http.count if stats.http.count else 0,
+            "db": {k: db[k] for k in ("count", "p50", "p95", "p99", "mean", "max")},
+        }
+    return out
+
+
+def print_results(results: dict, elapsed: float) -> None:
+    for slide, endpoints in results.items():
+        rows = []
+        for endpoint, buckets in endpoints.items():
+            for bucket, s in sorted(buckets.items(), key=lambda item: BUCKETS.index(item[0])):
+                rows.append({
+                    "endpoint": endpoint, "page": bucket, "requests": s["count"], "errors": s["errors"],
+                    "p50": s["p50"], "p95": s["p95"], "p99": s["p99"],
+                    "KB/page": s["bytesPerPage"] / 1024,
+                    "db p50": s["db"]["p50"] if s["db"]["count"] else "-",
+                    "db p95": s["db"]["p95"] if s["db"]["count"] else "-",
+                })
+        print_table(rows, ["endpoint", "page", "requests", "errors", "p50", "p95", "p99", "KB/page",
+                           "db p50", "db p95"], title=f"[{slide}] {elapsed:.1f}s (latency in ms)")
+
+
+async def main_async(args) -> dict:
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    slides = []
+    async with NeonHttp() as db:
+        users = await ensure_users(db, USER_PREFIX, args.users)
+        for size in sizes:
+            shape = ThreadShape(size, args.root_share, args.chains, args.chain_depth, args.hot)
+            slide_id = f"{SLIDE_PREFIX}-{size}"
+            if not args.no_seed:
+                await seed_slide(db, slide_id, shape, users, args.reseed)
+            slides.append((f"{size // 1000}k", slide_id, shape))
+
+    run = CommentRun()
+    print(f"Driving {len(slides)} slides with {args.walkers} walkers per endpoint...")
+    elapsed = await drive(args, slides, run)
+    results = summarize(run, elapsed)
+    print_results(results, elapsed)
+    return {"elapsedSeconds": elapsed, "slides": results}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Seed large comment threads and benchmark the comment APIs.")
+    parser.add_argument("--base-url", default=os.environ.get("LOAD_BASE_URL", "http://127.0.0.1:3000"))
+    parser.add_argument("--sizes", default="10000,100000", help="comments per benchmark slide")
+    parser.add_argument("--users", type=int, default=2000, help="synthetic commenters/likers")
+    parser.add_argument("--root-share", type=float, default=0.6, help="fraction of comments that are roots")
+    parser.add_argument("--chains", type=int, default=20, help="deep reply chains per slide")
+    parser.add_argument("--chain-depth", type=int, default=200, help="replies per chain")
+    parser.add_argument("--hot", type=int, default=50, help="heavily liked roots per slide")
+    parser.add_argument("--walkers", type=int, default=10, help="concurrent walkers per endpoint and slide")
+    parser.add_argument("--max-pages", type=int, default=25, help="stop a cursor walk after this many pages")
+    parser.add_argument("--max-depth", type=int, default=50, help="levels to descend into a chain")
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--no-seed", action="store_true", help="benchmark the already seeded slides")
+    parser.add_argument("--reseed", action="store_true", help="delete and reseed the benchmark comments")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+    args.base_url = args.base_url.rstrip("/")
+
+    results = asyncio.run(main_async(args))
+    if args.out:
+        write_report(args.out, "load_comments", {k: v for k, v in vars(args).items() if k != "out"}, results)
+        print(f"\nReport written to {args.out}")
+
+    failed = any(b["all"]["errors"] for endpoints in results["slides"].values() for b in endpoints.values())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
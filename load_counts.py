@@ -0,0 +1,325 @@
+"""Fan-in/fan-out benchmark for live like counts.
+
+Taps POST /api/like on --slides hot slides (Zipf-distributed, --rate taps/s for
+--seconds) from synthetic users, while --subscribers websocket clients listen on
+the local_ably.py realtime endpoint, each watching a window of --radius slides
+either side of a random position, the way FeedSwiper does:
+
+  counts   one derived feed:counts channel filtered to the window
+           (lib/live-counts.ts)
+  legacy   one likes:{slideId} channel per slide, as Sidebar subscribed
+           before the broadcaster; run it against the old build
+
+It reports fan-in (messages published per second, from the sink), fan-out
+(messages delivered to subscribers per second), how often a subscriber got two
+updates for one slide inside one broadcast window, and end-to-end staleness:
+for every tap, the time from its response until each watching subscriber
+received a count read at or after it. After --drain it also checks that the
+last count each subscriber holds for a tapped slide is the one in the
+database: bursts make taps lose the broadcast window, and those must still go
+out as a trailing update.
+
+Start the app with COUNT_BROADCAST_INLINE=1 to run the broadcaster as on
+serverless, where no window timer retries a deferred slide.
+
+    python local_stack.py &
+    python load_counts.py --slides 50 --subscribers 200 --rate 100 --out reports/counts.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import bisect
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+
+from load_users import ensure_users, login_all
+from perf_db import NeonHttp
+from perf_report import LatencyStats, percentile, print_table, write_report
+
+USER_PREFIX = "countfan"
+COUNTS_CHANNEL = "feed:counts"  # lib/count-channel.ts
+
+# Realtime protocol actions (local_ably.py)
+CONNECTED, ATTACH, ATTACHED, MESSAGE = 4, 10, 11, 15
+
+
+def counts_channel(slide_ids: List[str]) -> str:
+    """Derived channel name ably-js builds for lib/count-channel.ts's filter."""
+    expression = " || ".join(f'headers.slideId == `{json.dumps(i)}`' for i in sorted(slide_ids))
+    return f"[filter={base64.b64encode(expression.encode()).decode()}]{COUNTS_CHANNEL}"
+
+
+def zipf_weights(n: int, exponent: float) -> List[float]:
+    return [1 / (rank ** exponent) for rank in range(1, n + 1)]
+
+
+class Subscriber:
+    def __init__(self, index: int, watched: List[str]) -> None:
+        self.index = index
+        self.watched = watched
+        self.ready = asyncio.Event()
+        # slideId -> [(count read at ms, received at ms, likeCount)]
+        self.received: Dict[str, List[Tuple[float, float, Optional[int]]]] = defaultdict(list)
+        self.messages = 0
+
+    def channels(self, mode: str) -> List[str]:
+        if mode == "counts":
+            return [counts_channel(self.watched)]
+        return [f"likes:{slide_id}" for slide_id in self.watched]
+
+    def record(self, channel: str, message: dict) -> None:
+        data = message.get("data")
+        if isinstance(data, str) and (message.get("encoding") or "").endswith("json"):
+            data = json.loads(data)
+        data = data if isinstance(data, dict) else {}
+        slide_id = data.get("slideId") or (channel.split(":", 1)[1] if channel.startswith("likes:") else None)
+        if slide_id is None:
+            return
+        read_at = data.get("ts") or message.get("timestamp") or time.time() * 1000
+        self.received[slide_id].append((read_at, time.time() * 1000, data.get("likeCount")))
+        self.messages += 1
+
+    async def run(self, session: aiohttp.ClientSession, ws_url: str, mode: str, stop: asyncio.Event) -> None:
+        channels = self.channels(mode)
+        async with session.ws_connect(ws_url, params={"format": "json", "v": "3"}) as ws:
+            pending = set(channels)
+
+            async def reader():
+                async for raw in ws:
+                    if raw.type != aiohttp.WSMsgType.TEXT:
+                        continue
+                    frame = json.loads(raw.data)
+                    action = frame.get("action")
+                    if action == CONNECTED:
+                        for name in channels:
+                            await ws.send_json({"action": ATTACH, "channel": name})
+                    elif action == ATTACHED:
+                        pending.discard(frame.get("channel"))
+                        if not pending:
+                            self.ready.set()
+                    elif action == MESSAGE:
+                        for message in frame.get("messages") or []:
+                            self.record(frame.get("channel", ""), message)
+
+            task = asyncio.create_task(reader())
+            await stop.wait()
+            await ws.close()
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, aiohttp.ClientError):
+                pass
+
+
+async def sink_stats(session: aiohttp.ClientSession, ably_url: str) -> dict:
+    async with session.get(f"{ably_url}/_sink/stats") as resp:
+        return await resp.json()
+
+
+def published(stats: dict, mode: str) -> int:
+    channels = stats.get("channels", {})
+    if mode == "counts":
+        return channels.get(COUNTS_CHANNEL, 0)
+    return sum(n for name, n in channels.items() if name.startswith("likes:"))
+
+
+def staleness(taps: List[Tuple[str, float]], subscribers: List[Subscriber]) -> Tuple[List[float], int]:
+    """Per (tap, watching subscriber): ms until a count read after the tap arrived; plus misses."""
+    watchers: Dict[str, List[Subscriber]] = defaultdict(list)
+    for sub in subscribers:
+        for slide_id in sub.watched:
+            watchers[slide_id].append(sub)
+    index = {id(sub): {slide: sorted(rows) for slide, rows in sub.received.items()} for sub in subscribers}
+
+    delays, missed = [], 0
+    for slide_id, done_at in taps:
+        for sub in watchers[slide_id]:
+            rows = index[id(sub)].get(slide_id, [])
+            i = bisect.bisect_left(rows, (done_at, 0.0))
+            arrivals = [received for _, received, _ in rows[i:]]
+            if arrivals:
+                delays.append(max(0.0, min(arrivals) - done_at))
+            else:
+                missed += 1
+    return delays, missed
+
+
+def final_mismatches(subscribers: List[Subscriber], counts: Dict[str, int]) -> List[dict]:
+    """Subscribers whose newest count for a tapped slide is not the database's."""
+    mismatches = []
+    for sub in subscribers:
+        for slide_id, rows in sub.received.items():
+            if slide_id not in counts or not rows:
+                continue
+            last = max(rows)[2]
+            if last != counts[slide_id]:
+                mismatches.append({"subscriber": sub.index, "slideId": slide_id, "got": last, "want": counts[slide_id]})
+    return mismatches
+
+
+def window_violations(subscribers: List[Subscriber], window_ms: float) -> int:
+    """Consecutive updates for one slide on one subscriber read less than a window apart."""
+    violations = 0
+    for sub in subscribers:
+        for rows in sub.received.values():
+            reads = sorted(read for read, _, _ in rows)
+            violations += sum(1 for a, b in zip(reads, reads[1:]) if b - a < window_ms * 0.9)
+    return violations
+
+
+async def bench(args) -> dict:
+    rng = random.Random(args.seed)
+    connector = aiohttp.TCPConnector(limit=args.concurrency + args.subscribers + 10)
+    async with NeonHttp() as db, aiohttp.ClientSession(connector=connector, connector_owner=False) as plain:
+        slides = [row["id"] for row in await db.query(
+            'SELECT id FROM slides ORDER BY "createdAt" DESC LIMIT $1::int', [args.slides])]
+        if not slides:
+            raise SystemExit("No slides in the database; seed first")
+        users = await ensure_users(db, USER_PREFIX, args.users)
+        sessions = [session for _, session in await login_all(connector, args.base_url, users)]
+        if not sessions:
+            raise SystemExit("No synthetic user could log in")
+
+        subscribers = []
+        for i in range(args.subscribers):
+            center = rng.randrange(len(slides))
+            window = slides[max(0, center - args.radius):center + args.radius + 1]
+            subscribers.append(Subscriber(i, window))
+
+        stop = asyncio.Event()
+        ws_url = args.ably_url.replace("http", "ws", 1) + "/"
+        listeners = [asyncio.create_task(sub.run(plain, ws_url, args.channel, stop)) for sub in subscribers]
+        try:
+            await asyncio.wait_for(asyncio.gather(*(sub.ready.wait() for sub in subscribers)), 30)
+        except asyncio.TimeoutError:
+            raise SystemExit("Subscribers did not attach; is local_ably.py running?")
+        print(f"{len(sessions)} tappers, {len(subscribers)} subscribers ({args.channel}), "
+              f"{len(slides)} slides, {args.rate:g} taps/s for {args.seconds:g}s")
+
+        before = await sink_stats(plain, args.ably_url)
+        weights = zipf_weights(len(slides), args.zipf)
+        stats = LatencyStats()
+        taps: List[Tuple[str, float]] = []
+        gate = asyncio.Semaphore(args.concurrency)
+
+        async def tap(slide_id: str):
+            async with gate:
+                session = rng.choice(sessions)
+                started = time.perf_counter()
+                status = None
+                try:
+                    async with session.post(f"{args.base_url}/api/like", json={"slideId": slide_id}) as resp:
+                        status = resp.status
+                        await resp.read()
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    pass
+                stats.add((time.perf_counter() - started) * 1000, status == 200, status)
+                if status == 200:
+                    taps.append((slide_id, time.time() * 1000))
+
+        started = time.perf_counter()
+        inflight = []
+        n = int(args.rate * args.seconds)
+        for i in range(n):
+            delay = started + i / args.rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            inflight.append(asyncio.create_task(tap(rng.choices(slides, weights)[0])))
+        await asyncio.gather(*inflight)
+        tapping = time.perf_counter() - started
+        await asyncio.sleep(args.drain)  # last window flushes
+        elapsed = time.perf_counter() - started
+
+        after = await sink_stats(plain, args.ably_url)
+        tapped = sorted({slide_id for slide_id, _ in taps})
+        counts = {row["id"]: int(row["likeCount"]) for row in await db.query(
+            """SELECT id, "likeCount" FROM slides WHERE id = ANY(string_to_array($1, ','))""", [",".join(tapped)])} if tapped else {}
+        stop.set()
+        await asyncio.gather(*listeners, return_exceptions=True)
+        for session in sessions:
+            await session.close()
+    await connector.close()
+
+    delays, missed = staleness(taps, subscribers)
+    delays.sort()
+    mismatches = final_mismatches(subscribers, counts)
+    fan_in = published(after, args.channel) - published(before, args.channel)
+    fan_out = sum(sub.messages for sub in subscribers)
+    return {
+        "taps": stats.summary(tapping),
+        "fanIn": {"messages": fan_in, "perSecond": fan_in / elapsed, "perTap": fan_in / len(taps) if taps else 0.0},
+        "fanOut": {"messages": fan_out, "perSecond": fan_out / elapsed,
+                   "perSubscriberPerSecond": fan_out / elapsed / len(subscribers)},
+        "windowViolations": window_violations(subscribers, args.window_ms),
+        "finalCounts": {"checked": len(counts), "mismatches": len(mismatches), "examples": mismatches[:5]},
+        "staleness": {
+            "samples": len(delays),
+            "missed": missed,
+            "p50": percentile(delays, 50),
+            "p95": percentile(delays, 95),
+            "max": delays[-1] if delays else 0.0,
+        },
+        "elapsedSeconds": elapsed,
+    }
+
+
+def print_result(result: dict, mode: str) -> None:
+    fresh = result["staleness"]
+    print_table([{
+        "channel": mode, "taps": result["taps"]["count"], "errors": result["taps"]["errors"],
+        "fan-in/s": result["fanIn"]["perSecond"], "per tap": result["fanIn"]["perTap"],
+        "fan-out/s": result["fanOut"]["perSecond"], "violations": result["windowViolations"],
+        "stale p50": fresh["p50"], "stale p95": fresh["p95"], "stale max": fresh["max"], "missed": fresh["missed"],
+    }], ["channel", "taps", "errors", "fan-in/s", "per tap", "fan-out/s", "violations",
+         "stale p50", "stale p95", "stale max", "missed"],
+        title=f"Live counts over {result['elapsedSeconds']:.1f}s (staleness in ms)")
+    if result["taps"]["statusCodes"]:
+        print(f"\nStatus codes: {result['taps']['statusCodes']}")
+    final = result["finalCounts"]
+    print(f"\nFinal counts: {final['mismatches']} stale subscriber views across {final['checked']} tapped slides")
+    for example in final["examples"]:
+        print(f"  {example}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Live count fan-in/fan-out benchmark.")
+    parser.add_argument("--base-url", default=os.environ.get("LOAD_BASE_URL", "http://127.0.0.1:3000"))
+    parser.add_argument("--ably-url", default=os.environ.get("ABLY_SINK_URL", "http://127.0.0.1:8078"),
+                        help="local_ably.py (sink stats and realtime endpoint)")
+    parser.add_argument("--channel", choices=["counts", "legacy"], default="counts")
+    parser.add_argument("--slides", type=int, default=50, help="hot slides (newest first)")
+    parser.add_argument("--zipf", type=float, default=1.1, help="tap skew across the hot slides")
+    parser.add_argument("--users", type=int, default=50, help="synthetic tapping users")
+    parser.add_argument("--subscribers", type=int, default=100)
+    parser.add_argument("--radius", type=int, default=2, help="slides watched either side (FeedSwiper)")
+    parser.add_argument("--rate", type=float, default=50.0, help="taps per second")
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--concurrency", type=int, default=100, help="taps in flight")
+    parser.add_argument("--window-ms", type=float, default=float(os.environ.get("COUNT_BROADCAST_WINDOW_MS", 1000)))
+    parser.add_argument("--drain", type=float, default=3.0, help="seconds to keep listening after the last tap")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+    args.base_url = args.base_url.rstrip("/")
+    args.ably_url = args.ably_url.rstrip("/")
+
+    result = asyncio.run(bench(args))
+    print_result(result, args.channel)
+    if args.out:
+        config = {k: v for k, v in vars(args).items() if k != "out"}
+        write_report(args.out, "load_counts", config, result)
+        print(f"Report written to {args.out}")
+    return 0 if result["taps"]["errors"] == 0 and result["finalCounts"]["mismatches"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""Load generator for the feed API (GET /api/slides cursor pagination).
+
+Simulates M concurrent viewers walking the nextCursor chain at FeedSwiper's
+page size, anonymously and/or with a session cookie, and reports p50/p95/p99
+latency, throughput and error rate for each page depth.
+
+    python load_feed.py --viewers 50 --walks 3
+    python load_feed.py --mode auth --cookie "authjs.session-token=..." --out reports/feed.json
+    python perf_report.py diff reports/feed-before.json reports/feed-after.json
+
+The session cookie can also come from LOAD_SESSION_COOKIE (copy it from the
+browser after logging in).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+import aiohttp
+
+from perf_report import LatencyStats, print_table, write_report
+
+# components/FeedSwiper.tsx fetches /api/slides?cursor=...&limit=5
+PAGE_SIZE = 5
+
+
+class FeedRun:
+    def __init__(self) -> None:
+        self.by_depth: Dict[int, LatencyStats] = {}
+        self.total = LatencyStats()
+        self.walks_completed = 0
+        # X-Feed-Cache header of each response (local / redis / db)
+        self.cache = Counter()
+
+    def add(self, depth: int, ms: float, ok: bool, status: Optional[int], nbytes: int) -> None:
+        self.by_depth.setdefault(depth, LatencyStats()).add(ms, ok, status, nbytes)
+        self.total.add(ms, ok, status, nbytes)
+
+
+async def walk_feed(session: aiohttp.ClientSession, base_url: str, limit: int, max_depth: int, run: FeedRun) -> None:
+    """Follow nextCursor from the first page until it runs out (or max_depth)."""
+    cursor = ""
+    for depth in range(max_depth):
+        started = time.perf_counter()
+        status = None
+        body = None
+        nbytes = 0
+        try:
+            async with session.get(f"{base_url}/api/slides", params={"cursor": cursor, "limit": str(limit)}) as resp:
+                status = resp.status
+                run.cache[resp.headers.get("X-Feed-Cache", "none")] += 1
+                raw = await resp.read()
+                nbytes = len(raw)
+                if resp.status == 200:
+                    body = await resp.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        ms = (time.perf_counter() - started) * 1000
+        ok = body is not None and isinstance(body.get("slides"), list)
+        run.add(depth, ms, ok, status, nbytes)
+        if not ok:
+            return
+        cursor = body.get("nextCursor")
+        if not cursor:
+            break
+    run.walks_completed += 1
+
+
+async def viewer(base_url: str, cookie: Optional[str], limit: int, max_depth: int, walks: int,
+                 deadline: Optional[float], run: FeedRun, timeout: float) -> None:
+    headers = {"Cookie": cookie} if cookie else {}
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    async with aiohttp.ClientSession(headers=headers, timeout=client_timeout) as session:
+        done = 0
+        while True:
+            await walk_feed(session, base_url, limit, max_depth, run)
+            done += 1
+            if deadline is not None:
+                if time.perf_counter() >= deadline:
+                    break
+            elif done >= walks:
+                break
+
+
+async def run_mode(args, cookie: Optional[str]) -> dict:
+    run = FeedRun()
+    deadline = time.perf_counter() + args.duration if args.duration else None
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        viewer(args.base_url, cookie, args.limit, args.max_depth, args.walks, deadline, run, args.timeout)
+        for _ in range(args.viewers)
+    ))
+    elapsed = time.perf_counter() - started
+    return {
+        "elapsedSeconds": elapsed,
+        "walksCompleted": run.walks_completed,
+        "feedCache": dict(run.cache),
+        "total": run.total.summary(elapsed),
+        "depths": {str(depth): stats.summary(elapsed) for depth, stats in sorted(run.by_depth.items())},
+    }
+
+
+def print_mode(mode: str, result: dict) -> None:
+    rows = []
+    for depth, s in result["depths"].items():
+        rows.append({"depth": depth, "requests": s["count"], "errors": s["errors"],
+                     "p50": s["p50"], "p95": s["p95"], "p99": s["p99"], "rps": s["throughput"]})
+    t = result["total"]
+    rows.append({"depth": "all", "requests": t["count"], "errors": t["errors"],
+                 "p50": t["p50"], "p95": t["p95"], "p99": t["p99"], "rps": t["throughput"]})
+    print_table(rows, ["depth", "requests", "errors", "p50", "p95", "p99", "rps"],
+                title=f"[{mode}] {result['walksCompleted']} walks in {result['elapsedSeconds']:.1f}s (latency in ms)")
+    print(f"feed cache: {result['feedCache']}")
+
+
+async def main_async(args) -> dict:
+    cookie = args.cookie or os.environ.get("LOAD_SESSION_COOKIE")
+    modes = ["anon", "auth"] if args.mode == "both" else [args.mode]
+    if "auth" in modes and not cookie:
+        if args.mode == "auth":
+            raise SystemExit("--mode auth needs --cookie or LOAD_SESSION_COOKIE")
+        print("No session cookie given, skipping the logged-in pass.")
+        modes.remove("auth")
+
+    results = {}
+    for mode in modes:
+        results[mode] = await run_mode(args, cookie if mode == "auth" else None)
+        print_mode(mode, results[mode])
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Walk the /api/slides cursor chain with concurrent viewers.")
+    parser.add_argument("--base-url", default=os.environ.get("LOAD_BASE_URL", "http://127.0.0.1:3000"))
+    parser.add_argument("--viewers", type=int, default=20, help="concurrent viewers (M)")
+    parser.add_argument("--walks", type=int, default=1, help="feed walks per viewer")
+    parser.add_argument("--duration", type=float, help="keep walking for this many seconds instead of --walks")
+    parser.add_argument("--max-depth", type=int, default=50, help="stop a walk after this many pages")
+    parser.add_argument("--limit", type=int, default=PAGE_SIZE, help="page size")
+    parser.add_argument("--mode", choices=["anon", "auth", "both"], default="both")
+    parser.add_argument("--cookie", help="Cookie header for the logged-in pass")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+    args.base_url = args.base_url.rstrip("/")
+
+    results = asyncio.run(main_async(args))
+    if args.out:
+        config = {k: v for k, v in vars(args).items() if k not in ("cookie", "out")}
+        write_report(args.out, "load_feed", config, results)
+        print(f"\nReport written to {args.out}")
+
+    failed = any(r["total"]["errors"] for r in results.values())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""Concurrent like-storm benchmark and race detector for toggleLike.
+
+Logs in many synthetic users, fires thousands of concurrent POST /api/like
+taps at one hot slide and then checks the database:
+
+  * drift      slides."likeCount" minus COUNT(*) FROM likes for the slide,
+  * parity     users whose final like state differs from the parity of their
+               successful taps (each tap is a toggle),
+  * publishes  coalesced count messages for the slide on the feed:counts
+               Ably channel per successful request (at most one per
+               broadcast window), read from the local_ably.py sink.
+
+    python local_stack.py &                      # or point at a real stack
+    python load_likes.py --users 200 --taps 10 --out reports/likes.json
+
+Needs DATABASE_URL (and NEON_FETCH_ENDPOINT for the local proxy) to read and
+reset the counters.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import Optional
+
+import aiohttp
+
+from load_users import ensure_users, login_all
+from perf_db import NeonHttp
+from perf_report import LatencyStats, print_table, write_report
+
+USER_PREFIX = "likestorm"
+COUNTS_CHANNEL = "feed:counts"  # lib/count-channel.ts
+
+
+async def pick_slide(db: NeonHttp, slide_id: Optional[str]) -> str:
+    if slide_id:
+        return slide_id
+    found = await db.scalar('SELECT id FROM slides ORDER BY "createdAt" DESC LIMIT 1')
+    if not found:
+        raise SystemExit("No slides in the database; seed first")
+    return found
+
+
+async def reset_slide(db: NeonHttp, slide_id: str, prefix: str) -> None:
+    """Remove the synthetic users' likes and reconcile the counter."""
+    await db.transaction([
+        ("""DELETE FROM likes WHERE "slideId" = $1
+            AND "userId" IN (SELECT id FROM users WHERE email LIKE $2 || '%@load.local')""", [slide_id, prefix]),
+        ("""UPDATE slides SET "likeCount" = (SELECT COUNT(*) FROM likes WHERE "slideId" = $1) WHERE id = $1""",
+         [slide_id]),
+    ])
+
+
+async def like_state(db: NeonHttp, slide_id: str, prefix: str) -> dict:
+    rows = await db.query(
+        """
+        SELECT s."likeCount"::int AS counter,
+               (SELECT COUNT(*) FROM likes l WHERE l."slideId" = s.id)::int AS actual,
+               COALESCE((SELECT array_agg(l."userId") FROM likes l JOIN users u ON u.id = l."userId"
+                         WHERE l."slideId" = s.id AND u.email LIKE $2 || '%@load.local'), '{}') AS likers
+        FROM slides s WHERE s.id = $1
+        """,
+        [slide_id, prefix],
+    )
+    row = rows[0]
+    likers = row["likers"]
+    if isinstance(likers, str):  # raw text output: '{a,b}'
+        likers = [x for x in likers.strip("{}").split(",") if x]
+    return {"counter": int(row["counter"]), "actual": int(row["actual"]), "likers": set(likers)}
+
+
+async def sink_count(session: aiohttp.ClientSession, sink_url: Optional[str], slide_id: str) -> Optional[int]:
+    """Count broadcasts recorded for one slide on the shared feed:counts channel."""
+    if not sink_url:
+        return None
+    try:
+        async with session.get(f"{sink_url}/_sink/messages", params={"channel": COUNTS_CHANNEL}) as resp:
+            messages = await resp.json()
+        return sum(1 for m in messages if m["channel"] == COUNTS_CHANNEL and (m.get("data") or {}).get("slideId") == slide_id)
+    except (aiohttp.ClientError, asyncio.TimeoutError, KeyError, ValueError):
+        return None
+
+
+async def storm(args) -> dict:
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with NeonHttp() as db, aiohttp.ClientSession() as plain:
+        slide_id = await pick_slide(db, args.slide)
+        users = await ensure_users(db, USER_PREFIX, args.users)
+        print(f"Hot slide {slide_id}, logging in {len(users)} users...")
+        logged_in = await login_all(connector, args.base_url, users)
+        if not logged_in:
+            raise SystemExit("No user could log in")
+
+        await reset_slide(db, slide_id, USER_PREFIX)
+        publishes_before = await sink_count(plain, args.ably_sink, slide_id)
+
+        stats = LatencyStats()
+        successes: Counter = Counter()
+        gate = asyncio.Semaphore(args.concurrency)
+
+        async def tap(user, session):
+            async with gate:
+                started = time.perf_counter()
+                status = None
+                try:
+                    async with session.post(f"{args.base_url}/api/like", json={"slideId": slide_id}) as resp:
+                        status = resp.status
+                        await resp.read()
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    pass
+                ok = status == 200
+                stats.add((time.perf_counter() - started) * 1000, ok, status)
+                if ok:
+                    successes[user["id"]] += 1
+
+        jobs = [(user, session) for user, session in logged_in for _ in range(args.taps)]
+        random.shuffle(jobs)
+        print(f"Firing {len(jobs)} taps with concurrency {args.concurrency}...")
+        started = time.perf_counter()
+        await asyncio.gather(*(tap(user, session) for user, session in jobs))
+        elapsed = time.perf_counter() - started
+
+        state = await like_state(db, slide_id, USER_PREFIX)
+        await asyncio.sleep(args.broadcast_wait)  # the last coalesced broadcast trails the storm
+        publishes_after = await sink_count(plain, args.ably_sink, slide_id)
+        for _, session in logged_in:
+            await session.close()
+    await connector.close()
+
+    expected = {uid for uid, n in successes.items() if n % 2 == 1}
+    ok_requests = sum(successes.values())
+    publishes = None
+    if publishes_before is not None and publishes_after is not None:
+        publishes = publishes_after - publishes_before
+    return {
+        "slideId": slide_id,
+        "users": len(logged_in),
+        "requests": stats.summary(elapsed),
+        "elapsedSeconds": elapsed,
+        "likeCount": state["counter"],
+        "likesRows": state["actual"],
+        "drift": state["counter"] - state["actual"],
+        "parityMismatches": len(expected ^ state["likers"]),
+        "ablyPublishes": publishes,
+        "ablyPublishesPerRequest": (publishes / ok_requests) if publishes is not None and ok_requests else None,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Like-storm benchmark for POST /api/like.")
+    parser.add_argument("--base-url", default=os.environ.get("LOAD_BASE_URL", "http://127.0.0.1:3000"))
+    parser.add_argument("--slide", help="slide id (default: newest slide)")
+    parser.add_argument("--users", type=int, default=100, help="synthetic users")
+    parser.add_argument("--taps", type=int, default=10, help="taps per user")
+    parser.add_argument("--concurrency", type=int, default=200, help="requests in flight")
+    parser.add_argument("--ably-sink", default=os.environ.get("ABLY_SINK_URL", "http://127.0.0.1:8078"),
+                        help="local_ably.py URL ('' to skip publish counting)")
+    parser.add_argument("--broadcast-wait", type=float, default=2.0,
+                        help="seconds to wait for the trailing count broadcast (> COUNT_BROADCAST_WINDOW_MS)")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+    args.base_url = args.base_url.rstrip("/")
+
+    result = asyncio.run(storm(args))
+    r = result["requests"]
+    print_table([{
+        "requests": r["count"], "errors": r["errors"], "p50": r["p50"], "p95": r["p95"], "p99": r["p99"],
+        "rps": r["throughput"],
+    }], ["requests", "errors", "p50", "p95", "p99", "rps"], title="POST /api/like (latency in ms)")
+    print_table([{
+        "likeCount": result["likeCount"], "likes rows": result["likesRows"], "drift": result["drift"],
+        "parity mismatches": result["parityMismatches"],
+        "ably/request": "-" if result["ablyPublishesPerRequest"] is None else result["ablyPublishesPerRequest"],
+    }], ["likeCount", "likes rows", "drift", "parity mismatches", "ably/request"], title="Consistency")
+    print(f"status codes: {r['statusCodes']}")
+
+    if args.out:
+        write_report(args.out, "load_likes", {k: v for k, v in vars(args).items() if k != "out"}, result)
+        print(f"Report written to {args.out}")
+
+    return 1 if result["drift"] or result["parityMismatches"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
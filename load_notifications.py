@@ -0,0 +1,226 @@
+"""Idle-client soak test for the notification badge.
+
+Logs in N synthetic users with a seeded notification history and keeps them
+"idle" (app open, nobody clicking) for a while, once per client model:
+
+  legacy    GET /api/notifications every --poll-interval seconds, as TopBar
+            did before the unread counter (list + COUNT on every tick)
+  realtime  GET /api/notifications/unread-count once per page load and again
+            every --reconcile seconds; changes would arrive over Ably
+
+For each phase it reports database transactions per minute (pg_stat_database,
+minus the probe's own queries), Redis commands per minute (local_kv.py only)
+and request latency, so the two models can be compared on one server:
+
+    python local_stack.py &
+    python load_notifications.py --users 500 --minutes 5 --out reports/notif.json
+
+To compare revisions instead, run ``--client legacy`` against the old build,
+``--client realtime`` against the new one and ``perf_report.py diff`` them.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import List, Optional
+
+import aiohttp
+
+from load_users import ensure_users, login_all
+from perf_db import NeonHttp
+from perf_report import LatencyStats, print_table, write_report
+
+USER_PREFIX = "notifidle"
+
+XACT_SQL = """
+SELECT xact_commit + xact_rollback AS n FROM pg_stat_database WHERE datname = current_database()
+"""
+
+
+async def seed_notifications(db: NeonHttp, prefix: str, per_user: int, unread: int) -> None:
+    """Replace the synthetic users' notifications with ``per_user`` rows, the newest ``unread`` unread."""
+    await db.query(
+        """DELETE FROM "Notification" WHERE "userId" IN (SELECT id FROM users WHERE email LIKE $1 || '%@load.local')""",
+        [prefix],
+    )
+    await db.query(
+        """
+        INSERT INTO "Notification" (id, "userId", type, text, link, read, "createdAt")
+        SELECT gen_random_uuid()::text, u.id, 'system', 'Soak notification ' || g, '/', g > $3::int,
+               now() - g * interval '1 minute'
+        FROM users u CROSS JOIN generate_series(1, $2::int) AS g
+        WHERE u.email LIKE $1 || '%@load.local'
+        """,
+        [prefix, per_user, unread],
+    )
+
+
+async def kv_command(session: aiohttp.ClientSession, command: List[str]) -> Optional[object]:
+    """One command against UPSTASH_REDIS_REST_URL; None when Redis is not configured or unreachable."""
+    url = os.environ.get("UPSTASH_REDIS_REST_URL") or os.environ.get("KV_REST_API_URL")
+    token = os.environ.get("UPSTASH_REDIS_REST_TOKEN") or os.environ.get("KV_REST_API_TOKEN")
+    if not url:
+        return None
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    try:
+        async with session.post(url.rstrip("/"), json=command, headers=headers) as resp:
+            return (await resp.json()).get("result")
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        return None
+
+
+async def kv_commands(session: aiohttp.ClientSession) -> Optional[int]:
+    """Total commands served by local_kv.py (its /_stats endpoint); None for a real Upstash."""
+    url = os.environ.get("UPSTASH_REDIS_REST_URL") or os.environ.get("KV_REST_API_URL")
+    if not url:
+        return None
+    try:
+        async with session.get(f"{url.rstrip('/')}/_stats") as resp:
+            return int((await resp.json())["commands"])
+    except (aiohttp.ClientError, asyncio.TimeoutError, KeyError, ValueError):
+        return None
+
+
+async def run_phase(args, mode: str, clients, db: NeonHttp, plain: aiohttp.ClientSession) -> dict:
+    if mode == "legacy":
+        path, interval = "/api/notifications", args.poll_interval
+    else:
+        path, interval = "/api/notifications/unread-count", args.reconcile
+    stats = LatencyStats()
+    duration = args.minutes * 60
+    stop = asyncio.Event()
+
+    async def client(session):
+        # Page loads are spread over the first interval, like real users arriving
+        try:
+            await asyncio.wait_for(stop.wait(), random.uniform(0, min(interval, duration)))
+            return
+        except asyncio.TimeoutError:
+            pass
+        while not stop.is_set():
+            started = time.perf_counter()
+            status = None
+            nbytes = 0
+            try:
+                async with session.get(f"{args.base_url}{path}") as resp:
+                    status = resp.status
+                    nbytes = len(await resp.read())
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                pass
+            stats.add((time.perf_counter() - started) * 1000, status == 200, status, nbytes)
+            try:
+                await asyncio.wait_for(stop.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+    kv_before = await kv_commands(plain)
+    xact_before = int(await db.scalar(XACT_SQL))
+    probes = 1
+    per_minute: List[float] = []
+    print(f"{mode}: {len(clients)} idle clients on {path} for {args.minutes:g} min...")
+
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(client(session)) for _, session in clients]
+    last = xact_before
+    while time.perf_counter() - started < duration:
+        await asyncio.sleep(min(60.0, duration - (time.perf_counter() - started)))
+        current = int(await db.scalar(XACT_SQL))
+        probes += 1
+        per_minute.append(max(0, current - last - 1))
+        last = current
+    stop.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    # Backend statistics are flushed lazily; give the last transactions time to land
+    await asyncio.sleep(args.settle)
+    xact_after = int(await db.scalar(XACT_SQL))
+    probes += 1
+    kv_after = await kv_commands(plain)
+
+    transactions = max(0, xact_after - xact_before - probes + 1)
+    minutes = elapsed / 60
+    return {
+        "path": path,
+        "intervalSeconds": interval,
+        "requests": stats.summary(elapsed),
+        "dbTransactions": transactions,
+        "dbQueriesPerMinute": transactions / minutes if minutes else 0.0,
+        "dbQueriesPerMinuteSeries": per_minute,
+        "dbQueriesPerRequest": transactions / stats.count if stats.count else 0.0,
+        "redisCommandsPerMinute": (kv_after - kv_before) / minutes if kv_before is not None and kv_after is not None and minutes else None,
+    }
+
+
+async def soak(args) -> dict:
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with NeonHttp() as db, aiohttp.ClientSession() as plain:
+        users = await ensure_users(db, USER_PREFIX, args.users)
+        await seed_notifications(db, USER_PREFIX, args.per_user, args.unread)
+        # Rows were replaced behind the app's back, so drop any warm unread counters
+        await kv_command(plain, ["DEL", *(f"notifications:unread:{u['id']}" for u in users)])
+        print(f"Seeded {args.per_user} notifications ({args.unread} unread) for {len(users)} users, logging in...")
+        clients = await login_all(connector, args.base_url, users)
+        if not clients:
+            raise SystemExit("No user could log in")
+
+        modes = ["legacy", "realtime"] if args.client == "both" else [args.client]
+        phases = {}
+        for mode in modes:
+            phases[mode] = await run_phase(args, mode, clients, db, plain)
+
+        for _, session in clients:
+            await session.close()
+    await connector.close()
+
+    result = {"clients": len(clients), "phases": phases}
+    if "legacy" in phases and "realtime" in phases and phases["realtime"]["dbQueriesPerMinute"]:
+        result["dbReduction"] = phases["legacy"]["dbQueriesPerMinute"] / phases["realtime"]["dbQueriesPerMinute"]
+    return result
+
+
+def print_result(result: dict) -> None:
+    rows = []
+    for mode, phase in result["phases"].items():
+        req = phase["requests"]
+        rows.append({
+            "client": mode, "requests": req["count"], "errors": req["errors"], "p50 ms": req["p50"],
+            "p95 ms": req["p95"], "db q/min": phase["dbQueriesPerMinute"], "db q/req": phase["dbQueriesPerRequest"],
+            "redis cmd/min": "-" if phase["redisCommandsPerMinute"] is None else phase["redisCommandsPerMinute"],
+        })
+    print_table(rows, ["client", "requests", "errors", "p50 ms", "p95 ms", "db q/min", "db q/req", "redis cmd/min"],
+                title=f"{result['clients']} idle clients")
+    if "dbReduction" in result:
+        print(f"\nDatabase load: {result['dbReduction']:.1f}x lower with the realtime badge")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Idle-client soak test for the notification badge.")
+    parser.add_argument("--base-url", default=os.environ.get("LOAD_BASE_URL", "http://127.0.0.1:3000"))
+    parser.add_argument("--users", type=int, default=200, help="idle logged-in clients")
+    parser.add_argument("--client", choices=["legacy", "realtime", "both"], default="both")
+    parser.add_argument("--minutes", type=float, default=5.0, help="length of each phase")
+    parser.add_argument("--poll-interval", type=float, default=30.0, help="legacy TopBar refetchInterval (s)")
+    parser.add_argument("--reconcile", type=float, default=300.0, help="realtime count refetch, the query's staleTime (s)")
+    parser.add_argument("--per-user", type=int, default=40, help="seeded notifications per user")
+    parser.add_argument("--unread", type=int, default=5, help="of which unread")
+    parser.add_argument("--settle", type=float, default=2.0, help="wait for database statistics to flush (s)")
+    parser.add_argument("--concurrency", type=int, default=200, help="connection pool size")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+    args.base_url = args.base_url.rstrip("/")
+
+    result = asyncio.run(soak(args))
+    print_result(result)
+    if args.out:
+        write_report(args.out, "load_notifications", {k: v for k, v in vars(args).items() if k != "out"}, result)
+        print(f"Report written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
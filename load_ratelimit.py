@@ -0,0 +1,252 @@
+"""Accuracy and overhead benchmark for lib/rate-limiter.ts.
+
+Drives bursty traffic from --clients subjects through the limiter probe
+(POST /api/rate-limit/probe, enabled by RATE_LIMIT_PROBE=1 which
+local_stack.py sets): each client fires bursts of --burst requests at
+--burst-rate req/s, then idles for an exponentially distributed gap averaging
+--idle seconds. Every decision is replayed, by server timestamp, through
+
+  ideal   an exact sliding-window log of --limit per --window-ms
+  legacy  the previous INCR + EXPIRE limiter, whose window restarts on every
+          call (simulated on the same arrivals)
+
+and the report counts false allows and false blocks against the ideal, the
+worst number of requests let through in any window, and the latency the
+limiter adds: its own time (Server-Timing) split by local fast path versus
+Redis, and the route's latency against a --baseline run with the limiter
+skipped.
+
+    python local_stack.py &
+    python load_ratelimit.py --clients 50 --seconds 30 --limit 10 --window-ms 2000 --baseline --out reports/ratelimit.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from perf_report import LatencyStats, print_table, write_report
+
+SERVER_TIMING = re.compile(r"ratelimit;dur=([\d.]+)")
+
+
+class Decision:
+    __slots__ = ("subject", "seq", "at", "allowed", "source", "limiter_ms")
+
+    def __init__(self, subject: str, seq: int, at: float, allowed: bool, source: str, limiter_ms: Optional[float]):
+        self.subject = subject
+        self.seq = seq
+        self.at = at
+        self.allowed = allowed
+        self.source = source
+        self.limiter_ms = limiter_ms
+
+
+def ideal_decisions(times: List[float], limit: int, window_ms: float) -> List[bool]:
+    """Exact sliding log: allowed while fewer than ``limit`` accepted requests are newer than t - window."""
+    accepted: List[float] = []
+    out = []
+    for t in times:
+        recent = [a for a in accepted if a > t - window_ms]
+        ok = len(recent) < limit
+        if ok:
+            recent.append(t)
+        accepted = recent
+        out.append(ok)
+    return out
+
+
+def legacy_decisions(times: List[float], limit: int, window_ms: float) -> List[bool]:
+    """INCR + EXPIRE on every call: rejected calls count too and push the expiry out."""
+    count, expires_at, out = 0, float("-inf"), []
+    for t in times:
+        if t >= expires_at:
+            count = 0
+        count += 1
+        expires_at = t + window_ms
+        out.append(count <= limit)
+    return out
+
+
+def max_in_window(times: List[float], window_ms: float) -> int:
+    best, start = 0, 0
+    for end, t in enumerate(times):
+        while times[start] <= t - window_ms:
+            start += 1
+        best = max(best, end - start + 1)
+    return best
+
+
+def compare(expected: List[bool], actual: List[bool]) -> Dict[str, int]:
+    return {
+        "agree": sum(1 for e, a in zip(expected, actual) if e == a),
+        "falseAllows": sum(1 for e, a in zip(expected, actual) if a and not e),
+        "falseBlocks": sum(1 for e, a in zip(expected, actual) if e and not a),
+    }
+
+
+async def drive(session: aiohttp.ClientSession, args, mode: str, run_id: str) -> tuple:
+    decisions: List[Decision] = []
+    latency = LatencyStats()
+    rng = random.Random(args.seed)
+    gate = asyncio.Semaphore(args.concurrency)
+    deadline = time.perf_counter() + args.seconds
+    url = f"{args.base_url}/api/rate-limit/probe"
+
+    async def one(subject: str, seq: int):
+        async with gate:
+            params = {"subject": subject, "limit": str(args.limit), "windowMs": str(int(args.window_ms))}
+            if mode == "none":
+                params["mode"] = "none"
+            started = time.perf_counter()
+            status = None
+            try:
+                async with session.post(url, params=params) as resp:
+                    status = resp.status
+                    body = await resp.json(content_type=None)
+                    timing = SERVER_TIMING.search(resp.headers.get("Server-Timing", ""))
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                body, timing = None, None
+            latency.add((time.perf_counter() - started) * 1000, status == 200, status)
+            if status == 200 and body:
+                decisions.append(Decision(subject, seq, body["at"], body["allowed"], body.get("source", "?"),
+                                          float(timing.group(1)) if timing else None))
+
+    async def client(index: int):
+        subject = f"{run_id}-{index}"
+        seq, tasks = 0, []
+        await asyncio.sleep(rng.uniform(0, args.idle))
+        while time.perf_counter() < deadline:
+            for _ in range(args.burst):
+                tasks.append(asyncio.create_task(one(subject, seq)))
+                seq += 1
+                await asyncio.sleep(1 / args.burst_rate)
+            await asyncio.sleep(rng.expovariate(1 / args.idle) if args.idle > 0 else 0)
+        await asyncio.gather(*tasks)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(args.clients)))
+    return decisions, latency.summary(time.perf_counter() - started)
+
+
+def analyse(decisions: List[Decision], args) -> dict:
+    by_subject: Dict[str, List[Decision]] = defaultdict(list)
+    for d in decisions:
+        by_subject[d.subject].append(d)
+
+    totals = {"limiter": defaultdict(int), "legacy": defaultdict(int)}
+    worst_window = 0
+    allowed = 0
+    for items in by_subject.values():
+        items.sort(key=lambda d: (d.at, d.seq))
+        times = [d.at for d in items]
+        actual = [d.allowed for d in items]
+        allowed += sum(actual)
+        ideal = ideal_decisions(times, args.limit, args.window_ms)
+        for name, decided in (("limiter", actual), ("legacy", legacy_decisions(times, args.limit, args.window_ms))):
+            for key, value in compare(ideal, decided).items():
+                totals[name][key] += value
+        accepted = [d.at for d in items if d.allowed]
+        if accepted:
+            worst_window = max(worst_window, max_in_window(accepted, args.window_ms))
+
+    limiter: Dict[str, List[float]] = defaultdict(list)
+    for d in decisions:
+        if d.limiter_ms is not None:
+            limiter[d.source].append(d.limiter_ms)
+
+    def spread(values: List[float]) -> dict:
+        stats = LatencyStats()
+        for v in values:
+            stats.add(v)
+        s = stats.summary()
+        return {"count": s["count"], "p50": s["p50"], "p95": s["p95"], "p99": s["p99"]}
+
+    n = len(decisions) or 1
+    return {
+        "decisions": len(decisions),
+        "allowed": allowed,
+        "limiter": {"accuracy": totals["limiter"]["agree"] / n, **dict(totals["limiter"])},
+        # The old algorithm judged against the same ideal, on the same arrivals
+        "legacy": {"accuracy": totals["legacy"]["agree"] / n, **dict(totals["legacy"])},
+        "maxAllowedInWindow": worst_window,
+        "limiterMs": {source: spread(values) for source, values in sorted(limiter.items())},
+    }
+
+
+async def bench(args) -> dict:
+    run_id = f"rl{int(time.time())}"
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=args.timeout)) as session:
+        async with session.post(f"{args.base_url}/api/rate-limit/probe") as resp:
+            if resp.status == 404:
+                raise SystemExit("Probe disabled; start the server with RATE_LIMIT_PROBE=1")
+
+        result = {}
+        if args.baseline:
+            print(f"baseline: {args.clients} clients for {args.seconds:g}s, limiter skipped")
+            _, result["baselineRequests"] = await drive(session, args, "none", f"{run_id}b")
+        print(f"limiter: {args.clients} clients for {args.seconds:g}s, {args.limit} per {args.window_ms:g} ms, "
+              f"bursts of {args.burst} at {args.burst_rate:g}/s")
+        decisions, result["requests"] = await drive(session, args, "limit", run_id)
+    result.update(analyse(decisions, args))
+    return result
+
+
+def print_result(result: dict, args) -> None:
+    print_table([
+        {"limiter": name, "decisions": result["decisions"], "accuracy %": result[name]["accuracy"] * 100,
+         "false allows": result[name]["falseAllows"], "false blocks": result[name]["falseBlocks"]}
+        for name in ("limiter", "legacy")
+    ], ["limiter", "decisions", "accuracy %", "false allows", "false blocks"],
+        title=f"Decisions vs an exact {args.limit}/{args.window_ms:g}ms sliding window "
+              f"(most allowed in any window: {result['maxAllowedInWindow']})")
+    print()
+    rows = [{"path": source, **spread} for source, spread in result["limiterMs"].items()]
+    print_table(rows, ["path", "count", "p50", "p95", "p99"], title="Limiter time inside the route (ms)")
+    print()
+    phases = [("limiter", result["requests"])]
+    if "baselineRequests" in result:
+        phases.insert(0, ("no limiter", result["baselineRequests"]))
+    print_table([{"run": name, "requests": s["count"], "errors": s["errors"], "p50": s["p50"], "p95": s["p95"],
+                  "p99": s["p99"]} for name, s in phases],
+                ["run", "requests", "errors", "p50", "p95", "p99"], title="Request latency (ms)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rate limiter accuracy and overhead benchmark.")
+    parser.add_argument("--base-url", default=os.environ.get("LOAD_BASE_URL", "http://127.0.0.1:3000"))
+    parser.add_argument("--clients", type=int, default=20, help="distinct subjects")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--window-ms", type=float, default=2000.0)
+    parser.add_argument("--burst", type=int, default=15, help="requests per burst")
+    parser.add_argument("--burst-rate", type=float, default=50.0, help="requests per second within a burst")
+    parser.add_argument("--idle", type=float, default=1.0, help="mean seconds between bursts")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--baseline", action="store_true", help="first run the same traffic with the limiter skipped")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+    args.base_url = args.base_url.rstrip("/")
+
+    result = asyncio.run(bench(args))
+    print_result(result, args)
+    if args.out:
+        config = {k: v for k, v in vars(args).items() if k != "out"}
+        write_report(args.out, "load_ratelimit", config, result)
+        print(f"Report written to {args.out}")
+    return 0 if result["maxAllowedInWindow"] <= args.limit else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+"""Concurrent large-upload benchmark for /api/upload.
+
+Logs in as the seeded admin and pushes --files uploads of the --sizes given
+(MB, cycled) with --concurrency in flight, while sampling the server's
+resident memory from /proc. Modes:
+
+  chunked    POST /api/upload/sessions, then PATCH --chunk-mb chunks with
+             Upload-Offset; --interrupt cuts that share of chunks mid-body and
+             resumes from HEAD's offset
+  single     one streamed POST /api/upload with the file as the body
+  multipart  the pre-streaming form-data request, for comparing revisions
+
+    yarn build && yarn start &
+    python load_upload.py --sizes 50,100,250,500 --files 12 --concurrency 6 --out reports/upload.json
+
+Payloads are generated on the fly and are not playable video, so the media
+worker will fail their jobs; pass --source some.mp4 to upload a real file
+instead. The server is found with pgrep (next-server) unless --server-pid is set.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import AsyncIterator, List, Optional
+
+import aiohttp
+
+from load_users import login, session_for
+from perf_report import LatencyStats, print_table, write_report
+
+# Seeded by scripts/seed-test-accounts.ts
+ADMIN_LOGIN = "admin@admin.pl"
+ADMIN_PASSWORD = "admin"
+
+MB = 1024 * 1024
+PIECE = 256 * 1024
+PATTERN = os.urandom(MB)
+
+
+class AbortedBody(Exception):
+    pass
+
+
+def server_pid() -> Optional[int]:
+    try:
+        out = subprocess.run(["pgrep", "-o", "-f", "next-server"], capture_output=True, text=True).stdout.split()
+    except FileNotFoundError:
+        return None
+    return int(out[0]) if out else None
+
+
+def process_tree(pid: int) -> List[int]:
+    pids, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        pids.append(current)
+        try:
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as f:
+                    stack.extend(int(child) for child in f.read().split())
+        except OSError:
+            pass
+    return pids
+
+
+def rss_bytes(pid: int) -> int:
+    """Resident memory of ``pid`` and its descendants (next start forks a worker)."""
+    total = 0
+    for p in process_tree(pid):
+        try:
+            with open(f"/proc/{p}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            pass
+    return total
+
+
+class RssSampler:
+    def __init__(self, pid: Optional[int], interval: float) -> None:
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[int] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            self.samples.append(rss_bytes(self.pid))
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self.pid:
+            self.samples.append(rss_bytes(self.pid))
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> dict:
+        if not self._task:
+            return {"pid": None}
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        baseline, peak = self.samples[0], max(self.samples)
+        return {
+            "pid": self.pid,
+            "samples": len(self.samples),
+            "baselineMB": baseline / MB,
+            "peakMB": peak / MB,
+            "growthMB": (peak - baseline) / MB,
+        }
+
+
+async def payload(start: int, end: int, source: Optional[str], abort_at: Optional[int] = None) -> AsyncIterator[bytes]:
+    """Bytes [start, end) of the upload, optionally failing after ``abort_at`` bytes."""
+    position = start
+    handle = open(source, "rb") if source else None
+    try:
+        if handle:
+            handle.seek(start)
+        while position < end:
+            if abort_at is not None and position - start >= abort_at:
+                raise AbortedBody()
+            n = min(PIECE, end - position)
+            if handle:
+                piece = handle.read(n)
+            else:
+                offset = position % MB
+                piece = (PATTERN[offset:] + PATTERN)[:n]
+            position += n
+            yield piece
+            await asyncio.sleep(0)
+    finally:
+        if handle:
+            handle.close()
+
+
+async def upload_chunked(session: aiohttp.ClientSession, args, size: int, tally: dict) -> int:
+    async with session.post(f"{args.base_url}/api/upload/sessions", json={
+        "filename": "bench.mp4", "contentType": args.content_type, "size": size,
+    }) as resp:
+        body = await resp.json(content_type=None)
+        if resp.status != 201:
+            return resp.status
+    url = f"{args.base_url}/api/upload/sessions/{body['id']}"
+    chunk = int(args.chunk_mb * MB) if args.chunk_mb else body["chunkSize"]
+    offset = 0
+    while True:
+        end = min(offset + chunk, size)
+        abort_at = (end - offset) // 2 if args.rng.random() < args.interrupt else None
+        try:
+            async with session.patch(url, data=payload(offset, end, args.source, abort_at), headers={
+                "Upload-Offset": str(offset), "Content-Type": "application/offset+octet-stream",
+            }) as resp:
+                result = await resp.json(content_type=None)
+                if resp.status == 409:
+                    raise AbortedBody()  # still writing the broken chunk, or the offset moved
+                if resp.status != 200:
+                    return resp.status
+                if result.get("complete"):
+                    tally["jobs"] += 1 if result.get("jobId") else 0
+                    return 200
+                offset = result["offset"]
+        except (aiohttp.ClientError, AbortedBody):
+            tally["resumes"] += 1
+            await asyncio.sleep(0.2)  # let the server notice the broken body
+            async with session.head(url) as resp:
+                if resp.status != 200:
+                    return resp.status
+                offset = int(resp.headers["Upload-Offset"])
+
+
+async def upload_single(session: aiohttp.ClientSession, args, size: int, tally: dict) -> int:
+    async with session.post(f"{args.base_url}/api/upload", data=payload(0, size, args.source), headers={
+        "Content-Type": args.content_type, "Content-Length": str(size),
+    }) as resp:
+        result = await resp.json(content_type=None)
+        tally["jobs"] += 1 if result.get("jobId") else 0
+        return resp.status
+
+
+async def upload_multipart(session: aiohttp.ClientSession, args, size: int, tally: dict) -> int:
+    form = aiohttp.FormData()
+    form.add_field("file", payload(0, size, args.source), filename="bench.mp4", content_type=args.content_type)
+    async with session.post(f"{args.base_url}/api/upload", data=form) as resp:
+        await resp.read()
+        return resp.status
+
+
+UPLOADERS = {"chunked": upload_chunked, "single": upload_single, "multipart": upload_multipart}
+
+
+async def bench(args) -> dict:
+    sizes = [int(float(s) * MB) for s in args.sizes.split(",")]
+    if args.source:
+        sizes = [os.path.getsize(args.source)]
+    jobs = [sizes[i % len(sizes)] for i in range(args.files)]
+
+    connector = aiohttp.TCPConnector(limit=args.concurrency * 2)
+    admin = session_for(connector, timeout=args.timeout)
+    try:
+        if not await login(admin, args.base_url, args.login, args.password):
+            raise SystemExit(f"Could not log in as {args.login}")
+
+        sampler = RssSampler(args.server_pid, args.sample_ms / 1000)
+        stats = LatencyStats()
+        tally = {"resumes": 0, "jobs": 0, "bytes": 0}
+        gate = asyncio.Semaphore(args.concurrency)
+        upload = UPLOADERS[args.mode]
+
+        async def one(size: int):
+            async with gate:
+                started = time.perf_counter()
+                status = None
+                try:
+                    status = await upload(admin, args, size, tally)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                    print(f"  upload failed: {error!r}")
+                ok = status == 200
+                stats.add((time.perf_counter() - started) * 1000, ok, status, size if ok else 0)
+                if ok:
+                    tally["bytes"] += size
+
+        total_mb = sum(jobs) / MB
+        print(f"{args.mode}: {len(jobs)} uploads, {total_mb:.0f} MB, concurrency {args.concurrency}, "
+              f"server pid {args.server_pid or 'unknown'}")
+        sampler.start()
+        started = time.perf_counter()
+        await asyncio.gather(*(one(size) for size in jobs))
+        elapsed = time.perf_counter() - started
+        memory = await sampler.stop()
+    finally:
+        await admin.close()
+        await connector.close()
+
+    return {
+        "uploads": stats.summary(elapsed),
+        "elapsedSeconds": elapsed,
+        "megabytes": tally["bytes"] / MB,
+        "throughputMBps": tally["bytes"] / MB / elapsed if elapsed else 0.0,
+        "resumes": tally["resumes"],
+        "mediaJobs": tally["jobs"],
+        "serverMemory": memory,
+    }
+
+
+def print_result(result: dict, mode: str) -> None:
+    uploads = result["uploads"]
+    memory = result["serverMemory"]
+    print_table([{
+        "mode": mode, "uploads": uploads["count"], "errors": uploads["errors"],
+        "MB": result["megabytes"], "MB/s": result["throughputMBps"],
+        "p50 s": uploads["p50"] / 1000, "p95 s": uploads["p95"] / 1000, "resumes": result["resumes"],
+        "rss base MB": memory.get("baselineMB", "-"), "rss peak MB": memory.get("peakMB", "-"),
+    }], ["mode", "uploads", "errors", "MB", "MB/s", "p50 s", "p95 s", "resumes", "rss base MB", "rss peak MB"],
+        title=f"Uploads in {result['elapsedSeconds']:.1f}s")
+    if uploads["statusCodes"]:
+        print(f"\nStatus codes: {uploads['statusCodes']}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Concurrent large-upload benchmark.")
+    parser.add_argument("--base-url", default=os.environ.get("LOAD_BASE_URL", "http://127.0.0.1:3000"))
+    parser.add_argument("--login", default=ADMIN_LOGIN)
+    parser.add_argument("--password", default=ADMIN_PASSWORD)
+    parser.add_argument("--mode", choices=sorted(UPLOADERS), default="chunked")
+    parser.add_argument("--sizes", default="50,100,250,500", help="upload sizes in MB, cycled over --files")
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--chunk-mb", type=float, default=0, help="chunk size (default: what the server advertises)")
+    parser.add_argument("--interrupt", type=float, default=0.0, help="share of chunks cut mid-body and resumed")
+    parser.add_argument("--content-type", default="video/mp4")
+    parser.add_argument("--source", help="upload this file instead of generated bytes")
+    parser.add_argument("--server-pid", type=int, default=None, help="process to sample (default: pgrep next-server)")
+    parser.add_argument("--sample-ms", type=float, default=100.0)
+    parser.add_argument("--timeout", type=float, default=1800.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+    args.base_url = args.base_url.rstrip("/")
+    args.server_pid = args.server_pid or server_pid()
+
+    args.rng = random.Random(args.seed)
+
+    result = asyncio.run(bench(args))
+    print_result(result, args.mode)
+    if args.out:
+        config = {k: v for k, v in vars(args).items() if k not in ("out", "rng")}
+        write_report(args.out, "load_upload", config, result)
+        print(f"Report written to {args.out}")
+    return 0 if result["uploads"]["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
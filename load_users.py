@@ -0,0 +1,86 @@
+"""Synthetic, logged-in users for the load_*.py tools.
+
+Users are inserted in one set-based statement and reuse the bcrypt hash of a
+seeded test account (scripts/seed-test-accounts.ts), so they log in through
+the normal NextAuth credentials callback with that account's password.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import List, Optional, Tuple
+
+import aiohttp
+
+from perf_db import NeonHttp
+
+# Seeded by scripts/seed-test-accounts.ts
+TEMPLATE_EMAIL = "autor@autor.pl"
+TEMPLATE_PASSWORD = "autor"
+
+
+async def ensure_users(db: NeonHttp, prefix: str, count: int, template_email: str = TEMPLATE_EMAIL) -> List[dict]:
+    """Create ``prefix1..prefixN`` users if missing and return id/username/email."""
+    password = await db.scalar("SELECT password FROM users WHERE email = $1", [template_email])
+    if not password:
+        raise SystemExit(f"{template_email} not found; run scripts/seed-test-accounts.ts first")
+    await db.query(
+        """
+        INSERT INTO users (id, email, username, "displayName", password, role, "isFirstLogin", "updatedAt")
+        SELECT gen_random_uuid()::text, $1 || g || '@load.local', $1 || g, 'Load ' || $1 || g, $2, 'user', false, now()
+        FROM generate_series(1, $3::int) AS g
+        ON CONFLICT DO NOTHING
+        """,
+        [prefix, password, count],
+    )
+    return await db.query(
+        "SELECT id, username, email FROM users WHERE email LIKE $1 || '%@load.local' ORDER BY username LIMIT $2::int",
+        [prefix, count],
+    )
+
+
+def session_for(connector: aiohttp.BaseConnector, timeout: float = 30.0) -> aiohttp.ClientSession:
+    """A client with its own cookie jar on a shared connection pool."""
+    return aiohttp.ClientSession(
+        connector=connector,
+        connector_owner=False,
+        cookie_jar=aiohttp.CookieJar(unsafe=True),  # accept cookies for 127.0.0.1
+        timeout=aiohttp.ClientTimeout(total=timeout),
+    )
+
+
+def session_cookie(session: aiohttp.ClientSession) -> Optional[str]:
+    for cookie in session.cookie_jar:
+        if cookie.key.endswith("authjs.session-token"):
+            return f"{cookie.key}={cookie.value}"
+    return None
+
+
+async def login(session: aiohttp.ClientSession, base_url: str, login_name: str,
+                password: str = TEMPLATE_PASSWORD) -> bool:
+    """NextAuth credentials sign-in; leaves the session cookie in the jar."""
+    async with session.get(f"{base_url}/api/auth/csrf") as resp:
+        csrf = (await resp.json())["csrfToken"]
+    form = {"login": login_name, "password": password, "csrfToken": csrf, "callbackUrl": base_url}
+    async with session.post(f"{base_url}/api/auth/callback/credentials", data=form, allow_redirects=False):
+        pass
+    return session_cookie(session) is not None
+
+
+async def login_all(connector: aiohttp.BaseConnector, base_url: str, users: List[dict],
+                    concurrency: int = 20) -> List[Tuple[dict, aiohttp.ClientSession]]:
+    """Log every user in; returns (user, session) for those that got a cookie."""
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(user):
+        session = session_for(connector)
+        async with gate:
+            try:
+                if await login(session, base_url, user["email"]):
+                    return user, session
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                pass
+        await session.close()
+        return None
+
+    sessions = await asyncio.gather(*(one(u) for u in users))
+    return [s for s in sessions if s is not None]
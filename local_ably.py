@@ -0,0 +1,319 @@
+"""Local stand-in for Ably: REST publish sink plus a minimal realtime endpoint.
+
+lib/ably-server.ts publishes to it when ABLY_REST_HOST/ABLY_REST_PORT are set
+(JSON protocol, no TLS). Every published message is recorded so load and
+verification runs can assert on what the server broadcast:
+
+    GET    /_sink/messages?channel=feed:    recorded messages (prefix filter)
+    GET    /_sink/stats                     totals per channel and fan-out counters
+    DELETE /_sink/messages                  reset
+
+Published messages are also fanned out to realtime subscribers. ws://host:port/
+speaks the JSON realtime protocol subset ably-js needs to connect, attach,
+receive MESSAGE frames and detach, including derived channels
+("[filter=<base64>]name") with the filter syntax lib/count-channel.ts emits:
+name/headers.<key> compared with ==/!= to backtick-quoted JSON literals,
+joined by && and ||. lib/ably-client.ts connects here when
+NEXT_PUBLIC_ABLY_HOST/NEXT_PUBLIC_ABLY_PORT are set; tokens are not checked.
+
+    python local_ably.py --port 8078
+
+Usually started by local_stack.py.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import re
+import time
+import uuid
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+
+# Realtime protocol message actions (JSON wire format)
+HEARTBEAT, ACK, CONNECTED, CLOSE, CLOSED, ATTACH, ATTACHED, DETACH, DETACHED, MESSAGE, AUTH = 0, 1, 4, 7, 8, 10, 11, 12, 13, 15, 17
+
+HEARTBEAT_SECONDS = 10
+
+
+def decode_data(data, encoding: Optional[str]) -> Tuple[object, Optional[str]]:
+    """Undo the client library's trailing json encoding so the sink stores plain values."""
+    if encoding and isinstance(data, str) and encoding.split("/")[-1] == "json":
+        rest = "/".join(encoding.split("/")[:-1]) or None
+        return json.loads(data), rest
+    return data, encoding
+
+
+def parse_channel(name: str) -> Tuple[str, Optional[str]]:
+    """Base channel name and decoded filter expression of a (possibly derived) channel name."""
+    match = re.match(r"^\[([^\]]*)\](.+)$", name)
+    if not match:
+        return name, None
+    for param in re.split(r"[?&]", match.group(1)):
+        if param.startswith("filter="):
+            encoded = param[len("filter="):]
+            return match.group(2), base64.b64decode(encoded + "=" * (-len(encoded) % 4)).decode()
+    return match.group(2), None
+
+
+def compile_filter(expression: str) -> Callable[[dict], bool]:
+    alternatives = []
+    for alternative in expression.split("||"):
+        terms = []
+        for term in alternative.split("&&"):
+            match = re.match(r"^\s*(name|headers\.[\w-]+)\s*(==|!=)\s*`(.*)`\s*$", term)
+            if not match:
+                raise ValueError(f"unsupported filter term: {term.strip()!r}")
+            terms.append((match.group(1), match.group(2) == "==", json.loads(match.group(3))))
+        alternatives.append(terms)
+
+    def matches(message: dict) -> bool:
+        headers = (message.get("extras") or {}).get("headers") or {}
+
+        def value(field: str):
+            return message.get("name") if field == "name" else headers.get(field[len("headers."):])
+
+        return any(all((value(field) == literal) == equal for field, equal, literal in terms) for terms in alternatives)
+
+    return matches
+
+
+class Connection:
+    """One realtime client; frames go through a queue so each socket sees them in order."""
+
+    def __init__(self, ws: web.WebSocketResponse) -> None:
+        self.ws = ws
+        self.id = uuid.uuid4().hex[:12]
+        self.outbox: asyncio.Queue = asyncio.Queue()
+        self.serial = 0
+
+    def send(self, frame: dict) -> None:
+        self.outbox.put_nowait(frame)
+
+    async def writer(self) -> None:
+        while True:
+            try:
+                frame = await asyncio.wait_for(self.outbox.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                frame = {"action": HEARTBEAT}
+            if frame is None or self.ws.closed:
+                return
+            await self.ws.send_str(json.dumps(frame))
+
+
+class Subscription:
+    def __init__(self, connection: Connection, name: str, matches: Optional[Callable[[dict], bool]]) -> None:
+        self.connection = connection
+        self.name = name
+        self.matches = matches
+
+
+class Realtime:
+    def __init__(self) -> None:
+        self.subscriptions: Dict[str, List[Subscription]] = defaultdict(list)
+        self.connections = 0
+        self.frames = 0
+        self.delivered = 0
+
+    def fan_out(self, channel: str, messages: List[dict]) -> None:
+        now = int(time.time() * 1000)
+        for sub in list(self.subscriptions.get(channel, ())):
+            selected = [m for m in messages if sub.matches is None or sub.matches(m)]
+            if not selected:
+                continue
+            conn = sub.connection
+            conn.serial += 1
+            frame_id = f"{conn.id}:{conn.serial}"
+            sub.connection.send({
+                "action": MESSAGE,
+                "channel": sub.name,
+                "id": frame_id,
+                "timestamp": now,
+                "messages": [{
+                    "id": m.get("id") or f"{frame_id}:{i}",
+                    "name": m.get("name"),
+                    "data": m.get("data"),
+                    "encoding": m.get("encoding"),
+                    "extras": m.get("extras"),
+                    "timestamp": m.get("timestamp") or now,
+                } for i, m in enumerate(selected)],
+            })
+            self.frames += 1
+            self.delivered += len(selected)
+
+    async def handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        conn = Connection(ws)
+        writer = asyncio.create_task(conn.writer())
+        attached: Dict[str, Tuple[str, Subscription]] = {}
+        self.connections += 1
+        details = {
+            "clientId": request.query.get("clientId"), "connectionKey": conn.id, "serverId": "local_ably",
+            "maxMessageSize": 65536, "maxFrameSize": 524288, "maxInboundRate": 1000,
+            "maxIdleInterval": HEARTBEAT_SECONDS * 1000 * 2, "connectionStateTtl": 120000,
+        }
+        conn.send({"action": CONNECTED, "connectionId": conn.id, "connectionKey": conn.id, "connectionDetails": details})
+
+        def detach(name: str) -> None:
+            base, sub = attached.pop(name, (None, None))
+            if sub is not None and sub in self.subscriptions[base]:
+                self.subscriptions[base].remove(sub)
+
+        try:
+            async for raw in ws:
+                if raw.type != web.WSMsgType.TEXT:
+                    continue
+                frame = json.loads(raw.data)
+                action = frame.get("action")
+                if action == ATTACH:
+                    name = frame["channel"]
+                    detach(name)
+                    base, expression = parse_channel(name)
+                    sub = Subscription(conn, name, compile_filter(expression) if expression else None)
+                    attached[name] = (base, sub)
+                    self.subscriptions[base].append(sub)
+                    conn.send({"action": ATTACHED, "channel": name, "flags": 0})
+                elif action == DETACH:
+                    detach(frame["channel"])
+                    conn.send({"action": DETACHED, "channel": frame["channel"]})
+                elif action == HEARTBEAT:
+                    conn.send({"action": HEARTBEAT})
+                elif action == AUTH:
+                    conn.send({"action": CONNECTED, "connectionId": conn.id, "connectionKey": conn.id,
+                               "connectionDetails": details})
+                elif action == MESSAGE:
+                    conn.send({"action": ACK, "msgSerial": frame.get("msgSerial", 0), "count": 1})
+                elif action == CLOSE:
+                    conn.send({"action": CLOSED})
+                    break
+        finally:
+            for name in list(attached):
+                detach(name)
+            conn.send(None)
+            await writer
+            self.connections -= 1
+        return ws
+
+
+class MessageSink:
+    def __init__(self, keep: int = 100_000) -> None:
+        self.keep = keep
+        self.messages: List[dict] = []
+        self.per_channel: Counter = Counter()
+        self.requests = 0
+
+    def record(self, channel: str, messages: List[dict]) -> None:
+        self.requests += 1
+        now = int(time.time() * 1000)
+        for message in messages:
+            self.per_channel[channel] += 1
+            data, encoding = decode_data(message.get("data"), message.get("encoding"))
+            self.messages.append({
+                "id": message.get("id") or uuid.uuid4().hex,
+                "channel": channel,
+                "name": message.get("name"),
+                "data": data,
+                "encoding": encoding,
+                "extras": message.get("extras"),
+                "timestamp": message.get("timestamp") or now,
+            })
+        if len(self.messages) > self.keep:
+            del self.messages[: len(self.messages) - self.keep]
+
+    def filtered(self, prefix: Optional[str]) -> List[dict]:
+        if not prefix:
+            return list(self.messages)
+        return [m for m in self.messages if m["channel"].startswith(prefix)]
+
+    def reset(self) -> None:
+        self.messages.clear()
+        self.per_channel.clear()
+        self.requests = 0
+
+
+def create_app(sink: Optional[MessageSink] = None, realtime: Optional[Realtime] = None) -> web.Application:
+    sink = sink or MessageSink()
+    realtime = realtime or Realtime()
+
+    async def publish(request):
+        if "json" not in request.headers.get("Content-Type", ""):
+            return web.json_response(
+                {"error": {"message": "local_ably only speaks JSON; set useBinaryProtocol: false", "code": 41500}},
+                status=415,
+            )
+        body = await request.json()
+        messages = body if isinstance(body, list) else [body]
+        channel = request.match_info["channel"]
+        sink.record(channel, messages)
+        realtime.fan_out(channel, messages)
+        return web.json_response({"channel": channel, "messageId": messages[-1].get("id") if messages else None},
+                                 status=201)
+
+    async def history(request):
+        channel = request.match_info["channel"]
+        items = [m for m in sink.messages if m["channel"] == channel]
+        return web.json_response(list(reversed(items[-100:])))
+
+    async def server_time(request):
+        return web.json_response([int(time.time() * 1000)])
+
+    async def request_token(request):
+        body = await request.json()
+        now = int(time.time() * 1000)
+        return web.json_response({
+            "token": f"local-{uuid.uuid4().hex}", "keyName": request.match_info["key"], "issued": now,
+            "expires": now + int(body.get("ttl") or 3600_000), "capability": body.get("capability") or '{"*":["*"]}',
+            "clientId": body.get("clientId"),
+        })
+
+    async def list_messages(request):
+        return web.json_response(sink.filtered(request.query.get("channel")))
+
+    async def stats(request):
+        return web.json_response({
+            "requests": sink.requests,
+            "messages": len(sink.messages),
+            "channels": dict(sink.per_channel),
+            "realtime": {
+                "connections": realtime.connections,
+                "subscriptions": sum(len(subs) for subs in realtime.subscriptions.values()),
+                "frames": realtime.frames,
+                "delivered": realtime.delivered,
+            },
+        })
+
+    async def reset(request):
+        sink.reset()
+        realtime.frames = realtime.delivered = 0
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app["sink"] = sink
+    app["realtime"] = realtime
+    app.router.add_get("/", realtime.handle)
+    app.router.add_post("/keys/{key}/requestToken", request_token)
+    app.router.add_post("/channels/{channel}/messages", publish)
+    app.router.add_get("/channels/{channel}/messages", history)
+    app.router.add_get("/time", server_time)
+    app.router.add_get("/_sink/messages", list_messages)
+    app.router.add_delete("/_sink/messages", reset)
+    app.router.add_get("/_sink/stats", stats)
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local Ably stand-in (REST sink + realtime).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8078)
+    args = parser.parse_args()
+    web.run_app(create_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
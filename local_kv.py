@@ -0,0 +1,507 @@
+"""In-memory stand-in for the Upstash Redis REST API.
+
+Speaks the subset of the protocol @upstash/redis uses from lib/kv.ts: single
+commands POSTed as a JSON array, /pipeline and /multi-exec batches,
+path-style GET commands and the base64 response encoding the client asks for.
+
+There is no Lua interpreter: EVAL/EVALSHA run a Python port of the script,
+picked by the name on the script's first line (e.g. "-- rate-limit/sliding-window"
+in lib/rate-limiter.ts; see SCRIPTS below). A script without a port fails
+with an error instead of being silently ignored.
+
+    python local_kv.py --port 8079 --token local
+    UPSTASH_REDIS_REST_URL=http://127.0.0.1:8079 UPSTASH_REDIS_REST_TOKEN=local yarn dev
+
+Usually started by local_stack.py.
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import fnmatch
+import hashlib
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+
+class CommandError(Exception):
+    pass
+
+
+def _int(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise CommandError("ERR value is not an integer or out of range")
+
+
+def _score(value: Any) -> float:
+    text = str(value).lower()
+    if text in ("-inf", "+inf", "inf"):
+        return float(text)
+    try:
+        return float(text)
+    except ValueError:
+        raise CommandError("ERR value is not a valid float")
+
+
+def _format_score(score: float) -> str:
+    return str(int(score)) if score == int(score) else repr(score)
+
+
+class SortedSet:
+    def __init__(self) -> None:
+        self.scores: Dict[str, float] = {}
+
+    def ranked(self) -> List[Tuple[str, float]]:
+        return sorted(self.scores.items(), key=lambda item: (item[1], item[0]))
+
+
+class KVStore:
+    """Strings, hashes, lists and sorted sets with millisecond expiry, evaluated lazily."""
+
+    def __init__(self) -> None:
+        self.data: Dict[str, Any] = {}
+        self.expires: Dict[str, float] = {}
+        self.commands = 0
+        self.scripts: Dict[str, str] = {}  # sha1 -> script name
+        self.handlers: Dict[str, Callable[[List[Any]], Any]] = {
+            name[4:].upper(): getattr(self, name) for name in dir(self) if name.startswith("cmd_")
+        }
+
+    # --- helpers ---
+
+    def _now(self) -> float:
+        return time.time() * 1000
+
+    def _alive(self, key: str) -> bool:
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= self._now():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def _get(self, key: str, kind: type) -> Any:
+        if not self._alive(key):
+            return None
+        value = self.data[key]
+        if not isinstance(value, kind):
+            raise CommandError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    def execute(self, command: List[Any]) -> Any:
+        if not command:
+            raise CommandError("ERR empty command")
+        name = str(command[0]).upper()
+        handler = self.handlers.get(name)
+        if handler is None:
+            raise CommandError(f"ERR unknown command '{name}'")
+        self.commands += 1
+        return handler([str(arg) if not isinstance(arg, str) else arg for arg in command[1:]])
+
+    # --- commands ---
+
+    def cmd_ping(self, args):
+        return args[0] if args else "PONG"
+
+    def cmd_get(self, args):
+        return self._get(args[0], str)
+
+    def cmd_set(self, args):
+        key, value, options = args[0], args[1], [a.upper() for a in args[2:]]
+        exists = self._alive(key)
+        if ("NX" in options and exists) or ("XX" in options and not exists):
+            return None
+        previous = self.data.get(key) if "GET" in options else None
+        self.data[key] = value
+        self.expires.pop(key, None)
+        for flag, factor in (("EX", 1000), ("PX", 1)):
+            if flag in options:
+                self.expires[key] = self._now() + _int(args[2 + options.index(flag) + 1]) * factor
+        return previous if "GET" in options else "OK"
+
+    def cmd_mget(self, args):
+        return [self.data[k] if self._alive(k) and isinstance(self.data[k], str) else None for k in args]
+
+    def cmd_mset(self, args):
+        for key, value in zip(args[::2], args[1::2]):
+            self.data[key] = value
+            self.expires.pop(key, None)
+        return "OK"
+
+    def cmd_del(self, args):
+        removed = 0
+        for key in args:
+            if self._alive(key):
+                del self.data[key]
+                self.expires.pop(key, None)
+                removed += 1
+        return removed
+
+    cmd_unlink = cmd_del
+
+    def cmd_exists(self, args):
+        return sum(1 for key in args if self._alive(key))
+
+    def cmd_incrby(self, args):
+        key, delta = args[0], _int(args[1])
+        current = self._get(key, str)
+        value = _int(current if current is not None else 0) + delta
+        self.data[key] = str(value)
+        return value
+
+    def cmd_incr(self, args):
+        return self.cmd_incrby([args[0], "1"])
+
+    def cmd_decr(self, args):
+        return self.cmd_incrby([args[0], "-1"])
+
+    def cmd_decrby(self, args):
+        return self.cmd_incrby([args[0], str(-_int(args[1]))])
+
+    def cmd_pexpire(self, args):
+        if not self._alive(args[0]):
+            return 0
+        self.expires[args[0]] = self._now() + _int(args[1])
+        return 1
+
+    def cmd_expire(self, args):
+        return self.cmd_pexpire([args[0], str(_int(args[1]) * 1000)])
+
+    def cmd_pttl(self, args):
+        if not self._alive(args[0]):
+            return -2
+        deadline = self.expires.get(args[0])
+        return -1 if deadline is None else int(deadline - self._now())
+
+    def cmd_ttl(self, args):
+        ms = self.cmd_pttl(args)
+        return ms if ms < 0 else (ms + 999) // 1000
+
+    def cmd_persist(self, args):
+        return 1 if self._alive(args[0]) and self.expires.pop(args[0], None) is not None else 0
+
+    def cmd_keys(self, args):
+        return [key for key in list(self.data) if self._alive(key) and fnmatch.fnmatchcase(key, args[0])]
+
+    def cmd_dbsize(self, args):
+        return sum(1 for key in list(self.data) if self._alive(key))
+
+    def cmd_flushall(self, args):
+        self.data.clear()
+        self.expires.clear()
+        return "OK"
+
+    cmd_flushdb = cmd_flushall
+
+    def cmd_hset(self, args):
+        key = args[0]
+        table = self._get(key, dict)
+        if table is None:
+            table = self.data[key] = {}
+        added = 0
+        for field, value in zip(args[1::2], args[2::2]):
+            added += field not in table
+            table[field] = value
+        return added
+
+    def cmd_hget(self, args):
+        table = self._get(args[0], dict)
+        return None if table is None else table.get(args[1])
+
+    def cmd_hgetall(self, args):
+        table = self._get(args[0], dict) or {}
+        return [item for pair in table.items() for item in pair]
+
+    def cmd_hdel(self, args):
+        table = self._get(args[0], dict) or {}
+        return sum(1 for field in args[1:] if table.pop(field, None) is not None)
+
+    def cmd_hincrby(self, args):
+        key = args[0]
+        table = self._get(key, dict)
+        if table is None:
+            table = self.data[key] = {}
+        value = _int(table.get(args[1], 0)) + _int(args[2])
+        table[args[1]] = str(value)
+        return value
+
+    def _list(self, key: str, create: bool = False) -> Optional[list]:
+        items = self._get(key, list)
+        if items is None and create:
+            items = self.data[key] = []
+        return items
+
+    def _drop_if_empty(self, key: str, items: list) -> None:
+        if not items:
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+
+    def cmd_lpush(self, args):
+        items = self._list(args[0], create=True)
+        for value in args[1:]:
+            items.insert(0, value)
+        return len(items)
+
+    def cmd_rpush(self, args):
+        items = self._list(args[0], create=True)
+        items.extend(args[1:])
+        return len(items)
+
+    def _pop(self, args, index: int):
+        items = self._list(args[0])
+        if not items:
+            return None
+        value = items.pop(index)
+        self._drop_if_empty(args[0], items)
+        return value
+
+    def cmd_lpop(self, args):
+        return self._pop(args, 0)
+
+    def cmd_rpop(self, args):
+        return self._pop(args, -1)
+
+    def cmd_llen(self, args):
+        return len(self._list(args[0]) or [])
+
+    def cmd_lrange(self, args):
+        items = self._list(args[0]) or []
+        start, stop = _int(args[1]), _int(args[2])
+        stop = len(items) if stop == -1 else stop + 1
+        return items[start:stop]
+
+    def cmd_lrem(self, args):
+        key, count, value = args[0], _int(args[1]), args[2]
+        items = self._list(key) or []
+        indexes = [i for i, item in enumerate(items) if item == value]
+        if count < 0:
+            indexes = indexes[::-1]
+        if count:
+            indexes = indexes[:abs(count)]
+        for i in sorted(indexes, reverse=True):
+            del items[i]
+        self._drop_if_empty(key, items)
+        return len(indexes)
+
+    def cmd_lmove(self, args):
+        source, destination, where_from, where_to = args[0], args[1], args[2].upper(), args[3].upper()
+        value = self._pop([source], 0 if where_from == "LEFT" else -1)
+        if value is None:
+            return None
+        target = self._list(destination, create=True)
+        if where_to == "LEFT":
+            target.insert(0, value)
+        else:
+            target.append(value)
+        return value
+
+
+    # --- sorted sets ---
+
+    def _zset(self, key: str, create: bool = False) -> Optional[SortedSet]:
+        zset = self._get(key, SortedSet)
+        if zset is None and create:
+            zset = self.data[key] = SortedSet()
+        return zset
+
+    def cmd_zadd(self, args):
+        key, rest = args[0], list(args[1:])
+        while rest and rest[0].upper() in ("NX", "XX", "GT", "LT", "CH"):
+            rest.pop(0)
+        zset = self._zset(key, create=True)
+        added = 0
+        for score, member in zip(rest[::2], rest[1::2]):
+            added += member not in zset.scores
+            zset.scores[member] = _score(score)
+        return added
+
+    def cmd_zcard(self, args):
+        zset = self._zset(args[0])
+        return len(zset.scores) if zset else 0
+
+    def cmd_zscore(self, args):
+        zset = self._zset(args[0])
+        score = zset.scores.get(args[1]) if zset else None
+        return None if score is None else _format_score(score)
+
+    def cmd_zremrangebyscore(self, args):
+        zset = self._zset(args[0])
+        if not zset:
+            return 0
+
+        def bound(text: str, low: bool) -> Callable[[float], bool]:
+            exclusive = text.startswith("(")
+            limit = _score(text.lstrip("("))
+            if low:
+                return (lambda s: s > limit) if exclusive else (lambda s: s >= limit)
+            return (lambda s: s < limit) if exclusive else (lambda s: s <= limit)
+
+        above, below = bound(args[1], True), bound(args[2], False)
+        doomed = [m for m, score in zset.scores.items() if above(score) and below(score)]
+        for member in doomed:
+            del zset.scores[member]
+        if not zset.scores:
+            self.data.pop(args[0], None)
+            self.expires.pop(args[0], None)
+        return len(doomed)
+
+    def cmd_zrange(self, args):
+        zset = self._zset(args[0])
+        ranked = zset.ranked() if zset else []
+        start, stop = _int(args[1]), _int(args[2])
+        start = max(0, start + len(ranked) if start < 0 else start)
+        stop = stop + len(ranked) if stop < 0 else stop
+        selected = ranked[start:stop + 1]
+        if any(a.upper() == "WITHSCORES" for a in args[3:]):
+            return [x for member, score in selected for x in (member, _format_score(score))]
+        return [member for member, _ in selected]
+
+    # --- scripting ---
+
+    def cmd_time(self, args):
+        now = time.time()
+        return [str(int(now)), str(int((now % 1) * 1_000_000))]
+
+    def _script_name(self, script: str) -> str:
+        match = re.match(r"\s*--\s*([\w./-]+)", script)
+        if not match or match.group(1) not in SCRIPTS:
+            raise CommandError("ERR local_kv has no Python port of this script (see SCRIPTS in local_kv.py)")
+        return match.group(1)
+
+    def _run_script(self, name: str, args: List[str]):
+        numkeys = _int(args[0])
+        return SCRIPTS[name](self, args[1:1 + numkeys], args[1 + numkeys:])
+
+    def cmd_eval(self, args):
+        name = self._script_name(args[0])
+        self.scripts[hashlib.sha1(args[0].encode()).hexdigest()] = name
+        return self._run_script(name, args[1:])
+
+    def cmd_evalsha(self, args):
+        name = self.scripts.get(args[0].lower())
+        if name is None:
+            raise CommandError("NOSCRIPT No matching script. Please use EVAL.")
+        return self._run_script(name, args[1:])
+
+    def cmd_script(self, args):
+        sub = args[0].upper()
+        if sub == "LOAD":
+            sha = hashlib.sha1(args[1].encode()).hexdigest()
+            self.scripts[sha] = self._script_name(args[1])
+            return sha
+        if sub == "EXISTS":
+            return [1 if sha.lower() in self.scripts else 0 for sha in args[1:]]
+        if sub == "FLUSH":
+            self.scripts.clear()
+            return "OK"
+        raise CommandError(f"ERR unknown SCRIPT subcommand '{args[0]}'")
+
+
+# Python ports of the app's Lua scripts, line for line, keyed by the name on
+# the script's first line.
+
+def _sliding_window(store: KVStore, keys: List[str], argv: List[str]) -> List[int]:
+    """lib/rate-limiter.ts: SLIDING_WINDOW_SCRIPT."""
+    seconds, micros = store.cmd_time([])
+    now = int(seconds) * 1000 + int(micros) // 1000
+    member = argv[0]
+    remaining, retry, blocked = -1, 0, 0
+    for i, key in enumerate(keys, start=1):
+        limit, window = _int(argv[i * 2 - 1]), _int(argv[i * 2])
+        store.cmd_zremrangebyscore([key, "-inf", str(now - window)])
+        count = store.cmd_zcard([key])
+        if count >= limit:
+            oldest = store.cmd_zrange([key, str(count - limit), str(count - limit), "WITHSCORES"])
+            wait = int(float(oldest[1])) + window - now
+            if blocked == 0 or wait > retry:
+                blocked, retry = i, wait
+        elif remaining < 0 or limit - count - 1 < remaining:
+            remaining = limit - count - 1
+    if blocked > 0:
+        return [0, 0, retry, blocked]
+    for i, key in enumerate(keys, start=1):
+        store.cmd_zadd([key, str(now), member])
+        store.cmd_pexpire([key, argv[i * 2]])
+    return [1, remaining, 0, 0]
+
+
+SCRIPTS: Dict[str, Callable[[KVStore, List[str], List[str]], Any]] = {
+    "rate-limit/sliding-window": _sliding_window,
+}
+
+
+def _encode(value: Any) -> Any:
+    """Upstash base64-encodes string results when asked to (except "OK")."""
+    if isinstance(value, str):
+        return value if value == "OK" else base64.b64encode(value.encode()).decode()
+    if isinstance(value, list):
+        return [_encode(v) for v in value]
+    return value
+
+
+def _reply(store: KVStore, command: List[Any], b64: bool) -> Tuple[dict, bool]:
+    try:
+        result = store.execute(command)
+    except CommandError as e:
+        return {"error": str(e)}, False
+    except IndexError:
+        return {"error": f"ERR wrong number of arguments for '{command[0]}' command"}, False
+    return {"result": _encode(result) if b64 else result}, True
+
+
+def create_app(token: Optional[str] = None, store: Optional[KVStore] = None) -> web.Application:
+    store = store or KVStore()
+
+    @web.middleware
+    async def auth(request, handler):
+        if token and request.headers.get("Authorization") != f"Bearer {token}":
+            return web.json_response({"error": "Unauthorized"}, status=401)
+        return await handler(request)
+
+    def wants_b64(request) -> bool:
+        return request.headers.get("Upstash-Encoding", "").lower() == "base64"
+
+    async def single(request):
+        command = await request.json()
+        body, ok = _reply(store, command, wants_b64(request))
+        return web.json_response(body, status=200 if ok else 400)
+
+    async def batch(request):
+        commands = await request.json()
+        return web.json_response([_reply(store, c, wants_b64(request))[0] for c in commands])
+
+    async def path_command(request):
+        parts = [p for p in request.match_info["tail"].split("/") if p]
+        if request.method == "POST" and request.can_read_body:
+            parts.append(await request.text())
+        body, ok = _reply(store, parts, wants_b64(request))
+        return web.json_response(body, status=200 if ok else 400)
+
+    async def stats(request):
+        return web.json_response({"commands": store.commands, "keys": store.cmd_dbsize([])})
+
+    app = web.Application(middlewares=[auth])
+    app["store"] = store
+    app.router.add_post("/", single)
+    app.router.add_post("/pipeline", batch)
+    app.router.add_post("/multi-exec", batch)
+    app.router.add_get("/_stats", stats)
+    app.router.add_route("*", "/{tail:.+}", path_command)
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Upstash-REST-compatible in-memory KV server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8079)
+    parser.add_argument("--token", default="local", help="expected bearer token ('' disables auth)")
+    args = parser.parse_args()
+    web.run_app(create_app(args.token or None), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
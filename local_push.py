@@ -0,0 +1,261 @@
+"""Fake Web Push service for benchmarking the admin push fan-out offline.
+
+  serve  HTTPS push endpoints /push/<n> with configurable latency, transient
+         failures (503, or 429 + Retry-After above --max-inflight) and a stable
+         share of expired endpoints answering 404/410
+  seed   insert push_subscriptions rows pointing at the fake (100k by default)
+  bench  log in as the seeded admin, POST /api/notifications/send to every
+         subscription and report the route's per-batch stats next to what the
+         fake service actually received
+
+    python local_push.py serve --latency-ms 80 --fail-rate 0.02 --gone-rate 0.05 &
+    python local_push.py seed --endpoints 100000
+    NODE_TLS_REJECT_UNAUTHORIZED=0 yarn dev          # web-push only speaks HTTPS
+    python local_push.py bench --out reports/push.json
+
+The service uses a throwaway self-signed certificate (made with the openssl
+CLI), hence NODE_TLS_REJECT_UNAUTHORIZED=0 for the app process. Expired
+endpoints are pruned by the route, so a second bench run sends fewer pushes.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import ssl
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import aiohttp
+from aiohttp import web
+
+from load_users import login, session_for
+from perf_db import NeonHttp
+from perf_report import percentile, print_table, write_report
+
+# A valid P-256 public key and auth secret; web-push encrypts every payload
+# against them, the fake service never decrypts.
+P256DH = "BFSvMBv1jPL0ZAdxEh_DlNdZwyl480aMrRkYARazvwksjQzfVxcMX7RgHeeiw6NXitvoVxGi6yWuJ6hUit9RB0A"
+AUTH = "4Doj2M_3Ry9-ZF_ZUWr-9Q"
+
+# Seeded by scripts/seed-test-accounts.ts
+ADMIN_LOGIN = "admin@admin.pl"
+ADMIN_PASSWORD = "admin"
+
+CHUNK = 20_000
+
+
+def endpoint_base(port: int) -> str:
+    return f"https://127.0.0.1:{port}/push/"
+
+
+def bucket(endpoint_id: str) -> float:
+    """Stable value in [0, 1) per endpoint, so an expired endpoint stays expired."""
+    return int(hashlib.sha1(endpoint_id.encode()).hexdigest()[:8], 16) / 2**32
+
+
+class PushStats:
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.received = 0
+        self.statuses: Counter = Counter()
+        self.inflight = 0
+        self.peak_inflight = 0
+        self.first = None
+        self.last = None
+
+    def as_dict(self) -> dict:
+        span = (self.last - self.first) if self.first is not None and self.last is not None else 0.0
+        return {
+            "received": self.received,
+            "statusCodes": {str(k): v for k, v in sorted(self.statuses.items())},
+            "peakInflight": self.peak_inflight,
+            "seconds": span,
+            "throughput": self.received / span if span else 0.0,
+        }
+
+
+def create_app(args, stats: PushStats) -> web.Application:
+    async def push(request):
+        endpoint_id = request.match_info["id"]
+        await request.read()
+        now = time.perf_counter()
+        stats.first = now if stats.first is None else stats.first
+        stats.received += 1
+        stats.inflight += 1
+        stats.peak_inflight = max(stats.peak_inflight, stats.inflight)
+        try:
+            if args.max_inflight and stats.inflight > args.max_inflight:
+                status, headers = 429, {"Retry-After": "1"}
+            else:
+                await asyncio.sleep(max(0.0, random.gauss(args.latency_ms, args.jitter_ms)) / 1000)
+                b = bucket(endpoint_id)
+                if b < args.gone_rate:
+                    status, headers = 410, {}
+                elif b < args.gone_rate + args.missing_rate:
+                    status, headers = 404, {}
+                elif random.random() < args.fail_rate:
+                    status, headers = 503, {}
+                else:
+                    status, headers = 201, {"Location": f"/messages/{endpoint_id}-{stats.received}"}
+            stats.statuses[status] += 1
+            return web.Response(status=status, headers=headers)
+        finally:
+            stats.inflight -= 1
+            stats.last = time.perf_counter()
+
+    async def get_stats(request):
+        return web.json_response(stats.as_dict())
+
+    async def reset_stats(request):
+        stats.reset()
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_post("/push/{id}", push)
+    app.router.add_get("/_stats", get_stats)
+    app.router.add_delete("/_stats", reset_stats)
+    return app
+
+
+def self_signed_context() -> ssl.SSLContext:
+    directory = tempfile.mkdtemp(prefix="local-push-")
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "2",
+         "-subj", "/CN=127.0.0.1", "-keyout", key, "-out", cert],
+        check=True, capture_output=True,
+    )
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+def serve(args) -> int:
+    stats = PushStats()
+    print(f"Fake push service on {endpoint_base(args.port)}<n>")
+    web.run_app(create_app(args, stats), host="127.0.0.1", port=args.port, ssl_context=self_signed_context(),
+                access_log=None, backlog=4096)
+    return 0
+
+
+async def seed(args) -> int:
+    base = endpoint_base(args.port)
+    async with NeonHttp() as db:
+        await db.query("DELETE FROM push_subscriptions WHERE subscription->>'endpoint' LIKE $1 || '%'", [base])
+        started = time.perf_counter()
+        for lo in range(1, args.endpoints + 1, CHUNK):
+            hi = min(lo + CHUNK - 1, args.endpoints)
+            await db.query(
+                """
+                INSERT INTO push_subscriptions (id, "userId", subscription, is_pwa_installed)
+                SELECT gen_random_uuid()::text, NULL,
+                       jsonb_build_object('endpoint', $1 || g, 'keys', jsonb_build_object('p256dh', $2, 'auth', $3)),
+                       g % 2 = 0
+                FROM generate_series($4::int, $5::int) AS g
+                """,
+                [base, P256DH, AUTH, lo, hi],
+            )
+    print(f"Seeded {args.endpoints} subscriptions for {base} in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+async def bench(args) -> dict:
+    fake = f"https://127.0.0.1:{args.port}"
+    connector = aiohttp.TCPConnector(ssl=False)
+    async with aiohttp.ClientSession(connector=connector) as plain:
+        async with plain.delete(f"{fake}/_stats"):
+            pass
+        admin = session_for(connector, timeout=args.timeout)
+        try:
+            if not await login(admin, args.base_url, ADMIN_LOGIN, ADMIN_PASSWORD):
+                raise SystemExit(f"Could not log in as {ADMIN_LOGIN}")
+            started = time.perf_counter()
+            async with admin.post(f"{args.base_url}/api/notifications/send", json={
+                "title": "Benchmark", "body": "local_push.py", "url": "/",
+                "targetPwa": True, "targetBrowser": True,
+            }) as resp:
+                status = resp.status
+                body = await resp.json(content_type=None)
+            elapsed = time.perf_counter() - started
+        finally:
+            await admin.close()
+        async with plain.get(f"{fake}/_stats") as resp:
+            received = await resp.json()
+
+    route = body.get("stats") or {}
+    batch_ms = sorted(b["ms"] for b in route.get("batches", []))
+    return {
+        "status": status,
+        "message": body.get("message"),
+        "elapsedSeconds": elapsed,
+        "route": route,
+        "batchMsP50": percentile(batch_ms, 50),
+        "batchMsP95": percentile(batch_ms, 95),
+        "sentPerSecond": route.get("sent", 0) / elapsed if elapsed else 0.0,
+        "pushService": received,
+    }
+
+
+def print_bench(result: dict) -> None:
+    route = result["route"]
+    print(f"\nHTTP {result['status']}: {result['message']}")
+    print_table([{
+        "total": route.get("total", 0), "sent": route.get("sent", 0), "failed": route.get("failed", 0),
+        "expired": route.get("expired", 0), "pruned": route.get("pruned", 0), "retries": route.get("retries", 0),
+        "batches": len(route.get("batches", [])), "batch p50": result["batchMsP50"],
+        "batch p95": result["batchMsP95"], "sent/s": result["sentPerSecond"],
+    }], ["total", "sent", "failed", "expired", "pruned", "retries", "batches", "batch p50", "batch p95", "sent/s"],
+        title=f"Fan-out in {result['elapsedSeconds']:.1f}s (batch times in ms)")
+    service = result["pushService"]
+    print_table([{
+        "received": service["received"], "peak inflight": service["peakInflight"],
+        "req/s": service["throughput"], "status codes": service["statusCodes"],
+    }], ["received", "peak inflight", "req/s", "status codes"], title="Fake push service")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Fake Web Push service and fan-out benchmark.")
+    parser.add_argument("--port", type=int, default=8077)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_serve = sub.add_parser("serve", help="run the fake push service")
+    p_serve.add_argument("--latency-ms", type=float, default=50.0, help="mean response latency")
+    p_serve.add_argument("--jitter-ms", type=float, default=20.0, help="latency standard deviation")
+    p_serve.add_argument("--fail-rate", type=float, default=0.01, help="share of requests answered 503")
+    p_serve.add_argument("--gone-rate", type=float, default=0.05, help="share of endpoints answering 410")
+    p_serve.add_argument("--missing-rate", type=float, default=0.01, help="share of endpoints answering 404")
+    p_serve.add_argument("--max-inflight", type=int, default=0, help="answer 429 above this many concurrent requests")
+
+    p_seed = sub.add_parser("seed", help="insert push_subscriptions rows for the fake service")
+    p_seed.add_argument("--endpoints", type=int, default=100_000)
+
+    p_bench = sub.add_parser("bench", help="trigger the admin fan-out and report its stats")
+    p_bench.add_argument("--base-url", default=os.environ.get("LOAD_BASE_URL", "http://127.0.0.1:3000"))
+    p_bench.add_argument("--timeout", type=float, default=900.0, help="seconds to wait for the fan-out")
+    p_bench.add_argument("--out", help="write the JSON report here")
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        return serve(args)
+    if args.command == "seed":
+        return asyncio.run(seed(args))
+
+    args.base_url = args.base_url.rstrip("/")
+    result = asyncio.run(bench(args))
+    print_bench(result)
+    if args.out:
+        write_report(args.out, "local_push", {k: v for k, v in vars(args).items() if k != "out"}, result)
+        print(f"Report written to {args.out}")
+    return 0 if result["status"] == 200 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,8 +7,11 @@ const withSerwist = withSerwistInit({
 });
 
 const nextConfig = {
-  productionBrowserSourceMaps: true,
+  // Maps double .next/static and publish the source; build with BROWSER_SOURCE_MAPS=1 to debug production
+  productionBrowserSourceMaps: process.env.BROWSER_SOURCE_MAPS === '1',
   images: {
+    // Picked per request from the Accept header, AVIF first
+    formats: ['image/avif', 'image/webp'],
     remotePatterns: [
       {
         protocol: 'https',
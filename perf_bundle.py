@@ -0,0 +1,319 @@
+"""Bundle and static asset budgets for a production build.
+
+Reads what `next build` printed (the route table, from a saved log or piped
+in) and what it left in .next (build manifests and emitted files), and
+records
+
+  * First Load JS per route and the JS shared by all routes,
+  * the middleware bundle,
+  * static asset bytes: .next/static by kind plus public/, with source maps
+    counted on their own since browsers only fetch them with devtools open.
+
+Sizes are in kB (1000 bytes). JS sizes are gzipped, as in Next's table;
+static asset bytes are as stored on disk. The route table is used for the
+route sizes when given; otherwise they are computed from the manifests.
+Any size over its budget fails the run, and the report is diffed against
+the baseline from the previous accepted build.
+
+    npm run build | tee build.log
+    python perf_bundle.py --log build.log --out reports/bundle.json
+    python perf_bundle.py --log build.log --update-baseline      # accept this build
+    python perf_bundle.py --budget firstLoad:/robert=190 --max-growth 5
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+from typing import Dict, Iterable, List, Optional, Set
+
+from perf_report import print_table, write_report
+
+DEFAULT_BASELINE = os.path.join("reports", "bundle-baseline.json")
+
+# kB. "firstLoad" applies to every route without a "firstLoad:<route>" entry;
+# routes that ship no client JS (route handlers) are not checked.
+DEFAULT_BUDGETS_KB: Dict[str, float] = {
+    "firstLoad": 120,
+    "firstLoad:/robert": 180,
+    "shared": 95,
+    "middleware": 85,
+    "static": 6000,
+}
+
+ANSI = re.compile(r"\x1b\[[0-9;]*m")
+SIZE = r"([\d.]+\s*[kMG]?B)"
+TABLE_ROW = re.compile(rf"^[┌├└]\s+\S\s+(/\S*)\s+{SIZE}\s+{SIZE}\s*$")
+SHARED_ROW = re.compile(rf"^\+ First Load JS shared by all\s+{SIZE}")
+MIDDLEWARE_ROW = re.compile(rf"^\S\s+Middleware\s+{SIZE}")
+UNITS = {"B": 0.001, "kB": 1.0, "MB": 1000.0, "GB": 1000.0 * 1000}
+
+# Entries of the pages-router manifest that are not routes
+PAGES_INTERNAL = {"/_app", "/_document", "/_error"}
+
+
+def parse_size(text: str) -> float:
+    value, unit = re.match(r"([\d.]+)\s*([kMG]?B)", text).groups()
+    return float(value) * UNITS[unit]
+
+
+def parse_route_table(lines: Iterable[str]) -> dict:
+    """Routes, shared JS and middleware from `next build` output, in kB."""
+    routes: Dict[str, dict] = {}
+    shared: Optional[float] = None
+    middleware: Optional[float] = None
+    for raw in lines:
+        line = ANSI.sub("", raw.rstrip("\n"))
+        match = TABLE_ROW.match(line)
+        if match:
+            route, size, first_load = match.groups()
+            routes[route] = {"sizeKB": parse_size(size), "firstLoadKB": parse_size(first_load)}
+            continue
+        match = SHARED_ROW.match(line)
+        if match:
+            # The pages router prints its own shared line; the larger one bounds both
+            shared = max(shared or 0.0, parse_size(match.group(1)))
+            continue
+        match = MIDDLEWARE_ROW.match(line)
+        if match:
+            middleware = parse_size(match.group(1))
+    return {"routes": routes, "sharedKB": shared, "middlewareKB": middleware}
+
+
+class BuildDir:
+    """Gzipped file sizes under a .next directory, each file compressed once."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._gzip: Dict[str, int] = {}
+
+    def load(self, name: str) -> Optional[dict]:
+        full = os.path.join(self.path, name)
+        if not os.path.exists(full):
+            return None
+        with open(full) as f:
+            return json.load(f)
+
+    def gzip_size(self, name: str) -> int:
+        if name not in self._gzip:
+            with open(os.path.join(self.path, name), "rb") as f:
+                self._gzip[name] = len(gzip.compress(f.read(), compresslevel=9))
+        return self._gzip[name]
+
+    def kb(self, files: Iterable[str]) -> float:
+        return sum(self.gzip_size(name) for name in set(files)) / 1000
+
+
+def app_route(entry: str) -> str:
+    """'/(feed)/admin/page' -> '/admin'. Route groups and parallel slots are not in the URL."""
+    segments = [s for s in entry.split("/")[1:-1] if not s.startswith("(") and not s.startswith("@")]
+    return "/" + "/".join(segments)
+
+
+def layout_chain(entry: str, pages: Dict[str, List[str]]) -> List[str]:
+    """Manifest keys of the layouts wrapping an app page entry, outermost first."""
+    segments = entry.split("/")[1:-1]
+    keys = ["/".join([""] + segments[:depth] + ["layout"]) for depth in range(len(segments) + 1)]
+    return [key for key in keys if key in pages]
+
+
+def routes_from_manifests(build: BuildDir) -> dict:
+    """First Load JS per route the way the route table counts it, from the build manifests."""
+    build_manifest = build.load("build-manifest.json") or {}
+    app_pages: Dict[str, List[str]] = (build.load("app-build-manifest.json") or {}).get("pages", {})
+    root_main = [f for f in build_manifest.get("rootMainFiles", []) if f.endswith(".js")]
+
+    route_files: Dict[str, Set[str]] = {}
+    for entry, files in app_pages.items():
+        if not entry.endswith("/page"):
+            continue
+        chunks = set(root_main)
+        for key in layout_chain(entry, app_pages) + [entry]:
+            chunks.update(f for f in app_pages[key] if f.endswith(".js"))
+        route_files[app_route(entry)] = chunks
+
+    pages: Dict[str, List[str]] = build_manifest.get("pages", {})
+    app_chunks = [f for f in pages.get("/_app", []) if f.endswith(".js")]
+    for route, files in pages.items():
+        if route not in PAGES_INTERNAL:
+            route_files.setdefault(route, set(app_chunks) | {f for f in files if f.endswith(".js")})
+
+    if not route_files:
+        return {"routes": {}, "sharedKB": None}
+    shared = set.intersection(*route_files.values())
+    routes = {
+        route: {"sizeKB": build.kb(files - shared), "firstLoadKB": build.kb(files)}
+        for route, files in sorted(route_files.items())
+    }
+    return {"routes": routes, "sharedKB": build.kb(shared)}
+
+
+def middleware_from_manifest(build: BuildDir) -> Optional[float]:
+    manifest = build.load(os.path.join("server", "middleware-manifest.json")) or {}
+    files = [f for entry in manifest.get("middleware", {}).values() for f in entry.get("files", [])]
+    files = [f for f in files if os.path.exists(os.path.join(build.path, f))]
+    return build.kb(files) if files else None
+
+
+def directory_bytes(path: str) -> Dict[str, int]:
+    """Bytes under ``path`` by kind: js, css, media, sourceMaps, other."""
+    totals = {"js": 0, "css": 0, "media": 0, "sourceMaps": 0, "other": 0}
+    for root, _, files in os.walk(path):
+        for name in files:
+            size = os.path.getsize(os.path.join(root, name))
+            if name.endswith(".map"):
+                kind = "sourceMaps"
+            elif name.endswith((".js", ".mjs")):
+                kind = "js"
+            elif name.endswith(".css"):
+                kind = "css"
+            elif os.path.basename(root) == "media" or name.endswith((".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico",
+                                                                     ".webp", ".avif", ".woff", ".woff2")):
+                kind = "media"
+            else:
+                kind = "other"
+            totals[kind] += size
+    return totals
+
+
+def static_assets(next_dir: str, public_dir: str) -> dict:
+    emitted = directory_bytes(os.path.join(next_dir, "static"))
+    public = directory_bytes(public_dir)
+    maps = emitted.pop("sourceMaps") + public.pop("sourceMaps")
+    result = {f"{kind}KB": size / 1000 for kind, size in emitted.items()}
+    result["publicKB"] = sum(public.values()) / 1000
+    result["sourceMapsKB"] = maps / 1000
+    result["totalKB"] = (sum(emitted.values()) + sum(public.values())) / 1000
+    return result
+
+
+def analyse(args) -> dict:
+    build = BuildDir(args.next_dir)
+    has_build = os.path.isdir(args.next_dir)
+    table = None
+    if args.log:
+        if args.log == "-":
+            table = parse_route_table(sys.stdin)
+        else:
+            with open(args.log, encoding="utf-8") as f:
+                table = parse_route_table(f)
+        if not table["routes"]:
+            raise SystemExit(f"No route table found in {args.log}")
+    elif not has_build:
+        raise SystemExit(f"Neither a build log (--log) nor a build directory ({args.next_dir}) to read")
+
+    if table is not None:
+        results = {"routes": table["routes"], "sharedKB": table["sharedKB"], "middlewareKB": table["middlewareKB"],
+                   "source": "route table"}
+    else:
+        results = {**routes_from_manifests(build), "middlewareKB": None, "source": "manifests"}
+    if has_build:
+        if results["middlewareKB"] is None:
+            results["middlewareKB"] = middleware_from_manifest(build)
+        results["static"] = static_assets(args.next_dir, args.public_dir)
+    return results
+
+
+def measured(results: dict) -> Dict[str, float]:
+    """Every budgeted size of a report's results, keyed like the budgets."""
+    values = {f"firstLoad:{route}": r["firstLoadKB"] for route, r in results.get("routes", {}).items()
+              if r["firstLoadKB"] > 0}
+    for key, value in (("shared", results.get("sharedKB")), ("middleware", results.get("middlewareKB")),
+                       ("static", results.get("static", {}).get("totalKB"))):
+        if value is not None:
+            values[key] = value
+    return values
+
+
+def budget_for(key: str, budgets: Dict[str, float]) -> Optional[float]:
+    if key in budgets:
+        return budgets[key]
+    if key.startswith("firstLoad:"):
+        return budgets.get("firstLoad")
+    return None
+
+
+def compare(current: dict, baseline: Optional[dict], budgets: Dict[str, float], max_growth: Optional[float]):
+    """One row per measured size, with its budget and change from the baseline; and the failures."""
+    before = measured(baseline["results"]) if baseline else {}
+    rows, failures = [], []
+    for key, kb in sorted(measured(current).items()):
+        budget = budget_for(key, budgets)
+        old = before.get(key)
+        delta = None if old is None else kb - old
+        flag = ""
+        if budget is not None and kb > budget:
+            flag = "OVER"
+            failures.append(f"{key} {kb:.1f} kB > {budget:g} kB")
+        elif max_growth is not None and old and delta / old * 100 > max_growth:
+            flag = "GREW"
+            failures.append(f"{key} grew {delta:+.1f} kB ({delta / old * 100:+.1f}%) since the baseline")
+        rows.append({
+            "size": key, "kB": kb, "budget": "-" if budget is None else budget,
+            "baseline": "-" if old is None else old, "delta": "-" if delta is None else f"{delta:+.1f}", "": flag,
+        })
+    gone = sorted(set(before) - set(measured(current)))
+    return rows, failures, gone
+
+
+def load_baseline(path: str) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check a production build against bundle and asset budgets.")
+    parser.add_argument("--log", help="saved `next build` output, or - to read it from stdin")
+    parser.add_argument("--next-dir", default=".next", help="build output directory")
+    parser.add_argument("--public-dir", default="public")
+    parser.add_argument("--budget", action="append", default=[], metavar="KEY=KB",
+                        help="override a budget (repeatable): firstLoad, firstLoad:<route>, shared, middleware, static")
+    parser.add_argument("--no-budgets", action="store_true", help="record sizes without enforcing budgets")
+    parser.add_argument("--max-growth", type=float, metavar="PCT",
+                        help="also fail when a size grew more than PCT%% over the baseline")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="report of the previous accepted build")
+    parser.add_argument("--update-baseline", action="store_true", help="store this build as the new baseline")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    budgets = {} if args.no_budgets else dict(DEFAULT_BUDGETS_KB)
+    for item in args.budget:
+        key, _, kb = item.partition("=")
+        try:
+            budgets[key] = float(kb)
+        except ValueError:
+            parser.error(f"invalid --budget {item!r}, expected KEY=KB")
+
+    results = analyse(args)
+    baseline = load_baseline(args.baseline)
+    rows, failures, gone = compare(results, baseline, budgets, args.max_growth)
+    since = f" against baseline {baseline.get('revision')}" if baseline else " (no baseline yet)"
+    print_table(rows, ["size", "kB", "budget", "baseline", "delta", ""],
+                title=f"Bundle sizes from the {results['source']}{since}")
+    static = results.get("static")
+    if static:
+        print(f"\nstatic assets: js {static['jsKB']:.1f} kB, css {static['cssKB']:.1f} kB, "
+              f"media {static['mediaKB']:.1f} kB, public {static['publicKB']:.1f} kB, "
+              f"source maps {static['sourceMapsKB']:.1f} kB (not in the total)")
+    if gone:
+        print("no longer built: " + ", ".join(gone))
+
+    config = {"log": args.log, "nextDir": args.next_dir, "budgetsKB": budgets, "maxGrowth": args.max_growth}
+    if args.out:
+        write_report(args.out, "perf_bundle", config, results)
+        print(f"Report written to {args.out}")
+    if failures:
+        print("\nBudget check failed:\n  " + "\n  ".join(failures))
+    if args.update_baseline:
+        write_report(args.baseline, "perf_bundle", config, results)
+        print(f"Baseline updated: {args.baseline}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""Minimal SQL-over-HTTP client for the load_*.py tools.
+
+Talks the same HTTP protocol as @neondatabase/serverless, so it works against
+Neon itself and against the local Neon proxy started by local_stack.py
+(NEON_FETCH_ENDPOINT). Only needs aiohttp.
+
+    async with NeonHttp() as db:
+        rows = await db.query('SELECT "likeCount" FROM slides WHERE id = $1', [slide_id])
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, List, Optional, Sequence
+from urllib.parse import urlparse
+
+import aiohttp
+
+
+class NeonHttpError(Exception):
+    pass
+
+
+class NeonHttp:
+    def __init__(self, database_url: Optional[str] = None, endpoint: Optional[str] = None, timeout: float = 120.0):
+        self.database_url = database_url or os.environ.get("DATABASE_URL")
+        if not self.database_url:
+            raise NeonHttpError("DATABASE_URL is not set")
+        self.endpoint = endpoint or os.environ.get("NEON_FETCH_ENDPOINT") or \
+            f"https://{urlparse(self.database_url).hostname}/sql"
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "NeonHttp":
+        self._session = aiohttp.ClientSession(timeout=self.timeout, headers={
+            "Neon-Connection-String": self.database_url,
+            "Neon-Raw-Text-Output": "true",
+        })
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    async def _post(self, payload: dict, headers: Optional[dict] = None) -> dict:
+        if self._session is None:
+            raise NeonHttpError("use NeonHttp as an async context manager")
+        async with self._session.post(self.endpoint, json=payload, headers=headers or {}) as resp:
+            body = await resp.json(content_type=None)
+            if resp.status != 200:
+                message = body.get("message") if isinstance(body, dict) else body
+                raise NeonHttpError(f"{resp.status}: {message}")
+            return body
+
+    async def query(self, sql: str, params: Sequence[Any] = ()) -> List[dict]:
+        """Rows as dicts of text values (cast in SQL or in the caller)."""
+        body = await self._post({"query": sql, "params": list(params)})
+        return body.get("rows", [])
+
+    async def scalar(self, sql: str, params: Sequence[Any] = ()) -> Optional[str]:
+        rows = await self.query(sql, params)
+        if not rows:
+            return None
+        return next(iter(rows[0].values()))
+
+    async def transaction(self, queries: Sequence[tuple]) -> List[List[dict]]:
+        """Run (sql, params) pairs in one transaction."""
+        body = await self._post(
+            {"queries": [{"query": sql, "params": list(params)} for sql, params in queries]},
+            headers={"Neon-Batch-Isolation-Level": "ReadCommitted"},
+        )
+        return [result.get("rows", []) for result in body.get("results", [])]
@@ -0,0 +1,187 @@
+"""Server-side query metrics for load runs.
+
+Wraps any load_*.py command: snapshots /api/metrics?format=json (lib/metrics.ts)
+before the run, samples it while the command runs, and merges the difference
+into the command's JSON report under results.serverMetrics, so
+``perf_report.py diff`` compares database work as well as client latency:
+
+  * per query name (db function for the neon path, Model.operation for Prisma):
+    calls, errors, timeouts, retries, rows, mean and histogram p50/p95,
+  * attempts that hit the query timeout, peak queries per second,
+  * slow queries logged during the run.
+
+    python perf_metrics.py --out reports/feed.json -- python load_feed.py --out reports/feed.json
+    python perf_metrics.py                    # print the current counters
+
+METRICS_TOKEN is sent as a bearer token when set (required in production).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+
+from perf_report import print_table
+
+Key = Tuple[str, str]  # (source, name)
+
+
+async def scrape(session: aiohttp.ClientSession, url: str, token: Optional[str]) -> dict:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    async with session.get(url, params={"format": "json"}, headers=headers) as resp:
+        if resp.status == 401:
+            raise SystemExit("Metrics route refused the request; set METRICS_TOKEN")
+        resp.raise_for_status()
+        return await resp.json()
+
+
+def by_key(snapshot: dict) -> Dict[Key, dict]:
+    return {(q["source"], q["name"]): q for q in snapshot.get("db", {}).get("queries", [])}
+
+
+def total_queries(snapshot: dict) -> int:
+    return sum(q["count"] for q in snapshot.get("db", {}).get("queries", []))
+
+
+def histogram_percentile(buckets: List[Tuple[float, float]], p: float) -> float:
+    """Percentile from cumulative (upper bound, count) pairs, interpolating inside the bucket."""
+    total = buckets[-1][1] if buckets else 0
+    if not total:
+        return 0.0
+    rank = total * p / 100
+    lower_bound, lower_count = 0.0, 0.0
+    for bound, count in buckets:
+        if count >= rank:
+            if bound == float("inf"):
+                return lower_bound
+            share = (rank - lower_count) / (count - lower_count) if count > lower_count else 1.0
+            return lower_bound + (bound - lower_bound) * share
+        lower_bound, lower_count = bound, count
+    return lower_bound
+
+
+def query_delta(before: Optional[dict], after: dict) -> dict:
+    # A restarted server starts from zero
+    if before and before["count"] > after["count"]:
+        before = None
+
+    def diff(field: str) -> float:
+        return after.get(field, 0) - (before.get(field, 0) if before else 0)
+
+    count = diff("count")
+    sum_ms = after["meanMs"] * after["count"] - (before["meanMs"] * before["count"] if before else 0)
+    buckets = sorted(
+        ((float(bound), n - (before["buckets"].get(bound, 0) if before else 0)) for bound, n in after["buckets"].items()),
+        key=lambda item: item[0],
+    )
+    return {
+        "calls": count,
+        "errors": diff("error"),
+        "timeouts": diff("timeout"),
+        "retries": diff("retries"),
+        "rows": diff("rows"),
+        "meanMs": sum_ms / count if count else 0.0,
+        "p50Ms": histogram_percentile(buckets, 50),
+        "p95Ms": histogram_percentile(buckets, 95),
+    }
+
+
+def run_delta(before: dict, after: dict, started_iso: str, peak_qps: float) -> dict:
+    old = by_key(before)
+    queries = {}
+    for key, entry in by_key(after).items():
+        delta = query_delta(old.get(key), entry)
+        if delta["calls"]:
+            queries[f"{key[0]}:{key[1]}"] = delta
+    timeouts = after["db"]["timeouts"] - before["db"]["timeouts"]
+    return {
+        "queries": queries,
+        "totalQueries": sum(q["calls"] for q in queries.values()),
+        "timeouts": timeouts if timeouts >= 0 else after["db"]["timeouts"],
+        "peakQueriesPerSecond": peak_qps,
+        "slowQueryMs": after["db"]["slowQueryMs"],
+        "slowQueries": [s for s in after["db"]["slow"] if s["at"] >= started_iso],
+    }
+
+
+def print_delta(delta: dict, top: int) -> None:
+    rows = sorted(delta["queries"].items(), key=lambda item: item[1]["calls"] * item[1]["meanMs"], reverse=True)
+    print_table([{"query": name, **q} for name, q in rows[:top]],
+                ["query", "calls", "errors", "timeouts", "retries", "rows", "meanMs", "p50Ms", "p95Ms"],
+                title=f"Server queries ({delta['totalQueries']:.0f} total, peak {delta['peakQueriesPerSecond']:.1f}/s)")
+    if delta["slowQueries"]:
+        print(f"\n{len(delta['slowQueries'])} slow queries (>= {delta['slowQueryMs']} ms), e.g. "
+              + ", ".join(f"{s['name']} {s['ms']}ms" for s in delta["slowQueries"][:5]))
+
+
+def merge_into_report(path: str, delta: dict) -> None:
+    with open(path) as f:
+        report = json.load(f)
+    report.setdefault("results", {})["serverMetrics"] = delta
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+async def collect(args, command: List[str]) -> int:
+    url = f"{args.base_url}/api/metrics"
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
+        before = await scrape(session, url, args.token)
+        if not command:
+            print_delta(run_delta({"db": {"queries": [], "timeouts": 0}}, before, "", 0.0), args.top)
+            return 0
+
+        started_iso = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime())
+        process = await asyncio.create_subprocess_exec(*command)
+        peak, last_total, last_time = 0.0, total_queries(before), time.perf_counter()
+        while process.returncode is None:
+            try:
+                await asyncio.wait_for(process.wait(), args.interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                sample = await scrape(session, url, args.token)
+            except aiohttp.ClientError:
+                continue
+            now, total = time.perf_counter(), total_queries(sample)
+            if total >= last_total and now > last_time:
+                peak = max(peak, (total - last_total) / (now - last_time))
+            last_total, last_time = total, now
+
+        after = await scrape(session, url, args.token)
+
+    delta = run_delta(before, after, started_iso, peak)
+    print_delta(delta, args.top)
+    if args.out and os.path.exists(args.out):
+        merge_into_report(args.out, delta)
+        print(f"Server metrics merged into {args.out}")
+    elif args.out:
+        print(f"{args.out} was not written by the command; nothing to merge into")
+    return process.returncode
+
+
+def main() -> int:
+    argv = sys.argv[1:]
+    command: List[str] = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, command = argv[:split], argv[split + 1:]
+
+    parser = argparse.ArgumentParser(description="Scrape server query metrics around a load run.")
+    parser.add_argument("--base-url", default=os.environ.get("LOAD_BASE_URL", "http://127.0.0.1:3000"))
+    parser.add_argument("--token", default=os.environ.get("METRICS_TOKEN"))
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds between samples during the run")
+    parser.add_argument("--top", type=int, default=20, help="queries to print")
+    parser.add_argument("--out", help="the command's JSON report to merge serverMetrics into")
+    args = parser.parse_args(argv)
+    args.base_url = args.base_url.rstrip("/")
+    return asyncio.run(collect(args, command))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""Latency statistics and JSON run reports shared by the load_*.py tools.
+
+Reports are plain JSON so two runs can be diffed:
+
+    python perf_report.py diff before.json after.json
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, Iterable, List, Optional
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class LatencyStats:
+    """Latencies (ms), errors and payload bytes for one measured operation."""
+
+    def __init__(self) -> None:
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.bytes = 0
+        self.status_codes: Dict[str, int] = {}
+
+    def add(self, ms: float, ok: bool = True, status: Optional[int] = None, nbytes: int = 0) -> None:
+        self.latencies.append(ms)
+        self.bytes += nbytes
+        if not ok:
+            self.errors += 1
+        if status is not None:
+            key = str(status)
+            self.status_codes[key] = self.status_codes.get(key, 0) + 1
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies)
+
+    def summary(self, elapsed: Optional[float] = None) -> dict:
+        values = sorted(self.latencies)
+        out = {
+            "count": self.count,
+            "errors": self.errors,
+            "errorRate": self.errors / self.count if self.count else 0.0,
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+            "mean": sum(values) / len(values) if values else 0.0,
+            "max": values[-1] if values else 0.0,
+            "bytes": self.bytes,
+            "statusCodes": self.status_codes,
+        }
+        if elapsed:
+            out["throughput"] = self.count / elapsed
+        return out
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def write_report(path: str, tool: str, config: dict, results: dict) -> dict:
+    report = {
+        "tool": tool,
+        "startedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "revision": git_revision(),
+        "config": config,
+        "results": results,
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    return report
+
+
+def print_table(rows: Iterable[dict], columns: List[str], title: Optional[str] = None) -> None:
+    rows = list(rows)
+    if title:
+        print(f"\n{title}")
+    if not rows:
+        print("  (no data)")
+        return
+
+    def fmt(value) -> str:
+        if isinstance(value, float):
+            return f"{value:.4f}" if value < 1 else f"{value:.1f}"
+        return str(value)
+
+    cells = [[fmt(row.get(col, "")) for col in columns] for row in rows]
+    widths = [max(len(col), *(len(c[i]) for c in cells)) for i, col in enumerate(columns)]
+    print("  ".join(col.rjust(w) for col, w in zip(columns, widths)))
+    for c in cells:
+        print("  ".join(v.rjust(w) for v, w in zip(c, widths)))
+
+
+def _flatten(prefix: str, value, out: Dict[str, float]) -> None:
+    if isinstance(value, dict):
+        for key, inner in value.items():
+            _flatten(f"{prefix}.{key}" if prefix else key, inner, out)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        out[prefix] = float(value)
+
+
+def diff_reports(before: dict, after: dict) -> List[dict]:
+    """Numeric leaves of two reports' results, with relative change."""
+    a: Dict[str, float] = {}
+    b: Dict[str, float] = {}
+    _flatten("", before.get("results", {}), a)
+    _flatten("", after.get("results", {}), b)
+    rows = []
+    for key in sorted(set(a) | set(b)):
+        old, new = a.get(key), b.get(key)
+        change = None
+        if old not in (None, 0) and new is not None:
+            change = (new - old) / old
+        rows.append({"metric": key, "before": old, "after": new, "change": change})
+    return rows
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) != 3 or argv[0] != "diff":
+        print("usage: python perf_report.py diff BEFORE.json AFTER.json")
+        return 2
+    with open(argv[1]) as f:
+        before = json.load(f)
+    with open(argv[2]) as f:
+        after = json.load(f)
+    rows = []
+    for row in diff_reports(before, after):
+        change = row["change"]
+        rows.append({
+            "metric": row["metric"],
+            "before": "-" if row["before"] is None else row["before"],
+            "after": "-" if row["after"] is None else row["after"],
+            "change": "-" if change is None else f"{change * 100:+.1f}%",
+        })
+    print_table(rows, ["metric", "before", "after", "change"],
+                title=f"{before.get('tool')} {before.get('revision')} -> {after.get('revision')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,249 @@
+"""Client-side profiler for the FeedSwiper scroll.
+
+Opens the feed in one of the verify_harness context profiles (the iPhone
+viewport from verify_ui.py by default), swipes through N slides with the
+keyboard and, for every transition, records
+  * time to first video frame of the newly active slide (requestVideoFrameCallback),
+  * dropped frames and long tasks between the swipe and that first frame,
+  * JS heap and DOM node count (CDP Performance.getMetrics, after a forced GC),
+  * live <video> elements (in the DOM / still reachable) and open MediaSources,
+    i.e. hls.js instances that are attached and not yet destroyed.
+
+The whole run is also captured as a Chrome trace that opens in Perfetto,
+chrome://tracing or speedscope as a flamegraph:
+
+    python profile_feed.py --slides 30
+    python profile_feed.py --profile mobile --out reports/scroll.json --trace verification/scroll_trace.json
+
+Growing "alive" counts or heap across the run mean players are leaking;
+dropped frames and long tasks on a transition are the jank users see.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from typing import List, Optional
+
+from playwright.async_api import Page, async_playwright
+
+from perf_report import percentile, print_table, write_report
+from verify_harness import BASE_URL, PROFILES, screenshot_path, storage_state
+from verify_waits import (StepLog, current_step_log, feed_ready, goto_feed, preloader_detached, server_ready,
+                          slide_change, use_step_log)
+
+# Installed before any app script runs.
+PROBE_SCRIPT = """
+(() => {
+  const probe = window.__feedProbe = { frames: [], longTasks: [], videos: [], mediaSources: [] };
+
+  const tick = (t) => {
+    probe.frames.push(t);
+    if (probe.frames.length > 20000) probe.frames.splice(0, 10000);
+    requestAnimationFrame(tick);
+  };
+  requestAnimationFrame(tick);
+
+  try {
+    new PerformanceObserver((list) => {
+      for (const e of list.getEntries()) probe.longTasks.push({ start: e.startTime, duration: e.duration });
+    }).observe({ type: 'longtask', buffered: true });
+  } catch (e) {}
+
+  // Every <video> React creates, held weakly so leaked players stay countable.
+  const createElement = Document.prototype.createElement;
+  Document.prototype.createElement = function (tag, options) {
+    const el = createElement.call(this, tag, options);
+    if (String(tag).toLowerCase() === 'video') probe.videos.push(new WeakRef(el));
+    return el;
+  };
+
+  // hls.js attaches through MediaSource: one open MediaSource per live Hls instance.
+  if (window.MediaSource) {
+    const Native = window.MediaSource;
+    window.MediaSource = class extends Native {
+      constructor(...args) {
+        super(...args);
+        probe.mediaSources.push(new WeakRef(this));
+      }
+    };
+  }
+
+  probe.counts = () => {
+    const alive = probe.videos.map((r) => r.deref()).filter(Boolean);
+    const sources = probe.mediaSources.map((r) => r.deref()).filter(Boolean);
+    return {
+      videosInDom: document.querySelectorAll('video').length,
+      videosAlive: alive.length,
+      mediaSourcesOpen: sources.filter((s) => s.readyState !== 'closed').length,
+    };
+  };
+
+  probe.window = (since, until, refreshMs) => {
+    const frames = probe.frames.filter((t) => t >= since && t <= until);
+    let dropped = 0;
+    for (let i = 1; i < frames.length; i++) {
+      dropped += Math.max(0, Math.round((frames[i] - frames[i - 1]) / refreshMs) - 1);
+    }
+    const tasks = probe.longTasks.filter((t) => t.start + t.duration >= since && t.start <= until);
+    return {
+      frames: frames.length,
+      droppedFrames: dropped,
+      longTasks: tasks.length,
+      longTaskMs: tasks.reduce((sum, t) => sum + t.duration, 0),
+    };
+  };
+
+  // Resolves with ms from `since` to the first frame the active slide's video presents.
+  probe.firstFrame = (since, timeoutMs) => new Promise((resolve) => {
+    const video = document.querySelector('.swiper-slide-active video');
+    if (!video) return resolve(null);
+    const timer = setTimeout(() => resolve(-1), timeoutMs);
+    const done = (now) => { clearTimeout(timer); resolve(now - since); };
+    if ('requestVideoFrameCallback' in video) {
+      video.requestVideoFrameCallback((now) => done(now));
+    } else {
+      video.addEventListener('playing', () => done(performance.now()), { once: true });
+    }
+  });
+})();
+"""
+
+TRACE_CATEGORIES = [
+    "devtools.timeline",
+    "disabled-by-default-devtools.timeline",
+    "disabled-by-default-devtools.timeline.frame",
+    "v8.execute",
+    "disabled-by-default-v8.cpu_profiler",
+    "blink.user_timing",
+    "loading",
+    "latencyInfo",
+]
+
+# 60 Hz; used to turn gaps between animation frames into dropped frames
+REFRESH_MS = 1000 / 60
+
+
+async def heap_metrics(cdp, collect_garbage: bool) -> dict:
+    if collect_garbage:
+        await cdp.send("HeapProfiler.collectGarbage")
+    metrics = {m["name"]: m["value"] for m in (await cdp.send("Performance.getMetrics"))["metrics"]}
+    return {
+        "jsHeapUsedMB": metrics.get("JSHeapUsedSize", 0) / 2**20,
+        "domNodes": int(metrics.get("Nodes", 0)),
+        "listeners": int(metrics.get("JSEventListeners", 0)),
+    }
+
+
+async def profile_transition(page: Page, cdp, index: int, args) -> dict:
+    since = await page.evaluate("() => performance.now()")
+    real_index = await slide_change(page, lambda: page.keyboard.press("ArrowDown"))
+    transition_ms = current_step_log().steps[-1].ms
+    ttff = await page.evaluate("([since, timeout]) => window.__feedProbe.firstFrame(since, timeout)",
+                               [since, args.frame_timeout])
+    until = await page.evaluate("() => performance.now()")
+    window = await page.evaluate("([a, b, r]) => window.__feedProbe.window(a, b, r)", [since, until, REFRESH_MS])
+    heap = await heap_metrics(cdp, not args.no_gc)
+    counts = await page.evaluate("() => window.__feedProbe.counts()")
+    return {
+        "step": index,
+        "slide": real_index,
+        "transitionMs": transition_ms,
+        # None: no video on the slide, -1: no frame within --frame-timeout
+        "firstFrameMs": ttff,
+        **window,
+        **heap,
+        **counts,
+    }
+
+
+def summarize(rows: List[dict]) -> dict:
+    frames = sorted(r["firstFrameMs"] for r in rows if r["firstFrameMs"] is not None and r["firstFrameMs"] >= 0)
+    first, last = rows[0], rows[-1]
+    return {
+        "transitions": len(rows),
+        "firstFrameP50": percentile(frames, 50),
+        "firstFrameP95": percentile(frames, 95),
+        "firstFrameTimeouts": sum(1 for r in rows if r["firstFrameMs"] == -1),
+        "droppedFrames": sum(r["droppedFrames"] for r in rows),
+        "longTasks": sum(r["longTasks"] for r in rows),
+        "longTaskMs": sum(r["longTaskMs"] for r in rows),
+        "heapGrowthMB": last["jsHeapUsedMB"] - first["jsHeapUsedMB"],
+        "maxVideosAlive": max(r["videosAlive"] for r in rows),
+        "maxMediaSourcesOpen": max(r["mediaSourcesOpen"] for r in rows),
+    }
+
+
+async def profile(args) -> dict:
+    await server_ready(BASE_URL)
+    use_step_log(StepLog({}))
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=not args.headed,
+                                          args=["--autoplay-policy=no-user-gesture-required"])
+        context = await browser.new_context(storage_state=storage_state(), **PROFILES[args.profile])
+        await context.add_init_script(PROBE_SCRIPT)
+        page = await context.new_page()
+        cdp = await context.new_cdp_session(page)
+        await cdp.send("Performance.enable")
+        try:
+            await goto_feed(page, BASE_URL)
+            await preloader_detached(page)
+            await feed_ready(page)
+
+            await browser.start_tracing(page=page, path=args.trace, categories=TRACE_CATEGORIES)
+            rows = []
+            try:
+                for index in range(args.slides):
+                    rows.append(await profile_transition(page, cdp, index, args))
+            finally:
+                await browser.stop_tracing()
+        finally:
+            await context.close()
+            await browser.close()
+    return {"profile": args.profile, "summary": summarize(rows), "transitions": rows}
+
+
+def print_results(result: dict) -> None:
+    rows = []
+    for r in result["transitions"]:
+        ttff = r["firstFrameMs"]
+        rows.append({
+            "step": r["step"], "slide": r["slide"], "swipe": r["transitionMs"],
+            "1st frame": "-" if ttff is None else ("timeout" if ttff < 0 else ttff),
+            "dropped": r["droppedFrames"], "long tasks": r["longTasks"], "long ms": r["longTaskMs"],
+            "heap MB": r["jsHeapUsedMB"], "video dom": r["videosInDom"], "video alive": r["videosAlive"],
+            "mse open": r["mediaSourcesOpen"],
+        })
+    print_table(rows, ["step", "slide", "swipe", "1st frame", "dropped", "long tasks", "long ms", "heap MB",
+                       "video dom", "video alive", "mse open"],
+                title=f"FeedSwiper scroll, {result['profile']} profile (times in ms)")
+    s = result["summary"]
+    print(f"\nfirst frame p50 {s['firstFrameP50']:.0f}ms p95 {s['firstFrameP95']:.0f}ms "
+          f"({s['firstFrameTimeouts']} timeouts), {s['droppedFrames']} dropped frames, "
+          f"{s['longTasks']} long tasks ({s['longTaskMs']:.0f}ms), heap {s['heapGrowthMB']:+.1f}MB, "
+          f"max {s['maxVideosAlive']} videos alive / {s['maxMediaSourcesOpen']} MediaSources open")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile frame timing, video start and memory while scrolling the feed.")
+    parser.add_argument("--slides", type=int, default=20, help="number of swipes")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="iphone", help="verify_harness context profile")
+    parser.add_argument("--frame-timeout", type=float, default=10000, help="ms to wait for a video's first frame")
+    parser.add_argument("--no-gc", action="store_true", help="measure the heap without forcing a GC first")
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    parser.add_argument("--trace", default=None, help="Chrome trace output (default verification/feed_trace.json)")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args(argv)
+    args.trace = args.trace or screenshot_path("feed_trace.json")
+
+    result = asyncio.run(profile(args))
+    print_results(result)
+    print(f"Trace written to {args.trace} (open in https://ui.perfetto.dev or speedscope)")
+    if args.out:
+        write_report(args.out, "profile_feed", {k: v for k, v in vars(args).items() if k != "out"}, result)
+        print(f"Report written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
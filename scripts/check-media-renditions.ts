@@ -0,0 +1,70 @@
+import { prisma } from '../lib/prisma';
+import { attachMediaRenditions } from '../lib/db-postgres';
+
+// Checks attachMediaRenditions against a table holding a slide with empty
+// content (which used to fail the whole UPDATE): renditions land on every slide
+// playing the URL, or only on the slide id given, and a hand-set poster stays.
+// Uses the seeded author; the fixture slides are removed afterwards.
+//
+//   npm run media:check
+
+const AUTHOR_EMAIL = 'autor@autor.pl';
+const PREFIX = 'check-media-';
+
+function videoContent(mp4Url: string, poster = '') {
+  return JSON.stringify({ data: { mp4Url, hlsUrl: null, poster, title: 'Check', description: '' }, avatar: '' });
+}
+
+async function readData(id: string): Promise<{ hlsUrl?: string | null; poster?: string }> {
+  const slide = await prisma.slide.findUniqueOrThrow({ where: { id } });
+  return JSON.parse(slide.content || '{}').data || {};
+}
+
+async function main() {
+  const author = await prisma.user.findUnique({ where: { email: AUTHOR_EMAIL } });
+  if (!author) {
+    console.error(`❌ Author not found (${AUTHOR_EMAIL}). Run seed-test-accounts.ts first.`);
+    process.exit(1);
+  }
+
+  const run = Date.now().toString(36);
+  const mp4Url = `/uploads/${PREFIX}${run}.mp4`;
+  const renditions = { hlsUrl: `/uploads/${PREFIX}${run}/master.m3u8`, poster: `/uploads/${PREFIX}${run}/poster.jpg` };
+  const ids = { empty: `${PREFIX}${run}-empty`, first: `${PREFIX}${run}-a`, second: `${PREFIX}${run}-b`, posed: `${PREFIX}${run}-c` };
+  const failures: string[] = [];
+  const expect = (ok: boolean, message: string) => {
+    console.log(`${ok ? '✅' : '❌'} ${message}`);
+    if (!ok) failures.push(message);
+  };
+
+  try {
+    await prisma.slide.createMany({
+      data: [
+        { id: ids.empty, userId: author.id, content: '' },
+        { id: ids.first, userId: author.id, content: videoContent(mp4Url) },
+        { id: ids.second, userId: author.id, content: videoContent(mp4Url) },
+        { id: ids.posed, userId: author.id, content: videoContent(mp4Url, '/hand-picked.jpg') },
+      ],
+    });
+
+    const single = await attachMediaRenditions(mp4Url, renditions, ids.first);
+    expect(single === 1, `slide id given: ${single} slide(s) updated, expected 1`);
+    expect((await readData(ids.second)).hlsUrl == null, 'other slides with the URL left alone');
+
+    const all = await attachMediaRenditions(mp4Url, renditions);
+    expect(all === 3, `by URL next to empty content: ${all} slide(s) updated, expected 3`);
+    const first = await readData(ids.first);
+    expect(first.hlsUrl === renditions.hlsUrl && first.poster === renditions.poster, 'HLS ladder and poster attached');
+    expect((await readData(ids.posed)).poster === '/hand-picked.jpg', 'hand-set poster kept');
+    expect((await prisma.slide.findUniqueOrThrow({ where: { id: ids.empty } })).content === '', 'empty content untouched');
+  } catch (error) {
+    expect(false, `unexpected error: ${error instanceof Error ? error.message : error}`);
+  } finally {
+    await prisma.slide.deleteMany({ where: { id: { startsWith: `${PREFIX}${run}` } } });
+    await prisma.$disconnect();
+  }
+
+  process.exit(failures.length ? 1 : 0);
+}
+
+main();
@@ -0,0 +1,152 @@
+import { spawn } from 'child_process';
+import { mkdir, readFile, stat, writeFile } from 'fs/promises';
+import { basename, extname, join, relative, sep } from 'path';
+
+// Writes AVIF and WebP variants of static images under public/ at a few widths
+// into public/images, plus public/images/variants.json listing them by the
+// image's public URL. lib/image-variants.ts reads the manifest to render a
+// <picture> for images shown before next/image's optimizer is warm:
+//
+//   { "/icons/icon-512x512.png": { "width": 192, "height": 192, "alpha": true, "bytes": 7850,
+//       "variants": [{ "src": "/images/icon-512x512-192.avif", "type": "image/avif",
+//                      "width": 192, "height": 192, "bytes": 3100 }, ...] } }
+//
+//   npm run images:variants                        (needs ffmpeg and ffprobe on PATH)
+//   npm run images:variants -- public/some.png     (only the given images)
+//
+// Variants newer than their source are kept; pass --force to re-encode. The
+// output is committed: builds do not have ffmpeg.
+
+const FFMPEG = process.env.FFMPEG_PATH || 'ffmpeg';
+const FFPROBE = process.env.FFPROBE_PATH || 'ffprobe';
+const PUBLIC_DIR = join(process.cwd(), 'public');
+const OUT_DIR = join(PUBLIC_DIR, 'images');
+const MANIFEST = join(OUT_DIR, 'variants.json');
+
+// The Preloader logo: the first image on screen
+const SOURCES = ['public/icons/icon-512x512.png'];
+// Widths wider than the source are skipped; the source width is always written
+const WIDTHS = [320, 640, 1024, 1536];
+
+// Still-image AVIF through libaom; ffmpeg 6+ stores a second gray stream as the alpha plane
+const FORMATS = [
+  { ext: 'avif', type: 'image/avif', args: ['-c:v', 'libaom-av1', '-still-picture', '1', '-crf', '30', '-b:v', '0', '-cpu-used', '4'] },
+  { ext: 'webp', type: 'image/webp', args: ['-c:v', 'libwebp', '-quality', '78', '-compression_level', '6'] },
+];
+
+// Palette PNGs may carry transparency too
+const ALPHA_PIX_FMT = /^(rgba|bgra|argb|abgr|ya|yuva|gbrap|pal8)/;
+
+interface Variant { src: string; type: string; width: number; height: number; bytes: number }
+interface ImageEntry { width: number; height: number; alpha: boolean; bytes: number; variants: Variant[] }
+
+function run(command: string, args: string[]): Promise<string> {
+  return new Promise((resolve, reject) => {
+    const child = spawn(command, args, { stdio: ['ignore', 'pipe', 'pipe'] });
+    let stdout = '';
+    let stderr = '';
+    child.stdout.on('data', (data) => { stdout += data; });
+    child.stderr.on('data', (data) => { stderr = (stderr + data).slice(-4000); });
+    child.on('error', reject);
+    child.on('close', (code) => {
+      if (code === 0) resolve(stdout);
+      else reject(new Error(`${command} exited with ${code}: ${stderr.trim()}`));
+    });
+  });
+}
+
+async function probe(source: string): Promise<{ width: number; height: number; alpha: boolean }> {
+  const output = await run(FFPROBE, ['-v', 'error', '-select_streams', 'v:0', '-show_entries', 'stream=width,height,pix_fmt',
+    '-of', 'json', source]);
+  const stream: { width?: number; height?: number; pix_fmt?: string } = JSON.parse(output).streams?.[0] || {};
+  if (!stream.width || !stream.height) throw new Error('Not an image');
+  const alpha = ALPHA_PIX_FMT.test(stream.pix_fmt || '');
+  return { width: stream.width, height: stream.height, alpha };
+}
+
+async function isFresh(output: string, sourceMtime: number): Promise<boolean> {
+  try {
+    return (await stat(output)).mtimeMs >= sourceMtime;
+  } catch {
+    return false;
+  }
+}
+
+async function encode(source: string, output: string, width: number, format: typeof FORMATS[number], alpha: boolean) {
+  const scale = `scale=${width}:-2:flags=lanczos`;
+  const args = ['-y', '-v', 'error', '-i', source];
+  if (format.ext === 'avif' && alpha) {
+    args.push('-filter_complex', `[0:v]${scale},format=yuva444p,split[c][a];[a]alphaextract[alpha]`,
+      '-map', '[c]', '-map', '[alpha]');
+  } else {
+    args.push('-vf', alpha ? `${scale},format=yuva420p` : scale);
+  }
+  args.push(...format.args, '-frames:v', '1', output);
+  await run(FFMPEG, args);
+}
+
+// Manifest key: the URL components use for the original
+function publicUrl(source: string): string {
+  const path = relative(PUBLIC_DIR, join(process.cwd(), source));
+  if (path.startsWith('..')) throw new Error('Not under public/');
+  return '/' + path.split(sep).join('/');
+}
+
+async function processImage(source: string, force: boolean): Promise<ImageEntry> {
+  const name = basename(source, extname(source));
+  const { mtimeMs, size } = await stat(source);
+  const { width, height, alpha } = await probe(source);
+  const widths = [...WIDTHS.filter(w => w < width), width];
+
+  const variants: Variant[] = [];
+  for (const w of widths) {
+    // Same rounding as -2 in the scale filter: even heights, as 4:2:0 chroma needs
+    const h = Math.max(2, Math.round((height * w) / width / 2) * 2);
+    for (const format of FORMATS) {
+      const file = `${name}-${w}.${format.ext}`;
+      const output = join(OUT_DIR, file);
+      if (force || !(await isFresh(output, mtimeMs))) await encode(source, output, w, format, alpha);
+      const bytes = (await stat(output)).size;
+      variants.push({ src: `/images/${file}`, type: format.type, width: w, height: h, bytes });
+    }
+  }
+
+  const best = Math.min(...variants.filter(v => v.width === width).map(v => v.bytes));
+  console.log(`✅ ${source}: ${width}x${height}${alpha ? ' (alpha)' : ''}, ${(size / 1024).toFixed(0)} KB -> ` +
+    `${(best / 1024).toFixed(0)} KB at full width, ${variants.length} variants`);
+  return { width, height, alpha, bytes: size, variants };
+}
+
+async function main() {
+  const args = process.argv.slice(2);
+  const force = args.includes('--force');
+  const sources = args.filter(arg => !arg.startsWith('--'));
+
+  await mkdir(OUT_DIR, { recursive: true });
+  let manifest: Record<string, ImageEntry> = {};
+  try {
+    manifest = JSON.parse(await readFile(MANIFEST, 'utf8'));
+  } catch {
+    // First run
+  }
+
+  let failed = 0;
+  for (const source of sources.length ? sources : SOURCES) {
+    try {
+      manifest[publicUrl(source)] = await processImage(source, force);
+    } catch (error) {
+      failed++;
+      console.error(`❌ ${source}: ${error instanceof Error ? error.message : error}`);
+    }
+  }
+
+  const sorted = Object.fromEntries(Object.entries(manifest).sort(([a], [b]) => a.localeCompare(b)));
+  await writeFile(MANIFEST, JSON.stringify(sorted, null, 2) + '\n');
+  console.log(`Manifest written to ${MANIFEST}`);
+  if (failed) process.exit(1);
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exit(1);
+});
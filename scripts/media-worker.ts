@@ -0,0 +1,160 @@
+import { spawn } from 'child_process';
+import { mkdir, rename, rm } from 'fs/promises';
+import { basename, extname, join } from 'path';
+import { attachMediaRenditions } from '../lib/db-postgres';
+import { failMediaJob, finishMediaJob, MediaJob, requeueStaleMediaJobs, takeMediaJob } from '../lib/media-queue';
+import { UPLOAD_DIR, uploadUrl } from '../lib/uploads';
+
+// Drains the media queue filled by /api/upload: for every uploaded video it
+// writes a poster frame and an HLS ladder next to the file, then points the
+// slides playing that mp4 at the new master playlist (LocalVideoPlayer prefers
+// hlsUrl when hls.js or native HLS is available).
+//
+//   npm run media:worker          (needs ffmpeg and ffprobe on PATH)
+//
+// Run a single worker per upload directory; ffmpeg already uses every core,
+// so MEDIA_WORKER_CONCURRENCY is only worth raising on large machines.
+
+const FFMPEG = process.env.FFMPEG_PATH || 'ffmpeg';
+const FFPROBE = process.env.FFPROBE_PATH || 'ffprobe';
+const CONCURRENCY = parseInt(process.env.MEDIA_WORKER_CONCURRENCY || '1', 10);
+const POLL_MS = 1000;
+const MAX_ATTEMPTS = 3;
+const SEGMENT_SECONDS = 4;
+
+// Rungs taller than the source are skipped; a source below the first rung gets one rung at its own height
+const LADDER = [
+  { height: 360, videoKbps: 800, audioKbps: 64 },
+  { height: 540, videoKbps: 1400, audioKbps: 96 },
+  { height: 720, videoKbps: 2800, audioKbps: 128 },
+  { height: 1080, videoKbps: 5000, audioKbps: 128 },
+];
+
+let stopping = false;
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+function run(command: string, args: string[]): Promise<string> {
+  return new Promise((resolve, reject) => {
+    const child = spawn(command, args, { stdio: ['ignore', 'pipe', 'pipe'] });
+    let stdout = '';
+    let stderr = '';
+    child.stdout.on('data', (data) => { stdout += data; });
+    child.stderr.on('data', (data) => { stderr = (stderr + data).slice(-4000); });
+    child.on('error', reject);
+    child.on('close', (code) => {
+      if (code === 0) resolve(stdout);
+      else reject(new Error(`${command} exited with ${code}: ${stderr.trim()}`));
+    });
+  });
+}
+
+async function probe(source: string): Promise<{ height: number; hasAudio: boolean }> {
+  const output = await run(FFPROBE, ['-v', 'error', '-show_entries', 'stream=codec_type,height', '-of', 'json', source]);
+  const streams: { codec_type: string; height?: number }[] = JSON.parse(output).streams || [];
+  const video = streams.find(s => s.codec_type === 'video');
+  if (!video?.height) throw new Error('No video stream');
+  return { height: video.height, hasAudio: streams.some(s => s.codec_type === 'audio') };
+}
+
+async function makePoster(source: string, outDir: string): Promise<void> {
+  // `thumbnail` picks a representative frame from the first few, skipping black intros
+  await run(FFMPEG, ['-y', '-v', 'error', '-i', source, '-vf', 'thumbnail,scale=720:-2', '-frames:v', '1', '-q:v', '3',
+    join(outDir, 'poster.jpg')]);
+}
+
+async function makeLadder(source: string, outDir: string, height: number, hasAudio: boolean): Promise<void> {
+  let rungs = LADDER.filter(rung => rung.height <= height);
+  if (rungs.length === 0) rungs = [{ ...LADDER[0], height: height - (height % 2) }];
+
+  const split = `[0:v]split=${rungs.length}${rungs.map((_, i) => `[s${i}]`).join('')}`;
+  const scales = rungs.map((rung, i) => `[s${i}]scale=-2:${rung.height}[v${i}]`);
+  const args = ['-y', '-v', 'error', '-i', source, '-filter_complex', [split, ...scales].join(';')];
+
+  rungs.forEach((rung, i) => {
+    args.push('-map', `[v${i}]`, `-c:v:${i}`, 'libx264', `-b:v:${i}`, `${rung.videoKbps}k`,
+      `-maxrate:v:${i}`, `${Math.round(rung.videoKbps * 1.07)}k`, `-bufsize:v:${i}`, `${rung.videoKbps * 1.5}k`);
+    if (hasAudio) args.push('-map', 'a:0', `-c:a:${i}`, 'aac', `-b:a:${i}`, `${rung.audioKbps}k`, '-ac', '2');
+  });
+
+  // Keyframes on segment boundaries keep every rung switchable at every segment
+  args.push(
+    '-preset', 'veryfast', '-profile:v', 'main', '-pix_fmt', 'yuv420p', '-sc_threshold', '0',
+    '-force_key_frames', `expr:gte(t,n_forced*${SEGMENT_SECONDS})`,
+    '-f', 'hls', '-hls_time', String(SEGMENT_SECONDS), '-hls_playlist_type', 'vod',
+    '-hls_flags', 'independent_segments',
+    '-hls_segment_filename', join(outDir, 'v%v', 'seg_%03d.ts'),
+    '-master_pl_name', 'master.m3u8',
+    '-var_stream_map', rungs.map((_, i) => (hasAudio ? `v:${i},a:${i}` : `v:${i}`)).join(' '),
+    join(outDir, 'v%v', 'index.m3u8'),
+  );
+  await run(FFMPEG, args);
+}
+
+async function processJob(job: MediaJob): Promise<void> {
+  const name = basename(job.source, extname(job.source));
+  const outDir = join(UPLOAD_DIR, name);
+  const workDir = `${outDir}.tmp`;
+  const started = Date.now();
+
+  try {
+    await rm(workDir, { recursive: true, force: true });
+    await mkdir(workDir, { recursive: true });
+
+    const { height, hasAudio } = await probe(job.source);
+    await makePoster(job.source, workDir);
+    await makeLadder(job.source, workDir, height, hasAudio);
+
+    // Publish the renditions only once complete, so players never see a half-written ladder
+    await rm(outDir, { recursive: true, force: true });
+    await rename(workDir, outDir);
+
+    // Done before the slides are updated: createSlide checks for a finished job after
+    // inserting, so a slide created meanwhile is covered by one side or the other
+    const renditions = { hlsUrl: uploadUrl(`${name}/master.m3u8`), poster: uploadUrl(`${name}/poster.jpg`) };
+    await finishMediaJob(job, renditions);
+    const slides = await attachMediaRenditions(job.mp4Url, renditions);
+    console.log(`✅ ${job.id}: ${height}p source, ${slides} slide(s) updated in ${((Date.now() - started) / 1000).toFixed(1)}s`);
+  } catch (error) {
+    await rm(workDir, { recursive: true, force: true });
+    const message = error instanceof Error ? error.message : String(error);
+    await failMediaJob(job, message, MAX_ATTEMPTS);
+    console.error(`❌ ${job.id} (attempt ${job.attempts}/${MAX_ATTEMPTS}): ${message}`);
+  }
+}
+
+async function workerLoop(): Promise<void> {
+  while (!stopping) {
+    let job: MediaJob | null = null;
+    try {
+      job = await takeMediaJob();
+    } catch (error) {
+      console.error('Failed to read the media queue:', error);
+    }
+    if (!job) {
+      await sleep(POLL_MS);
+      continue;
+    }
+    await processJob(job);
+  }
+}
+
+async function main() {
+  const requeued = await requeueStaleMediaJobs();
+  console.log(`Media worker started (concurrency ${CONCURRENCY}, ${requeued} interrupted job(s) requeued)`);
+
+  const stop = () => {
+    if (!stopping) console.log('Finishing current jobs, then exiting...');
+    stopping = true;
+  };
+  process.on('SIGINT', stop);
+  process.on('SIGTERM', stop);
+
+  await Promise.all(Array.from({ length: CONCURRENCY }, workerLoop));
+  process.exit(0);
+}
+
+main().catch((error) => {
+  console.error('Media worker crashed:', error);
+  process.exit(1);
+});
@@ -1,5 +1,5 @@
 
-import { neon } from '@neondatabase/serverless';
+import { neon, neonConfig } from '@neondatabase/serverless';
 import dotenv from 'dotenv';
 
 dotenv.config({ path: '.env.local' });
@@ -9,6 +9,10 @@ if (!process.env.DATABASE_URL) {
   process.exit(1);
 }
 
+if (process.env.NEON_FETCH_ENDPOINT) {
+  neonConfig.fetchEndpoint = process.env.NEON_FETCH_ENDPOINT;
+}
+
 const sql = neon(process.env.DATABASE_URL);
 
 async function main() {
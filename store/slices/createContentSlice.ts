@@ -4,15 +4,20 @@ import { SlideDTO } from '@/lib/dto';
 export interface ContentSlice {
   activeSlide: SlideDTO | null;
   nextSlide: SlideDTO | null;
+  // The slides after the active one, nearest first; lib/video-prefetch warms videos from it
+  upcomingSlides: SlideDTO[];
   setActiveSlide: (slide: SlideDTO | null) => void;
   setNextSlide: (slide: SlideDTO | null) => void;
+  setUpcomingSlides: (slides: SlideDTO[]) => void;
   jumpToSlide: (slideId: string) => void;
 }
 
 export const createContentSlice: StateCreator<ContentSlice> = (set) => ({
   activeSlide: null,
   nextSlide: null,
+  upcomingSlides: [],
   setActiveSlide: (slide) => set({ activeSlide: slide }),
   setNextSlide: (slide) => set({ nextSlide: slide }),
+  setUpcomingSlides: (slides) => set({ upcomingSlides: slides }),
   jumpToSlide: (slideId) => console.log('Jump to slide not implemented globally yet', slideId),
 });
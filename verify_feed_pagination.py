@@ -0,0 +1,317 @@
+"""Pagination correctness and deep-page latency checks for GET /api/slides.
+
+API-level (no browser). Seeds benchmark slides straight into the database,
+with every --collide consecutive slides sharing one createdAt so page
+boundaries keep landing inside timestamp ties, then checks:
+
+  exactly-once  walk K pages from the top of the feed and from several deep
+                offsets, and compare the ids against
+                ORDER BY "createdAt" DESC, id DESC in the database: no
+                duplicates, no skipped slides, same order
+  latency       request pages at deep offsets (cursors built from the row just
+                before each sampled position) and report p50/p95/p99 per
+                offset; the slowest offset's query plan is printed via EXPLAIN
+
+Pages are served through the feed cache (lib/feed-cache.ts), so after seeding,
+before the latency pass and after --cleanup the script bumps feed:generation
+in Redis and waits for the app to pick it up. Latency percentiles only count
+responses with X-Feed-Cache: db; cache hits are reported separately.
+
+    python verify_feed_pagination.py --rows 1000000
+    python verify_feed_pagination.py --no-seed --offsets 0,10000,900000 --max-p95-ms 150
+    python verify_feed_pagination.py --cleanup
+
+Without UPSTASH_REDIS_REST_URL/KV_REST_API_URL (the app's Redis) the script
+can only wait out the in-process cache TTL.
+
+Cursors are "<createdAt epoch ms>_<slide id>" (slideCursor in
+lib/db-postgres.ts). Exits non-zero on any duplicate, skip or reordering, or
+when a p95 is over --max-p95-ms.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+import aiohttp
+
+from load_notifications import kv_command
+from perf_db import NeonHttp
+from perf_report import LatencyStats, print_table, write_report
+
+SLIDE_PREFIX = "bench-feed-"
+# Seeded by scripts/seed-test-accounts.ts
+AUTHOR_EMAIL = "autor@autor.pl"
+CHUNK = 50_000
+
+# lib/feed-cache.ts: GENERATION_KEY, GENERATION_CHECK_MS and LOCAL_TTL_MS
+FEED_GENERATION_KEY = "feed:generation"
+GENERATION_CHECK_S = 2.0
+LOCAL_TTL_S = 10.0
+
+ORDER = 'ORDER BY "createdAt" DESC, id DESC'
+CONTENT = json.dumps({
+    "data": {"mp4Url": "", "hlsUrl": None, "poster": "", "title": "Bench", "description": ""},
+    "avatar": "",
+})
+
+
+def cursor_for(row: dict) -> str:
+    """Same format as slideCursor() in lib/db-postgres.ts."""
+    created = datetime.fromisoformat(row["createdAt"].replace(" ", "T").replace("Z", "+00:00"))
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)  # Prisma stores UTC in timestamp(3)
+    return f"{round(created.timestamp() * 1000)}_{row['id']}"
+
+
+async def seed(db: NeonHttp, rows: int, collide: int) -> None:
+    existing = int(await db.scalar("SELECT COUNT(*) FROM slides WHERE id LIKE $1 || '%'", [SLIDE_PREFIX]) or 0)
+    if existing == rows:
+        print(f"{rows} benchmark slides already seeded")
+        return
+    author = await db.query("SELECT id, username FROM users WHERE email = $1", [AUTHOR_EMAIL])
+    if not author:
+        raise SystemExit(f"{AUTHOR_EMAIL} not found; run scripts/seed-test-accounts.ts first")
+    await cleanup(db)
+
+    started = time.perf_counter()
+    for lo in range(1, rows + 1, CHUNK):
+        hi = min(lo + CHUNK - 1, rows)
+        await db.query(
+            """
+            INSERT INTO slides (id, "userId", username, title, content, "slideType", "accessLevel", "createdAt", "updatedAt")
+            SELECT $1 || g, $2, $3, 'Bench ' || g, $4, 'video', 'PUBLIC',
+                   timestamp '2020-01-01' - ((g / $5::int) || ' milliseconds')::interval, now()
+            FROM generate_series($6::int, $7::int) AS g
+            """,
+            [SLIDE_PREFIX, author[0]["id"], author[0]["username"], CONTENT, collide, lo, hi],
+        )
+        print(f"  {hi}/{rows}", end="\r")
+    await db.query("ANALYZE slides")
+    print(f"Seeded {rows} slides ({collide} per timestamp) in {time.perf_counter() - started:.1f}s")
+
+
+async def cleanup(db: NeonHttp) -> None:
+    await db.query("DELETE FROM slides WHERE id LIKE $1 || '%'", [SLIDE_PREFIX])
+
+
+async def retire_feed_cache(session: aiohttp.ClientSession) -> None:
+    """Invalidate every cached feed page, as invalidateFeedCache() does, and wait until the app notices."""
+    generation = await kv_command(session, ["INCR", FEED_GENERATION_KEY])
+    if generation is None:
+        print(f"Redis not configured; waiting {LOCAL_TTL_S:.0f}s for cached feed pages to expire")
+        await asyncio.sleep(LOCAL_TTL_S + 0.5)
+    else:
+        await asyncio.sleep(GENERATION_CHECK_S + 0.5)
+
+
+async def expected_ids(db: NeonHttp, offset: int, count: int) -> List[str]:
+    rows = await db.query(f"SELECT id FROM slides {ORDER} OFFSET $1 LIMIT $2", [offset, count])
+    return [r["id"] for r in rows]
+
+
+async def row_at(db: NeonHttp, offset: int) -> Optional[dict]:
+    rows = await db.query(f'SELECT id, "createdAt"::text AS "createdAt" FROM slides {ORDER} OFFSET $1 LIMIT 1',
+                          [offset])
+    return rows[0] if rows else None
+
+
+async def fetch_page(session: aiohttp.ClientSession, base_url: str, cursor: str, limit: int,
+                     stats: Optional[LatencyStats] = None) -> Tuple[List[str], Optional[str], str]:
+    """One page; ``stats`` only gets errors and responses that went to the database."""
+    started = time.perf_counter()
+    async with session.get(f"{base_url}/api/slides", params={"cursor": cursor, "limit": str(limit)}) as resp:
+        raw = await resp.read()
+        ok = resp.status == 200
+        source = resp.headers.get("X-Feed-Cache", "db")
+        if stats is not None and (source == "db" or not ok):
+            stats.add((time.perf_counter() - started) * 1000, ok, resp.status, len(raw))
+        if not ok:
+            raise AssertionError(f"/api/slides returned {resp.status}")
+        body = json.loads(raw)
+    return [s["id"] for s in body["slides"]], body.get("nextCursor"), source
+
+
+async def check_window(db: NeonHttp, session, args, offset: int) -> dict:
+    """Walk --pages pages starting at ``offset`` and diff against the database order."""
+    cursor = ""
+    if offset:
+        before = await row_at(db, offset - 1)
+        if before is None:
+            return {"offset": offset, "skipped": True}
+        cursor = cursor_for(before)
+
+    got: List[str] = []
+    cached = 0
+    for _ in range(args.pages):
+        ids, cursor, source = await fetch_page(session, args.base_url, cursor, args.limit)
+        got.extend(ids)
+        cached += source != "db"
+        if not cursor:
+            break
+    want = await expected_ids(db, offset, args.pages * args.limit)
+
+    seen, duplicates = set(), []
+    for slide_id in got:
+        if slide_id in seen:
+            duplicates.append(slide_id)
+        seen.add(slide_id)
+    missing = [i for i in want if i not in seen]
+    return {
+        "offset": offset,
+        "returned": len(got),
+        "expected": len(want),
+        "duplicates": len(duplicates),
+        "missing": len(missing),
+        "inOrder": got == want,
+        "cachedPages": cached,
+        "examples": {"duplicates": duplicates[:5], "missing": missing[:5]},
+    }
+
+
+async def measure_offset(db: NeonHttp, session, args, offset: int) -> Tuple[LatencyStats, int, Optional[str]]:
+    """Latency of single uncached page requests at random positions in [offset, offset + --spread).
+
+    Also returns how many requests were cache hits and left out of the stats.
+    """
+    rows = await db.query(f'SELECT id, "createdAt"::text AS "createdAt" FROM slides {ORDER} OFFSET $1 LIMIT $2',
+                          [max(0, offset - 1), args.spread])
+    stats = LatencyStats()
+    if not rows:
+        return stats, 0, None
+    picks = random.sample(rows, min(args.samples, len(rows)))
+    gate = asyncio.Semaphore(args.concurrency)
+    cached = 0
+
+    async def one(row):
+        nonlocal cached
+        async with gate:
+            try:
+                _, _, source = await fetch_page(session, args.base_url, cursor_for(row), args.limit, stats)
+                cached += source != "db"
+            except (aiohttp.ClientError, asyncio.TimeoutError, AssertionError):
+                pass
+
+    await asyncio.gather(*(one(r) for r in picks))
+    return stats, cached, cursor_for(picks[0])
+
+
+async def explain(db: NeonHttp, cursor: str, limit: int) -> dict:
+    ms, _, slide_id = cursor.partition("_")
+    rows = await db.query(
+        """
+        EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)
+        SELECT s.id FROM slides s LEFT JOIN users u ON s."userId" = u.id
+        WHERE (s."createdAt", s.id) < (to_timestamp($1::bigint / 1000.0) AT TIME ZONE 'UTC', $2)
+        ORDER BY s."createdAt" DESC, s.id DESC LIMIT $3
+        """,
+        [ms, slide_id, limit],
+    )
+    plan = next(iter(rows[0].values()))
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    top = plan[0]
+
+    def nodes(node):
+        yield node
+        for child in node.get("Plans", []):
+            yield from nodes(child)
+
+    return {
+        "executionMs": top.get("Execution Time"),
+        "nodes": [f"{n['Node Type']}" + (f" using {n['Index Name']}" if "Index Name" in n else "")
+                  for n in nodes(top["Plan"])],
+    }
+
+
+async def main_async(args) -> dict:
+    offsets = [int(o) for o in args.offsets.split(",") if o]
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    async with NeonHttp() as db, aiohttp.ClientSession(timeout=timeout) as session:
+        if args.cleanup:
+            await cleanup(db)
+            await retire_feed_cache(session)
+            print("Benchmark slides removed")
+            return {}
+        if not args.no_seed:
+            await seed(db, args.rows, args.collide)
+        total = int(await db.scalar("SELECT COUNT(*) FROM slides") or 0)
+        offsets = [o for o in offsets if o < total]
+
+        # Pages cached before the seed would hide duplicates and skips
+        await retire_feed_cache(session)
+        windows = [await check_window(db, session, args, offset) for offset in offsets]
+        # The windows cached pages at the same cursors the samples start from
+        await retire_feed_cache(session)
+        latency = {}
+        slowest = (0.0, None)
+        for offset in offsets:
+            stats, cached, cursor = await measure_offset(db, session, args, offset)
+            latency[str(offset)] = {**stats.summary(), "cacheHits": cached}
+            if cursor and latency[str(offset)]["p95"] >= slowest[0]:
+                slowest = (latency[str(offset)]["p95"], cursor)
+        plan = await explain(db, slowest[1], args.limit) if slowest[1] else None
+
+    return {"totalSlides": total, "windows": windows, "latency": latency, "slowestPlan": plan}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check /api/slides keyset pagination and deep-page latency.")
+    parser.add_argument("--base-url", default=os.environ.get("LOAD_BASE_URL", "http://127.0.0.1:3000"))
+    parser.add_argument("--rows", type=int, default=1_000_000, help="benchmark slides to seed")
+    parser.add_argument("--collide", type=int, default=7, help="slides sharing each createdAt")
+    parser.add_argument("--offsets", default="0,1000,10000,100000,500000,900000")
+    parser.add_argument("--pages", type=int, default=40, help="pages walked per exactly-once window")
+    parser.add_argument("--limit", type=int, default=5, help="page size (FeedSwiper uses 5, the route caps it at 20)")
+    parser.add_argument("--samples", type=int, default=50, help="latency samples per offset")
+    parser.add_argument("--spread", type=int, default=1000, help="sample positions from [offset, offset+spread)")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--max-p95-ms", type=float, help="fail when any offset's p95 is above this")
+    parser.add_argument("--no-seed", action="store_true", help="use the slides already in the database")
+    parser.add_argument("--cleanup", action="store_true", help="delete the benchmark slides and exit")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+    args.base_url = args.base_url.rstrip("/")
+
+    result = asyncio.run(main_async(args))
+    if args.cleanup:
+        return 0
+
+    print_table([{
+        "offset": w["offset"], "returned": w.get("returned", "-"), "duplicates": w.get("duplicates", "-"),
+        "missing": w.get("missing", "-"), "in order": w.get("inOrder", "-"),
+    } for w in result["windows"]], ["offset", "returned", "duplicates", "missing", "in order"],
+        title=f"Exactly-once over {args.pages} pages of {args.limit} ({result['totalSlides']} slides)")
+    print_table([{"offset": o, "requests": s["count"], "cache hits": s["cacheHits"], "errors": s["errors"],
+                  "p50": s["p50"], "p95": s["p95"], "p99": s["p99"], "max": s["max"]}
+                 for o, s in result["latency"].items()],
+                ["offset", "requests", "cache hits", "errors", "p50", "p95", "p99", "max"],
+                title="Uncached page latency by offset (ms)")
+    if result["slowestPlan"]:
+        plan = result["slowestPlan"]
+        print(f"\nslowest offset plan: {' -> '.join(plan['nodes'])} ({plan['executionMs']}ms)")
+
+    if args.out:
+        write_report(args.out, "verify_feed_pagination", {k: v for k, v in vars(args).items() if k != "out"}, result)
+        print(f"Report written to {args.out}")
+
+    broken = [w for w in result["windows"] if not w.get("skipped")
+              and (w["duplicates"] or w["missing"] or not w["inOrder"])]
+    slow = [o for o, s in result["latency"].items() if args.max_p95_ms and s["p95"] > args.max_p95_ms]
+    errors = [o for o, s in result["latency"].items() if s["errors"]]
+    for w in broken:
+        print(f"FAIL offset {w['offset']}: {w['examples']}")
+    for o in slow:
+        print(f"FAIL offset {o}: p95 {result['latency'][o]['p95']:.0f}ms > {args.max_p95_ms:.0f}ms")
+    return 1 if broken or slow or errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""Shared Playwright harness for the verify_*.py scripts.
+
+Keeps one warm Chromium and a pool of pre-initialised browser contexts (the
+language choice is already in their localStorage), runs every registered
+scenario concurrently across the pool and reports wall-clock, per-scenario and
+per-step timings. A step slower than its budget (see verify_waits) fails the
+scenario.
+
+    python verify_harness.py                  # every scenario, 4 contexts
+    python verify_harness.py tipping ui -n 2  # selected scenarios
+    python verify_harness.py --budget slide_change=600
+    python verify_tipping.py                  # a single scenario
+
+Each verify_*.py registers its scenario with @scenario and can still be run on
+its own. Screenshots taken through screenshot_path() are listed with their
+scenario and viewport in verification/captures.json, which visual_diff.py
+uses to pick their baselines.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import sys
+import time
+import traceback
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from playwright.async_api import Browser, BrowserContext, Page, async_playwright
+
+from verify_waits import DEFAULT_BUDGETS_MS, StepLog, goto_feed, preloader_detached, server_ready, use_step_log
+
+BASE_URL = os.environ.get("VERIFY_BASE_URL", "http://127.0.0.1:3000").rstrip("/")
+SCREENSHOT_DIR = "verification"
+# Which scenario and viewport wrote each screenshot; visual_diff.py keys baselines by it
+CAPTURE_MANIFEST = os.path.join(SCREENSHOT_DIR, "captures.json")
+# Playwright's viewport when a profile does not set one
+DEFAULT_VIEWPORT = {"width": 1280, "height": 720}
+
+IPHONE_UA = (
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 13_2_3 like Mac OS X) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/13.0.3 Mobile/15E148 Safari/604.1"
+)
+
+# Context profiles used by the scenarios. Contexts are pooled per profile.
+PROFILES: Dict[str, dict] = {
+    "desktop": {},
+    "mobile": {"viewport": {"width": 375, "height": 812}},
+    "iphone": {"viewport": {"width": 414, "height": 896}, "user_agent": IPHONE_UA},
+    "iphone-mini": {"viewport": {"width": 375, "height": 812}, "user_agent": IPHONE_UA},
+}
+
+# Modules that register scenarios. Imported lazily by main().
+SCENARIO_MODULES = (
+    "verify_layout",
+    "verify_ui",
+    "verify_tipping",
+    "verify_tipping_forced",
+    "verify_notifications",
+)
+
+# Language stored by LanguageContext; the preloader still asks for it once per
+# page load, so dismiss_preloader() only has to click the button.
+APP_LANG = "pl"
+
+
+@dataclass
+class Scenario:
+    name: str
+    fn: Callable[[Page], Awaitable[None]]
+    profile: str = "desktop"
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    profile: str
+    ok: bool
+    seconds: float
+    error: Optional[str] = None
+    steps: List[dict] = field(default_factory=list)
+
+
+SCENARIOS: Dict[str, Scenario] = {}
+
+_current_scenario: ContextVar[Optional[Scenario]] = ContextVar("verify_scenario", default=None)
+CAPTURES: Dict[str, dict] = {}
+
+
+def scenario(name: str, profile: str = "desktop"):
+    """Register an async ``fn(page)`` as a verification scenario."""
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown context profile: {profile}")
+
+    def register(fn):
+        SCENARIOS[name] = Scenario(name=name, fn=fn, profile=profile)
+        return fn
+
+    return register
+
+
+def storage_state() -> dict:
+    return {
+        "cookies": [],
+        "origins": [
+            {"origin": BASE_URL, "localStorage": [{"name": "app_lang", "value": APP_LANG}]},
+        ],
+    }
+
+
+def viewport_key(profile: str) -> str:
+    viewport = PROFILES[profile].get("viewport", DEFAULT_VIEWPORT)
+    return f"{viewport['width']}x{viewport['height']}"
+
+
+def screenshot_path(name: str) -> str:
+    os.makedirs(SCREENSHOT_DIR, exist_ok=True)
+    sc = _current_scenario.get()
+    if sc is not None:
+        CAPTURES[name] = {"scenario": sc.name, "viewport": viewport_key(sc.profile)}
+    return os.path.join(SCREENSHOT_DIR, name)
+
+
+def write_capture_manifest() -> None:
+    """Merge this run's screenshots into CAPTURE_MANIFEST (other scenarios' entries are kept)."""
+    if not CAPTURES:
+        return
+    manifest = {}
+    if os.path.exists(CAPTURE_MANIFEST):
+        with open(CAPTURE_MANIFEST) as f:
+            manifest = json.load(f)
+    manifest.update(CAPTURES)
+    with open(CAPTURE_MANIFEST, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+async def dismiss_preloader(page: Page) -> bool:
+    """Click the language button on the preloader if it is shown."""
+    return await preloader_detached(page)
+
+
+async def open_app(page: Page, path: str = "/", timeout: float = 60000) -> None:
+    """Load the feed and get past the preloader."""
+    await goto_feed(page, BASE_URL + path, timeout=timeout)
+    await preloader_detached(page)
+
+
+class ContextPool:
+    """Pre-initialised browser contexts shared by concurrent scenarios."""
+
+    def __init__(self, browser: Browser, size: int):
+        self.browser = browser
+        self.size = size
+        self._slots = asyncio.Semaphore(size)
+        self._idle: Dict[str, List[BrowserContext]] = {name: [] for name in PROFILES}
+        self._all: List[BrowserContext] = []
+
+    async def _new_context(self, profile: str) -> BrowserContext:
+        context = await self.browser.new_context(storage_state=storage_state(), **PROFILES[profile])
+        self._all.append(context)
+        return context
+
+    async def warm(self, profiles: List[str]) -> None:
+        """Create one context per profile up front, up to the pool size."""
+        for profile in profiles[: self.size]:
+            self._idle[profile].append(await self._new_context(profile))
+
+    @asynccontextmanager
+    async def page(self, profile: str):
+        async with self._slots:
+            idle = self._idle[profile]
+            context = idle.pop() if idle else await self._new_context(profile)
+            page = await context.new_page()
+            try:
+                yield page
+            finally:
+                await page.close()
+                await context.clear_cookies()
+                idle.append(context)
+
+    async def close(self) -> None:
+        for context in self._all:
+            await context.close()
+
+
+async def run_scenario(pool: ContextPool, sc: Scenario, budgets: Dict[str, float]) -> ScenarioResult:
+    # Each gather() task runs in its own context, so the log is per scenario.
+    log = StepLog(budgets)
+    use_step_log(log)
+    _current_scenario.set(sc)
+    async with pool.page(sc.profile) as page:
+        started = time.perf_counter()
+        error = None
+        try:
+            await sc.fn(page)
+        except Exception as e:
+            traceback.print_exc()
+            error = str(e)
+            try:
+                await page.screenshot(path=screenshot_path(f"{sc.name}_error.png"))
+            except Exception:
+                pass
+        seconds = time.perf_counter() - started
+
+    if error is None and log.violations:
+        error = "over budget: " + ", ".join(
+            f"{s.name} {s.ms:.0f}ms > {s.budget_ms:.0f}ms" for s in log.violations
+        )
+    steps = [{"name": s.name, "ms": round(s.ms, 1), "budgetMs": s.budget_ms} for s in log.steps]
+    return ScenarioResult(sc.name, sc.profile, error is None, seconds, error=error, steps=steps)
+
+
+async def run(
+    names: List[str],
+    concurrency: int = 4,
+    headless: bool = True,
+    budgets: Optional[Dict[str, float]] = None,
+) -> List[ScenarioResult]:
+    selected = [SCENARIOS[name] for name in names]
+    budgets = DEFAULT_BUDGETS_MS if budgets is None else budgets
+    await server_ready(BASE_URL)
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+        pool = ContextPool(browser, concurrency)
+        try:
+            await pool.warm(sorted({sc.profile for sc in selected}))
+            return list(await asyncio.gather(*(run_scenario(pool, sc, budgets) for sc in selected)))
+        finally:
+            await pool.close()
+            await browser.close()
+
+
+def report(results: List[ScenarioResult], wall: float) -> None:
+    width = max([len(r.name) for r in results] + [8])
+    print()
+    print(f"{'scenario':<{width}}  {'profile':<11}  {'status':<6}  seconds")
+    for r in sorted(results, key=lambda r: -r.seconds):
+        status = "ok" if r.ok else "FAIL"
+        print(f"{r.name:<{width}}  {r.profile:<11}  {status:<6}  {r.seconds:7.2f}")
+        for s in r.steps:
+            budget = "-" if s["budgetMs"] is None else f"{s['budgetMs']:.0f}"
+            flag = "  OVER" if s["budgetMs"] is not None and s["ms"] > s["budgetMs"] else ""
+            print(f"{'':<{width}}    {s['name']:<20} {s['ms']:8.0f}ms / {budget}ms{flag}")
+        if r.error:
+            print(f"{'':<{width}}  -> {r.error}")
+    serial = sum(r.seconds for r in results)
+    print()
+    print(f"wall clock {wall:.2f}s, serial sum {serial:.2f}s")
+
+
+def load_scenarios() -> None:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    for module in SCENARIO_MODULES:
+        importlib.import_module(module)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run verification scenarios against a running app.")
+    parser.add_argument("scenarios", nargs="*", help="scenario names (default: all)")
+    parser.add_argument("-n", "--concurrency", type=int, default=4, help="browser contexts in the pool")
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    parser.add_argument("--json", dest="json_path", help="write timings as JSON to this path")
+    parser.add_argument("--budget", action="append", default=[], metavar="STEP=MS",
+                        help="override a step latency budget (repeatable)")
+    parser.add_argument("--no-budgets", action="store_true", help="record step timings without enforcing budgets")
+    args = parser.parse_args(argv)
+
+    budgets = {} if args.no_budgets else dict(DEFAULT_BUDGETS_MS)
+    for item in args.budget:
+        name, _, ms = item.partition("=")
+        try:
+            budgets[name] = float(ms)
+        except ValueError:
+            parser.error(f"invalid --budget {item!r}, expected STEP=MS")
+
+    load_scenarios()
+    names = args.scenarios or sorted(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)} (known: {', '.join(sorted(SCENARIOS))})")
+
+    started = time.perf_counter()
+    results = asyncio.run(run(names, concurrency=args.concurrency, headless=not args.headed, budgets=budgets))
+    wall = time.perf_counter() - started
+    report(results, wall)
+    write_capture_manifest()
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({
+                "baseUrl": BASE_URL,
+                "concurrency": args.concurrency,
+                "wallSeconds": wall,
+                "budgetsMs": budgets,
+                "scenarios": [r.__dict__ for r in results],
+            }, f, indent=2)
+
+    return 0 if all(r.ok for r in results) else 1
+
+
+if __name__ == "__main__":
+    # Scenario modules import this file as ``verify_harness``; go through that
+    # module so they register into the same SCENARIOS dict.
+    import verify_harness
+    sys.exit(verify_harness.main())
@@ -1,21 +1,16 @@
-from playwright.sync_api import sync_playwright
-import traceback
+import sys
+from verify_harness import BASE_URL, main, scenario
+from verify_waits import goto_feed
 
-def run(playwright):
-    try:
-        print("Launching browser...")
-        browser = playwright.chromium.launch()
-        page = browser.new_page()
-        print("Navigating to http://localhost:3000...")
-        page.goto("http://localhost:3000", timeout=60000)
-        print("Taking screenshot...")
-        page.screenshot(path="verification.png")
-        print("Screenshot saved to verification.png")
-        browser.close()
-        print("Browser closed.")
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        traceback.print_exc()
 
-with sync_playwright() as playwright:
-    run(playwright)
+@scenario("layout")
+async def verify_layout(page):
+    print(f"Navigating to {BASE_URL}...")
+    await goto_feed(page, BASE_URL)
+    print("Taking screenshot...")
+    await page.screenshot(path="verification.png")
+    print("Screenshot saved to verification.png")
+
+
+if __name__ == "__main__":
+    sys.exit(main(["layout"] + sys.argv[1:]))
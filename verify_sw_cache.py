@@ -0,0 +1,235 @@
+"""Cold versus warm load through the service worker's runtime caches (app/sw.ts).
+
+Loads the feed in a fresh context (cold: no service worker yet, it installs
+and takes over during this visit), swipes through --slides slides, then opens
+the feed again in the same context --warm-runs times (warm: served through
+the runtime caches). The browser's HTTP cache is cleared before every warm
+run so only the service worker's caches carry over (--keep-http-cache to
+measure both). For each run it records
+
+  * bytes and requests that went over the network (page requests the service
+    worker did not answer, plus the service worker's own fetches), by kind,
+  * requests the service worker answered,
+  * time to the feed and to the first presented video frame,
+
+and at the end what each runtime cache holds.
+
+    npm run build && npm start        # the service worker is only built for production
+    python verify_sw_cache.py --out reports/sw-cache.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from playwright.async_api import BrowserContext, Page, Request, async_playwright
+
+from perf_report import print_table, write_report
+from verify_harness import BASE_URL, PROFILES, storage_state
+from verify_waits import StepLog, feed_ready, goto_feed, preloader_detached, server_ready, slide_change, use_step_log
+
+# Service worker requests are reported on the context from here
+os.environ.setdefault("PW_EXPERIMENTAL_SERVICE_WORKER_NETWORK_EVENTS", "1")
+
+# Installed before any app script runs. Media events do not bubble, but a
+# capturing listener on the document still sees them.
+FIRST_FRAME_SCRIPT = """
+(() => {
+  const probe = window.__swProbe = { firstFrame: null };
+  document.addEventListener('playing', (event) => {
+    const video = event.target;
+    if (probe.firstFrame !== null || probe.pending) return;
+    probe.pending = true;
+    if ('requestVideoFrameCallback' in video) {
+      video.requestVideoFrameCallback((now) => { probe.firstFrame = now; });
+    } else {
+      probe.firstFrame = performance.now();
+    }
+  }, true);
+})();
+"""
+
+CACHE_CONTENTS_SCRIPT = """
+async () => {
+  const out = {};
+  for (const name of await caches.keys()) {
+    out[name] = (await (await caches.open(name)).keys()).length;
+  }
+  return out;
+}
+"""
+
+
+def kind_of(request: Request) -> str:
+    path = request.url.split("?", 1)[0]
+    if request.resource_type == "image":
+        return "image"
+    if request.resource_type == "media" or path.endswith((".m3u8", ".ts", ".m4s", ".mp4", ".aac")):
+        return "video"
+    if "/api/" in path:
+        return "api"
+    return "other"
+
+
+class LoadRun:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.bytes: Dict[str, int] = defaultdict(int)
+        self.requests: Dict[str, int] = defaultdict(int)
+        self.served_by_worker = 0
+        self.failed = 0
+        self.feed_ms: Optional[float] = None
+        self.first_frame_ms: Optional[float] = None
+
+    def result(self) -> dict:
+        return {
+            "networkBytes": sum(self.bytes.values()),
+            "networkRequests": sum(self.requests.values()),
+            "bytesByKind": dict(self.bytes),
+            "requestsByKind": dict(self.requests),
+            "servedByWorker": self.served_by_worker,
+            "failed": self.failed,
+            "feedMs": self.feed_ms,
+            # None: no video started within --frame-timeout
+            "firstFrameMs": self.first_frame_ms,
+        }
+
+
+class NetworkCounter:
+    """Attributes every finished request in the context to the current run."""
+
+    def __init__(self, context: BrowserContext) -> None:
+        self.run: Optional[LoadRun] = None
+        self.pending: List[asyncio.Task] = []
+        context.on("requestfinished", lambda request: self.pending.append(asyncio.create_task(self._finished(request))))
+        context.on("requestfailed", self._failed)
+
+    async def _finished(self, request: Request) -> None:
+        run = self.run
+        if run is None:
+            return
+        response = await request.response()
+        if response is not None and response.from_service_worker:
+            # Whatever the worker fetched for it shows up as its own request
+            run.served_by_worker += 1
+            return
+        sizes = await request.sizes()
+        kind = kind_of(request)
+        run.bytes[kind] += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+        run.requests[kind] += 1
+
+    def _failed(self, request: Request) -> None:
+        if self.run is not None:
+            self.run.failed += 1
+
+    async def settle(self) -> None:
+        await asyncio.gather(*self.pending)
+        self.pending.clear()
+
+
+async def load_feed(page: Page, run: LoadRun, args) -> None:
+    await goto_feed(page, BASE_URL)
+    await preloader_detached(page)
+    await feed_ready(page)
+    run.feed_ms = await page.evaluate("() => performance.now()")
+    try:
+        handle = await page.wait_for_function("() => window.__swProbe.firstFrame", timeout=args.frame_timeout)
+        run.first_frame_ms = await handle.json_value()
+    except Exception:
+        run.first_frame_ms = None
+    for _ in range(args.slides):
+        await slide_change(page, lambda: page.keyboard.press("ArrowDown"))
+        await page.wait_for_timeout(args.dwell_ms)
+
+
+async def measure(args) -> dict:
+    await server_ready(BASE_URL)
+    use_step_log(StepLog({}))
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=not args.headed,
+                                          args=["--autoplay-policy=no-user-gesture-required"])
+        context = await browser.new_context(storage_state=storage_state(), service_workers="allow",
+                                            **PROFILES[args.profile])
+        await context.add_init_script(FIRST_FRAME_SCRIPT)
+        counter = NetworkCounter(context)
+        runs: List[LoadRun] = []
+        try:
+            page = await context.new_page()
+            counter.run = LoadRun("cold")
+            await load_feed(page, counter.run, args)
+            controlled = await page.evaluate(
+                "() => navigator.serviceWorker.ready.then(() => !!navigator.serviceWorker.controller)")
+            if not controlled:
+                raise SystemExit("No service worker took control; run a production build (next build && next start)")
+            await counter.settle()
+            runs.append(counter.run)
+            await page.close()
+
+            for index in range(args.warm_runs):
+                page = await context.new_page()
+                if not args.keep_http_cache:
+                    cdp = await context.new_cdp_session(page)
+                    await cdp.send("Network.clearBrowserCache")
+                    await cdp.detach()
+                counter.run = LoadRun(f"warm {index + 1}")
+                await load_feed(page, counter.run, args)
+                await counter.settle()
+                runs.append(counter.run)
+                caches = await page.evaluate(CACHE_CONTENTS_SCRIPT)
+                await page.close()
+        finally:
+            counter.run = None
+            await context.close()
+            await browser.close()
+    return {"profile": args.profile, "runs": {run.name: run.result() for run in runs}, "caches": caches}
+
+
+def print_results(result: dict) -> None:
+    rows = []
+    for name, r in result["runs"].items():
+        rows.append({
+            "run": name, "KB": r["networkBytes"] / 1024, "requests": r["networkRequests"],
+            "from sw": r["servedByWorker"],
+            **{f"{kind} KB": r["bytesByKind"].get(kind, 0) / 1024 for kind in ("api", "image", "video")},
+            "feed ms": r["feedMs"], "1st frame ms": "-" if r["firstFrameMs"] is None else r["firstFrameMs"],
+        })
+    print_table(rows, ["run", "KB", "requests", "from sw", "api KB", "image KB", "video KB", "feed ms", "1st frame ms"],
+                title=f"Feed load through the service worker, {result['profile']} profile (network only)")
+    print("\nruntime caches: " + ", ".join(f"{name} {n}" for name, n in sorted(result["caches"].items())))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare cold and warm feed loads through the service worker caches.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="iphone", help="verify_harness context profile")
+    parser.add_argument("--slides", type=int, default=3, help="slides to swipe through on each load")
+    parser.add_argument("--dwell-ms", type=float, default=1500, help="time on each slide, for segments to load")
+    parser.add_argument("--warm-runs", type=int, default=2)
+    parser.add_argument("--keep-http-cache", action="store_true",
+                        help="leave the browser's HTTP cache in place between runs")
+    parser.add_argument("--frame-timeout", type=float, default=15000, help="ms to wait for the first video frame")
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args(argv)
+    if args.warm_runs < 1:
+        parser.error("--warm-runs must be at least 1")
+
+    result = asyncio.run(measure(args))
+    print_results(result)
+    if args.out:
+        write_report(args.out, "verify_sw_cache", {k: v for k, v in vars(args).items() if k != "out"}, result)
+        print(f"Report written to {args.out}")
+
+    cold = result["runs"]["cold"]
+    warm = [r for name, r in result["runs"].items() if name != "cold"]
+    saved = all(r["networkBytes"] < cold["networkBytes"] for r in warm)
+    if not saved:
+        print("Warm loads did not use less network than the cold load")
+    return 0 if saved else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
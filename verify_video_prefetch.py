@@ -0,0 +1,235 @@
+"""Swipe-to-first-frame latency with and without the feed's video prefetch.
+
+For each --modes entry opens the feed in a fresh context (no service worker,
+empty HTTP cache), swipes through --slides slides, --dwell-ms apart, and for
+every swipe records
+
+  * ms from the key press to the first frame the new slide's video presents
+    (requestVideoFrameCallback),
+  * whether that video already had media when the swipe landed (warm start),
+
+plus, per run, the media bytes and requests (playlists, segments, mp4s), the
+<video> elements in the page and the prefetch manager's counters
+(lib/video-prefetch.ts). "off" sets localStorage video_prefetch=off, which
+keeps the element pool but warms nothing ahead.
+
+--network emulates the connection the manager backs off on: "3g" throttles
+through CDP (navigator.connection reports it), "save-data" reports Save-Data.
+
+    python verify_video_prefetch.py --out reports/video-prefetch.json
+    python verify_video_prefetch.py --dwell-ms 800 --slides 12     # fast swiping warms two ahead
+    python verify_video_prefetch.py --network 3g --modes on
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from playwright.async_api import BrowserContext, Page, Request, async_playwright
+
+from perf_report import LatencyStats, print_table, write_report
+from verify_harness import BASE_URL, PROFILES, storage_state
+from verify_waits import StepLog, feed_ready, goto_feed, preloader_detached, server_ready, slide_change, use_step_log
+
+MODES = ("off", "on")
+PREFETCH_SWITCH = "video_prefetch"
+
+# Chrome DevTools "Fast 3G"; effectiveType and downlink follow the emulation
+NETWORKS: Dict[str, Optional[dict]] = {
+    "fast": None,
+    "3g": {"offline": False, "latency": 150, "downloadThroughput": 1.6 * 1024 * 1024 / 8,
+           "uploadThroughput": 750 * 1024 / 8, "connectionType": "cellular3g"},
+    "save-data": None,
+}
+
+SAVE_DATA_SCRIPT = """
+(() => {
+  if (navigator.connection) Object.defineProperty(navigator.connection, 'saveData', { get: () => true });
+})();
+"""
+
+# Resolves with ms from `since` to the first frame the active slide's video
+# presents, -1 on timeout, null when the slide has no video. The element may
+# only arrive from the pool after the swipe, so it is polled for.
+FIRST_FRAME_SCRIPT = """
+([since, timeoutMs]) => new Promise((resolve) => {
+  const deadline = performance.now() + timeoutMs;
+  const find = () => {
+    const slide = document.querySelector('.swiper-slide-active');
+    const video = slide && slide.querySelector('video');
+    if (video) {
+      const timer = setTimeout(() => resolve(-1), Math.max(0, deadline - performance.now()));
+      const done = (now) => { clearTimeout(timer); resolve(now - since); };
+      if ('requestVideoFrameCallback' in video) video.requestVideoFrameCallback((now) => done(now));
+      else video.addEventListener('playing', () => done(performance.now()), { once: true });
+    } else if (!slide || performance.now() > deadline || !slide.querySelector('[data-video-host]')) {
+      resolve(null);
+    } else {
+      requestAnimationFrame(find);
+    }
+  };
+  find();
+})
+"""
+
+LANDED_SCRIPT = """
+() => {
+  const video = document.querySelector('.swiper-slide-active video');
+  return video ? video.readyState : null;
+}
+"""
+
+
+def is_media(request: Request) -> bool:
+    path = request.url.split("?", 1)[0]
+    return request.resource_type == "media" or path.endswith((".m3u8", ".ts", ".m4s", ".mp4", ".aac"))
+
+
+class MediaCounter:
+    def __init__(self, context: BrowserContext) -> None:
+        self.bytes = 0
+        self.requests: Dict[str, int] = defaultdict(int)
+        self.pending: List[asyncio.Task] = []
+        context.on("requestfinished", lambda request: self.pending.append(asyncio.create_task(self._finished(request))))
+
+    async def _finished(self, request: Request) -> None:
+        if not is_media(request):
+            return
+        sizes = await request.sizes()
+        self.bytes += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+        path = request.url.split("?", 1)[0]
+        self.requests["playlist" if path.endswith(".m3u8") else "segment"] += 1
+
+    async def settle(self) -> None:
+        await asyncio.gather(*self.pending)
+        self.pending.clear()
+
+
+async def swipe(page: Page, index: int, args) -> dict:
+    since = await page.evaluate("() => performance.now()")
+    real_index = await slide_change(page, lambda: page.keyboard.press("ArrowDown"))
+    ready_state = await page.evaluate(LANDED_SCRIPT)
+    first_frame = await page.evaluate(FIRST_FRAME_SCRIPT, [since, args.frame_timeout])
+    return {
+        "step": index,
+        "slide": real_index,
+        # None: not a video slide, -1: no frame within --frame-timeout
+        "firstFrameMs": first_frame,
+        # HAVE_CURRENT_DATA (2) or better: the swipe landed on buffered media
+        "warm": ready_state is not None and ready_state >= 2,
+    }
+
+
+async def run_mode(browser, mode: str, args) -> dict:
+    state = storage_state()
+    if mode == "off":
+        state["origins"][0]["localStorage"].append({"name": PREFETCH_SWITCH, "value": "off"})
+    context = await browser.new_context(storage_state=state, service_workers="block", **PROFILES[args.profile])
+    if args.network == "save-data":
+        await context.add_init_script(SAVE_DATA_SCRIPT)
+    counter = MediaCounter(context)
+    try:
+        page = await context.new_page()
+        conditions = NETWORKS[args.network]
+        if conditions:
+            cdp = await context.new_cdp_session(page)
+            await cdp.send("Network.enable")
+            await cdp.send("Network.emulateNetworkConditions", conditions)
+        await goto_feed(page, BASE_URL)
+        await preloader_detached(page)
+        await feed_ready(page)
+        await page.wait_for_timeout(args.dwell_ms)
+
+        swipes = []
+        for index in range(args.slides):
+            swipes.append(await swipe(page, index, args))
+            await page.wait_for_timeout(args.dwell_ms)
+        manager = await page.evaluate("() => window.__videoPrefetch || null")
+        videos = await page.evaluate("() => document.querySelectorAll('video').length")
+        await counter.settle()
+    finally:
+        await context.close()
+
+    frames = LatencyStats()
+    for s in swipes:
+        if s["firstFrameMs"] is not None:
+            frames.add(max(s["firstFrameMs"], 0), ok=s["firstFrameMs"] >= 0)
+    video_swipes = [s for s in swipes if s["firstFrameMs"] is not None]
+    summary = frames.summary()
+    return {
+        "firstFrameMs": {k: summary[k] for k in ("count", "p50", "p95", "max", "mean")},
+        "timeouts": summary["errors"],
+        "warmStarts": sum(1 for s in video_swipes if s["warm"]),
+        "videoSwipes": len(video_swipes),
+        "mediaBytes": counter.bytes,
+        "mediaRequests": dict(counter.requests),
+        "videosInDom": videos,
+        "manager": manager,
+        "swipes": swipes,
+    }
+
+
+async def measure(args) -> dict:
+    await server_ready(BASE_URL)
+    use_step_log(StepLog({}))
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=not args.headed,
+                                          args=["--autoplay-policy=no-user-gesture-required"])
+        try:
+            modes = {mode: await run_mode(browser, mode, args) for mode in args.modes}
+        finally:
+            await browser.close()
+    return {"profile": args.profile, "network": args.network, "modes": modes}
+
+
+def print_results(result: dict) -> None:
+    rows = []
+    for mode, r in result["modes"].items():
+        f = r["firstFrameMs"]
+        rows.append({
+            "prefetch": mode, "swipes": r["videoSwipes"], "warm": r["warmStarts"], "p50": f["p50"], "p95": f["p95"],
+            "max": f["max"], "timeouts": r["timeouts"], "media KB": r["mediaBytes"] / 1024,
+            "requests": sum(r["mediaRequests"].values()), "<video>": r["videosInDom"],
+        })
+    print_table(rows, ["prefetch", "swipes", "warm", "p50", "p95", "max", "timeouts", "media KB", "requests", "<video>"],
+                title=f"Swipe to first frame (ms), {result['profile']} profile, {result['network']} network")
+    for mode, r in result["modes"].items():
+        if r["manager"]:
+            print(f"{mode}: " + ", ".join(f"{k} {v}" for k, v in r["manager"].items()))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure swipe-to-first-frame latency with and without video prefetch.")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--network", choices=sorted(NETWORKS), default="fast")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="iphone", help="verify_harness context profile")
+    parser.add_argument("--slides", type=int, default=10, help="number of swipes")
+    parser.add_argument("--dwell-ms", type=float, default=3000, help="time on each slide before the next swipe")
+    parser.add_argument("--frame-timeout", type=float, default=15000, help="ms to wait for a video's first frame")
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args(argv)
+    args.modes = [m for m in MODES if m in args.modes]
+
+    result = asyncio.run(measure(args))
+    print_results(result)
+    if args.out:
+        write_report(args.out, "verify_video_prefetch", {k: v for k, v in vars(args).items() if k != "out"}, result)
+        print(f"Report written to {args.out}")
+
+    modes = result["modes"]
+    if any(r["timeouts"] for r in modes.values()):
+        print("Some swipes never showed a video frame")
+        return 1
+    if "off" in modes and "on" in modes and args.network == "fast":
+        if modes["on"]["firstFrameMs"]["p50"] >= modes["off"]["firstFrameMs"]["p50"]:
+            print("Prefetch did not lower the median swipe-to-first-frame")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""Event-driven wait primitives for the verification scenarios.
+
+Every wait blocks on a concrete signal from the app (the /api/slides response,
+the Swiper transition finishing, a modal header getting attached, the preloader
+overlay detaching) instead of a fixed sleep, and records how long it actually
+waited. verify_harness fails a scenario when a step takes longer than its
+latency budget, so a run doubles as a UI-latency regression gate.
+
+Budgets are in milliseconds and can be overridden per run:
+
+    python verify_harness.py --budget slide_change=600 --budget modal_header=800
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+import urllib.error
+import urllib.request
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from playwright.async_api import Locator, Page, Response
+
+DEFAULT_BUDGETS_MS: Dict[str, float] = {
+    "slides_response": 3000,
+    "preloader_detached": 2500,
+    "feed_ready": 3000,
+    "slide_change": 1000,
+    "modal_header": 1500,
+    "ui_attached": 1500,
+    "api_response": 2000,
+}
+
+# Hard ceiling for every wait. Hitting it fails the step whatever the budget.
+WAIT_TIMEOUT_MS = 15000
+
+# The language overlay rendered by components/Preloader.tsx.
+PRELOADER_SELECTOR = ".absolute.inset-0.bg-black.z-\\[10000\\]"
+
+
+@dataclass
+class Step:
+    name: str
+    ms: float
+    budget_ms: Optional[float]
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget_ms is not None and self.ms > self.budget_ms
+
+
+class StepLog:
+    """Waited time per step for one scenario run."""
+
+    def __init__(self, budgets: Optional[Dict[str, float]] = None):
+        self.budgets = dict(DEFAULT_BUDGETS_MS if budgets is None else budgets)
+        self.steps: List[Step] = []
+
+    def record(self, name: str, ms: float, budget_ms: Optional[float] = None) -> Step:
+        if budget_ms is None:
+            budget_ms = self.budgets.get(name)
+        entry = Step(name, ms, budget_ms)
+        self.steps.append(entry)
+        return entry
+
+    @property
+    def violations(self) -> List[Step]:
+        return [s for s in self.steps if s.over_budget]
+
+
+_step_log: ContextVar[Optional[StepLog]] = ContextVar("verify_step_log", default=None)
+
+
+def use_step_log(log: StepLog) -> None:
+    """Make ``log`` the target of step() for the current asyncio task."""
+    _step_log.set(log)
+
+
+def current_step_log() -> StepLog:
+    log = _step_log.get()
+    if log is None:
+        log = StepLog()
+        _step_log.set(log)
+    return log
+
+
+@asynccontextmanager
+async def step(name: str, budget_ms: Optional[float] = None):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        current_step_log().record(name, (time.perf_counter() - started) * 1000, budget_ms)
+
+
+async def server_ready(url: str, timeout: float = 60.0) -> float:
+    """Poll ``url`` until the dev server answers. Returns the seconds waited."""
+    started = time.perf_counter()
+
+    def probe() -> bool:
+        try:
+            urllib.request.urlopen(url, timeout=2).close()
+            return True
+        except urllib.error.HTTPError:
+            return True  # the server is up, the page itself may still error
+        except Exception:
+            return False
+
+    while not await asyncio.to_thread(probe):
+        if time.perf_counter() - started > timeout:
+            raise TimeoutError(f"{url} did not respond within {timeout:.0f}s")
+        await asyncio.sleep(0.25)
+    return time.perf_counter() - started
+
+
+def _is_feed_response(response: Response) -> bool:
+    return "/api/slides" in response.url and response.request.method == "GET"
+
+
+async def goto_feed(page: Page, url: str, timeout: float = 60000) -> Response:
+    """Navigate and wait for the feed's /api/slides response."""
+    async with step("slides_response"):
+        async with page.expect_response(_is_feed_response, timeout=timeout) as info:
+            await page.goto(url, timeout=timeout)
+        response = await info.value
+    if not response.ok:
+        raise AssertionError(f"/api/slides returned {response.status}")
+    return response
+
+
+async def preloader_detached(page: Page, label: str = "Polski", timeout: float = WAIT_TIMEOUT_MS) -> bool:
+    """Pick the language on the preloader and wait for the overlay to leave the DOM.
+
+    Returns False when no preloader was shown.
+    """
+    overlay = page.locator(PRELOADER_SELECTOR)
+    try:
+        await overlay.first.wait_for(state="attached", timeout=5000)
+    except Exception:
+        return False
+    async with step("preloader_detached"):
+        await page.get_by_text(label, exact=False).first.click(timeout=timeout, force=True)
+        await overlay.first.wait_for(state="detached", timeout=timeout)
+    return True
+
+
+async def feed_ready(page: Page, timeout: float = WAIT_TIMEOUT_MS) -> None:
+    """Wait until Swiper has been initialised on the rendered feed."""
+    async with step("feed_ready"):
+        await page.wait_for_function(
+            "() => { const el = document.querySelector('.swiper'); return !!(el && el.swiper && el.swiper.initialized); }",
+            timeout=timeout,
+        )
+
+
+async def slide_change(page: Page, action: Callable[[], Awaitable[None]], timeout: float = WAIT_TIMEOUT_MS) -> int:
+    """Run ``action`` and wait for Swiper to settle on a different slide."""
+    previous = await page.evaluate("() => document.querySelector('.swiper')?.swiper?.realIndex ?? -1")
+    async with step("slide_change"):
+        await action()
+        handle = await page.wait_for_function(
+            """(previous) => {
+                const swiper = document.querySelector('.swiper')?.swiper;
+                if (!swiper || swiper.animating || swiper.realIndex === previous) return false;
+                return swiper.realIndex + 1;
+            }""",
+            arg=previous,
+            timeout=timeout,
+        )
+    return await handle.json_value() - 1
+
+
+async def modal_header(page: Page, text: str = "Bramka Napiwkowa", timeout: float = WAIT_TIMEOUT_MS) -> None:
+    async with step("modal_header"):
+        await page.locator(f"text={text}").first.wait_for(state="attached", timeout=timeout)
+
+
+async def attached(target: Locator, name: str = "ui_attached", timeout: float = WAIT_TIMEOUT_MS) -> None:
+    """Wait for the element that proves the previous interaction landed."""
+    async with step(name):
+        await target.first.wait_for(state="attached", timeout=timeout)
+
+
+async def api_response(
+    page: Page,
+    action: Callable[[], Awaitable[None]],
+    path: str,
+    name: str = "api_response",
+    timeout: float = WAIT_TIMEOUT_MS,
+) -> Response:
+    """Run ``action`` and wait for the response of the API call it triggers.
+
+    ``path`` is compared with the whole URL path (the query string is ignored),
+    so "/api/notifications" does not match "/api/notifications/unread-count".
+    """
+    async with step(name):
+        async with page.expect_response(lambda r: urlsplit(r.url).path == path, timeout=timeout) as info:
+            await action()
+        return await info.value
@@ -0,0 +1,324 @@
+"""Visual regression for the verification screenshots.
+
+Compares every capture in verification/ with its baseline, keyed by scenario
+and viewport (scenario/viewport/name, from the captures.json the harness
+writes; screenshots it did not record are keyed "_/<width>w/name"):
+
+  * identical files are skipped on a content hash without being decoded,
+  * otherwise the capture is cut into --tile square tiles and only tiles whose
+    hash differs from the one stored with the baseline are diffed,
+  * those tiles are compared pixel by pixel with a YIQ colour distance (the
+    pixelmatch metric), vectorised over all changed tiles at once,
+  * images are spread over a process pool.
+
+Changed images get a heatmap in --out (the capture faded to grey, differing
+pixels in red by strength) and everything lands in --out/summary.json.
+
+    python verify_harness.py && python visual_diff.py compare
+    python visual_diff.py approve                    # accept the current captures as baselines
+    python visual_diff.py approve ui/414x896/topbar  # or only some of them
+
+Needs numpy and Pillow.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from perf_report import print_table
+
+CAPTURE_DIR = "verification"
+BASELINE_DIR = os.path.join(CAPTURE_DIR, "baselines")
+DIFF_DIR = os.path.join(CAPTURE_DIR, "diff")
+CAPTURE_MANIFEST = "captures.json"
+BASELINE_INDEX = "index.json"
+
+# Largest YIQ delta between two RGB colours (black vs white)
+MAX_YIQ_DELTA = 35215.0
+HASH_BYTES = 8
+
+
+def file_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_rgb(path: str) -> np.ndarray:
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def png_size(path: str) -> Tuple[int, int]:
+    """(width, height) from the PNG header, without decoding."""
+    with open(path, "rb") as f:
+        header = f.read(24)
+    return int.from_bytes(header[16:20], "big"), int.from_bytes(header[20:24], "big")
+
+
+def tile_view(pixels: np.ndarray, tile: int) -> np.ndarray:
+    """(rows, cols, tile, tile, channels) view of ``pixels`` zero-padded to whole tiles."""
+    height, width, channels = pixels.shape
+    padded = np.pad(pixels, ((0, -height % tile), (0, -width % tile), (0, 0)))
+    rows, cols = padded.shape[0] // tile, padded.shape[1] // tile
+    return padded.reshape(rows, tile, cols, tile, channels).swapaxes(1, 2)
+
+
+def tile_hashes(tiles: np.ndarray) -> np.ndarray:
+    """One short digest per tile, as a (rows, cols) array of bytes."""
+    flat = np.ascontiguousarray(tiles).reshape(tiles.shape[0] * tiles.shape[1], -1)
+    digests = [hashlib.blake2b(row.tobytes(), digest_size=HASH_BYTES).digest() for row in flat]
+    return np.array(digests, dtype=f"S{HASH_BYTES}").reshape(tiles.shape[:2])
+
+
+def yiq_delta(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Perceptual colour distance per pixel, scaled to 0..1."""
+    a = a.astype(np.float32)
+    b = b.astype(np.float32)
+    d = a - b
+    dy = d @ np.float32([0.29889531, 0.58662247, 0.11448223])
+    di = d @ np.float32([0.59597799, -0.27417610, -0.32180189])
+    dq = d @ np.float32([0.21147017, -0.52261711, 0.31114694])
+    return (0.5053 * dy * dy + 0.299 * di * di + 0.1957 * dq * dq) / MAX_YIQ_DELTA
+
+
+def heatmap(capture: np.ndarray, delta: np.ndarray, threshold: float) -> np.ndarray:
+    """The capture as faded grey with differing pixels painted red by strength."""
+    grey = capture.astype(np.float32) @ np.float32([0.299, 0.587, 0.114])
+    faded = (grey * 0.25 + 191).astype(np.uint8)
+    out = np.repeat(faded[:, :, None], 3, axis=2)
+    hit = delta > threshold
+    strength = np.sqrt(np.clip(delta[hit], 0, 1))
+    out[hit] = np.stack([np.full_like(strength, 255), 160 * (1 - strength), 160 * (1 - strength)], axis=1).astype(np.uint8)
+    return out
+
+
+def compare_one(job: dict) -> dict:
+    """Compares one capture with its baseline; runs in a worker process."""
+    started = time.perf_counter()
+    key, tile, threshold = job["key"], job["tile"], job["threshold"]
+    baseline: Optional[dict] = job["baseline"]
+    result = {"key": key, "capture": job["capture"], "status": "unchanged", "tiles": 0,
+              "tilesSkipped": 0, "diffTiles": 0, "diffPixels": 0, "diffRatio": 0.0, "maxDelta": 0.0}
+
+    digest = file_digest(job["capture"])
+    if baseline and baseline["sha256"] == digest:
+        result["tiles"] = result["tilesSkipped"] = baseline["tileCount"]
+        result["ms"] = (time.perf_counter() - started) * 1000
+        return result
+
+    capture = load_rgb(job["capture"])
+    tiles = tile_view(capture, tile)
+    result["tiles"] = tiles.shape[0] * tiles.shape[1]
+    if not baseline:
+        result["status"] = "new"
+        result["ms"] = (time.perf_counter() - started) * 1000
+        return result
+
+    height, width = capture.shape[:2]
+    same_size = [height, width] == baseline["size"] and baseline["tile"] == tile
+    if same_size:
+        stored = np.array([bytes.fromhex(h) for h in baseline["tiles"]], dtype=f"S{HASH_BYTES}")
+        changed = tile_hashes(tiles) != stored.reshape(tiles.shape[:2])
+        result["tilesSkipped"] = int(result["tiles"] - changed.sum())
+        if not changed.any():
+            result["ms"] = (time.perf_counter() - started) * 1000
+            return result
+        base = load_rgb(job["baseline_path"])
+    else:
+        # Different page length or width: compare the overlap, count the rest as changed
+        result["status"] = "size"
+        base = load_rgb(job["baseline_path"])
+        base_height, base_width = base.shape[:2]
+        full = (max(height, base_height), max(width, base_width), 3)
+        capture_full, base_full = np.zeros(full, np.uint8), np.zeros(full, np.uint8)
+        capture_full[:height, :width] = capture
+        base_full[:base_height, :base_width] = base
+        capture, base = capture_full, base_full
+        tiles = tile_view(capture, tile)
+        changed = np.ones(tiles.shape[:2], dtype=bool)
+
+    # Diff only the tiles whose hashes moved, all of them in one vectorised pass
+    delta_tiles = yiq_delta(tiles[changed], tile_view(base, tile)[changed])
+    if not same_size:
+        outside = np.ones(capture.shape[:2], dtype=bool)
+        outside[:min(height, base_height), :min(width, base_width)] = False
+        delta_tiles = np.maximum(delta_tiles, tile_view(outside[:, :, None].astype(np.float32), tile)[changed][..., 0])
+
+    hits = delta_tiles > threshold
+    per_tile = hits.reshape(len(hits), -1).sum(axis=1)
+    result["diffTiles"] = int((per_tile > 0).sum())
+    result["diffPixels"] = int(per_tile.sum())
+    result["diffRatio"] = result["diffPixels"] / (capture.shape[0] * capture.shape[1])
+    result["maxDelta"] = float(delta_tiles.max()) if delta_tiles.size else 0.0
+    if result["diffPixels"] and result["status"] == "unchanged":
+        result["status"] = "changed"
+
+    if result["diffPixels"]:
+        delta = np.zeros(tiles.shape[:2] + (tile, tile), dtype=np.float32)
+        delta[changed] = delta_tiles
+        delta = delta.swapaxes(1, 2).reshape(tiles.shape[0] * tile, tiles.shape[1] * tile)
+        delta = delta[:capture.shape[0], :capture.shape[1]]
+        os.makedirs(os.path.dirname(job["heatmap"]), exist_ok=True)
+        Image.fromarray(heatmap(capture, delta, threshold)).save(job["heatmap"], compress_level=1)
+        result["heatmap"] = job["heatmap"]
+    result["ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def baseline_entry(job: dict) -> dict:
+    """Digest, size and tile hashes of a capture being approved; runs in a worker process."""
+    capture = load_rgb(job["capture"])
+    tiles = tile_view(capture, job["tile"])
+    return {
+        "key": job["key"],
+        "sha256": file_digest(job["capture"]),
+        "size": list(capture.shape[:2]),
+        "tile": job["tile"],
+        "tileCount": tiles.shape[0] * tiles.shape[1],
+        "tiles": [h.hex() for h in tile_hashes(tiles).ravel()],
+    }
+
+
+def discover_captures(capture_dir: str) -> Dict[str, str]:
+    """Key -> capture path for the PNGs directly in ``capture_dir`` (error shots excluded)."""
+    manifest = {}
+    manifest_path = os.path.join(capture_dir, CAPTURE_MANIFEST)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    captures = {}
+    for name in sorted(os.listdir(capture_dir)):
+        path = os.path.join(capture_dir, name)
+        if not name.endswith(".png") or name.endswith("_error.png") or not os.path.isfile(path):
+            continue
+        entry = manifest.get(name)
+        if entry:
+            key = f"{entry['scenario']}/{entry['viewport']}/{name[:-4]}"
+        else:
+            key = f"_/{png_size(path)[0]}w/{name[:-4]}"
+        captures[key] = path
+    return captures
+
+
+def load_index(baseline_dir: str) -> Dict[str, dict]:
+    path = os.path.join(baseline_dir, BASELINE_INDEX)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def run_jobs(fn, jobs: List[dict], workers: int) -> Iterable[dict]:
+    if workers <= 1 or len(jobs) <= 1:
+        return map(fn, jobs)
+    executor = ProcessPoolExecutor(max_workers=min(workers, len(jobs)))
+    chunk = max(1, len(jobs) // (workers * 4))
+    try:
+        return list(executor.map(fn, jobs, chunksize=chunk))
+    finally:
+        executor.shutdown()
+
+
+def compare(args) -> int:
+    started = time.perf_counter()
+    captures = discover_captures(args.captures)
+    index = load_index(args.baselines)
+    jobs = [{
+        "key": key,
+        "capture": path,
+        "baseline": index.get(key),
+        "baseline_path": os.path.join(args.baselines, f"{key}.png"),
+        "heatmap": os.path.join(args.out, f"{key}.png"),
+        "tile": args.tile,
+        "threshold": args.threshold * args.threshold,
+    } for key, path in captures.items()]
+
+    results = list(run_jobs(compare_one, jobs, args.jobs))
+    elapsed = time.perf_counter() - started
+    counts = {status: sum(1 for r in results if r["status"] == status) for status in ("unchanged", "changed", "size", "new")}
+    failed = [r for r in results if r["status"] == "size" or r["diffRatio"] > args.max_diff_ratio]
+    summary = {
+        "elapsedSeconds": elapsed,
+        "images": len(results),
+        **counts,
+        "failed": len(failed),
+        "missing": sorted(set(index) - set(captures)),
+        "tiles": sum(r["tiles"] for r in results),
+        "tilesSkipped": sum(r["tilesSkipped"] for r in results),
+        "config": {"tile": args.tile, "threshold": args.threshold, "maxDiffRatio": args.max_diff_ratio,
+                   "baselines": args.baselines},
+        "results": results,
+    }
+    os.makedirs(args.out, exist_ok=True)
+    with open(os.path.join(args.out, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+
+    rows = [r for r in results if r["status"] != "unchanged"]
+    if rows:
+        print_table([{**r, "diff %": r["diffRatio"] * 100} for r in rows],
+                    ["key", "status", "diffTiles", "diffPixels", "diff %", "maxDelta"], title="Visual changes")
+        print()
+    print(f"{len(results)} images in {elapsed:.2f}s: {counts['unchanged']} unchanged, {counts['changed']} changed, "
+          f"{counts['size']} resized, {counts['new']} without baseline; "
+          f"{summary['tilesSkipped']}/{summary['tiles']} tiles skipped by hash")
+    if summary["missing"]:
+        print(f"baselines with no capture: {', '.join(summary['missing'])}")
+    print(f"Summary written to {os.path.join(args.out, 'summary.json')}")
+    return 1 if failed else 0
+
+
+def approve(args) -> int:
+    captures = discover_captures(args.captures)
+    keys = args.keys or list(captures)
+    unknown = [key for key in keys if key not in captures]
+    if unknown:
+        raise SystemExit(f"No capture for: {', '.join(unknown)} (captured: {', '.join(captures)})")
+
+    index = load_index(args.baselines)
+    jobs = [{"key": key, "capture": captures[key], "tile": args.tile} for key in keys]
+    for entry in run_jobs(baseline_entry, jobs, args.jobs):
+        key = entry.pop("key")
+        target = os.path.join(args.baselines, f"{key}.png")
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(captures[key], target)
+        index[key] = entry
+    with open(os.path.join(args.baselines, BASELINE_INDEX), "w") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    print(f"Approved {len(jobs)} baselines into {args.baselines}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Tile-hashed, parallel visual diff of the verification screenshots.")
+    parser.add_argument("--captures", default=CAPTURE_DIR, help="directory the verify scripts write to")
+    parser.add_argument("--baselines", default=BASELINE_DIR)
+    parser.add_argument("--tile", type=int, default=64, help="tile edge in pixels")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_compare = sub.add_parser("compare", help="diff the captures against their baselines")
+    p_compare.add_argument("--out", default=DIFF_DIR, help="heatmaps and summary.json go here")
+    p_compare.add_argument("--threshold", type=float, default=0.1,
+                           help="per-pixel colour difference (0..1, as in pixelmatch) that counts as changed")
+    p_compare.add_argument("--max-diff-ratio", type=float, default=0.0,
+                           help="fail when more than this share of an image's pixels changed")
+
+    p_approve = sub.add_parser("approve", help="store captures as the new baselines")
+    p_approve.add_argument("keys", nargs="*", help="scenario/viewport/name keys (default: every capture)")
+
+    args = parser.parse_args()
+    return compare(args) if args.command == "compare" else approve(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())